@@ -7,12 +7,14 @@ from .max_kz_time import MaxKZTimeCalc
 from .dyn_stability import DynStabilityCalc
 from .mdp_stability import MdpStabilityCalc
 from .uost_stability import UostStabilityCalc
+from .crt_search import CrtWarmStart
 
 __all__ = [
     'ShuntKZCalc',
     'MaxKZTimeCalc',
     'DynStabilityCalc',
     'MdpStabilityCalc',
-    'UostStabilityCalc'
+    'UostStabilityCalc',
+    'CrtWarmStart'
 ]
 
@@ -0,0 +1,322 @@
+"""
+Предварительная оценка критического времени отключения КЗ по правилу площадей
+
+Оценка выполняется по данным установившегося режима без расчета динамики:
+критический генератор (электрически ближайший к месту КЗ) рассматривается
+как эквивалентная машина, работающая на шины бесконечной мощности (базисный
+узел), передаточные сопротивления до, во время и после КЗ определяются
+по схеме из реактивных сопротивлений ветвей. Схема факторизуется один раз
+на топологию (до КЗ и после отключения ветвей), КЗ учитывается поправкой
+ранга один, кандидаты ограничиваются генераторами, ближайшими к месту КЗ.
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.network_graph import connected_nodes
+
+from .thevenin import SCIPY_AVAILABLE, admittance_matrix
+
+if SCIPY_AVAILABLE:
+    from scipy.sparse.linalg import splu
+
+# Результат оценки сценария
+SCREENED = 0  # Критическое время оценено
+TRIVIALLY_STABLE = 1  # Устойчиво при неотключаемом КЗ
+TRIVIALLY_UNSTABLE = 2  # Неустойчиво при мгновенном отключении КЗ (нет послеаварийного равновесия)
+
+# Проводимость глухого КЗ в узле, о.е.
+FAULT_SUSCEPTANCE = 1e9
+# Взаимная проводимость, ниже которой передача мощности считается невозможной, о.е.
+MIN_SUSCEPTANCE = 1e-6
+# Число электрически ближайших к месту КЗ генераторов, среди которых выбирается критический
+NEAR_GENERATORS = 5
+
+
+class CctEstimate:
+    """Оценка критического времени отключения КЗ для сценария"""
+
+    def __init__(self, status: int, cct: float = math.nan, generator: int = -1):
+        """
+        Args:
+            status: SCREENED, TRIVIALLY_STABLE или TRIVIALLY_UNSTABLE
+            cct: Оценка критического времени, с (для SCREENED)
+            generator: Номер узла критического генератора
+        """
+        self.status = status
+        self.cct = cct
+        self.generator = generator
+
+    def bracket(self, max_time: float, margin: float, precision: float) -> Tuple[float, float]:
+        """
+        Начальный интервал поиска (устойчиво, неустойчиво) для find_crt_time
+
+        Args:
+            max_time: Максимальное время отключения КЗ, с
+            margin: Относительная погрешность оценки
+            precision: Точность расчета, с
+        """
+        if self.status == TRIVIALLY_STABLE:
+            return max_time, max_time
+        if self.status == TRIVIALLY_UNSTABLE:
+            return 0.0, min(max_time, 2 * precision)
+        spread = max(self.cct * margin, precision)
+        return max(0.0, self.cct - spread), min(max_time, self.cct + spread)
+
+
+def equal_area_cct(tj: Sequence[float], pm: Sequence[float], pmax_pre: Sequence[float],
+                   pmax_fault: Sequence[float], pmax_post: Sequence[float],
+                   frequency: float = 50.0, max_time: float = 5.0,
+                   dt: float = 1e-4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Критическое время отключения КЗ эквивалентной машины по правилу площадей
+
+    Мощности задаются в одних относительных единицах, постоянная инерции Tj - на той же
+    базе. Критический угол определяется по правилу площадей; время его достижения -
+    аналитически при отсутствии передачи мощности во время КЗ и численным
+    интегрированием уравнения движения ротора (для всех сценариев одновременно) иначе.
+
+    Returns:
+        (оценки критического времени, с - NaN для тривиальных случаев; признаки результата)
+    """
+    tj, pm, pmax_pre, pmax_fault, pmax_post = (
+        np.asarray(v, dtype=float) for v in (tj, pm, pmax_pre, pmax_fault, pmax_post)
+    )
+    omega = 2 * math.pi * frequency
+    status = np.full(pm.shape, SCREENED)
+    cct = np.full(pm.shape, math.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        no_equilibrium = (pm >= pmax_pre) | (pm >= pmax_post)
+        status[no_equilibrium] = TRIVIALLY_UNSTABLE
+        # Мощность, передаваемая при КЗ, уравновешивает турбину
+        status[~no_equilibrium & (pm <= pmax_fault)] = TRIVIALLY_STABLE
+        active = status == SCREENED
+
+        delta0 = np.arcsin(np.clip(pm / pmax_pre, -1.0, 1.0))
+        delta_max = math.pi - np.arcsin(np.clip(pm / pmax_post, -1.0, 1.0))
+        cos_clear = (pm * (delta_max - delta0) + pmax_post * np.cos(delta_max)
+                     - pmax_fault * np.cos(delta0)) / (pmax_post - pmax_fault)
+    status[active & (cos_clear <= -1.0)] = TRIVIALLY_STABLE
+    status[active & (cos_clear >= np.cos(delta0))] = TRIVIALLY_UNSTABLE
+    active = status == SCREENED
+    delta_clear = np.arccos(np.clip(cos_clear, -1.0, 1.0))
+
+    # Без передачи мощности при КЗ ротор ускоряется равномерно
+    closed = active & (pmax_fault <= 0.0)
+    cct[closed] = np.sqrt(2 * tj[closed] * (delta_clear[closed] - delta0[closed])
+                          / (omega * pm[closed]))
+
+    numeric = np.flatnonzero(active & ~closed)
+    if numeric.size:
+        cct[numeric] = _integrate_clearing_time(
+            tj[numeric], pm[numeric], pmax_fault[numeric], delta0[numeric],
+            delta_clear[numeric], omega, max_time, dt,
+        )
+        status[numeric[np.isnan(cct[numeric])]] = TRIVIALLY_STABLE
+    return cct, status
+
+
+def _integrate_clearing_time(tj: np.ndarray, pm: np.ndarray, pmax_fault: np.ndarray,
+                             delta0: np.ndarray, delta_clear: np.ndarray, omega: float,
+                             max_time: float, dt: float) -> np.ndarray:
+    """Время достижения критического угла при КЗ (полунеявный метод Эйлера)"""
+    delta = delta0.copy()
+    speed = np.zeros_like(delta)
+    reached = np.full(delta.shape, math.nan)
+    pending = np.ones(delta.shape, dtype=bool)
+    for step in range(1, int(max_time / dt) + 1):
+        speed += dt * omega * (pm - pmax_fault * np.sin(delta)) / tj
+        delta += dt * speed
+        crossed = pending & (delta >= delta_clear)
+        reached[crossed] = step * dt
+        pending &= ~crossed
+        if not pending.any():
+            break
+    return reached
+
+
+class _GroundedNetwork:
+    """
+    Схема из реактивных сопротивлений ветвей с заземленным базисным узлом
+
+    Учитывается компонента связности базисного узла; матрица проводимостей
+    факторизуется один раз, столбцы матрицы сопротивлений получаются решением
+    с несколькими правыми частями.
+    """
+
+    def __init__(self, ip: np.ndarray, iq: np.ndarray, x: np.ndarray, base: int):
+        ip, iq, x = np.asarray(ip), np.asarray(iq), np.asarray(x, dtype=float)
+        component = connected_nodes(ip, iq, [base])
+        live = np.fromiter((a in component for a in ip.tolist()), dtype=bool, count=len(ip))
+        nodes = [base] + sorted(component - {base})
+        self.index = {ny: idx - 1 for idx, ny in enumerate(nodes) if idx}
+        self._lu = None
+        if not self.index:
+            return
+        matrix = admittance_matrix(np.array(nodes, dtype=int), ip[live], iq[live], x[live],
+                                   np.ones(int(live.sum())), np.zeros(0, dtype=int), np.zeros(0))
+        row = matrix[0, 1:]
+        # Проводимости ветвей от базисного узла: ток в базисный узел = w @ U
+        self._w = -(row.toarray().ravel() if SCIPY_AVAILABLE else row).real
+        if SCIPY_AVAILABLE:
+            self._lu = splu(matrix[1:, 1:])
+        else:
+            self._matrix = matrix[1:, 1:].real
+
+    def columns(self, nodes: Sequence[int]) -> np.ndarray:
+        """Столбцы матрицы сопротивлений (базисный узел заземлен) для узлов схемы"""
+        cols = [self.index[n] for n in nodes]
+        rhs = np.zeros((len(self.index), len(cols)))
+        rhs[cols, np.arange(len(cols))] = 1.0
+        if self._lu is not None:
+            return self._lu.solve(rhs).real
+        return np.linalg.solve(self._matrix, rhs)
+
+    def transfer(self, sources: Sequence[int], xd: Sequence[float], fault: Optional[int] = None,
+                 fault_column: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Взаимные проводимости между внутренними узлами источников (за сопротивлениями xd
+        от узлов sources) и базисным узлом; КЗ учитывается глухим шунтом в узле fault
+
+        Returns:
+            Взаимные проводимости, о.е. (0 - передача мощности невозможна)
+        """
+        result = np.zeros(len(sources))
+        present = [k for k, n in enumerate(sources) if n in self.index]
+        if not present:
+            return result
+        nodes = [sources[k] for k in present]
+        z = self.columns(nodes)
+        if fault in self.index:
+            f = self.index[fault]
+            zf = self.columns([fault])[:, 0] if fault_column is None else fault_column
+            z = z - np.outer(zf, z[f]) / (zf[f] + 1.0 / FAULT_SUSCEPTANCE)
+        # Единичный ток во внутреннем узле: доля, дошедшая до базисного узла,
+        # отнесенная к напряжению внутреннего узла
+        diagonal = z[[self.index[n] for n in nodes], np.arange(len(nodes))]
+        transfer = (self._w @ z) / (np.asarray(xd, dtype=float)[present] + diagonal)
+        result[present] = np.where(transfer > MIN_SUSCEPTANCE, transfer, 0.0)
+        return result
+
+
+def transfer_susceptance(ip: np.ndarray, iq: np.ndarray, x: np.ndarray, source: int,
+                         base: int, fault: Optional[int] = None) -> float:
+    """
+    Взаимная проводимость между узлом источника и базисным узлом
+
+    Схема из реактивных сопротивлений ветвей (ip, iq, x) приводится к двум узлам
+    (source, base); КЗ учитывается глухим шунтом в узле fault. Узлы,
+    не связанные с базисным узлом, не учитываются.
+
+    Returns:
+        Взаимная проводимость, о.е. (0 - передача мощности невозможна)
+    """
+    return float(_GroundedNetwork(ip, iq, x, base).transfer([source], [0.0], fault)[0])
+
+
+def _scenario_actions(rastr) -> Tuple[Optional[int], List[Tuple[int, int, int]]]:
+    """Узел КЗ и отключаемые ветви сценария"""
+    fault = None
+    trips = []
+    obj_class = rastr.get_column("DFWAutoActionScn", "ObjectClass").tolist()
+    obj_key = rastr.get_column("DFWAutoActionScn", "ObjectKey").tolist()
+    for cls, key in zip(obj_class, obj_key):
+        try:
+            if cls == "node" and fault is None:
+                fault = int(str(key).strip())
+            elif cls == "vetv":
+                parts = [int(p.strip()) for p in str(key).split(",")]
+                trips.append((parts[0], parts[1], parts[2] if len(parts) > 2 else 0))
+        except (ValueError, IndexError):
+            continue
+    return fault, trips
+
+
+def screen_scenario(rastr, base_mva: float = 100.0, frequency: float = 50.0) -> Optional[CctEstimate]:
+    """
+    Оценка критического времени для загруженных режима и сценария
+
+    Используются таблицы node (ny, uhom, tip, sta), vetv (ip, iq, np, x, sta)
+    и Generator (Node, P, Pnom, Mj, xd1, sta). Сопротивления приводятся к базисной
+    мощности base_mva по номинальному напряжению узла начала ветви (узла генератора).
+
+    Returns:
+        Оценка или None, если данных режима недостаточно
+    """
+    from utils.logger import logger
+
+    try:
+        fault, trips = _scenario_actions(rastr)
+        if fault is None:
+            return None
+        ny = rastr.get_column("node", "ny").astype(int)
+        uhom = dict(zip(ny.tolist(), rastr.get_column("node", "uhom").astype(float).tolist()))
+        node_on = rastr.get_column("node", "sta") == 0
+        base_nodes = ny[(rastr.get_column("node", "tip") == 0) & node_on]
+
+        ip = rastr.get_column("vetv", "ip").astype(int)
+        iq = rastr.get_column("vetv", "iq").astype(int)
+        npar = rastr.get_column("vetv", "np").astype(int)
+        x = rastr.get_column("vetv", "x").astype(float)
+        on = (rastr.get_column("vetv", "sta") == 0) & (x != 0)
+
+        gen_node = rastr.get_column("Generator", "Node").astype(int)
+        gen_on = (rastr.get_column("Generator", "sta") == 0) & (rastr.get_column("Generator", "P") > 0)
+        gen_p = rastr.get_column("Generator", "P").astype(float)
+        gen_pnom = rastr.get_column("Generator", "Pnom").astype(float)
+        gen_tj = rastr.get_column("Generator", "Mj").astype(float)
+        gen_xd = rastr.get_column("Generator", "xd1").astype(float)
+    except Exception as e:
+        logger.debug(f"Оценка критического времени недоступна: {e}")
+        return None
+    if not base_nodes.size or not gen_on.any():
+        return None
+    base = int(base_nodes[0])
+
+    # Схема в о.е.: ветви (без отключенных) и внутренние узлы генераторов
+    x_pu = x * base_mva / np.array([uhom.get(n, 1.0) for n in ip.tolist()]) ** 2
+    live_nodes = set(ny[node_on].tolist())
+    on &= np.array([a in live_nodes and b in live_nodes for a, b in zip(ip.tolist(), iq.tolist())], dtype=bool)
+    tripped = np.array([(a, b, c) in trips for a, b, c in zip(ip.tolist(), iq.tolist(), npar.tolist())],
+                       dtype=bool)
+
+    candidates = [idx for idx in np.flatnonzero(gen_on)
+                  if gen_node[idx] != base and gen_node[idx] in live_nodes and gen_xd[idx] > 0]
+    if not candidates or fault not in live_nodes:
+        return None
+    xd_pu = gen_xd * base_mva / np.array([uhom.get(n, 1.0) for n in gen_node.tolist()]) ** 2
+
+    try:
+        network = _GroundedNetwork(ip[on], iq[on], x_pu[on], base)
+        candidates = [idx for idx in candidates if gen_node[idx] in network.index]
+        if not candidates:
+            return None
+        fault_column = None
+        if fault in network.index:
+            # Электрическая близость к месту КЗ - доля снижения напряжения в узле КЗ,
+            # передающаяся в узел генератора (Z(n, f) / Z(f, f))
+            fault_column = network.columns([fault])[:, 0]
+            nearness = fault_column[[network.index[gen_node[idx]] for idx in candidates]]
+            order = np.argsort(-nearness, kind="stable")[:NEAR_GENERATORS]
+            candidates = [candidates[k] for k in order]
+        nodes = gen_node[candidates].tolist()
+        b_fault_all = network.transfer(nodes, xd_pu[candidates], fault, fault_column)
+        # Критический генератор - с наименьшей передачей мощности при КЗ
+        pick = int(np.argmin(b_fault_all))
+        idx = candidates[pick]
+        b_fault = float(b_fault_all[pick])
+        b_pre = float(network.transfer([gen_node[idx]], [xd_pu[idx]])[0])
+        post = on & ~tripped
+        b_post = float(_GroundedNetwork(ip[post], iq[post], x_pu[post], base)
+                       .transfer([gen_node[idx]], [xd_pu[idx]])[0])
+    except (RuntimeError, np.linalg.LinAlgError) as e:
+        logger.debug(f"Оценка критического времени недоступна: {e}")
+        return None
+
+    pm = gen_p[idx] / base_mva
+    tj = gen_tj[idx] * gen_pnom[idx] / base_mva
+    cct, status = equal_area_cct([tj], [pm], [b_pre], [b_fault], [b_post], frequency)
+    return CctEstimate(int(status[0]), float(cct[0]), int(gen_node[idx]))
@@ -0,0 +1,176 @@
+"""
+Ускорение поиска критического времени отключения КЗ: спекулятивный k-арный
+поиск и начальные интервалы по ранее найденным значениям
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def kary_probes(time_min: float, time_max: float, count: int) -> List[float]:
+    """Точки, делящие интервал [time_min, time_max] на count + 1 равных частей"""
+    step = (time_max - time_min) / (count + 1)
+    return [time_min + step * (idx + 1) for idx in range(count)]
+
+
+def speculative_crt_search(
+    evaluate: Callable[[Sequence[float]], Optional[List[bool]]],
+    precision: float,
+    max_time: float,
+    width: int,
+) -> Optional[Tuple[float, int, int]]:
+    """
+    Поиск критического времени КЗ пакетами из width расчетов динамики
+
+    За раунд интервал [устойчиво, неустойчиво] сужается в width + 1 раз
+    (при width = 1 - обычное деление пополам, как в RastrOperations.find_crt_time).
+    В первом раунде вместе с внутренними точками проверяется max_time.
+    Поиск завершается, когда половина интервала не превышает precision.
+
+    Args:
+        evaluate: Расчет пакета длительностей КЗ -> признаки устойчивости
+            (None - режим не сбалансирован, поиск прерывается)
+        precision: Точность расчета, с
+        max_time: Максимальное время отключения КЗ, с
+        width: Количество расчетов динамики в раунде
+
+    Returns:
+        (критическое время, раундов, расчетов динамики) или None
+    """
+    width = max(1, width)
+    time_min = 0.0
+    time_max = max_time
+    max_checked = False
+    rounds = 0
+    probes = 0
+
+    while not max_checked or (time_max - time_min) * 0.5 > precision:
+        if max_checked:
+            times = kary_probes(time_min, time_max, width)
+        else:
+            times = kary_probes(time_min, time_max, width - 1) + [time_max]
+        stable = evaluate(times)
+        if stable is None:
+            return None
+        rounds += 1
+        probes += len(times)
+
+        if not max_checked:
+            max_checked = True
+            if stable[-1]:
+                return max_time, rounds, probes
+
+        # Первая неустойчивая точка ограничивает интервал сверху,
+        # последняя устойчивая перед ней - снизу
+        for time, is_stable in zip(times, stable):
+            if is_stable:
+                time_min = time
+            else:
+                time_max = time
+                break
+
+    return time_min, rounds, probes
+
+
+def bisection_runs(precision: float, max_time: float) -> int:
+    """Количество расчетов динамики при поиске делением пополам с интервала [0, max_time]"""
+    if max_time <= precision:
+        return 1
+    return 1 + math.ceil(math.log2(max_time / precision))
+
+
+class CrtWarmStart:
+    """
+    Начальные интервалы поиска критического времени по ранее найденным значениям
+
+    Источники (в порядке приоритета): результат того же сценария для той же пары
+    (режим, вариант) из предыдущего запуска, медиана результатов сценария для других
+    вариантов и режимов текущего запуска. Найденные значения сохраняются в
+    paths.cache_dir для следующего запуска.
+    """
+
+    CACHE_FILE = "crt_warm_start.json"
+
+    def __init__(self, cache_file: Optional[Path] = None, margin: Optional[float] = None):
+        """
+        Args:
+            cache_file: Файл результатов предыдущих запусков
+                (по умолчанию paths.cache_dir/crt_warm_start.json)
+            margin: Полуширина начального интервала, с (по умолчанию - две точности расчета)
+        """
+        self._cache_file = Path(cache_file) if cache_file else None
+        self._margin = margin
+        self._previous: Optional[Dict[str, float]] = None
+        self._current: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(rgm: str, vrn: str, scn: str) -> str:
+        return f"{Path(rgm).name}|{vrn}|{Path(scn).name}"
+
+    def _cache_path(self) -> Path:
+        if self._cache_file:
+            return self._cache_file
+        from utils.config import config
+        return config.get_path("paths.cache_dir") / self.CACHE_FILE
+
+    def _load(self) -> Dict[str, float]:
+        if self._previous is None:
+            try:
+                self._previous = json.loads(self._cache_path().read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._previous = {}
+        return self._previous
+
+    def bracket(self, rgm: str, vrn: str, scn: str, precision: float,
+                max_time: float) -> Optional[Tuple[float, float]]:
+        """
+        Начальный интервал поиска для сценария
+
+        Returns:
+            (предположительно устойчиво, предположительно неустойчиво) или None
+        """
+        with self._lock:
+            guess = self._load().get(self._key(rgm, vrn, scn))
+            if guess is None:
+                neighbours = self._current.get(Path(scn).name)
+                if not neighbours:
+                    return None
+                guess = median(neighbours.values())
+        margin = self._margin if self._margin is not None else 2 * precision
+        return max(0.0, guess - margin), min(max_time, guess + margin)
+
+    def record(self, rgm: str, vrn: str, scn: str, crt_time: float):
+        """Сохранение найденного критического времени"""
+        with self._lock:
+            self._current.setdefault(Path(scn).name, {})[self._key(rgm, vrn, scn)] = crt_time
+
+    def save(self):
+        """Запись результатов текущего запуска для следующего (атомарная замена файла)"""
+        path = self._cache_path()
+        with self._lock:
+            data = dict(self._load())
+            for times in self._current.values():
+                data.update(times)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            from utils.logger import logger
+            logger.debug(f"Не удалось сохранить результаты поиска критического времени: {e}")
@@ -5,12 +5,12 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Tuple
 from models import (
     RgmsInfo, ScnsInfo, VrnInfo, KprInfo,
     DynResults, DynShems, Events
 )
-from rastr_operations import RastrOperations, DynamicResult
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, DynamicResult
 from utils.exceptions import InitialDataException
 
 
@@ -21,7 +21,10 @@ class DynStabilityCalc:
                  rgms: List[RgmsInfo], scns: List[ScnsInfo], vrns: List[VrnInfo],
                  rems_path: Optional[str], kprs: List[KprInfo], sechen_path: Optional[str],
                  lapnu_path: Optional[str], save_grf: bool, lpns: str,
-                 dyn_no_pa: bool, dyn_with_pa: bool, use_lpn: bool):
+                 dyn_no_pa: bool, dyn_with_pa: bool, use_lpn: bool,
+                 session_pool: Optional[RastrSessionPool] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 parallel_workers: int = 1):
         """
         Инициализация пакетного расчета ДУ
         
@@ -39,6 +42,10 @@ class DynStabilityCalc:
             dyn_no_pa: Расчет без ПА
             dyn_with_pa: Расчет с ПА
             use_lpn: Использовать формат LPN
+            session_pool: Пул сессий RASTR (по умолчанию создается собственный)
+            snapshot_store: Хранилище подготовленных режимов (по умолчанию создается собственное)
+            parallel_workers: Количество процессов для параллельного расчета сценариев
+                (1 - последовательный расчет)
         """
         if not rgms or not scns or (use_lpn and not sechen_path) or (save_grf and not kprs) or (dyn_with_pa and not lapnu_path):
             error_msg = "Не заданы все исходные данные для выполнения пакетного расчета динамической устойчивости!\n\n"
@@ -54,6 +61,9 @@ class DynStabilityCalc:
             raise InitialDataException(error_msg)
         
         self._progress_callback = progress_callback
+        self._pool = session_pool or RastrSessionPool()
+        self._snapshots = snapshot_store or SnapshotStore()
+        self._parallel_workers = parallel_workers or 1
         self._rgms = rgms
         self._scns = scns
         self._vrns = [v for v in vrns if not v.deactive]
@@ -93,105 +103,55 @@ class DynStabilityCalc:
     
     def calc(self) -> List[DynResults]:
         """Выполнение расчета"""
+        tasks = [
+            (rgm_idx, vrn_idx, scn_idx)
+            for rgm_idx in range(len(self._rgms))
+            for vrn_idx in range(len(self._vrns))
+            for scn_idx in range(len(self._scns))
+        ]
         progress = 0
-        results = []
+
+        def on_result(idx, result):
+            nonlocal progress
+            if result[2]:
+                progress += result[2]
+                if self._progress_callback:
+                    self._progress_callback(progress)
+
+        if self._parallel_workers > 1 and len(tasks) > 1:
+            from .parallel import run_parallel
+            outcomes = run_parallel(self, "_calc_scenario", tasks, self._parallel_workers, on_result)
+        else:
+            outcomes = []
+            unstable = set()
+            for idx, (rgm_idx, vrn_idx, scn_idx) in enumerate(tasks):
+                # Для несбалансированного варианта остальные сценарии не рассчитываются
+                if (rgm_idx, vrn_idx) in unstable:
+                    outcomes.append((False, None, 0))
+                    continue
+                outcomes.append(self._calc_scenario(rgm_idx, vrn_idx, scn_idx))
+                on_result(idx, outcomes[idx])
+                if not outcomes[idx][0]:
+                    unstable.add((rgm_idx, vrn_idx))
+            self._pool.log_stats()
+            self._snapshots.log_stats()
+        outcomes = dict(zip(tasks, outcomes))
         
+        results = []
         for rgm_idx, rgm in enumerate(self._rgms):
             dyn_shems_list = []
             
-            for vrn in self._vrns:
+            for vrn_idx, vrn in enumerate(self._vrns):
                 dyn_shem = DynShems(sheme_name=vrn.name, is_stable=False, events=[])
                 events_list = []
                 
-                for scn_idx, scn in enumerate(self._scns):
-                    rastr = RastrOperations()
-                    rastr.load(rgm.name)
-                    rastr.dyn_settings()
-                    
-                    # Применение варианта
-                    if vrn.id == -1:
-                        is_stable = rastr.rgm()
-                    else:
-                        # ИСПРАВЛЕНО: Проверка наличия пути к файлу ремонтных схем (как в C#)
-                        if not self._rems_path:
-                            from utils.logger import logger
-                            logger.error(f"Файл ремонтных схем не загружен, но требуется для варианта {vrn.name}")
-                            is_stable = False
-                        else:
-                            is_stable = rastr.apply_variant(vrn.num, self._rems_path)
-                    
+                for scn_idx in range(len(self._scns)):
+                    is_stable, events, _ = outcomes[(rgm_idx, vrn_idx, scn_idx)]
                     dyn_shem.is_stable = is_stable
-                    
                     if not is_stable:
                         break
-                    
-                    no_pa_result = DynamicResult()
-                    with_pa_result = DynamicResult()
-                    no_pa_pic = []
-                    with_pa_pic = []
-                    
-                    # Расчет без ПА
-                    if self._dyn_no_pa:
-                        rastr.load(scn.name)
-                        rastr.load_template(".dfw")
-                        
-                        if self._save_grf:
-                            no_pa_result = rastr.run_dynamic(ems=False)
-                            # Сохранение графиков
-                            for grf_num, kprs_group in self._grf_groups.items():
-                                pic_path = self._root / f"Рисунок - {rgm_idx + 1}.{vrn.num + 1}.{scn_idx + 1}.{grf_num}(без ПА).png"
-                                self._save_picture(rastr, kprs_group, str(pic_path))
-                                no_pa_pic.append(str(pic_path))
-                        else:
-                            no_pa_result = rastr.run_dynamic(ems=True)
-                        
-                        progress += 1
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                    
-                    # Расчет с ПА
-                    if self._dyn_with_pa:
-                        # ИСПРАВЛЕНО: Проверка наличия путей (как в C# строка 159-165)
-                        if self._use_lpn:
-                            if not self._sechen_path:
-                                from utils.logger import logger
-                                logger.error("Файл сечений не загружен, но требуется для расчета с ПА в формате LPN")
-                                continue
-                            if not self._lapnu_path:
-                                from utils.logger import logger
-                                logger.error("Файл ПА не загружен, но требуется для расчета с ПА")
-                                continue
-                            rastr.load(self._sechen_path)
-                            rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
-                        else:
-                            if not self._lapnu_path:
-                                from utils.logger import logger
-                                logger.error("Файл ПА не загружен, но требуется для расчета с ПА")
-                                continue
-                            rastr.load(scn.name)
-                            rastr.load(self._lapnu_path)
-                        
-                        if self._save_grf:
-                            with_pa_result = rastr.run_dynamic(ems=False)
-                            # Сохранение графиков
-                            for grf_num, kprs_group in self._grf_groups.items():
-                                pic_path = self._root / f"Рисунок - {rgm_idx + 1}.{vrn.num + 1}.{scn_idx + 1}.{grf_num}(с ПА).png"
-                                self._save_picture(rastr, kprs_group, str(pic_path))
-                                with_pa_pic.append(str(pic_path))
-                        else:
-                            with_pa_result = rastr.run_dynamic(ems=True)
-                        
-                        progress += 1
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                    
-                    events_list.append(Events(
-                        name=Path(scn.name).stem,
-                        no_pa_result=no_pa_result,
-                        with_pa_result=with_pa_result,
-                        no_pa_pic=no_pa_pic,
-                        with_pa_pic=with_pa_pic
-                    ))
+                    if events is not None:
+                        events_list.append(events)
                 
                 dyn_shem.events = events_list
                 dyn_shems_list.append(dyn_shem)
@@ -203,6 +163,93 @@ class DynStabilityCalc:
         
         return results
     
+    def _calc_scenario(self, rgm_idx: int, vrn_idx: int, scn_idx: int) -> Tuple[bool, Optional[Events], int]:
+        """
+        Расчет одного аварийного процесса в сессии из пула
+        
+        Returns:
+            (режим с вариантом сбалансирован, результаты или None, количество шагов прогресса)
+        """
+        rgm = self._rgms[rgm_idx]
+        vrn = self._vrns[vrn_idx]
+        scn = self._scns[scn_idx]
+        steps = 0
+        
+        with self._pool.session() as rastr:
+            # Загрузка режима с примененным вариантом (из снимка, если он уже подготовлен)
+            if not self._snapshots.prepare(rastr, rgm.name, vrn, self._rems_path):
+                return False, None, steps
+        
+            no_pa_result = DynamicResult()
+            with_pa_result = DynamicResult()
+            no_pa_pic = []
+            with_pa_pic = []
+        
+            # Расчет без ПА
+            if self._dyn_no_pa:
+                rastr.load(scn.name)
+                rastr.load_template(".dfw")
+            
+                if self._save_grf:
+                    no_pa_result = rastr.run_dynamic(ems=False)
+                    # Сохранение графиков
+                    for grf_num, kprs_group in self._grf_groups.items():
+                        pic_path = self._root / f"Рисунок - {rgm_idx + 1}.{vrn.num + 1}.{scn_idx + 1}.{grf_num}(без ПА).png"
+                        self._save_picture(rastr, kprs_group, str(pic_path))
+                        no_pa_pic.append(str(pic_path))
+                else:
+                    no_pa_result = rastr.run_dynamic(ems=True)
+            
+                steps += 1
+        
+            # Расчет с ПА
+            if self._dyn_with_pa:
+                # ИСПРАВЛЕНО: Проверка наличия путей (как в C# строка 159-165)
+                if self._use_lpn:
+                    if not self._sechen_path:
+                        from utils.logger import logger
+                        logger.error("Файл сечений не загружен, но требуется для расчета с ПА в формате LPN")
+                        return True, None, steps
+                    if not self._lapnu_path:
+                        from utils.logger import logger
+                        logger.error("Файл ПА не загружен, но требуется для расчета с ПА")
+                        return True, None, steps
+                    from utils.config import config
+                    if config.get("performance.lpn_scn_cache", False):
+                        self._snapshots.lpn_scenario(
+                            rastr, self._sechen_path, self._lapnu_path, self._lpns, scn.name
+                        )
+                    else:
+                        rastr.load(self._sechen_path)
+                        rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
+                else:
+                    if not self._lapnu_path:
+                        from utils.logger import logger
+                        logger.error("Файл ПА не загружен, но требуется для расчета с ПА")
+                        return True, None, steps
+                    rastr.load(scn.name)
+                    rastr.load(self._lapnu_path)
+            
+                if self._save_grf:
+                    with_pa_result = rastr.run_dynamic(ems=False)
+                    # Сохранение графиков
+                    for grf_num, kprs_group in self._grf_groups.items():
+                        pic_path = self._root / f"Рисунок - {rgm_idx + 1}.{vrn.num + 1}.{scn_idx + 1}.{grf_num}(с ПА).png"
+                        self._save_picture(rastr, kprs_group, str(pic_path))
+                        with_pa_pic.append(str(pic_path))
+                else:
+                    with_pa_result = rastr.run_dynamic(ems=True)
+            
+                steps += 1
+        
+            return True, Events(
+                name=Path(scn.name).stem,
+                no_pa_result=no_pa_result,
+                with_pa_result=with_pa_result,
+                no_pa_pic=no_pa_pic,
+                with_pa_pic=with_pa_pic
+            ), steps
+    
     def _save_picture(self, rastr: RastrOperations, kprs: List[KprInfo], file_path: str):
         """Сохранение графика (интерактивный Plotly или статический matplotlib)"""
         try:
@@ -5,11 +5,12 @@
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Tuple
 from models import (
     RgmsInfo, ScnsInfo, VrnInfo, CrtTimeResults, CrtShems, CrtTimes
 )
-from rastr_operations import RastrOperations
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore
+from .crt_search import CrtWarmStart, bisection_runs
 from utils.exceptions import InitialDataException
 
 
@@ -18,7 +19,12 @@ class MaxKZTimeCalc:
     
     def __init__(self, progress_callback: Optional[Callable[[int], None]],
                  rgms: List[RgmsInfo], scns: List[ScnsInfo], vrns: List[VrnInfo],
-                 rems_path: Optional[str], time_precision: float, max_time: float):
+                 rems_path: Optional[str], time_precision: float, max_time: float,
+                 session_pool: Optional[RastrSessionPool] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 parallel_workers: int = 1, parallel_retries: Optional[int] = None,
+                 speculative: bool = False, warm_start: Optional[CrtWarmStart] = None,
+                 screening: bool = False, screening_margin: float = 0.3):
         """
         Инициализация расчета предельного времени КЗ
         
@@ -30,6 +36,19 @@ class MaxKZTimeCalc:
             rems_path: Путь к файлу ремонтных схем
             time_precision: Точность расчета (секунды)
             max_time: Максимальное время отключения КЗ (секунды)
+            session_pool: Пул сессий RASTR (по умолчанию создается собственный)
+            snapshot_store: Хранилище подготовленных режимов (по умолчанию создается собственное)
+            parallel_workers: Количество процессов для параллельного расчета сценариев
+                (1 - последовательный расчет)
+            parallel_retries: Количество повторов после аварийного завершения рабочего процесса
+                (по умолчанию performance.parallel_retries)
+            speculative: Спекулятивный поиск: сценарии рассчитываются по очереди, в каждом
+                раунде parallel_workers расчетов динамики сужают интервал в parallel_workers + 1 раз
+            warm_start: Начальные интервалы поиска по ранее найденным значениям
+                (при параллельном расчете используются результаты предыдущего запуска)
+            screening: Начальный интервал поиска по оценке правилом площадей (если нет
+                интервала warm_start)
+            screening_margin: Относительная погрешность оценки правилом площадей
         """
         if not rgms or not scns or max_time == 0.0:
             error_msg = "Не заданы все исходные данные для определения предельного времени отключения КЗ!\n\n"
@@ -40,6 +59,14 @@ class MaxKZTimeCalc:
             raise InitialDataException(error_msg)
         
         self._progress_callback = progress_callback
+        self._pool = session_pool or RastrSessionPool()
+        self._snapshots = snapshot_store or SnapshotStore()
+        self._parallel_workers = parallel_workers or 1
+        self._parallel_retries = parallel_retries
+        self._speculative = speculative
+        self._warm_start = warm_start
+        self._screening = screening
+        self._screening_margin = screening_margin
         self._rgms = rgms
         self._scns = scns
         self._vrns = [v for v in vrns if not v.deactive]
@@ -47,6 +74,9 @@ class MaxKZTimeCalc:
         self._time_precision = time_precision
         self._max_time = max_time
         
+        # Статистика поиска: спекулятивный поиск (раунды) и расчеты динамики
+        self.search_stats = {'scenarios': 0, 'rounds': 0, 'probes': 0, 'runs_saved': 0}
+        
         # Создание папки для результатов
         from utils.config import config
         results_dir = config.get_path("paths.results_dir")
@@ -65,41 +95,65 @@ class MaxKZTimeCalc:
     
     def calc(self) -> List[CrtTimeResults]:
         """Выполнение расчета"""
+        tasks = [
+            (rgm_idx, vrn_idx, scn_idx)
+            for rgm_idx in range(len(self._rgms))
+            for vrn_idx in range(len(self._vrns))
+            for scn_idx in range(len(self._scns))
+        ]
         progress = 0
-        results = []
+
+        def on_result(idx, result):
+            nonlocal progress
+            is_stable, crt_times, runs = result
+            if crt_times is not None:
+                rgm_idx, vrn_idx, scn_idx = tasks[idx]
+                self.search_stats['scenarios'] += 1
+                self.search_stats['probes'] += runs
+                self.search_stats['runs_saved'] += bisection_runs(self._time_precision, self._max_time) - runs
+                if self._warm_start is not None:
+                    self._warm_start.record(self._rgms[rgm_idx].name, self._vrns[vrn_idx].name,
+                                            self._scns[scn_idx].name, crt_times.crt_time)
+                progress += 1
+                if self._progress_callback:
+                    self._progress_callback(progress)
+
+        if self._speculative and self._parallel_workers > 1:
+            from .parallel import WorkerPool
+            outcomes = []
+            with WorkerPool(self, self._parallel_workers) as pool:
+                for idx, task in enumerate(tasks):
+                    outcomes.append(self._search_speculative(pool, *task))
+                    on_result(idx, outcomes[idx])
+        elif self._parallel_workers > 1 and len(tasks) > 1:
+            from .parallel import run_parallel
+            outcomes = run_parallel(self, "_calc_scenario", tasks, self._parallel_workers,
+                                    on_result, self._parallel_retries)
+        else:
+            outcomes = []
+            for idx, task in enumerate(tasks):
+                outcomes.append(self._calc_scenario(*task))
+                on_result(idx, outcomes[idx])
+            self._pool.log_stats()
+            self._snapshots.log_stats()
+        self._log_search_stats()
+        if self._warm_start is not None:
+            self._warm_start.save()
+        outcomes = dict(zip(tasks, outcomes))
         
-        for rgm in self._rgms:
+        results = []
+        for rgm_idx, rgm in enumerate(self._rgms):
             crt_shems_list = []
             
-            for vrn in self._vrns:
+            for vrn_idx, vrn in enumerate(self._vrns):
                 times_list = []
                 crt_shem = CrtShems(sheme_name=vrn.name, is_stable=False, times=[])
                 
-                for scn in self._scns:
-                    rastr = RastrOperations()
-                    rastr.load(rgm.name)
-                    rastr.load(scn.name)
-                    
-                    # Применение варианта
-                    if vrn.id == -1:
-                        is_stable = rastr.rgm()
-                    else:
-                        is_stable = rastr.apply_variant(vrn.num, self._rems_path)
-                    
+                for scn_idx in range(len(self._scns)):
+                    is_stable, crt_times, _ = outcomes[(rgm_idx, vrn_idx, scn_idx)]
                     crt_shem.is_stable = is_stable
-                    
-                    if is_stable:
-                        # Поиск критического времени
-                        crt_time = rastr.find_crt_time(self._time_precision, self._max_time)
-                        
-                        times_list.append(CrtTimes(
-                            scn_name=Path(scn.name).stem,
-                            crt_time=crt_time
-                        ))
-                        
-                        progress += 1
-                        if self._progress_callback:
-                            self._progress_callback(progress)
+                    if crt_times is not None:
+                        times_list.append(crt_times)
                 
                 crt_shem.times = times_list
                 crt_shems_list.append(crt_shem)
@@ -110,4 +164,111 @@ class MaxKZTimeCalc:
             ))
         
         return results
-
+    
+    def _calc_scenario(self, rgm_idx: int, vrn_idx: int, scn_idx: int) -> Tuple[bool, Optional[CrtTimes], int]:
+        """
+        Поиск критического времени для одного аварийного процесса в сессии из пула
+        
+        Returns:
+            (режим с вариантом сбалансирован, критическое время или None, расчетов динамики)
+        """
+        rgm = self._rgms[rgm_idx]
+        vrn = self._vrns[vrn_idx]
+        scn = self._scns[scn_idx]
+        
+        with self._pool.session() as rastr:
+            # Загрузка режима с примененным вариантом (из снимка, если он уже подготовлен)
+            if not self._snapshots.prepare(rastr, rgm.name, vrn, self._rems_path):
+                return False, None, 0
+            
+            rastr.load(scn.name)
+            
+            # Поиск критического времени (с интервала по соседним результатам, если они есть)
+            bracket = None
+            if self._warm_start is not None:
+                bracket = self._warm_start.bracket(rgm.name, vrn.name, scn.name,
+                                                   self._time_precision, self._max_time)
+            if bracket is None and self._screening:
+                bracket = self._screen(rastr, scn)
+            crt_time = rastr.find_crt_time(self._time_precision, self._max_time, bracket)
+            
+            return True, CrtTimes(
+                scn_name=Path(scn.name).stem,
+                crt_time=crt_time
+            ), rastr.crt_runs
+    
+    def _screen(self, rastr: RastrOperations, scn: ScnsInfo) -> Optional[Tuple[float, float]]:
+        """Начальный интервал поиска по оценке критического времени правилом площадей"""
+        from utils.logger import logger
+        from .cct_screening import TRIVIALLY_STABLE, TRIVIALLY_UNSTABLE, screen_scenario
+        
+        estimate = screen_scenario(rastr)
+        if estimate is None:
+            return None
+        if estimate.status == TRIVIALLY_STABLE:
+            logger.info(f"Сценарий {Path(scn.name).stem}: по оценке устойчив при неотключаемом КЗ")
+        elif estimate.status == TRIVIALLY_UNSTABLE:
+            logger.info(f"Сценарий {Path(scn.name).stem}: по оценке неустойчив при любом времени отключения")
+        else:
+            logger.debug(f"Сценарий {Path(scn.name).stem}: оценка критического времени {estimate.cct:.3f} с "
+                         f"(генератор в узле {estimate.generator})")
+        return estimate.bracket(self._max_time, self._screening_margin, self._time_precision)
+    
+    def _search_speculative(self, pool, rgm_idx: int, vrn_idx: int, scn_idx: int) -> Tuple[bool, Optional[CrtTimes], int]:
+        """
+        Спекулятивный поиск критического времени: расчеты динамики раунда выполняются
+        одновременно в рабочих процессах пула
+        
+        Returns:
+            (режим с вариантом сбалансирован, критическое время или None, расчетов динамики)
+        """
+        from .crt_search import speculative_crt_search
+        
+        def evaluate(times):
+            stable = pool.map("_probe_scenario", [(rgm_idx, vrn_idx, scn_idx, dt) for dt in times])
+            return None if None in stable else stable
+        
+        found = speculative_crt_search(evaluate, self._time_precision, self._max_time, pool.workers)
+        if found is None:
+            return False, None, 0
+        crt_time, rounds, probes = found
+        
+        self.search_stats['rounds'] += rounds
+        return True, CrtTimes(
+            scn_name=Path(self._scns[scn_idx].name).stem,
+            crt_time=crt_time
+        ), probes
+    
+    def _probe_scenario(self, rgm_idx: int, vrn_idx: int, scn_idx: int, dt: float) -> Optional[bool]:
+        """
+        Расчет динамики аварийного процесса с заданной длительностью КЗ
+        
+        Returns:
+            Признак устойчивости или None, если режим с вариантом не сбалансирован
+        """
+        rgm = self._rgms[rgm_idx]
+        vrn = self._vrns[vrn_idx]
+        
+        with self._pool.session() as rastr:
+            if not self._snapshots.prepare(rastr, rgm.name, vrn, self._rems_path):
+                return None
+            rastr.load(self._scns[scn_idx].name)
+            return rastr.probe_crt_time(dt)
+    
+    def _log_search_stats(self):
+        """Вывод статистики поиска критического времени в лог"""
+        from utils.logger import logger
+        
+        stats = self.search_stats
+        scenarios = stats['scenarios']
+        if not scenarios:
+            return
+        message = (
+            f"Поиск критического времени: сценариев {scenarios}, "
+            f"расчетов динамики {stats['probes']} ({stats['probes'] / scenarios:.1f} на сценарий)"
+        )
+        if stats['rounds']:
+            message += f", раундов {stats['rounds']} ({stats['rounds'] / scenarios:.1f} на сценарий)"
+        if self._warm_start is not None:
+            message += f", сэкономлено расчетов динамики в среднем {stats['runs_saved'] / scenarios:.1f} на сценарий"
+        logger.info(message)
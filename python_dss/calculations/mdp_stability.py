@@ -4,15 +4,22 @@
 
 import os
 import math
+import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Sequence, Tuple
 from models import (
     RgmsInfo, ScnsInfo, VrnInfo, SchInfo, KprInfo,
     MdpResults, MdpShems, MdpEvents, Values
 )
-from rastr_operations import RastrOperations
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, WeightingTrajectory
+from utils.boundary_search import BoundaryResult, find_boundary, make_boundary_search
 from utils.exceptions import InitialDataException
+from .crt_search import bisection_runs
+
+# Запас к наибольшему приросту предела от ПА в предыдущих сценариях варианта
+# (доля интервала от предела без ПА до исходного режима) для первой пробы с ПА
+PA_GAIN_MARGIN = 0.1
 
 
 class MdpStabilityCalc:
@@ -22,7 +29,13 @@ class MdpStabilityCalc:
                  rgms: List[RgmsInfo], scns: List[ScnsInfo], vrns: List[VrnInfo],
                  rems_path: Optional[str], vir_path: Optional[str], sechen_path: Optional[str],
                  lapnu_path: Optional[str], schs: List[SchInfo], kprs: List[KprInfo],
-                 lpns: str, selected_sch: int, no_pa: bool, with_pa: bool, use_lpn: bool):
+                 lpns: str, selected_sch: int, no_pa: bool, with_pa: bool, use_lpn: bool,
+                 session_pool: Optional[RastrSessionPool] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 parallel_workers: int = 1,
+                 search_method: Optional[str] = None,
+                 weighting_trajectory: Optional[bool] = None,
+                 seed_with_pa: Optional[bool] = None):
         """
         Инициализация расчета МДП ДУ
         
@@ -42,6 +55,16 @@ class MdpStabilityCalc:
             no_pa: Расчет без ПА
             with_pa: Расчет с ПА
             use_lpn: Использовать формат LPN
+            session_pool: Пул сессий RASTR (по умолчанию создается собственный)
+            snapshot_store: Хранилище подготовленных режимов (по умолчанию создается собственное)
+            parallel_workers: Количество процессов для параллельного расчета вариантов
+                (1 - последовательный расчет)
+            search_method: Стратегия поиска предельного шага утяжеления (bisection, secant;
+                по умолчанию calculations.mdp_search)
+            weighting_trajectory: Запись траектории утяжеления для калибровки шага и выбора
+                шага проб по перетоку (по умолчанию performance.weighting_trajectory)
+            seed_with_pa: Поиск МДП с ПА от найденного предела без ПА
+                (по умолчанию calculations.mdp_seed_with_pa)
         """
         if not rgms or not scns or not vir_path or not sechen_path or (lapnu_path is None and with_pa) or (use_lpn and not sechen_path):
             error_msg = "Не заданы все исходные данные для определения допустимых перетоков мощности!\n\n"
@@ -59,6 +82,20 @@ class MdpStabilityCalc:
             raise InitialDataException(error_msg)
         
         self._progress_callback = progress_callback
+        self._pool = session_pool or RastrSessionPool()
+        self._snapshots = snapshot_store or SnapshotStore()
+        self._parallel_workers = parallel_workers or 1
+        from utils.config import config
+        self._search_method = search_method or config.get("calculations.mdp_search", "bisection")
+        self._max_probes = config.get("calculations.mdp_max_probes", 100)
+        if weighting_trajectory is None:
+            weighting_trajectory = config.get("performance.weighting_trajectory", False)
+        self._use_trajectory = weighting_trajectory
+        self._trajectory_resolution = config.get("performance.weighting_resolution", 1)
+        if seed_with_pa is None:
+            seed_with_pa = config.get("calculations.mdp_seed_with_pa", False)
+        self._seed_with_pa = seed_with_pa
+        self._progress = 0
         self._rgms = rgms
         self._scns = scns
         self._vrns = [v for v in vrns if not v.deactive]
@@ -74,6 +111,9 @@ class MdpStabilityCalc:
         self._with_pa = with_pa
         self._use_lpn = use_lpn
         
+        # Статистика поиска МДП: расчеты динамики без ПА и с ПА
+        self.search_stats = {'scenarios': 0, 'no_pa_probes': 0, 'with_pa_probes': 0, 'runs_saved': 0}
+        
         # Создание папки для результатов
         from utils.config import config
         results_dir = config.get_path("paths.results_dir")
@@ -103,7 +143,7 @@ class MdpStabilityCalc:
         logger.info(f"Количество сценариев: {len(self._scns)}")
         logger.info(f"Максимальное количество шагов: {self.max}")
         
-        progress = 0
+        self._progress = 0
         results = []
         tmp_file = self._root / "mdp_calc_tmp.rst"
         tmp_file_base = self._root / "mdp_calc_tmp_base.rst"  # Базовое состояние до калибровки
@@ -111,508 +151,61 @@ class MdpStabilityCalc:
         logger.info(f"Базовый временный файл: {tmp_file_base}")
         
         # Начальный прогресс
-        logger.info(f"Вызов progress_callback с progress={progress}")
+        logger.info(f"Вызов progress_callback с progress={self._progress}")
         if self._progress_callback:
             try:
-                self._progress_callback(progress)
+                self._progress_callback(self._progress)
                 logger.info("progress_callback выполнен успешно")
             except Exception as e:
                 logger.error(f"Ошибка в progress_callback: {e}")
         else:
             logger.warning("progress_callback не установлен!")
         
-        logger.info("Начало цикла по режимам (rgms)")
-        for rgm_idx, rgm in enumerate(self._rgms):
-            logger.info(f"[РЕЖИМ {rgm_idx + 1}/{len(self._rgms)}] Обработка режима: {Path(rgm.name).stem}")
-            mdp_shems_list = []
+        tasks = [(rgm_idx, vrn_idx) for rgm_idx in range(len(self._rgms)) for vrn_idx in range(len(self._vrns))]
+        parallel = self._parallel_workers > 1 and len(tasks) > 1
+        if parallel:
+            from .parallel import run_parallel
             
-            logger.info(f"[РЕЖИМ {rgm_idx + 1}] Начало цикла по вариантам (vrns)")
-            for vrn_idx, vrn in enumerate(self._vrns):
-                logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}/{len(self._vrns)}] Обработка варианта: {vrn.name}")
-                mdp_shem = MdpShems(
-                    sheme_name=vrn.name,
-                    is_ready=False,
-                    is_stable=False,
-                    max_step=0.0,
-                    p_pred=0.0,
-                    p_start=0.0,
-                    events=[]
-                )
-                events_list = []
-                
-                logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}/{len(self._vrns)}] Обработка варианта: {vrn.name}")
-                logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}] Начало цикла по сценариям (scns)")
-                for scn_idx, scn in enumerate(self._scns):
-                    logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}/{len(self._scns)}] Обработка сценария: {Path(scn.name).stem}")
-                    
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Создание объекта RastrOperations")
-                    rastr = RastrOperations()
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] RastrOperations создан")
-                    
-                    # Инициализация схемы (только один раз)
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Проверка is_ready: {mdp_shem.is_ready}")
-                    if not mdp_shem.is_ready:
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] ИНИЦИАЛИЗАЦИЯ СХЕМЫ: {vrn.name} для режима {Path(rgm.name).stem}")
-                        # Обновление прогресса при начале инициализации схемы
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Вызов progress_callback (инициализация)")
-                        if self._progress_callback:
-                            try:
-                                self._progress_callback(progress)
-                            except Exception as e:
-                                logger.error(f"Ошибка в progress_callback: {e}")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка режима: {rgm.name}")
-                        rastr.load(rgm.name)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Режим загружен")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Настройка параметров динамики")
-                        rastr.dyn_settings()
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Параметры динамики настроены")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Применение варианта: vrn.id={vrn.id}, vrn.num={vrn.num}")
-                        if vrn.id == -1:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Вызов rgm() (базовый вариант)")
-                            mdp_shem.is_stable = rastr.rgm()
-                        else:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Вызов apply_variant({vrn.num}, {self._rems_path})")
-                            mdp_shem.is_stable = rastr.apply_variant(vrn.num, self._rems_path)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Результат применения варианта (is_stable): {mdp_shem.is_stable}")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Сохранение базового состояния во временный файл: {tmp_file_base}")
-                        rastr.save(str(tmp_file_base))
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Базовый файл сохранен")
-                        mdp_shem.is_ready = True
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] is_ready установлен в True")
-                        
-                        if mdp_shem.is_stable:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Схема устойчива, продолжаем инициализацию")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка базового временного файла: {tmp_file_base}")
-                            rastr.load(str(tmp_file_base))
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка файла сечений: {self._sechen_path}")
-                            rastr.load(self._sechen_path)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка файла VIR: {self._vir_path}")
-                            rastr.load(self._vir_path)
-                            
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Получение p_start для сечения {self._selected_sch}")
-                            mdp_shem.p_start = rastr.get_val("sechen", "psech", self._selected_sch)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] p_start = {mdp_shem.p_start}")
-                            
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Вызов run_ut() для определения max_step")
-                            mdp_shem.max_step = rastr.run_ut()
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] max_step = {mdp_shem.max_step}")
-                            
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Получение p_pred для сечения {self._selected_sch}")
-                            mdp_shem.p_pred = rastr.get_val("sechen", "psech", self._selected_sch)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] p_pred = {mdp_shem.p_pred}")
-                            
-                            # Калибровка шага
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] НАЧАЛО КАЛИБРОВКИ ШАГА")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка базового временного файла для калибровки: {tmp_file_base}")
-                            rastr.load(str(tmp_file_base))
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Загрузка VIR для калибровки")
-                            rastr.load(self._vir_path)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Вызов step({mdp_shem.max_step * 0.9})")
-                            mdp_shem.max_step = rastr.step(mdp_shem.max_step * 0.9)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] max_step после первого step = {mdp_shem.max_step}")
-                            
-                            p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] p_current после первого step = {p_current}")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Целевое значение: p_pred * 0.9 = {mdp_shem.p_pred * 0.9}")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Разница: {abs(p_current - mdp_shem.p_pred * 0.9)}")
-                            
-                            iteration = 0
-                            max_calibration_iterations = 50  # Максимум итераций калибровки
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Начало цикла калибровки (макс. {max_calibration_iterations} итераций)")
-                            while abs(p_current - mdp_shem.p_pred * 0.9) > 2.0 and iteration < max_calibration_iterations:
-                                logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}] Калибровка, итерация {iteration + 1}: p_current={p_current:.2f}, цель={mdp_shem.p_pred * 0.9:.2f}, разница={abs(p_current - mdp_shem.p_pred * 0.9):.2f}")
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Калибровка, итерация {iteration + 1}: загрузка базового файла: {tmp_file_base}")
-                                rastr.load(str(tmp_file_base))
-                                rastr.load(self._vir_path)
-                                mdp_shem.max_step = rastr.step(mdp_shem.max_step * mdp_shem.p_pred * 0.9 / p_current)
-                                p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                                iteration += 1
-                                # Обновление прогресса при калибровке (каждые 3 итерации)
-                                if iteration % 3 == 0 and self._progress_callback:
-                                    self._progress_callback(progress)
-                            
-                            if iteration >= max_calibration_iterations:
-                                from utils.logger import logger
-                                logger.warning(f"Достигнуто максимальное количество итераций калибровки ({max_calibration_iterations}) для схемы {vrn.name}")
-                            
-                            # Сохраняем состояние после калибровки (но это не нужно для других сценариев)
-                            # rastr.save(str(tmp_file))  # Убрано, чтобы не влиять на другие сценарии
-                    
-                    if not mdp_shem.is_stable:
-                        logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}] Схема нестабильна, пропуск дальнейших расчетов")
-                        break
-                    
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Схема устойчива, продолжаем расчеты")
-                    no_pa_sechen = []
-                    no_pa_kpr = []
-                    with_pa_sechen = []
-                    with_pa_kpr = []
-                    no_pa_mdp = -1.0
-                    with_pa_mdp = -1.0
-                    
-                    precision = max(2.0, min(10.0, math.floor(mdp_shem.p_pred * 0.02)))
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Точность расчета: {precision}")
-                    
-                    # Расчет без ПА
-                    if self._no_pa:
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] ========== НАЧАЛО РАСЧЕТА БЕЗ ПА ==========")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Начало расчета МДП без ПА для сценария {Path(scn.name).stem}")
-                        # Обновление прогресса при начале расчета без ПА
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файлов для расчета")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка базового временного файла: {tmp_file_base}")
-                        rastr.load(str(tmp_file_base))
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файла сечений")
-                        rastr.load(self._sechen_path)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файла VIR")
-                        rastr.load(self._vir_path)
-                        
-                        # Получаем значение сечения ДО загрузки сценария (для сравнения)
-                        p_before_scn = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ДО загрузки сценария: {p_before_scn:.2f}")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка сценария: {scn.name}")
-                        rastr.load(scn.name)
-                        
-                        # Получаем значение сечения ПОСЛЕ загрузки сценария (ДО расчета динамики)
-                        p_after_scn = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ПОСЛЕ загрузки сценария (ДО run_dynamic): {p_after_scn:.2f} (изменение от базового: {p_after_scn - p_before_scn:.2f})")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка шаблона .dfw")
-                        rastr.load_template(".dfw")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Все файлы загружены")
-                        
-                        # Получаем значение сечения ДО расчета динамики (после загрузки шаблона)
-                        p_before_dyn = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ДО run_dynamic (после загрузки шаблона): {p_before_dyn:.2f}")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Вызов run_dynamic(ems=True)")
-                        dyn_result = rastr.run_dynamic(ems=True)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Результат динамики: успех={dyn_result.is_success}, устойчивость={dyn_result.is_stable}")
-                        
-                        # Получаем значение сечения ПОСЛЕ расчета динамики для диагностики
-                        p_after_dyn = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ПОСЛЕ run_dynamic: {p_after_dyn:.2f} (изменение: {p_after_dyn - p_before_dyn:.2f})")
-                        
-                        # ДИАГНОСТИКА: Проверка условий для начала итераций
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Проверка условий: is_success={dyn_result.is_success}, is_stable={dyn_result.is_stable}, условие для итераций={dyn_result.is_success and not dyn_result.is_stable}")
-                        
-                        if dyn_result.is_success and not dyn_result.is_stable:
-                            p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                            p_stable = mdp_shem.p_start
-                            step_min = 0.0
-                            step_max = 0.0 - mdp_shem.max_step
-                            step_current = step_min + (step_max - step_min) * 0.5
-                            
-                            iteration = 0
-                            max_mdp_iterations = 100  # Максимум итераций поиска МДП
-                            prev_step_current = None
-                            stagnation_count = 0
-                            
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Начало итерационного поиска МДП: p_current={p_current:.2f}, p_stable={p_stable:.2f}, precision={precision:.2f}, step_min={step_min:.2f}, step_max={step_max:.2f}")
-                            
-                            # ИСПРАВЛЕНО: В C# сценарий загружается ДО цикла (строка 140), в цикле НЕ перезагружается (строки 152-155)
-                            # В C# в цикле загружаются только базовый файл (text) и VIR, затем Step, затем RunDynamic БЕЗ загрузки сценария
-                            # Это означает, что сценарий должен сохраняться в памяти RASTR даже после Load(tmp_file_base)
-                            # Но в Python load() вызывает NewFile(), который сбрасывает все состояние
-                            # Поэтому нужно использовать add() для VIR или загружать сценарий в цикле
-                            # Проверяем: в C# Load() вызывает NewFile(), значит состояние сбрасывается
-                            # Но тогда как сценарий сохраняется? Возможно, сценарий загружается через Add()?
-                            # Или может быть, в C# используется другой механизм?
-                            # Пока используем загрузку сценария в цикле, так как load() сбрасывает состояние
-                            while dyn_result.is_success and (abs(p_current - p_stable) > precision or not dyn_result.is_stable) and iteration < max_mdp_iterations:
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: загрузка базового файла: {tmp_file_base}")
-                                rastr.load(str(tmp_file_base))
-                                rastr.add(self._vir_path)  # Используем add() вместо load() для сохранения состояния
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: вызов step({step_current:.2f})")
-                                step_actual = rastr.step(step_current)
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: step_actual={step_actual:.2f}")
-                                
-                                # В C# сценарий НЕ загружается в цикле (строка 155 - только RunDynamic)
-                                # Но load(tmp_file_base) сбрасывает состояние, поэтому нужно загрузить сценарий
-                                # Возможно, в C# используется другой механизм сохранения сценария
-                                # Пока загружаем сценарий в цикле
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: загрузка сценария: {scn.name}")
-                                rastr.add(scn.name)  # Используем add() для сохранения состояния
-                                rastr.load_template(".dfw")
-                                
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: вызов run_dynamic(ems=True)")
-                                dyn_result = rastr.run_dynamic(ems=True)
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Итерация {iteration + 1}: результат динамики: success={dyn_result.is_success}, stable={dyn_result.is_stable}")
-                                
-                                if dyn_result.is_success and dyn_result.is_stable:
-                                    step_max = step_actual
-                                    p_stable = rastr.get_val("sechen", "psech", self._selected_sch)
-                                else:
-                                    step_min = step_actual
-                                    p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                                    if step_min <= step_max or math.floor(p_current) <= math.floor(p_stable) + 2.0:
-                                        step_max -= 2.0
-                                
-                                step_current = step_min + (step_max - step_min) * 0.5
-                                
-                                # Проверка на застой (если step_current не меняется)
-                                if prev_step_current is not None and abs(step_current - prev_step_current) < 0.001:
-                                    stagnation_count += 1
-                                    if stagnation_count >= 10:
-                                        from utils.logger import logger
-                                        logger.warning(f"Обнаружен застой в поиске МДП без ПА (итерация {iteration}), прерываем цикл")
-                                        break
-                                else:
-                                    stagnation_count = 0
-                                
-                                prev_step_current = step_current
-                                iteration += 1
-                                # Обновление прогресса при итерациях поиска МДП (каждые 3 итерации)
-                                if iteration % 3 == 0 and self._progress_callback:
-                                    self._progress_callback(progress)
-                                
-                                # Логирование каждые 20 итераций для диагностики
-                                if iteration % 20 == 0:
-                                    logger.debug(f"Поиск МДП без ПА: итерация {iteration}, p_current={p_current:.2f}, p_stable={p_stable:.2f}, precision={precision:.2f}")
-                            
-                            if iteration >= max_mdp_iterations:
-                                from utils.logger import logger
-                                logger.warning(f"Достигнуто максимальное количество итераций поиска МДП без ПА ({max_mdp_iterations}) для сценария {Path(scn.name).stem}")
-                            
-                            no_pa_mdp = rastr.get_val("sechen", "psech", self._selected_sch)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] МДП найден после итераций: {no_pa_mdp:.2f}")
-                        elif dyn_result.is_success and dyn_result.is_stable:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Результат сразу устойчив, МДП = значение сечения ПОСЛЕ run_dynamic (как в исходном коде)")
-                            # Используем значение ПОСЛЕ run_dynamic (как в исходном C# коде, строка 176)
-                            # Если результат устойчив, это означает, что текущая перегрузка меньше МДП
-                            # В этом случае МДП = текущее значение сечения после расчета динамики
-                            no_pa_mdp = p_after_dyn
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] МДП (устойчив): {no_pa_mdp:.2f}")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значения: p_start={mdp_shem.p_start:.2f}, p_before_scn={p_before_scn:.2f}, p_after_scn={p_after_scn:.2f}, p_before_dyn={p_before_dyn:.2f}, p_after_dyn={p_after_dyn:.2f}")
-                            logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] ВНИМАНИЕ: Если МДП одинаковые для разных сценариев, это может означать, что сценарии не изменяют перетоки в сечениях. Проверьте логику расчета МДП.")
-                        else:
-                            logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Расчет динамики не успешен, МДП = -1")
-                            no_pa_mdp = -1.0
-                        
-                        # Сбор данных по сечениям (всегда, если расчет выполнен)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сбор данных по сечениям ПОСЛЕ расчета динамики")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}, no_pa_mdp={no_pa_mdp:.2f}")
-                        for sch in [s for s in self._schs if s.control]:
-                            try:
-                                value = rastr.get_val("sechen", "psech", sch.id)
-                                no_pa_sechen.append(Values(
-                                    id=sch.id,
-                                    name=sch.name,
-                                    value=value
-                                ))
-                                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сечение {sch.name} (ID {sch.id}): {value:.2f}")
-                            except Exception as e:
-                                logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Ошибка при получении значения сечения {sch.name} (ID {sch.id}): {e}")
-
-                        # Сбор данных по контролируемым величинам (всегда, если расчет выполнен)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сбор данных по контролируемым величинам")
-                        for kpr in self._kprs:
-                            try:
-                                value = rastr.get_val(kpr.table, kpr.col, kpr.selection)
-                                no_pa_kpr.append(Values(
-                                    id=kpr.id,
-                                    name=kpr.name,
-                                    value=value
-                                ))
-                                logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] КПР {kpr.name} (ID {kpr.id}): {value:.2f}")
-                            except Exception as e:
-                                logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Ошибка при получении значения КПР {kpr.name} (ID {kpr.id}): {e}")
-                        
-                        progress += 1
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                    
-                    # Расчет с ПА
-                    if self._with_pa:
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] ========== НАЧАЛО РАСЧЕТА С ПА ==========")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Начало расчета МДП с ПА для сценария {Path(scn.name).stem}")
-                        # Обновление прогресса при начале расчета с ПА
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файлов для расчета")
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка базового временного файла: {tmp_file_base}")
-                        rastr.load(str(tmp_file_base))
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файла сечений")
-                        rastr.load(self._sechen_path)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файла VIR")
-                        rastr.load(self._vir_path)
-                        
-                        # Получаем значение сечения ДО загрузки сценария/ПА (для сравнения)
-                        p_before_scn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ДО загрузки сценария/ПА: {p_before_scn_pa:.2f}")
-                        
-                        if self._use_lpn:
-                            rastr.load(self._sechen_path)
-                            rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
-                        else:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка сценария: {scn.name}")
-                            rastr.load(scn.name)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка ПА: {self._lapnu_path}")
-                            rastr.load(self._lapnu_path)
-                        
-                        # Получаем значение сечения ПОСЛЕ загрузки сценария/ПА (ДО расчета динамики)
-                        p_after_scn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ПОСЛЕ загрузки сценария/ПА (ДО run_dynamic): {p_after_scn_pa:.2f} (изменение от базового: {p_after_scn_pa - p_before_scn_pa:.2f})")
-                        
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Вызов run_dynamic(ems=True)")
-                        dyn_result = rastr.run_dynamic(ems=True)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Результат динамики: успех={dyn_result.is_success}, устойчивость={dyn_result.is_stable}")
-                        
-                        # Получаем значение сечения ПОСЛЕ расчета динамики для диагностики
-                        p_after_dyn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ПОСЛЕ run_dynamic: {p_after_dyn_pa:.2f} (изменение: {p_after_dyn_pa - p_after_scn_pa:.2f})")
-                        
-                        if dyn_result.is_success and not dyn_result.is_stable:
-                            p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                            p_stable = mdp_shem.p_start
-                            step_min = 0.0
-                            step_max = 0.0 - mdp_shem.max_step
-                            step_current = step_min + (step_max - step_min) * 0.5
-                            
-                            iteration = 0
-                            max_mdp_iterations = 100  # Максимум итераций поиска МДП
-                            prev_step_current = None
-                            stagnation_count = 0
-                            
-                            while dyn_result.is_success and (abs(p_current - p_stable) > precision or not dyn_result.is_stable) and iteration < max_mdp_iterations:
-                                logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Итерация {iteration + 1}: загрузка базового файла: {tmp_file_base}")
-                                rastr.load(str(tmp_file_base))
-                                rastr.load(self._vir_path)
-                                step_actual = rastr.step(step_current)
-                                
-                                if self._use_lpn:
-                                    rastr.load(self._sechen_path)
-                                    rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
-                                else:
-                                    rastr.load(scn.name)
-                                    rastr.load(self._lapnu_path)
-                                
-                                dyn_result = rastr.run_dynamic(ems=True)
-                                
-                                if dyn_result.is_success and dyn_result.is_stable:
-                                    step_max = step_actual
-                                    p_stable = rastr.get_val("sechen", "psech", self._selected_sch)
-                                else:
-                                    step_min = step_actual
-                                    p_current = rastr.get_val("sechen", "psech", self._selected_sch)
-                                    if step_min <= step_max or math.floor(p_current) <= math.floor(p_stable) + 2.0:
-                                        step_max -= 2.0
-                                
-                                step_current = step_min + (step_max - step_min) * 0.5
-                                
-                                # Проверка на застой (если step_current не меняется)
-                                if prev_step_current is not None and abs(step_current - prev_step_current) < 0.001:
-                                    stagnation_count += 1
-                                    if stagnation_count >= 10:
-                                        from utils.logger import logger
-                                        logger.warning(f"Обнаружен застой в поиске МДП с ПА (итерация {iteration}), прерываем цикл")
-                                        break
-                                else:
-                                    stagnation_count = 0
-                                
-                                prev_step_current = step_current
-                                iteration += 1
-                                # Обновление прогресса при итерациях поиска МДП с ПА (каждые 3 итерации)
-                                if iteration % 3 == 0 and self._progress_callback:
-                                    self._progress_callback(progress)
-                                
-                                # Логирование каждые 20 итераций для диагностики
-                                if iteration % 20 == 0:
-                                    logger.debug(f"Поиск МДП с ПА: итерация {iteration}, p_current={p_current:.2f}, p_stable={p_stable:.2f}, precision={precision:.2f}")
-                            
-                            if iteration >= max_mdp_iterations:
-                                from utils.logger import logger
-                                logger.warning(f"Достигнуто максимальное количество итераций поиска МДП с ПА ({max_mdp_iterations}) для сценария {Path(scn.name).stem}")
-                            
-                            with_pa_mdp = rastr.get_val("sechen", "psech", self._selected_sch)
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] МДП найден после итераций: {with_pa_mdp:.2f}")
-                        elif dyn_result.is_success and dyn_result.is_stable:
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Результат сразу устойчив, МДП = значение сечения ПОСЛЕ run_dynamic (как в исходном коде)")
-                            # Используем значение ПОСЛЕ run_dynamic (как в исходном C# коде, строка 258)
-                            # Если результат устойчив, это означает, что текущая перегрузка меньше МДП
-                            # В этом случае МДП = текущее значение сечения после расчета динамики
-                            with_pa_mdp = p_after_dyn_pa
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] МДП (устойчив): {with_pa_mdp:.2f}")
-                            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значения: p_start={mdp_shem.p_start:.2f}, p_before_scn_pa={p_before_scn_pa:.2f}, p_after_scn_pa={p_after_scn_pa:.2f}, p_after_dyn_pa={p_after_dyn_pa:.2f}")
-                            logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] ВНИМАНИЕ: Если МДП одинаковые для разных сценариев, это может означать, что сценарии не изменяют перетоки в сечениях. Проверьте логику расчета МДП.")
-                        else:
-                            logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Расчет динамики не успешен, МДП = -1")
-                            with_pa_mdp = -1.0
-                        
-                        # Сбор данных по сечениям (всегда, если расчет выполнен)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сбор данных по сечениям")
-                        for sch in [s for s in self._schs if s.control]:
-                            try:
-                                value = rastr.get_val("sechen", "psech", sch.id)
-                                with_pa_sechen.append(Values(
-                                    id=sch.id,
-                                    name=sch.name,
-                                    value=value
-                                ))
-                                logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сечение {sch.name} (ID {sch.id}): {value:.2f}")
-                            except Exception as e:
-                                logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Ошибка при получении значения сечения {sch.name} (ID {sch.id}): {e}")
-
-                        # Сбор данных по контролируемым величинам (всегда, если расчет выполнен)
-                        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сбор данных по контролируемым величинам")
-                        for kpr in self._kprs:
-                            try:
-                                value = rastr.get_val(kpr.table, kpr.col, kpr.selection)
-                                with_pa_kpr.append(Values(
-                                    id=kpr.id,
-                                    name=kpr.name,
-                                    value=value
-                                ))
-                                logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] КПР {kpr.name} (ID {kpr.id}): {value:.2f}")
-                            except Exception as e:
-                                logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Ошибка при получении значения КПР {kpr.name} (ID {kpr.id}): {e}")
-                        
-                        progress += 1
-                        if self._progress_callback:
-                            self._progress_callback(progress)
-                    
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Создание объекта MdpEvents для сценария: {Path(scn.name).stem}")
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Данные для сохранения: no_pa_mdp={no_pa_mdp:.2f}, сечений={len(no_pa_sechen)}, КПР={len(no_pa_kpr)}")
-                    mdp_event = MdpEvents(
-                        name=Path(scn.name).stem,
-                        no_pa_sechen=no_pa_sechen.copy() if no_pa_sechen else [],
-                        no_pa_kpr=no_pa_kpr.copy() if no_pa_kpr else [],
-                        no_pa_mdp=no_pa_mdp,
-                        with_pa_sechen=with_pa_sechen.copy() if with_pa_sechen else [],
-                        with_pa_kpr=with_pa_kpr.copy() if with_pa_kpr else [],
-                        with_pa_mdp=with_pa_mdp
-                    )
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] MdpEvents создан: name={mdp_event.name}, no_pa_mdp={mdp_event.no_pa_mdp:.2f}")
-                    events_list.append(mdp_event)
-                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] MdpEvents добавлен в events_list. Всего событий: {len(events_list)}")
-                
-                mdp_shem.events = events_list
-                mdp_shems_list.append(mdp_shem)
+            num_modes = (1 if self._no_pa else 0) + (1 if self._with_pa else 0)
+            
+            def on_result(idx, mdp_shem):
+                self._progress += len(mdp_shem.events) * num_modes
+                if self._progress_callback:
+                    self._progress_callback(self._progress)
             
+            # Вариант рассчитывается целиком в одном процессе: калибровка выполняется один раз
+            # и используется всеми сценариями варианта, базовый файл - в директории процесса
+            logger.info(f"Параллельный расчет вариантов: процессов {self._parallel_workers}")
+            mdp_shems = run_parallel(
+                self, "_calc_variant", [task + (True,) for task in tasks], self._parallel_workers, on_result
+            )
+        else:
+            logger.info("Начало цикла по режимам и вариантам")
+            mdp_shems = [self._calc_variant(rgm_idx, vrn_idx) for rgm_idx, vrn_idx in tasks]
+        mdp_shems = iter(mdp_shems)
+        
+        for rgm in self._rgms:
             results.append(MdpResults(
                 rg_name=Path(rgm.name).stem,
-                mdp_shems=mdp_shems_list
+                mdp_shems=[next(mdp_shems) for _ in self._vrns]
             ))
+        for mdp_result in results:
+            for shem in mdp_result.mdp_shems:
+                for event in shem.events:
+                    self.search_stats['scenarios'] += 1
+                    self.search_stats['no_pa_probes'] += event.no_pa_probes
+                    self.search_stats['with_pa_probes'] += event.with_pa_probes
+                    self.search_stats['runs_saved'] += event.with_pa_saved
         
         logger.info("Завершение всех циклов")
         logger.info(f"Получено результатов для режимов: {len(results)}")
         
         # Финальное обновление прогресса (100%)
-        progress += 1
-        logger.info(f"Финальное обновление прогресса: {progress}/{self.max}")
+        self._progress += 1
+        logger.info(f"Финальное обновление прогресса: {self._progress}/{self.max}")
         if self._progress_callback:
             try:
-                self._progress_callback(progress)
+                self._progress_callback(self._progress)
                 logger.info("Финальный progress_callback выполнен")
             except Exception as e:
                 logger.error(f"Ошибка в финальном progress_callback: {e}")
@@ -636,5 +229,540 @@ class MdpStabilityCalc:
         logger.info("КОНЕЦ МЕТОДА calc() В MdpStabilityCalc")
         logger.info(f"Возвращаем {len(results)} результатов")
         logger.info("=" * 80)
+        if not parallel:
+            self._pool.log_stats()
+            self._snapshots.log_stats()
+        self._log_search_stats()
         return results
+    
+    def _log_search_stats(self):
+        """Вывод статистики поиска МДП в лог"""
+        from utils.logger import logger
+        
+        stats = self.search_stats
+        scenarios = stats['scenarios']
+        if not scenarios:
+            return
+        message = (
+            f"Поиск МДП: сценариев {scenarios}, расчетов динамики без ПА {stats['no_pa_probes']}, "
+            f"с ПА {stats['with_pa_probes']}"
+        )
+        if self._seed_with_pa and self._no_pa and self._with_pa:
+            message += f", сэкономлено расчетов динамики с ПА {stats['runs_saved']} (оценка)"
+        logger.info(message)
+    
+    def _calc_variant(self, rgm_idx: int, vrn_idx: int, private_tmp: bool = False) -> MdpShems:
+        """
+        Расчет всех сценариев варианта с однократной калибровкой шага утяжеления
+        
+        Args:
+            rgm_idx: Индекс расчетного режима
+            vrn_idx: Индекс варианта
+            private_tmp: Базовый файл в собственной директории процесса (параллельный расчет)
+        
+        Returns:
+            Результаты варианта
+        """
+        from utils.logger import logger
+        from .parallel import worker_dir
+        
+        rgm = self._rgms[rgm_idx]
+        vrn = self._vrns[vrn_idx]
+        tmp_dir = Path(worker_dir()) if private_tmp else self._root
+        tmp_file_base = tmp_dir / "mdp_calc_tmp_base.rst"
+        
+        logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}/{len(self._vrns)}] Обработка варианта: {vrn.name} для режима {Path(rgm.name).stem}")
+        mdp_shem = MdpShems(
+            sheme_name=vrn.name,
+            is_ready=False,
+            is_stable=False,
+            max_step=0.0,
+            p_pred=0.0,
+            p_start=0.0,
+            events=[]
+        )
+        events_list = []
+        trajectory = None
+        unloading = None
+        # Прирост предела от ПА в сценариях варианта (для первой пробы с ПА)
+        pa_gains: List[float] = []
+        
+        with self._pool.session() as rastr:
+            logger.info(f"[ВАРИАНТ {vrn_idx + 1}] ИНИЦИАЛИЗАЦИЯ СХЕМЫ: {vrn.name} для режима {Path(rgm.name).stem}")
+            # Обновление прогресса при начале инициализации схемы
+            logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Вызов progress_callback (инициализация)")
+            if self._progress_callback:
+                try:
+                    self._progress_callback(self._progress)
+                except Exception as e:
+                    logger.error(f"Ошибка в progress_callback: {e}")
+        
+            logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Подготовка режима {rgm.name}: vrn.id={vrn.id}, vrn.num={vrn.num}")
+            mdp_shem.is_stable = self._snapshots.prepare(rastr, rgm.name, vrn, self._rems_path)
+            logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Результат применения варианта (is_stable): {mdp_shem.is_stable}")
+        
+            if mdp_shem.is_stable:
+                # Базовое состояние - копия снимка подготовленного режима
+                snapshot = self._snapshots.path(self._snapshots.key(rgm.name, vrn, self._rems_path))
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Копирование снимка {snapshot} во временный файл: {tmp_file_base}")
+                shutil.copyfile(snapshot, tmp_file_base)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Базовый файл сохранен")
+            mdp_shem.is_ready = True
+            logger.info(f"[ВАРИАНТ {vrn_idx + 1}] is_ready установлен в True")
+        
+            if mdp_shem.is_stable:
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Схема устойчива, продолжаем инициализацию")
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Загрузка базового временного файла: {tmp_file_base}")
+                rastr.load(str(tmp_file_base))
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Загрузка файла сечений: {self._sechen_path}")
+                rastr.load(self._sechen_path)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Загрузка файла VIR: {self._vir_path}")
+                rastr.load(self._vir_path)
+            
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Получение p_start для сечения {self._selected_sch}")
+                mdp_shem.p_start = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] p_start = {mdp_shem.p_start}")
+            
+                if self._use_trajectory:
+                    logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Утяжеление с записью траектории для определения max_step")
+                    trajectory = rastr.weighting_trajectory(resolution=self._trajectory_resolution)
+                    mdp_shem.max_step = trajectory.limit
+                else:
+                    logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Вызов run_ut() для определения max_step")
+                    mdp_shem.max_step = rastr.run_ut()
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] max_step = {mdp_shem.max_step}")
+            
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Получение p_pred для сечения {self._selected_sch}")
+                mdp_shem.p_pred = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] p_pred = {mdp_shem.p_pred}")
+            
+                # Калибровка шага
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] НАЧАЛО КАЛИБРОВКИ ШАГА")
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Загрузка базового временного файла для калибровки: {tmp_file_base}")
+                rastr.load(str(tmp_file_base))
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Загрузка VIR для калибровки")
+                rastr.load(self._vir_path)
+                first_step = mdp_shem.max_step * 0.9
+                if trajectory is not None:
+                    # Шаг для перетока p_pred * 0.9 по траектории; расчет только проверяет его
+                    estimate = trajectory.step_for(mdp_shem.p_pred * 0.9, self._selected_sch)
+                    if estimate is not None:
+                        first_step = estimate
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Вызов step({first_step})")
+                mdp_shem.max_step = rastr.step(first_step)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] max_step после первого step = {mdp_shem.max_step}")
+            
+                p_current = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] p_current после первого step = {p_current}")
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Целевое значение: p_pred * 0.9 = {mdp_shem.p_pred * 0.9}")
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Разница: {abs(p_current - mdp_shem.p_pred * 0.9)}")
+            
+                iteration = 0
+                max_calibration_iterations = 50  # Максимум итераций калибровки
+                logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Начало цикла калибровки (макс. {max_calibration_iterations} итераций)")
+                while abs(p_current - mdp_shem.p_pred * 0.9) > 2.0 and iteration < max_calibration_iterations:
+                    logger.debug(f"[ВАРИАНТ {vrn_idx + 1}] Калибровка, итерация {iteration + 1}: p_current={p_current:.2f}, цель={mdp_shem.p_pred * 0.9:.2f}, разница={abs(p_current - mdp_shem.p_pred * 0.9):.2f}")
+                    logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Калибровка, итерация {iteration + 1}: загрузка базового файла: {tmp_file_base}")
+                    rastr.load(str(tmp_file_base))
+                    rastr.load(self._vir_path)
+                    mdp_shem.max_step = rastr.step(mdp_shem.max_step * mdp_shem.p_pred * 0.9 / p_current)
+                    p_current = rastr.get_val("sechen", "psech", self._selected_sch)
+                    iteration += 1
+                    # Обновление прогресса при калибровке (каждые 3 итерации)
+                    if iteration % 3 == 0 and self._progress_callback:
+                        self._progress_callback(self._progress)
+            
+                if iteration >= max_calibration_iterations:
+                    from utils.logger import logger
+                    logger.warning(f"Достигнуто максимальное количество итераций калибровки ({max_calibration_iterations}) для схемы {vrn.name}")
+
+                if self._use_trajectory:
+                    # Траектория в направлении разгрузки (область поиска МДП: шаг [0, -max_step])
+                    rastr.load(str(tmp_file_base))
+                    rastr.load(self._sechen_path)
+                    rastr.load(self._vir_path)
+                    kfc = rastr.get_val("ut_common", "kfc", 0)
+                    unloading = rastr.weighting_trajectory(kfc=-abs(kfc), limit=mdp_shem.max_step,
+                                                           resolution=self._trajectory_resolution)
+                    logger.info(f"[ВАРИАНТ {vrn_idx + 1}] Траектория разгрузки: {len(unloading)} точек, "
+                                f"шаг до {unloading.limit:.2f}")
+            
+                # Сохраняем состояние после калибровки (но это не нужно для других сценариев)
+                # rastr.save(str(tmp_file))  # Убрано, чтобы не влиять на другие сценарии
+            
+            if not mdp_shem.is_stable:
+                logger.warning(f"[ВАРИАНТ {vrn_idx + 1}] Схема нестабильна, пропуск дальнейших расчетов")
+            else:
+                logger.info(f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}] Начало цикла по сценариям (scns)")
+                for scn_idx in range(len(self._scns)):
+                    events_list.append(self._calc_scenario(rastr, mdp_shem, scn_idx, tmp_file_base, unloading,
+                                                           pa_gains))
+        
+        if private_tmp and tmp_file_base.exists():
+            tmp_file_base.unlink()
+        
+        mdp_shem.events = events_list
+        return mdp_shem
+    
+    def _calc_scenario(self, rastr: RastrOperations, mdp_shem: MdpShems, scn_idx: int,
+                       tmp_file_base: Path,
+                       trajectory: Optional[WeightingTrajectory] = None,
+                       pa_gains: Optional[List[float]] = None) -> MdpEvents:
+        """
+        Расчет МДП для одного аварийного процесса на откалиброванном варианте
+        
+        Args:
+            rastr: Сессия RASTR
+            mdp_shem: Откалиброванный вариант (p_start, p_pred, max_step)
+            scn_idx: Индекс аварийного процесса
+            tmp_file_base: Базовый файл варианта
+            trajectory: Траектория разгрузки варианта (для выбора шага проб по перетоку)
+            pa_gains: Прирост предела от ПА в предыдущих сценариях варианта (доля интервала
+                от предела без ПА до исходного режима); дополняется результатом сценария
+        
+        Returns:
+            Результаты сценария
+        """
+        from utils.logger import logger
+        
+        scn = self._scns[scn_idx]
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}/{len(self._scns)}] Обработка сценария: {Path(scn.name).stem}")
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Схема устойчива, продолжаем расчеты")
+        no_pa_sechen = []
+        no_pa_kpr = []
+        with_pa_sechen = []
+        with_pa_kpr = []
+        no_pa_mdp = -1.0
+        with_pa_mdp = -1.0
+        no_pa_probes = 0
+        with_pa_probes = 0
+        with_pa_saved = 0
+        # Найденный предел без ПА (устойчив и с ПА - нижняя граница поиска с ПА)
+        no_pa_limit: Optional[BoundaryResult] = None
+    
+        precision = max(2.0, min(10.0, math.floor(mdp_shem.p_pred * 0.02)))
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Точность расчета: {precision}")
+    
+        # Расчет без ПА
+        if self._no_pa:
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] ========== НАЧАЛО РАСЧЕТА БЕЗ ПА ==========")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Начало расчета МДП без ПА для сценария {Path(scn.name).stem}")
+            # Обновление прогресса при начале расчета без ПА
+            if self._progress_callback:
+                self._progress_callback(self._progress)
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файлов для расчета")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка базового временного файла: {tmp_file_base}")
+            rastr.load(str(tmp_file_base))
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файла сечений")
+            rastr.load(self._sechen_path)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка файла VIR")
+            rastr.load(self._vir_path)
+        
+            # Получаем значение сечения ДО загрузки сценария (для сравнения)
+            p_before_scn = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ДО загрузки сценария: {p_before_scn:.2f}")
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка сценария: {scn.name}")
+            rastr.load(scn.name)
+        
+            # Получаем значение сечения ПОСЛЕ загрузки сценария (ДО расчета динамики)
+            p_after_scn = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ПОСЛЕ загрузки сценария (ДО run_dynamic): {p_after_scn:.2f} (изменение от базового: {p_after_scn - p_before_scn:.2f})")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}")
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Загрузка шаблона .dfw")
+            rastr.load_template(".dfw")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Все файлы загружены")
+        
+            # Получаем значение сечения ДО расчета динамики (после загрузки шаблона)
+            p_before_dyn = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ДО run_dynamic (после загрузки шаблона): {p_before_dyn:.2f}")
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Вызов run_dynamic(ems=True)")
+            dyn_result = rastr.run_dynamic(ems=True)
+            no_pa_probes += 1
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Результат динамики: успех={dyn_result.is_success}, устойчивость={dyn_result.is_stable}")
+        
+            # Получаем значение сечения ПОСЛЕ расчета динамики для диагностики
+            p_after_dyn = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значение сечения ПОСЛЕ run_dynamic: {p_after_dyn:.2f} (изменение: {p_after_dyn - p_before_dyn:.2f})")
+        
+            # ДИАГНОСТИКА: Проверка условий для начала итераций
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Проверка условий: is_success={dyn_result.is_success}, is_stable={dyn_result.is_stable}, условие для итераций={dyn_result.is_success and not dyn_result.is_stable}")
+        
+            if dyn_result.is_success and not dyn_result.is_stable:
+                p_current = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Начало поиска МДП ({self._search_method}): p_current={p_current:.2f}, precision={precision:.2f}, step=[0, {-mdp_shem.max_step:.2f}]")
+
+                def load_no_pa(step: float) -> float:
+                    # Сценарий загружается в каждой пробе: load() сбрасывает состояние RASTR
+                    rastr.load(str(tmp_file_base))
+                    rastr.add(self._vir_path)
+                    step_actual = rastr.step(step)
+                    rastr.add(scn.name)
+                    rastr.load_template(".dfw")
+                    return step_actual
+
+                runs, result = self._search_mdp(rastr, load_no_pa, mdp_shem, p_current, precision, trajectory,
+                                                f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА]", f"без ПА для сценария {Path(scn.name).stem}")
+                no_pa_probes += runs
+                if result.converged and result.x < 0:
+                    no_pa_limit = result
+                no_pa_mdp = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] МДП найден после итераций: {no_pa_mdp:.2f}")
+            elif dyn_result.is_success and dyn_result.is_stable:
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Результат сразу устойчив, МДП = значение сечения ПОСЛЕ run_dynamic (как в исходном коде)")
+                # Используем значение ПОСЛЕ run_dynamic (как в исходном C# коде, строка 176)
+                # Если результат устойчив, это означает, что текущая перегрузка меньше МДП
+                # В этом случае МДП = текущее значение сечения после расчета динамики
+                no_pa_mdp = p_after_dyn
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] МДП (устойчив): {no_pa_mdp:.2f}")
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}")
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Значения: p_start={mdp_shem.p_start:.2f}, p_before_scn={p_before_scn:.2f}, p_after_scn={p_after_scn:.2f}, p_before_dyn={p_before_dyn:.2f}, p_after_dyn={p_after_dyn:.2f}")
+                logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] ВНИМАНИЕ: Если МДП одинаковые для разных сценариев, это может означать, что сценарии не изменяют перетоки в сечениях. Проверьте логику расчета МДП.")
+            else:
+                logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Расчет динамики не успешен, МДП = -1")
+                no_pa_mdp = -1.0
+        
+            # Сбор данных по сечениям (всегда, если расчет выполнен)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сбор данных по сечениям ПОСЛЕ расчета динамики")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сценарий: {Path(scn.name).stem}, no_pa_mdp={no_pa_mdp:.2f}")
+            no_pa_sechen.extend(self._collect_sechen(rastr, f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА]"))
 
+            # Сбор данных по контролируемым величинам (всегда, если расчет выполнен)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Сбор данных по контролируемым величинам")
+            for kpr in self._kprs:
+                try:
+                    value = rastr.get_val(kpr.table, kpr.col, kpr.selection)
+                    no_pa_kpr.append(Values(
+                        id=kpr.id,
+                        name=kpr.name,
+                        value=value
+                    ))
+                    logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] КПР {kpr.name} (ID {kpr.id}): {value:.2f}")
+                except Exception as e:
+                    logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, БЕЗ ПА] Ошибка при получении значения КПР {kpr.name} (ID {kpr.id}): {e}")
+        
+            self._progress += 1
+            if self._progress_callback:
+                self._progress_callback(self._progress)
+    
+        # Расчет с ПА
+        if self._with_pa:
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] ========== НАЧАЛО РАСЧЕТА С ПА ==========")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Начало расчета МДП с ПА для сценария {Path(scn.name).stem}")
+            # Обновление прогресса при начале расчета с ПА
+            if self._progress_callback:
+                self._progress_callback(self._progress)
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файлов для расчета")
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка базового временного файла: {tmp_file_base}")
+            rastr.load(str(tmp_file_base))
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файла сечений")
+            rastr.load(self._sechen_path)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка файла VIR")
+            rastr.load(self._vir_path)
+        
+            # Получаем значение сечения ДО загрузки сценария/ПА (для сравнения)
+            p_before_scn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ДО загрузки сценария/ПА: {p_before_scn_pa:.2f}")
+        
+            if self._use_lpn:
+                rastr.load(self._sechen_path)
+                rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
+            else:
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка сценария: {scn.name}")
+                rastr.load(scn.name)
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Загрузка ПА: {self._lapnu_path}")
+                rastr.load(self._lapnu_path)
+        
+            # Получаем значение сечения ПОСЛЕ загрузки сценария/ПА (ДО расчета динамики)
+            p_after_scn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ПОСЛЕ загрузки сценария/ПА (ДО run_dynamic): {p_after_scn_pa:.2f} (изменение от базового: {p_after_scn_pa - p_before_scn_pa:.2f})")
+        
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Вызов run_dynamic(ems=True)")
+            dyn_result = rastr.run_dynamic(ems=True)
+            with_pa_probes += 1
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Результат динамики: успех={dyn_result.is_success}, устойчивость={dyn_result.is_stable}")
+        
+            # Получаем значение сечения ПОСЛЕ расчета динамики для диагностики
+            p_after_dyn_pa = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значение сечения ПОСЛЕ run_dynamic: {p_after_dyn_pa:.2f} (изменение: {p_after_dyn_pa - p_after_scn_pa:.2f})")
+        
+            if dyn_result.is_success and not dyn_result.is_stable:
+                p_current = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Начало поиска МДП ({self._search_method}): p_current={p_current:.2f}, precision={precision:.2f}, step=[0, {-mdp_shem.max_step:.2f}]")
+
+                def load_with_pa(step: float) -> float:
+                    rastr.load(str(tmp_file_base))
+                    rastr.load(self._vir_path)
+                    step_actual = rastr.step(step)
+                    if self._use_lpn:
+                        rastr.load(self._sechen_path)
+                        rastr.create_scn_from_lpn(self._lapnu_path, self._lpns, scn.name)
+                    else:
+                        rastr.load(scn.name)
+                        rastr.load(self._lapnu_path)
+                    return step_actual
+
+                stable, first = None, []
+                if self._seed_with_pa and no_pa_limit is not None:
+                    # ПА только повышает предел: шаг предела без ПА устойчив и с ПА
+                    stable = (no_pa_limit.x, no_pa_limit.y)
+                    if pa_gains:
+                        gain = max(pa_gains) + PA_GAIN_MARGIN
+                        if gain < 1.0:
+                            first = [no_pa_limit.x * (1.0 - gain)]
+                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Поиск от предела без ПА: шаг {no_pa_limit.x:.2f}"
+                                + (f", первая проба {first[0]:.2f}" if first else ""))
+                runs, result = self._search_mdp(rastr, load_with_pa, mdp_shem, p_current, precision, trajectory,
+                                                f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА]", f"с ПА для сценария {Path(scn.name).stem}",
+                                                stable, first)
+                with_pa_probes += runs
+                if stable is not None:
+                    # Оценка: деление пополам всего интервала [0, -max_step] при том же наклоне перетока
+                    slope = abs(p_current - no_pa_limit.y) / abs(no_pa_limit.x)
+                    with_pa_saved = bisection_runs(precision, slope * mdp_shem.max_step) - runs
+                    logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сэкономлено расчетов динамики (оценка): {with_pa_saved}")
+                if pa_gains is not None and no_pa_limit is not None and result.converged:
+                    pa_gains.append((result.x - no_pa_limit.x) / -no_pa_limit.x)
+                with_pa_mdp = rastr.get_val("sechen", "psech", self._selected_sch)
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] МДП найден после итераций: {with_pa_mdp:.2f}")
+            elif dyn_result.is_success and dyn_result.is_stable:
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Результат сразу устойчив, МДП = значение сечения ПОСЛЕ run_dynamic (как в исходном коде)")
+                # Используем значение ПОСЛЕ run_dynamic (как в исходном C# коде, строка 258)
+                # Если результат устойчив, это означает, что текущая перегрузка меньше МДП
+                # В этом случае МДП = текущее значение сечения после расчета динамики
+                with_pa_mdp = p_after_dyn_pa
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] МДП (устойчив): {with_pa_mdp:.2f}")
+                logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Значения: p_start={mdp_shem.p_start:.2f}, p_before_scn_pa={p_before_scn_pa:.2f}, p_after_scn_pa={p_after_scn_pa:.2f}, p_after_dyn_pa={p_after_dyn_pa:.2f}")
+                logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] ВНИМАНИЕ: Если МДП одинаковые для разных сценариев, это может означать, что сценарии не изменяют перетоки в сечениях. Проверьте логику расчета МДП.")
+            else:
+                logger.warning(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Расчет динамики не успешен, МДП = -1")
+                with_pa_mdp = -1.0
+        
+            # Сбор данных по сечениям (всегда, если расчет выполнен)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сбор данных по сечениям")
+            with_pa_sechen.extend(self._collect_sechen(rastr, f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА]"))
+
+            # Сбор данных по контролируемым величинам (всегда, если расчет выполнен)
+            logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Сбор данных по контролируемым величинам")
+            for kpr in self._kprs:
+                try:
+                    value = rastr.get_val(kpr.table, kpr.col, kpr.selection)
+                    with_pa_kpr.append(Values(
+                        id=kpr.id,
+                        name=kpr.name,
+                        value=value
+                    ))
+                    logger.debug(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] КПР {kpr.name} (ID {kpr.id}): {value:.2f}")
+                except Exception as e:
+                    logger.error(f"[СЦЕНАРИЙ {scn_idx + 1}, С ПА] Ошибка при получении значения КПР {kpr.name} (ID {kpr.id}): {e}")
+        
+            self._progress += 1
+            if self._progress_callback:
+                self._progress_callback(self._progress)
+    
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Создание объекта MdpEvents для сценария: {Path(scn.name).stem}")
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] Данные для сохранения: no_pa_mdp={no_pa_mdp:.2f}, сечений={len(no_pa_sechen)}, КПР={len(no_pa_kpr)}")
+        mdp_event = MdpEvents(
+            name=Path(scn.name).stem,
+            no_pa_sechen=no_pa_sechen.copy() if no_pa_sechen else [],
+            no_pa_kpr=no_pa_kpr.copy() if no_pa_kpr else [],
+            no_pa_mdp=no_pa_mdp,
+            with_pa_sechen=with_pa_sechen.copy() if with_pa_sechen else [],
+            with_pa_kpr=with_pa_kpr.copy() if with_pa_kpr else [],
+            with_pa_mdp=with_pa_mdp,
+            no_pa_probes=no_pa_probes,
+            with_pa_probes=with_pa_probes,
+            with_pa_saved=with_pa_saved
+        )
+        logger.info(f"[СЦЕНАРИЙ {scn_idx + 1}] MdpEvents создан: name={mdp_event.name}, no_pa_mdp={mdp_event.no_pa_mdp:.2f}, расчетов динамики: {no_pa_probes} + {with_pa_probes}")
+        return mdp_event
+    
+    def _search_mdp(self, rastr: RastrOperations, load_case: Callable[[float], float],
+                    mdp_shem: MdpShems, p_unstable: float, precision: float,
+                    trajectory: Optional[WeightingTrajectory], log_prefix: str, description: str,
+                    stable: Optional[Tuple[float, float]] = None,
+                    first: Sequence[float] = ()) -> Tuple[int, BoundaryResult]:
+        """
+        Поиск предельного по устойчивости шага утяжеления в интервале [0, -max_step]
+
+        Шаг 0 (исходный режим) неустойчив. По завершении в сессии загружен
+        и рассчитан режим найденного предела.
+        
+        Args:
+            rastr: Сессия RASTR
+            load_case: Загрузка режима с шагом утяжеления и сценария; возвращает фактический шаг
+            mdp_shem: Откалиброванный вариант
+            p_unstable: Переток в сечении в исходном (неустойчивом) режиме
+            precision: Точность по перетоку
+            trajectory: Траектория разгрузки (переток в сечении в зависимости от шага)
+            log_prefix: Префикс сообщений журнала
+            description: Описание расчета для предупреждений
+            stable: Известная устойчивая точка (шаг, переток), например, предел без ПА
+            first: Шаги первых проб (далее - шаги стратегии поиска)
+        
+        Returns:
+            Количество расчетов динамики и результат поиска
+        """
+        from utils.logger import logger
+
+        runs = 0
+
+        def probe(step: float):
+            nonlocal runs
+            step_actual = load_case(step)
+            dyn_result = rastr.run_dynamic(ems=True)
+            runs += 1
+            # Обновление прогресса при итерациях поиска МДП (каждые 3 итерации)
+            if runs % 3 == 0 and self._progress_callback:
+                self._progress_callback(self._progress)
+            if not dyn_result.is_success:
+                logger.warning(f"{log_prefix} Расчет динамики не успешен при шаге {step_actual:.2f}, поиск прерван")
+                return None
+            p_current = rastr.get_val("sechen", "psech", self._selected_sch)
+            logger.debug(f"{log_prefix} Проба {runs}: шаг {step_actual:.2f}, переток {p_current:.2f}, "
+                         f"устойчиво={dyn_result.is_stable}")
+            return step_actual, p_current, dyn_result.is_stable
+
+        row = self._selected_sch
+
+        def _curve(step: float):
+            return trajectory.value(step, row) if trajectory.covers(step) else None
+
+        def _inverse(value: float):
+            return trajectory.step_for(value, row)
+
+        curve = inverse = None
+        if trajectory is not None and len(trajectory) > 1:
+            curve, inverse = _curve, _inverse
+
+        search = make_boundary_search(self._search_method, (0.0, p_unstable), -mdp_shem.max_step, precision,
+                                      stable=stable, curve=curve, inverse=inverse)
+        result = find_boundary(probe, search, self._max_probes, first)
+        if not result.converged and result.probes >= self._max_probes:
+            logger.warning(f"Достигнуто максимальное количество итераций поиска МДП {description} ({self._max_probes})")
+        logger.info(f"{log_prefix} Поиск МДП завершен: расчетов динамики {runs}, шаг {result.x:.2f}")
+        return runs, result
+
+    def _collect_sechen(self, rastr: RastrOperations, log_prefix: str) -> List[Values]:
+        """Сбор значений контролируемых сечений одним чтением колонки psech"""
+        from utils.logger import logger
+        
+        controlled = [s for s in self._schs if s.control]
+        if not controlled:
+            return []
+        
+        try:
+            values = rastr.get_column("sechen", "psech", [sch.id for sch in controlled]).tolist()
+        except Exception as e:
+            logger.error(f"{log_prefix} Ошибка при получении значений сечений: {e}")
+            return []
+        
+        result = []
+        for sch, value in zip(controlled, values):
+            result.append(Values(id=sch.id, name=sch.name, value=value))
+            logger.debug(f"{log_prefix} Сечение {sch.name} (ID {sch.id}): {value:.2f}")
+        return result
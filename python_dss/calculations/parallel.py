@@ -0,0 +1,191 @@
+"""
+Параллельное выполнение задач расчета в пуле процессов
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Атрибуты расчета, которые не передаются в рабочие процессы
+LOCAL_ATTRS = ("_progress_callback", "_pool", "_snapshots")
+
+# Расчет, восстановленный в рабочем процессе
+_worker_calc = None
+# Рабочая директория процесса
+_worker_dir: Optional[str] = None
+
+
+def worker_dir() -> str:
+    """Собственная рабочая директория процесса (в основном процессе - системная временная)"""
+    return _worker_dir or tempfile.gettempdir()
+
+
+def _init_worker(calc_cls: type, state: Dict[str, Any], config_data: Dict[str, Any],
+                 session_factory: Optional[Callable], snapshot_root: Optional[str],
+                 snapshot_max_mb: Optional[float]):
+    """Инициализация рабочего процесса: конфигурация, рабочая директория, сессия RASTR"""
+    global _worker_calc, _worker_dir
+    from utils.config import config
+    from rastr_operations import RastrSessionPool, SnapshotStore
+
+    config._config = config_data
+
+    # Временные файлы процесса (в т.ч. файлы RASTR) не пересекаются с другими процессами
+    _worker_dir = tempfile.mkdtemp(prefix=f"dss_worker_{os.getpid()}_")
+    os.environ["TMP"] = os.environ["TEMP"] = _worker_dir
+    tempfile.tempdir = _worker_dir
+    atexit.register(shutil.rmtree, _worker_dir, True)
+
+    calc = calc_cls.__new__(calc_cls)
+    calc.__dict__.update(state)
+    calc._progress_callback = None
+    calc._pool = RastrSessionPool(factory=session_factory)
+    calc._snapshots = SnapshotStore(root=snapshot_root, max_mb=snapshot_max_mb)
+    _worker_calc = calc
+
+
+def _run_task(method: str, args: tuple) -> Any:
+    return getattr(_worker_calc, method)(*args)
+
+
+def _initargs(calc: Any) -> tuple:
+    """Аргументы инициализации рабочих процессов для расчета"""
+    from utils.config import config
+
+    state = {k: v for k, v in vars(calc).items() if k not in LOCAL_ATTRS}
+    snapshots = getattr(calc, "_snapshots", None)
+    pool = getattr(calc, "_pool", None)
+    return (
+        type(calc),
+        state,
+        config._config,
+        pool.factory if pool is not None else None,
+        str(snapshots.root.resolve()) if snapshots is not None else None,
+        snapshots.max_bytes / (1024 * 1024) if snapshots is not None else None,
+    )
+
+
+class WorkerPool:
+    """
+    Долгоживущий пул рабочих процессов для серии коротких пакетов задач
+
+    В отличие от run_parallel, процессы (и сессии RASTR в них) сохраняются между
+    вызовами map(), поэтому пул подходит для итерационных алгоритмов, в которых
+    каждый шаг - небольшой пакет независимых расчетов.
+    """
+
+    def __init__(self, calc: Any, workers: int):
+        """
+        Args:
+            calc: Объект расчета
+            workers: Количество рабочих процессов
+        """
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_init_worker, initargs=_initargs(calc))
+        self._futures: List[Future] = []
+
+    def map(self, method: str, tasks: Sequence[tuple]) -> List[Any]:
+        """Выполнение calc.<method>(*task) для пакета задач, результаты в порядке задач"""
+        futures = [self._executor.submit(_run_task, method, tuple(task)) for task in tasks]
+        self._futures = futures
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def close(self):
+        """Завершение рабочих процессов (невыполненные задачи отменяются)"""
+        # cancel_futures в shutdown() - только с Python 3.9
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_parallel(calc: Any, method: str, tasks: Sequence[tuple], workers: int,
+                 on_result: Optional[Callable[[int, Any], None]] = None,
+                 retries: Optional[int] = None) -> List[Any]:
+    """
+    Выполнение calc.<method>(*task) для всех задач в пуле процессов
+
+    Расчет передается в каждый рабочий процесс один раз; в процессе создаются
+    собственные пул сессий RASTR и хранилище снимков (в той же директории, что
+    и у основного процесса, поэтому подготовленные режимы общие).
+
+    Args:
+        calc: Объект расчета
+        method: Имя метода расчета одной задачи
+        tasks: Аргументы метода для каждой задачи
+        workers: Количество рабочих процессов
+        on_result: Вызывается в основном процессе по завершении задачи (индекс, результат)
+        retries: Количество перезапусков пула после аварийного завершения рабочего
+            процесса (по умолчанию performance.parallel_retries); незавершенные
+            задачи выполняются повторно
+
+    Returns:
+        Результаты в порядке задач
+    """
+    from utils.config import config
+    from utils.logger import logger
+
+    initargs = _initargs(calc)
+
+    if retries is None:
+        retries = config.get("performance.parallel_retries", 2)
+    logger.info(f"Параллельный расчет: {len(tasks)} задач, процессов {min(workers, len(tasks))}")
+
+    results: List[Any] = [None] * len(tasks)
+    pending = list(range(len(tasks)))
+    attempt = 0
+    while pending:
+        done = set()
+        futures = {}
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pending))),
+                                     initializer=_init_worker, initargs=initargs) as executor:
+                futures = {executor.submit(_run_task, method, tuple(tasks[idx])): idx
+                           for idx in pending}
+                try:
+                    for future in as_completed(futures):
+                        idx = futures[future]
+                        results[idx] = future.result()
+                        done.add(idx)
+                        if on_result:
+                            on_result(idx, results[idx])
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            pending = []
+        except BrokenProcessPool as e:
+            # Задачи, завершенные до аварии, повторно не выполняются
+            for future, idx in futures.items():
+                if idx in done or not future.done() or future.cancelled() or future.exception():
+                    continue
+                results[idx] = future.result()
+                done.add(idx)
+                if on_result:
+                    on_result(idx, results[idx])
+            pending = [idx for idx in pending if idx not in done]
+            attempt += 1
+            if attempt > retries:
+                logger.error(f"Рабочий процесс завершился аварийно, попытки исчерпаны: {e}")
+                raise
+            logger.warning(
+                f"Рабочий процесс завершился аварийно ({e}), "
+                f"повтор {attempt}/{retries} для {len(pending)} задач"
+            )
+    return results
@@ -4,14 +4,16 @@
 
 import os
 import math
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from models import (
     RgmsInfo, VrnInfo, ShuntKZ, ShuntResults, Shems
 )
-from rastr_operations import RastrOperations, ShuntKZResult
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, ShuntKZResult
 from utils.exceptions import InitialDataException
+from .thevenin import thevenin_impedances, shunt_estimate
 
 
 class ShuntKZCalc:
@@ -22,7 +24,11 @@ class ShuntKZCalc:
     def __init__(self, progress_callback: Optional[Callable[[int], None]],
                  rgms: List[RgmsInfo], vrns: List[VrnInfo], rems_path: Optional[str],
                  shunt_kz_inf: List[ShuntKZ], use_sel_nodes: bool, use_type_val_u: bool,
-                 calc_one_phase: bool, calc_two_phase: bool):
+                 calc_one_phase: bool, calc_two_phase: bool,
+                 session_pool: Optional[RastrSessionPool] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 parallel_workers: int = 1,
+                 thevenin_start: bool = False):
         """
         Инициализация расчета шунтов КЗ
         
@@ -36,6 +42,12 @@ class ShuntKZCalc:
             use_type_val_u: Использовать типовые значения остаточного напряжения
             calc_one_phase: Расчет для однофазного КЗ
             calc_two_phase: Расчет для двухфазного КЗ
+            session_pool: Пул сессий RASTR (по умолчанию создается собственный)
+            snapshot_store: Хранилище подготовленных режимов (по умолчанию создается собственное)
+            parallel_workers: Количество процессов для параллельного расчета узлов
+                (1 - последовательный расчет)
+            thevenin_start: Начальное сопротивление шунта по эквивалентному
+                сопротивлению сети относительно узла (вместо исходного X/R)
         """
         if not rgms or (not shunt_kz_inf and not use_sel_nodes) or (not calc_one_phase and not calc_two_phase):
             error_msg = "Не заданы все исходные данные для определения шунтов КЗ!\n\n"
@@ -48,6 +60,10 @@ class ShuntKZCalc:
             raise InitialDataException(error_msg)
         
         self._progress_callback = progress_callback
+        self._pool = session_pool or RastrSessionPool()
+        self._snapshots = snapshot_store or SnapshotStore()
+        self._parallel_workers = parallel_workers or 1
+        self._thevenin_start = thevenin_start
         self._rgms = rgms
         self._vrns = [v for v in vrns if not v.deactive]
         self._rems_path = rems_path
@@ -78,148 +94,70 @@ class ShuntKZCalc:
         
         # Подсчет отмеченных узлов для каждого режима
         total_nodes = 0
-        rastr = RastrOperations()
-        for rgm in self._rgms:
-            try:
-                rastr.load(rgm.name)
-                selected = rastr.selection("node", "sel = 1")
-                total_nodes += len(selected) * len(self._vrns) * num_phases
-            except:
-                pass
+        with self._pool.session() as rastr:
+            for rgm in self._rgms:
+                try:
+                    rastr.load(rgm.name)
+                    selected = rastr.selection("node", "sel = 1")
+                    total_nodes += len(selected) * len(self._vrns) * num_phases
+                except:
+                    pass
         
         return total_nodes + 1
     
     def calc(self) -> List[ShuntResults]:
         """Выполнение расчета"""
         progress = 0
-        results = []
+
+        def on_result(idx, result):
+            nonlocal progress
+            for _, steps in result:
+                if steps:
+                    progress += steps
+                    if self._progress_callback:
+                        self._progress_callback(progress)
+
+        parallel = self._parallel_workers > 1
+        groups = {}
+        tasks = []
+        for rgm_idx, rgm in enumerate(self._rgms):
+            for vrn_idx, vrn in enumerate(self._vrns):
+                with self._pool.session() as rastr:
+                    # Загрузка режима с примененным вариантом (из снимка, если он уже подготовлен)
+                    is_stable = self._snapshots.prepare(rastr, rgm.name, vrn, self._rems_path)
+                    nodes = self._nodes(rastr) if is_stable else []
+                    z_th = self._thevenin(rastr, nodes)
+                    outcome = []
+                    
+                    if parallel:
+                        # Узлы варианта делятся на части, каждая рассчитывается от общего снимка
+                        chunk = max(1, math.ceil(len(nodes) / (self._parallel_workers * 4)))
+                        for start in range(0, len(nodes), chunk):
+                            tasks.append((rgm_idx, vrn_idx, nodes[start:start + chunk], z_th))
+                    elif nodes:
+                        outcome = self._calc_nodes(rastr, nodes, z_th)
+                        on_result(len(groups), outcome)
+                    
+                    groups[(rgm_idx, vrn_idx)] = (is_stable, outcome)
+
+        if parallel and tasks:
+            from .parallel import run_parallel
+            outcomes = run_parallel(self, "_calc_chunk", tasks, self._parallel_workers, on_result)
+            for (rgm_idx, vrn_idx, _, _), outcome in zip(tasks, outcomes):
+                groups[(rgm_idx, vrn_idx)][1].extend(outcome)
+        else:
+            self._pool.log_stats()
+            self._snapshots.log_stats()
         
-        for rgm in self._rgms:
+        results = []
+        for rgm_idx, rgm in enumerate(self._rgms):
             shems_list = []
-            
-            for vrn in self._vrns:
-                nodes_list = []
-                rastr = RastrOperations()
-                rastr.load(rgm.name)
-                
-                # Применение варианта
-                if vrn.id == -1:
-                    is_stable = rastr.rgm()
-                else:
-                    is_stable = rastr.apply_variant(vrn.num, self._rems_path)
-                
-                if not is_stable:
-                    shems_list.append(Shems(
-                        sheme_name=vrn.name,
-                        is_stable=False,
-                        nodes=[]
-                    ))
-                    continue
-                
-                # Расчет шунтов КЗ
-                if not self._use_sel_nodes:
-                    # Использование узлов из файла задания
-                    for shunt_node in self._shunt_kz_inf:
-                        shunt_result = ShuntKZ()
-                        shunt_result.node = shunt_node.node
-                        
-                        rastr.rgm()
-                        v_initial = rastr.get_val("node", "vras", f"ny={shunt_node.node}")
-                        
-                        # Расчет однофазного КЗ
-                        if self._calc_one_phase:
-                            if shunt_node.x1 != -1.0 and (shunt_node.u1 != -1.0 or self._use_type_val_u):
-                                u_target = shunt_node.u1 if shunt_node.u1 != -1.0 else (v_initial * 0.66)
-                                result = rastr.find_shunt_kz(
-                                    shunt_node.node, u_target, shunt_node.x1, shunt_node.r1
-                                )
-                                shunt_result.r1 = result.r
-                                shunt_result.x1 = result.x
-                                shunt_result.u1 = result.u
-                            elif shunt_node.x1 == -1.0 and (shunt_node.u1 != -1.0 or self._use_type_val_u):
-                                u_target = shunt_node.u1 if shunt_node.u1 != -1.0 else (v_initial * 0.66)
-                                result = rastr.find_shunt_kz(
-                                    shunt_node.node, u_target,
-                                    math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE)
-                                )
-                                shunt_result.r1 = result.r
-                                shunt_result.x1 = result.x
-                                shunt_result.u1 = result.u
-                            
-                            progress += 1
-                            if self._progress_callback:
-                                self._progress_callback(progress)
-                        
-                        # Расчет двухфазного КЗ
-                        if self._calc_two_phase:
-                            if shunt_node.x2 != -1.0 and (shunt_node.u2 != -1.0 or self._use_type_val_u):
-                                u_target = shunt_node.u2 if shunt_node.u2 != -1.0 else (v_initial * 0.33)
-                                result = rastr.find_shunt_kz(
-                                    shunt_node.node, u_target, shunt_node.x2, shunt_node.r2
-                                )
-                                shunt_result.r2 = result.r
-                                shunt_result.x2 = result.x
-                                shunt_result.u2 = result.u
-                            elif shunt_node.x2 == -1.0 and (shunt_node.u2 != -1.0 or self._use_type_val_u):
-                                u_target = shunt_node.u2 if shunt_node.u2 != -1.0 else (v_initial * 0.33)
-                                result = rastr.find_shunt_kz(
-                                    shunt_node.node, u_target,
-                                    math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE)
-                                )
-                                shunt_result.r2 = result.r
-                                shunt_result.x2 = result.x
-                                shunt_result.u2 = result.u
-                            
-                            progress += 1
-                            if self._progress_callback:
-                                self._progress_callback(progress)
-                        
-                        nodes_list.append(shunt_result)
-                else:
-                    # Использование отмеченных узлов
-                    selected_nodes = rastr.selection("node", "sel = 1")
-                    
-                    for node_idx in selected_nodes:
-                        shunt_result = ShuntKZ()
-                        rastr.rgm()
-                        v_initial = rastr.get_val("node", "vras", node_idx)
-                        node_num = rastr.get_val("node", "ny", node_idx)
-                        shunt_result.node = node_num
-                        
-                        # Расчет однофазного КЗ
-                        if self._calc_one_phase:
-                            result = rastr.find_shunt_kz(
-                                node_num, v_initial * 0.66,
-                                math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE)
-                            )
-                            shunt_result.r1 = result.r
-                            shunt_result.x1 = result.x
-                            shunt_result.u1 = result.u
-                            
-                            progress += 1
-                            if self._progress_callback:
-                                self._progress_callback(progress)
-                        
-                        # Расчет двухфазного КЗ
-                        if self._calc_two_phase:
-                            result = rastr.find_shunt_kz(
-                                node_num, v_initial * 0.33,
-                                math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE)
-                            )
-                            shunt_result.r2 = result.r
-                            shunt_result.x2 = result.x
-                            shunt_result.u2 = result.u
-                            
-                            progress += 1
-                            if self._progress_callback:
-                                self._progress_callback(progress)
-                        
-                        nodes_list.append(shunt_result)
-                
+            for vrn_idx, vrn in enumerate(self._vrns):
+                is_stable, outcome = groups[(rgm_idx, vrn_idx)]
                 shems_list.append(Shems(
                     sheme_name=vrn.name,
                     is_stable=is_stable,
-                    nodes=nodes_list
+                    nodes=[shunt_result for shunt_result, _ in outcome]
                 ))
             
             results.append(ShuntResults(
@@ -228,4 +166,170 @@ class ShuntKZCalc:
             ))
         
         return results
-
+    
+    def _nodes(self, rastr: RastrOperations) -> List[int]:
+        """Узлы расчета: индексы узлов файла задания или номера отмеченных узлов"""
+        if not self._use_sel_nodes:
+            return list(range(len(self._shunt_kz_inf)))
+        selected_nodes = rastr.selection("node", "sel = 1")
+        return [int(ny) for ny in rastr.get_column("node", "ny", selected_nodes).tolist()]
+    
+    def _thevenin(self, rastr: RastrOperations, nodes: List[int]) -> Dict[int, complex]:
+        """Эквивалентные сопротивления сети относительно узлов расчета (одна факторизация на вариант)"""
+        if not self._thevenin_start or not nodes:
+            return {}
+        if not self._use_sel_nodes:
+            nodes = [self._shunt_kz_inf[idx].node for idx in nodes]
+        return thevenin_impedances(rastr, nodes)
+    
+    def _start(self, z_th: Optional[complex], v_initial: float, u_target: float,
+               x: float, r: float) -> Tuple[float, float]:
+        """Начальные X, R шунта: оценка по эквивалентному сопротивлению сети с углом исходных X/R"""
+        angle = (math.pi / 2.0) if r == -1.0 else math.atan(x / r)
+        z = shunt_estimate(z_th, v_initial, u_target, angle) if z_th is not None else None
+        if z is None:
+            return x, r
+        return z * math.sin(angle), (-1.0 if r == -1.0 else z * math.cos(angle))
+    
+    def _calc_chunk(self, rgm_idx: int, vrn_idx: int, nodes: List[int],
+                    z_th: Optional[Dict[int, complex]] = None) -> List[Tuple[ShuntKZ, int]]:
+        """Расчет части узлов варианта в сессии из пула (режим загружается из снимка)"""
+        with self._pool.session() as rastr:
+            self._snapshots.prepare(rastr, self._rgms[rgm_idx].name, self._vrns[vrn_idx], self._rems_path)
+            return self._calc_nodes(rastr, nodes, z_th)
+    
+    def _calc_nodes(self, rastr: RastrOperations, nodes: List[int],
+                    z_th: Optional[Dict[int, complex]] = None) -> List[Tuple[ShuntKZ, int]]:
+        """
+        Расчет шунтов КЗ для узлов в подготовленной сессии
+        
+        Args:
+            rastr: Сессия с загруженным режимом и вариантом
+            nodes: Номера отмеченных узлов или индексы узлов файла задания
+            z_th: Эквивалентные сопротивления сети относительно узлов, Ом
+        
+        Returns:
+            Список (результат по узлу, количество шагов прогресса)
+        """
+        from utils.logger import logger
+        
+        outcome = []
+        for node in nodes:
+            start = time.perf_counter()
+            if self._use_sel_nodes:
+                shunt_result, steps = self._calc_sel_node(rastr, node, (z_th or {}).get(node))
+            else:
+                shunt_node = self._shunt_kz_inf[node]
+                shunt_result, steps = self._calc_task_node(rastr, shunt_node, (z_th or {}).get(shunt_node.node))
+            shunt_result.calc_time = time.perf_counter() - start
+            logger.debug(
+                f"Шунт КЗ для узла {shunt_result.node} рассчитан за {shunt_result.calc_time:.2f} с, "
+                f"расчетов динамики: {shunt_result.iterations1} + {shunt_result.iterations2}"
+            )
+            outcome.append((shunt_result, steps))
+        return outcome
+    
+    def _calc_task_node(self, rastr: RastrOperations, shunt_node: ShuntKZ,
+                        z_th: Optional[complex] = None) -> Tuple[ShuntKZ, int]:
+        """Расчет узла из файла задания"""
+        steps = 0
+        shunt_result = ShuntKZ()
+        shunt_result.node = shunt_node.node
+        
+        rastr.rgm()
+        v_initial = rastr.get_val("node", "vras", f"ny={shunt_node.node}")
+        
+        # Расчет однофазного КЗ
+        if self._calc_one_phase:
+            if shunt_node.x1 != -1.0 and (shunt_node.u1 != -1.0 or self._use_type_val_u):
+                u_target = shunt_node.u1 if shunt_node.u1 != -1.0 else (v_initial * 0.66)
+                result = rastr.find_shunt_kz(
+                    shunt_node.node, u_target,
+                    *self._start(z_th, v_initial, u_target, shunt_node.x1, shunt_node.r1)
+                )
+                shunt_result.r1 = result.r
+                shunt_result.x1 = result.x
+                shunt_result.u1 = result.u
+                shunt_result.iterations1 = result.iterations
+            elif shunt_node.x1 == -1.0 and (shunt_node.u1 != -1.0 or self._use_type_val_u):
+                u_target = shunt_node.u1 if shunt_node.u1 != -1.0 else (v_initial * 0.66)
+                result = rastr.find_shunt_kz(
+                    shunt_node.node, u_target,
+                    *self._start(z_th, v_initial, u_target,
+                                 math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE))
+                )
+                shunt_result.r1 = result.r
+                shunt_result.x1 = result.x
+                shunt_result.u1 = result.u
+                shunt_result.iterations1 = result.iterations
+            
+            steps += 1
+        
+        # Расчет двухфазного КЗ
+        if self._calc_two_phase:
+            if shunt_node.x2 != -1.0 and (shunt_node.u2 != -1.0 or self._use_type_val_u):
+                u_target = shunt_node.u2 if shunt_node.u2 != -1.0 else (v_initial * 0.33)
+                result = rastr.find_shunt_kz(
+                    shunt_node.node, u_target,
+                    *self._start(z_th, v_initial, u_target, shunt_node.x2, shunt_node.r2)
+                )
+                shunt_result.r2 = result.r
+                shunt_result.x2 = result.x
+                shunt_result.u2 = result.u
+                shunt_result.iterations2 = result.iterations
+            elif shunt_node.x2 == -1.0 and (shunt_node.u2 != -1.0 or self._use_type_val_u):
+                u_target = shunt_node.u2 if shunt_node.u2 != -1.0 else (v_initial * 0.33)
+                result = rastr.find_shunt_kz(
+                    shunt_node.node, u_target,
+                    *self._start(z_th, v_initial, u_target,
+                                 math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE))
+                )
+                shunt_result.r2 = result.r
+                shunt_result.x2 = result.x
+                shunt_result.u2 = result.u
+                shunt_result.iterations2 = result.iterations
+            
+            steps += 1
+        
+        return shunt_result, steps
+    
+    def _calc_sel_node(self, rastr: RastrOperations, node_num: int,
+                       z_th: Optional[complex] = None) -> Tuple[ShuntKZ, int]:
+        """Расчет отмеченного узла"""
+        steps = 0
+        shunt_result = ShuntKZ()
+        rastr.rgm()
+        v_initial = rastr.get_val("node", "vras", f"ny={node_num}")
+        shunt_result.node = node_num
+        
+        # Расчет однофазного КЗ
+        if self._calc_one_phase:
+            u_target = v_initial * 0.66
+            result = rastr.find_shunt_kz(
+                node_num, u_target,
+                *self._start(z_th, v_initial, u_target,
+                             math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE))
+            )
+            shunt_result.r1 = result.r
+            shunt_result.x1 = result.x
+            shunt_result.u1 = result.u
+            shunt_result.iterations1 = result.iterations
+            
+            steps += 1
+        
+        # Расчет двухфазного КЗ
+        if self._calc_two_phase:
+            u_target = v_initial * 0.33
+            result = rastr.find_shunt_kz(
+                node_num, u_target,
+                *self._start(z_th, v_initial, u_target,
+                             math.sin(self.BASE_ANGLE), math.cos(self.BASE_ANGLE))
+            )
+            shunt_result.r2 = result.r
+            shunt_result.x2 = result.x
+            shunt_result.u2 = result.u
+            shunt_result.iterations2 = result.iterations
+            
+            steps += 1
+        
+        return shunt_result, steps
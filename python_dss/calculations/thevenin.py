@@ -0,0 +1,161 @@
+"""
+Эквивалентные сопротивления сети относительно узлов (по Тевенену)
+
+Матрица узловых проводимостей строится по таблицам node/vetv режима одним
+пакетным чтением и факторизуется один раз; сопротивления для всех
+запрошенных узлов получаются решением с несколькими правыми частями.
+Используется для начального приближения шунта КЗ.
+"""
+
+import math
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from utils.network_graph import connected_nodes
+
+try:
+    import scipy.sparse as sparse
+    from scipy.sparse.linalg import splu
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+def _column(rastr, table: str, col: str, default: float, size: int) -> np.ndarray:
+    """Колонка таблицы или значение по умолчанию, если колонки нет"""
+    try:
+        return rastr.get_column(table, col)
+    except Exception:
+        return np.full(size, default)
+
+
+def admittance_matrix(ny: np.ndarray, ip: np.ndarray, iq: np.ndarray, z: np.ndarray,
+                      ktr: np.ndarray, shunt_nodes: np.ndarray, shunt_z: np.ndarray):
+    """
+    Матрица узловых проводимостей, См
+
+    Ветви (ip, iq, z) с идеальным трансформатором ktr = U(iq) / U(ip) на стороне iq
+    (сопротивление приведено к напряжению узла ip); shunt_z - сопротивления
+    источников на землю в узлах shunt_nodes.
+
+    Returns:
+        Разреженная матрица (при наличии SciPy) или плотный массив, порядок узлов - ny
+    """
+    index = {n: idx for idx, n in enumerate(ny.tolist())}
+    rows = np.fromiter((index[n] for n in ip.tolist()), dtype=int, count=len(ip))
+    cols = np.fromiter((index[n] for n in iq.tolist()), dtype=int, count=len(iq))
+    src = np.fromiter((index[n] for n in shunt_nodes.tolist()), dtype=int, count=len(shunt_nodes))
+    y = 1.0 / z
+    i = np.concatenate([rows, cols, rows, cols, src])
+    j = np.concatenate([rows, cols, cols, rows, src])
+    v = np.concatenate([y, y / ktr ** 2, -y / ktr, -y / ktr, 1.0 / shunt_z])
+
+    size = len(ny)
+    if SCIPY_AVAILABLE:
+        return sparse.csc_matrix((v, (i, j)), shape=(size, size))
+    dense = np.zeros((size, size), dtype=complex)
+    np.add.at(dense, (i, j), v)
+    return dense
+
+
+def thevenin_impedances(rastr, nodes: Sequence[int]) -> Dict[int, complex]:
+    """
+    Эквивалентные сопротивления сети относительно узлов, Ом
+
+    Базисные узлы (tip = 0) считаются источниками бесконечной мощности,
+    генераторы таблицы Generator - источниками за сопротивлением xd1, Ом.
+    Нагрузки и емкостные проводимости не учитываются. Отключенные узлы
+    и ветви (sta != 0) исключаются.
+
+    Returns:
+        Сопротивление для каждого запрошенного включенного узла,
+        связанного с источниками (пустой словарь, если данных режима недостаточно)
+    """
+    from utils.logger import logger
+
+    try:
+        ny = rastr.get_column("node", "ny").astype(int)
+        tip = rastr.get_column("node", "tip").astype(int)
+        ip = rastr.get_column("vetv", "ip").astype(int)
+        iq = rastr.get_column("vetv", "iq").astype(int)
+        r = rastr.get_column("vetv", "r").astype(float)
+        x = rastr.get_column("vetv", "x").astype(float)
+    except Exception as e:
+        logger.debug(f"Эквивалентные сопротивления недоступны: {e}")
+        return {}
+    node_on = _column(rastr, "node", "sta", 0, len(ny)) == 0
+    ktr = _column(rastr, "vetv", "ktr", 1.0, len(ip)).astype(float)
+    ktr[ktr == 0] = 1.0
+    on = _column(rastr, "vetv", "sta", 0, len(ip)) == 0
+
+    try:
+        gen_node = rastr.get_column("Generator", "Node").astype(int)
+        gen_x = rastr.get_column("Generator", "xd1").astype(float)
+        gen_on = _column(rastr, "Generator", "sta", 0, len(gen_node)) == 0
+    except Exception:
+        gen_node, gen_x, gen_on = np.zeros(0, dtype=int), np.zeros(0), np.zeros(0, dtype=bool)
+
+    # Базисные узлы исключаются из матрицы (напряжение источника неизменно)
+    live = set(ny[node_on].tolist())
+    base = set(ny[node_on & (tip == 0)].tolist())
+    if not base:
+        return {}
+    kept = np.array(sorted(live - base), dtype=int)
+    kept_set = set(kept.tolist())
+    z = r + 1j * x
+    on &= np.array([a in live and b in live for a, b in zip(ip.tolist(), iq.tolist())], dtype=bool)
+    on &= z != 0
+    # Ветви к базисным узлам - шунты на землю по стороне оставшегося узла
+    to_base = on & np.array([(a in base) != (b in base) for a, b in zip(ip.tolist(), iq.tolist())],
+                            dtype=bool)
+    inner = on & np.array([a in kept_set and b in kept_set for a, b in zip(ip.tolist(), iq.tolist())],
+                          dtype=bool)
+    base_side = np.where(np.isin(ip[to_base], list(base)), iq[to_base], ip[to_base])
+    # Сопротивление ветви, приведенное к напряжению оставшегося узла
+    base_z = np.where(np.isin(ip[to_base], list(base)), z[to_base] * ktr[to_base] ** 2, z[to_base])
+    gens = gen_on & (gen_x > 0) & np.isin(gen_node, kept)
+
+    shunt_nodes = np.concatenate([base_side, gen_node[gens]])
+    shunt_z = np.concatenate([base_z, 1j * gen_x[gens]])
+    # Узлы, не связанные с источниками, дают вырожденную матрицу
+    grounded = connected_nodes(np.concatenate([ip[inner], shunt_nodes]),
+                                np.concatenate([iq[inner], shunt_nodes]), shunt_nodes.tolist())
+    kept = np.array([n for n in kept.tolist() if n in grounded], dtype=int)
+    inner &= np.isin(ip, kept) & np.isin(iq, kept)
+    requested = [n for n in nodes if n in kept_set and n in grounded]
+    if not requested:
+        return {}
+
+    matrix = admittance_matrix(kept, ip[inner], iq[inner], z[inner], ktr[inner], shunt_nodes, shunt_z)
+    index = {n: idx for idx, n in enumerate(kept.tolist())}
+    columns = [index[n] for n in requested]
+    rhs = np.zeros((len(kept), len(columns)), dtype=complex)
+    rhs[columns, np.arange(len(columns))] = 1.0
+    try:
+        if SCIPY_AVAILABLE:
+            solution = splu(matrix).solve(rhs)
+        else:
+            solution = np.linalg.solve(matrix, rhs)
+    except (RuntimeError, np.linalg.LinAlgError) as e:
+        logger.debug(f"Эквивалентные сопротивления недоступны: {e}")
+        return {}
+    return {n: complex(solution[idx, col]) for col, (n, idx) in enumerate(zip(requested, columns))}
+
+
+def shunt_estimate(z_th: complex, u_pre: float, u_target: float, angle: float) -> Optional[float]:
+    """
+    Модуль сопротивления шунта с углом angle, при котором напряжение узла
+    за эквивалентным сопротивлением z_th снижается с u_pre до u_target
+
+    Из U = u_pre * |Zш| / |Zш + z_th|: (k^2 - 1) z^2 - 2 Re(z_th e^-j*angle) z - |z_th|^2 = 0,
+    k = u_pre / u_target (берется положительный корень).
+
+    Returns:
+        Модуль сопротивления, Ом, или None, если целевое напряжение недостижимо
+    """
+    if u_target <= 0 or u_pre <= u_target or z_th == 0:
+        return None
+    a = (u_pre / u_target) ** 2 - 1
+    c = (z_th * complex(math.cos(angle), -math.sin(angle))).real
+    return (c + math.sqrt(c * c + a * abs(z_th) ** 2)) / a
@@ -7,7 +7,7 @@ import math
 import locale
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Tuple
 from models import (
     RgmsInfo,
     ScnsInfo,
@@ -18,7 +18,8 @@ from models import (
     UostEvents,
     Values,
 )
-from rastr_operations import RastrOperations, DynamicResult
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, DynamicResult, SplitLine
+from utils.boundary_search import BoundarySearch, BoundaryResult, find_boundary
 from utils.exceptions import InitialDataException
 
 
@@ -33,6 +34,12 @@ class UostStabilityCalc:
         vrns: List[VrnInfo],
         rems_path: Optional[str],
         kprs: List[KprInfo],
+        session_pool: Optional[RastrSessionPool] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        parallel_workers: int = 1,
+        split_fixture: Optional[bool] = None,
+        tolerance: Optional[float] = None,
+        warm_start: Optional[bool] = None,
     ):
         """
         Инициализация расчета остаточного напряжения
@@ -44,6 +51,18 @@ class UostStabilityCalc:
             vrns: Список вариантов (ремонтных схем)
             rems_path: Путь к файлу ремонтных схем
             kprs: Список контролируемых величин
+            session_pool: Пул сессий RASTR (по умолчанию создается собственный)
+            snapshot_store: Хранилище подготовленных режимов (по умолчанию создается собственное)
+            parallel_workers: Количество процессов для параллельного расчета сценариев
+                (1 - последовательный расчет)
+            split_fixture: Снимок режима с разделенной линией на (режим, вариант, линию)
+                и смена положения КЗ без расчета режима (по умолчанию performance.uost_split_fixture)
+            tolerance: Точность места КЗ на границе устойчивости, % длины линии
+                (по умолчанию calculations.uost_tolerance)
+            warm_start: Первые пробы поиска по границе предыдущих сценариев на той же линии
+                (по умолчанию calculations.uost_warm_start); при параллельном расчете
+                отключается: набор сценариев, рассчитанных процессом ранее, зависит
+                от порядка выполнения, и результаты не воспроизводились бы
         """
         if not rgms or not scns:
             error_msg = "Не заданы все исходные данные для определения остаточного напряжения!\n\n"
@@ -53,6 +72,9 @@ class UostStabilityCalc:
             raise InitialDataException(error_msg)
 
         self._progress_callback = progress_callback
+        self._pool = session_pool or RastrSessionPool()
+        self._snapshots = snapshot_store or SnapshotStore()
+        self._parallel_workers = parallel_workers or 1
         self._rgms = rgms
         self._scns = scns
         self._vrns = [v for v in vrns if not v.deactive]
@@ -62,6 +84,20 @@ class UostStabilityCalc:
         # Создание папки для результатов
         from utils.config import config
 
+        if split_fixture is None:
+            split_fixture = config.get("performance.uost_split_fixture", False)
+        self._split_fixture = split_fixture
+        if tolerance is None:
+            tolerance = config.get("calculations.uost_tolerance", 0.5)
+        self._tolerance = tolerance
+        self._max_probes = config.get("calculations.uost_max_probes", 50)
+        if warm_start is None:
+            warm_start = config.get("calculations.uost_warm_start", False)
+        self._warm_start = warm_start and self._parallel_workers == 1
+        # Границы устойчивости по (ip, iq, np, узел КЗ) в сценариях, рассчитанных процессом
+        self._boundaries = {}
+        self.search_stats = {'scenarios': 0, 'probes': 0}
+
         results_dir = config.get_path("paths.results_dir")
         self._root = (
             results_dir
@@ -90,990 +126,979 @@ class UostStabilityCalc:
 
         progress = 0
         results = []
-        new_node_counter = 1  # ИСПРАВЛЕНО: Счетчик для новых узлов (как num2 в C#)
 
         logger.info(
             f"Начало расчета остаточного напряжения: {len(self._rgms)} режимов, {len(self._vrns)} вариантов, {len(self._scns)} сценариев"
         )
 
-        for rgm_idx, rgm in enumerate(self._rgms):
-            logger.info(
-                f"[РЕЖИМ {rgm_idx + 1}/{len(self._rgms)}] Загрузка режима: {Path(rgm.name).stem}"
+        def on_result(idx, result):
+            nonlocal progress
+            if result[1] is not None:
+                progress += 1
+                if self._progress_callback:
+                    self._progress_callback(progress)
+
+        tasks = [
+            (rgm_idx, vrn_idx, scn_idx)
+            for rgm_idx in range(len(self._rgms))
+            for vrn_idx in range(len(self._vrns))
+            for scn_idx in range(len(self._scns))
+        ]
+        if self._parallel_workers > 1 and len(tasks) > 1:
+            from .parallel import run_parallel
+
+            # Каждой задаче выделяется собственный номер узла в пределах режима, поэтому
+            # номера узлов процессов не пересекаются и не зависят от порядка выполнения
+            tasks = [
+                (rgm_idx, vrn_idx, scn_idx, 1 + vrn_idx * len(self._scns) + scn_idx)
+                for rgm_idx, vrn_idx, scn_idx in tasks
+            ]
+            outcomes = run_parallel(
+                self, "_calc_scenario", tasks, self._parallel_workers, on_result
             )
+        else:
+            outcomes = []
+            new_node_counter = 1  # ИСПРАВЛЕНО: Счетчик для новых узлов (как num2 в C#)
+            for idx, (rgm_idx, vrn_idx, scn_idx) in enumerate(tasks):
+                # ИСПРАВЛЕНО: Сбрасываем счетчик для каждого режима (как в C# num2 инициализируется один раз)
+                if vrn_idx == 0 and scn_idx == 0:
+                    new_node_counter = 1
+                outcomes.append(
+                    self._calc_scenario(rgm_idx, vrn_idx, scn_idx, new_node_counter)
+                )
+                on_result(idx, outcomes[idx])
+                if outcomes[idx][1] is not None:
+                    # ИСПРАВЛЕНО: Увеличиваем счетчик для следующего сценария (как num2 в C#)
+                    new_node_counter += 1
+            self._pool.log_stats()
+            self._snapshots.log_stats()
+        for _, events in outcomes:
+            if events is not None and events.probes:
+                self.search_stats['scenarios'] += 1
+                self.search_stats['probes'] += events.probes
+        outcomes = iter(outcomes)
+
+        for rgm_idx, rgm in enumerate(self._rgms):
             uost_shems_list = []
-            # ИСПРАВЛЕНО: Сбрасываем счетчик для каждого режима (как в C# num2 инициализируется один раз)
-            new_node_counter = 1
 
             for vrn_idx, vrn in enumerate(self._vrns):
+                events_list = []
+                is_stable = False
+
+                for _ in self._scns:
+                    is_stable, events = next(outcomes)
+                    if events is not None:
+                        events_list.append(events)
+
                 logger.info(
-                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}/{len(self._vrns)}] Вариант: {vrn.name}"
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}] Обработано событий: {len(events_list)}"
                 )
-                events_list = []
 
-                for scn_idx, scn in enumerate(self._scns):
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}/{len(self._scns)}] Начало обработки сценария: {Path(scn.name).stem}"
-                    )
-                    rastr = RastrOperations()
-                    rastr.load(rgm.name)
-                    rastr.dyn_settings()
-
-                    # Применение варианта
-                    is_stable = (
-                        rastr.rgm()
-                        if vrn.id == -1
-                        else rastr.apply_variant(vrn.num, self._rems_path)
+                uost_shems_list.append(
+                    UostShems(
+                        sheme_name=vrn.name, is_stable=is_stable, events=events_list
                     )
+                )
 
-                    if not is_stable:
-                        logger.warning(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Режим неустойчив после применения варианта, пропуск"
-                        )
-                        continue
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}] Обработано вариантов: {len(uost_shems_list)}"
+            )
 
-                    rastr.load(scn.name)
-                    logger.debug(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Сценарий загружен"
-                    )
+            results.append(
+                UostResults(rg_name=Path(rgm.name).stem, uost_shems=uost_shems_list)
+            )
 
-                    # Извлечение информации о КЗ из сценария
-                    distance = 100.0
-                    line_key = ""
-                    node_kz = 0
-                    time_start = 0.0
-                    r_shunt = -1.0
-                    x_shunt = -1.0
-                    r_id = 0
-                    x_id = 0
-                    # Инициализация параметров линии для вывода в Excel
-                    begin_r = -1.0
-                    begin_x = -1.0
-                    end_r = -1.0
-                    end_x = -1.0
+        logger.info(
+            f"Расчет остаточного напряжения завершен. Всего результатов: {len(results)}"
+        )
+        if self.search_stats['scenarios']:
+            logger.info(
+                f"Поиск места КЗ: сценариев {self.search_stats['scenarios']}, "
+                f"расчетов динамики {self.search_stats['probes']}"
+            )
+        return results
 
-                    actions = rastr.selection("DFWAutoActionScn")
-                    logger.debug(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено действий в сценарии: {len(actions)}"
-                    )
+    def _search_distance(
+        self, rastr: RastrOperations, split: SplitLine, l_stable: float,
+        l_unstable: float, previous: Optional[float], prefix: str
+    ) -> BoundaryResult:
+        """
+        Поиск места КЗ на границе устойчивости делением интервала
 
-                    if not actions:
-                        logger.warning(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Сценарий не содержит действий (DFWAutoActionScn пуст), пропуск"
-                        )
-                        continue
+        Устойчивость - двоичный результат расчета динамики (невязки со знаком,
+        необходимой для интерполяции, нет), поэтому интервал делится пополам до
+        заданной точности. Если известна граница предыдущего сценария на той же
+        линии, первые пробы выполняются по обе стороны от нее на две точности.
 
-                    for action_id in actions:
-                        # ИСПРАВЛЕНО: Убеждаемся, что action_id - это int
-                        if not isinstance(action_id, int):
-                            try:
-                                action_id = int(action_id)
-                            except (ValueError, TypeError) as e:
-                                from utils.logger import logger
+        Args:
+            rastr: Сессия RASTR
+            split: Разделенная линия
+            l_stable: Устойчивое место КЗ, % длины линии
+            l_unstable: Неустойчивое место КЗ, % длины линии
+            previous: Граница устойчивости предыдущего сценария на линии
+            prefix: Префикс сообщений лога
+
+        Returns:
+            Результат поиска (последняя проба - устойчивое место КЗ, если поиск сошелся)
+        """
+        from utils.logger import logger
 
-                                logger.error(
-                                    f"Некорректный тип action_id: {action_id} (тип: {type(action_id)}), ошибка: {e}"
-                                )
-                                continue
+        def probe(distance: float):
+            split.set(rastr, distance)
+            dyn_result = rastr.run_dynamic(ems=True)
+            logger.debug(
+                f"{prefix} Проба distance={distance:.2f}: успех={dyn_result.is_success}, устойчивость={dyn_result.is_stable}"
+            )
+            if not dyn_result.is_success:
+                logger.warning(f"{prefix} Расчет динамики не выполнен при distance={distance:.2f}")
+                return None
+            return distance, distance, dyn_result.is_stable
+
+        first = []
+        if self._warm_start and previous is not None:
+            margin = 2 * self._tolerance
+            if l_stable < l_unstable:
+                margin = -margin
+            first = [previous + margin, previous - margin]
+            logger.info(
+                f"{prefix} Первые пробы по границе предыдущего сценария на линии: {first[0]:.2f}, {first[1]:.2f}"
+            )
 
-                        obj_class = rastr.get_val(
-                            "DFWAutoActionScn", "ObjectClass", action_id
-                        )
+        search = BoundarySearch((l_unstable, l_unstable), l_stable, self._tolerance,
+                                stable=(l_stable, l_stable))
+        result = find_boundary(probe, search, self._max_probes, first)
+        if not result.converged and result.probes >= self._max_probes:
+            logger.warning(
+                f"{prefix} Достигнуто максимальное количество расчетов динамики ({self._max_probes}) при поиске места КЗ"
+            )
+        return result
 
-                        if obj_class == "vetv":
-                            line_key = rastr.get_val(
-                                "DFWAutoActionScn", "ObjectKey", action_id
-                            )
-                            rastr.set_val("DFWAutoActionScn", "State", action_id, 1)
 
-                        if obj_class == "node":
-                            try:
-                                obj_key = rastr.get_val(
-                                    "DFWAutoActionScn", "ObjectKey", action_id
-                                )
-                                # Преобразуем в int, если это строка
-                                if isinstance(obj_key, str):
-                                    node_kz = int(obj_key.strip())
-                                else:
-                                    node_kz = int(obj_key)
-                            except (ValueError, TypeError) as e:
-                                from utils.logger import logger
+    def _calc_scenario(
+        self, rgm_idx: int, vrn_idx: int, scn_idx: int, new_node_counter: int
+    ) -> Tuple[bool, Optional[UostEvents]]:
+        """
+        Расчет одного аварийного процесса в сессии из пула
 
-                                logger.error(
-                                    f"Ошибка при получении node_kz из ObjectKey: {e}, значение: {rastr.get_val('DFWAutoActionScn', 'ObjectKey', action_id)}"
-                                )
-                                continue
-                            time_start = rastr.get_val(
-                                "DFWAutoActionScn", "TimeStart", action_id
-                            )
+        Args:
+            rgm_idx: Индекс расчетного режима
+            vrn_idx: Индекс варианта
+            scn_idx: Индекс аварийного процесса
+            new_node_counter: Номер узла, добавляемого в точку КЗ на линии
 
-                            # ИСПРАВЛЕНО: Изменяем ObjectKey на new_node_counter (как в C# строке 89)
-                            rastr.set_val(
-                                "DFWAutoActionScn",
-                                "ObjectKey",
-                                action_id,
-                                new_node_counter,
-                            )
+        Returns:
+            (режим с вариантом сбалансирован, результаты или None)
+        """
+        from utils.logger import logger
 
-                            obj_prop = rastr.get_val(
-                                "DFWAutoActionScn", "ObjectProp", action_id
-                            )
-                            if obj_prop == "r":
-                                r_shunt = float(
-                                    str(
-                                        rastr.get_val(
-                                            "DFWAutoActionScn", "Formula", action_id
-                                        )
-                                    ).replace(".", locale.localeconv()["decimal_point"])
-                                )
-                                r_id = action_id
-                            if obj_prop == "x":
-                                x_shunt = float(
-                                    str(
-                                        rastr.get_val(
-                                            "DFWAutoActionScn", "Formula", action_id
-                                        )
-                                    ).replace(".", locale.localeconv()["decimal_point"])
-                                )
-                                x_id = action_id
+        rgm = self._rgms[rgm_idx]
+        vrn = self._vrns[vrn_idx]
+        scn = self._scns[scn_idx]
 
-                    # Парсинг ключа линии
-                    if not line_key:
-                        logger.warning(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ключ линии не найден в сценарии, пропуск"
-                        )
-                        continue
+        logger.info(
+            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}/{len(self._scns)}] Начало обработки сценария: {Path(scn.name).stem}"
+        )
+        with self._pool.session() as rastr:
+            # Загрузка режима с примененным вариантом (из снимка, если он уже подготовлен)
+            is_stable = self._snapshots.prepare(
+                rastr, rgm.name, vrn, self._rems_path
+            )
 
-                    logger.debug(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ключ линии: {line_key}, node_kz: {node_kz}"
-                    )
+            if not is_stable:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Режим неустойчив после применения варианта, пропуск"
+                )
+                return False, None
 
-                    line_parts = line_key.split(",")
-                    if len(line_parts) >= 3:
-                        try:
-                            ip = int(line_parts[0].strip())
-                            iq = int(line_parts[1].strip())
-                            np = int(line_parts[2].strip())
-                            logger.debug(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии: ip={ip}, iq={iq}, np={np}"
-                            )
-                        except (ValueError, TypeError) as e:
-                            logger.error(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ошибка при парсинге ключа линии '{line_key}': {e}"
-                            )
-                            continue
-                    else:
-                        logger.warning(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Некорректный формат ключа линии '{line_key}' (ожидается 3 части через запятую), пропуск"
-                        )
-                        continue
+            rastr.load(scn.name)
+            logger.debug(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Сценарий загружен"
+            )
 
-                    # Получение параметров линии
-                    # ИСПРАВЛЕНО: Используем формат с пробелами как в C# (строки 109-114)
-                    logger.debug(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получение параметров линии: ip={ip}, iq={iq}, np={np}"
-                    )
+            # Извлечение информации о КЗ из сценария
+            distance = 100.0
+            probes = 0
+            line_key = ""
+            node_kz = 0
+            time_start = 0.0
+            r_shunt = -1.0
+            x_shunt = -1.0
+            r_id = 0
+            x_id = 0
+            node_actions = []
+            # Инициализация параметров линии для вывода в Excel
+            begin_r = -1.0
+            begin_x = -1.0
+            end_r = -1.0
+            end_x = -1.0
+
+            actions = rastr.selection("DFWAutoActionScn")
+            logger.debug(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено действий в сценарии: {len(actions)}"
+            )
+
+            if not actions:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Сценарий не содержит действий (DFWAutoActionScn пуст), пропуск"
+                )
+                return True, None
+
+            for action_id in actions:
+                # ИСПРАВЛЕНО: Убеждаемся, что action_id - это int
+                if not isinstance(action_id, int):
                     try:
-                        r_line = rastr.get_val(
-                            "vetv", "r", f"ip = {ip} & iq = {iq} & np = {np}"
-                        )
-                        x_line = rastr.get_val(
-                            "vetv", "x", f"ip = {ip} & iq = {iq} & np = {np}"
-                        )
-                        b_line = rastr.get_val(
-                            "vetv", "b", f"ip = {ip} & iq = {iq} & np = {np}"
-                        )
-                        logger.debug(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии получены: r={r_line}, x={x_line}, b={b_line}"
-                        )
-                    except Exception as e:
+                        action_id = int(action_id)
+                    except (ValueError, TypeError) as e:
+                        from utils.logger import logger
+
                         logger.error(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ошибка при получении параметров линии: {e}"
+                            f"Некорректный тип action_id: {action_id} (тип: {type(action_id)}), ошибка: {e}"
                         )
                         continue
 
-                    # Отключение исходной линии и добавление новой
-                    # ИСПРАВЛЕНО: В C# используется setVal с selection (строка 112-114)
-                    logger.debug(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Отключение линии и установка bsh"
+                obj_class = rastr.get_val(
+                    "DFWAutoActionScn", "ObjectClass", action_id
+                )
+
+                if obj_class == "vetv":
+                    line_key = rastr.get_val(
+                        "DFWAutoActionScn", "ObjectKey", action_id
                     )
+                    rastr.set_val("DFWAutoActionScn", "State", action_id, 1)
+
+                if obj_class == "node":
                     try:
-                        result1 = rastr.set_val(
-                            "vetv", "sta", f"ip = {ip} & iq = {iq} & np = {np}", 1
+                        obj_key = rastr.get_val(
+                            "DFWAutoActionScn", "ObjectKey", action_id
                         )
-                        result2 = rastr.set_val(
-                            "node", "bsh", f"ny = {ip}", b_line / 2.0
-                        )
-                        result3 = rastr.set_val(
-                            "node", "bsh", f"ny = {iq}", b_line / 2.0
-                        )
-                        logger.debug(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Результаты set_val: vetv.sta={result1}, node.bsh(ip)={result2}, node.bsh(iq)={result3}"
-                        )
-                        if not result1 or not result2 or not result3:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось установить значения через set_val, пропуск"
-                            )
-                            continue
-                    except Exception as e:
+                        # Преобразуем в int, если это строка
+                        if isinstance(obj_key, str):
+                            node_kz = int(obj_key.strip())
+                        else:
+                            node_kz = int(obj_key)
+                    except (ValueError, TypeError) as e:
+                        from utils.logger import logger
+
                         logger.error(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ошибка при установке значений: {e}"
+                            f"Ошибка при получении node_kz из ObjectKey: {e}, значение: {rastr.get_val('DFWAutoActionScn', 'ObjectKey', action_id)}"
                         )
                         continue
+                    time_start = rastr.get_val(
+                        "DFWAutoActionScn", "TimeStart", action_id
+                    )
+                    node_actions.append(action_id)
 
-                    # ИСПРАВЛЕНО: Создаем новый узел с номером new_node_counter (как в C# строке 115-117)
-                    new_node_id = rastr.add_table_row("node")
-                    rastr.set_val("node", "ny", new_node_id, new_node_counter)
+                    # ИСПРАВЛЕНО: Изменяем ObjectKey на new_node_counter (как в C# строке 89)
                     rastr.set_val(
-                        "node",
-                        "uhom",
-                        new_node_id,
-                        rastr.get_val("node", "uhom", f"ny = {node_kz}"),
+                        "DFWAutoActionScn",
+                        "ObjectKey",
+                        action_id,
+                        new_node_counter,
                     )
 
-                    # Добавление новых ветвей
-                    branch1_id = rastr.add_table_row("vetv")
-                    branch2_id = rastr.add_table_row("vetv")
-
-                    # ИСПРАВЛЕНО: Убеждаемся, что все ID - это int
-                    if not isinstance(branch1_id, int):
-                        branch1_id = int(branch1_id)
-                    if not isinstance(branch2_id, int):
-                        branch2_id = int(branch2_id)
-                    if not isinstance(new_node_id, int):
-                        new_node_id = int(new_node_id)
+                    obj_prop = rastr.get_val(
+                        "DFWAutoActionScn", "ObjectProp", action_id
+                    )
+                    if obj_prop == "r":
+                        r_shunt = float(
+                            str(
+                                rastr.get_val(
+                                    "DFWAutoActionScn", "Formula", action_id
+                                )
+                            ).replace(".", locale.localeconv()["decimal_point"])
+                        )
+                        r_id = action_id
+                    if obj_prop == "x":
+                        x_shunt = float(
+                            str(
+                                rastr.get_val(
+                                    "DFWAutoActionScn", "Formula", action_id
+                                )
+                            ).replace(".", locale.localeconv()["decimal_point"])
+                        )
+                        x_id = action_id
 
-                    # ИСПРАВЛЕНО: Используем new_node_counter вместо new_node_id для ветвей (как в C# строках 120-123)
-                    rastr.set_val("vetv", "ip", branch1_id, ip)
-                    rastr.set_val("vetv", "iq", branch1_id, new_node_counter)
-                    rastr.set_val("vetv", "ip", branch2_id, new_node_counter)
-                    rastr.set_val("vetv", "iq", branch2_id, iq)
+            # Парсинг ключа линии
+            if not line_key:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ключ линии не найден в сценарии, пропуск"
+                )
+                return True, None
 
-                    rastr.rgm()
+            logger.debug(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ключ линии: {line_key}, node_kz: {node_kz}"
+            )
 
-                    # Расчет угла и модуля шунта
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет параметров шунта КЗ: r_shunt={r_shunt:.6f}, x_shunt={x_shunt:.6f}, r_id={r_id}, x_id={x_id}"
-                    )
-                    z_angle = (
-                        (math.pi / 2.0)
-                        if r_shunt == -1.0
-                        else math.atan(x_shunt / r_shunt)
+            line_parts = line_key.split(",")
+            if len(line_parts) >= 3:
+                try:
+                    ip = int(line_parts[0].strip())
+                    iq = int(line_parts[1].strip())
+                    np = int(line_parts[2].strip())
+                    logger.debug(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии: ip={ip}, iq={iq}, np={np}"
                     )
-                    z_mod = math.sqrt(
-                        (r_shunt**2 if r_shunt != -1.0 else 0) + x_shunt**2
+                except (ValueError, TypeError) as e:
+                    logger.error(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ошибка при парсинге ключа линии '{line_key}': {e}"
                     )
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры шунта рассчитаны: z_angle={z_angle:.6f} рад ({math.degrees(z_angle):.2f}°), z_mod={z_mod:.6f} Ом"
+                    return True, None
+            else:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Некорректный формат ключа линии '{line_key}' (ожидается 3 части через запятую), пропуск"
+                )
+                return True, None
+
+            # Разделение линии узлом КЗ: отключение линии, узел КЗ и две ветви
+            # ИСПРАВЛЕНО: Узел КЗ с номером new_node_counter (как в C# строках 112-123)
+            try:
+                uhom = rastr.get_val("node", "uhom", f"ny = {node_kz}")
+                if self._split_fixture:
+                    split = self._snapshots.split_line(
+                        rastr, rgm.name, vrn, self._rems_path, ip, iq, np, new_node_counter, uhom
                     )
+                else:
+                    split = SplitLine.build(rastr, ip, iq, np, new_node_counter, uhom)
+            except Exception as e:
+                logger.error(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Ошибка при разделении линии: {e}"
+                )
+                return True, None
+            if split is None:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось отключить линию, пропуск"
+                )
+                return True, None
+            if not self._split_fixture:
+                # Расчет режима при каждой смене положения КЗ
+                split.solved = False
+            if split.node != new_node_counter:
+                # Узел КЗ из снимка, построенного для другого сценария
+                new_node_counter = split.node
+                for action_id in node_actions:
+                    rastr.set_val("DFWAutoActionScn", "ObjectKey", action_id, new_node_counter)
+            r_line, x_line = split.r, split.x
+            branch1_id, branch2_id = split.branches
+            logger.debug(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Линия разделена узлом {split.node}: r={r_line}, x={x_line}, режим рассчитан={split.solved}"
+            )
 
-                    # ДОБАВЛЕНО: Инициализация переменной для финального значения шунта
-                    z_mod_final = z_mod  # Начальное значение
+            # Расчет угла и модуля шунта
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет параметров шунта КЗ: r_shunt={r_shunt:.6f}, x_shunt={x_shunt:.6f}, r_id={r_id}, x_id={x_id}"
+            )
+            z_angle = (
+                (math.pi / 2.0)
+                if r_shunt == -1.0
+                else math.atan(x_shunt / r_shunt)
+            )
+            z_mod = math.sqrt(
+                (r_shunt**2 if r_shunt != -1.0 else 0) + x_shunt**2
+            )
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры шунта рассчитаны: z_angle={z_angle:.6f} рад ({math.degrees(z_angle):.2f}°), z_mod={z_mod:.6f} Ом"
+            )
 
-                    # Определение начальной позиции КЗ
-                    # ИСПРАВЛЕНО: Убеждаемся, что оба значения - числа перед сравнением
-                    ip_int = int(ip) if not isinstance(ip, int) else ip
-                    node_kz_int = (
-                        int(node_kz) if not isinstance(node_kz, int) else node_kz
-                    )
-                    l_start = 0.1 if ip_int == node_kz_int else 99.9
-                    l_end = 100.0 - l_start
+            # ДОБАВЛЕНО: Инициализация переменной для финального значения шунта
+            z_mod_final = z_mod  # Начальное значение
 
-                    # Первый расчет
+            # Определение начальной позиции КЗ
+            # ИСПРАВЛЕНО: Убеждаемся, что оба значения - числа перед сравнением
+            ip_int = int(ip) if not isinstance(ip, int) else ip
+            node_kz_int = (
+                int(node_kz) if not isinstance(node_kz, int) else node_kz
+            )
+            l_start = 0.1 if ip_int == node_kz_int else 99.9
+            l_end = 100.0 - l_start
+
+            # Первый расчет
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало первого динамического расчета (l_start={l_start:.2f})"
+            )
+            split.set(rastr, l_start)
+            dyn_result1 = rastr.run_dynamic(ems=True)
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Первый расчет завершен: успех={dyn_result1.is_success}, устойчивость={dyn_result1.is_stable}"
+            )
+
+            # Второй расчет
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало второго динамического расчета (l_end={l_end:.2f})"
+            )
+            split.set(rastr, l_end)
+            dyn_result2 = rastr.run_dynamic(ems=True)
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Второй расчет завершен: успех={dyn_result2.is_success}, устойчивость={dyn_result2.is_stable}"
+            )
+
+            # Определение границы устойчивости
+            if (
+                dyn_result1.is_success
+                and dyn_result2.is_success
+                and (dyn_result1.is_stable != dyn_result2.is_stable)
+            ):
+                # Поиск границы устойчивости по месту КЗ
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало поиска границы устойчивости (точность {self._tolerance:.2f} %)"
+                )
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Исходные значения: l_start={l_start:.2f} (устойчивость={dyn_result1.is_stable}), l_end={l_end:.2f} (устойчивость={dyn_result2.is_stable})"
+                )
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начальное значение шунта: z_mod={z_mod:.6f}, z_angle={z_angle:.6f}, r_shunt={r_shunt:.6f}, x_shunt={x_shunt:.6f}, r_id={r_id}, x_id={x_id}"
+                )
+
+                l_stable = l_start if dyn_result1.is_stable else l_end
+                l_unstable = l_end if dyn_result1.is_stable else l_start
+                probes = 2
+                line = (ip, iq, np, node_kz_int)
+                result = self._search_distance(
+                    rastr, split, l_stable, l_unstable, self._boundaries.get(line),
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}]",
+                )
+                probes += result.probes
+                distance = result.x
+                if result.converged:
+                    self._boundaries[line] = distance
+
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Поиск границы завершен: distance={distance:.2f}, расчетов динамики {result.probes}, сходимость={result.converged}"
+                )
+
+                # ДОБАВЛЕНО: Извлекаем значения r и x для обеих ветвей после бинарного поиска
+                # Эти значения соответствуют найденным остаточным напряжениям
+                # ВАЖНО: branch1_id идет от ip к новому узлу (где КЗ), branch2_id идет от нового узла к iq
+                # Если node_kz == ip, то begin_r/begin_x должны быть почти нулевыми
+                # Если node_kz == iq, то end_r/end_x должны быть почти нулевыми
+                begin_r = -1.0
+                begin_x = -1.0
+                end_r = -1.0
+                end_x = -1.0
+                try:
+                    # Получаем r и x для первой ветви (от ip к новому узлу, где КЗ)
+                    begin_r = rastr.get_val("vetv", "r", branch1_id)
+                    begin_x = rastr.get_val("vetv", "x", branch1_id)
+                    # Получаем r и x для второй ветви (от нового узла к iq)
+                    end_r = rastr.get_val("vetv", "r", branch2_id)
+                    end_x = rastr.get_val("vetv", "x", branch2_id)
                     logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало первого динамического расчета (l_start={l_start:.2f})"
-                    )
-                    rastr.set_line_for_uost_calc(
-                        branch1_id, branch2_id, r_line, x_line, l_start
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии после бинарного поиска: begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
                     )
-                    dyn_result1 = rastr.run_dynamic(ems=True)
                     logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Первый расчет завершен: успех={dyn_result1.is_success}, устойчивость={dyn_result1.is_stable}"
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Структура ветвей: branch1_id (ip={ip} -> new_node={new_node_counter}), branch2_id (new_node={new_node_counter} -> iq={iq}), node_kz={node_kz}, distance={distance:.2f}%"
                     )
-
-                    # Второй расчет
+                    # ВАЖНО: Параметры begin_r/begin_x соответствуют ветви от ip к точке КЗ
+                    # Параметры end_r/end_x соответствуют ветви от точки КЗ к iq
+                    # Если node_kz == ip, то КЗ в узле начала, и begin_r/begin_x должны быть почти нулевыми
+                    # Если node_kz == iq, то КЗ в узле конца, и end_r/end_x должны быть почти нулевыми
+                    # ПРОВЕРКА: Если node_kz == ip, то begin_r/begin_x должны быть почти нулевыми
+                    if ip_int == node_kz_int:
+                        if begin_r > 1.0 or begin_x > 1.0:
+                            logger.warning(
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] ⚠️ ВНИМАНИЕ: node_kz==ip, но begin_r={begin_r:.6f}, begin_x={begin_x:.6f} (ожидаются почти нулевые значения)"
+                            )
+                    # ПРОВЕРКА: Если node_kz == iq, то end_r/end_x должны быть почти нулевыми
+                    iq_int = int(iq) if not isinstance(iq, int) else iq
+                    if iq_int == node_kz_int:
+                        if end_r > 1.0 or end_x > 1.0:
+                            logger.warning(
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] ⚠️ ВНИМАНИЕ: node_kz==iq, но end_r={end_r:.6f}, end_x={end_x:.6f} (ожидаются почти нулевые значения)"
+                            )
+                    # ВАЖНО: Параметры для узла, где происходит КЗ (node_kz)
+                    # Если node_kz == ip, то параметры для узла ip должны быть begin_r/begin_x
+                    # Если node_kz == iq, то параметры для узла iq должны быть end_r/end_x
+                    # Если КЗ происходит на линии (не в узле), то параметры распределяются пропорционально distance
                     logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало второго динамического расчета (l_end={l_end:.2f})"
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры для узла КЗ (node_kz={node_kz}): "
+                        f"если node_kz==ip ({ip}), то для узла {ip} используются begin_r={begin_r:.6f}, begin_x={begin_x:.6f}; "
+                        f"если node_kz==iq ({iq}), то для узла {iq} используются end_r={end_r:.6f}, end_x={end_x:.6f}"
                     )
-                    rastr.set_line_for_uost_calc(
-                        branch1_id, branch2_id, r_line, x_line, l_end
+                except Exception as e:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии после бинарного поиска: {e}"
                     )
-                    dyn_result2 = rastr.run_dynamic(ems=True)
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Второй расчет завершен: успех={dyn_result2.is_success}, устойчивость={dyn_result2.is_stable}"
-                    )
-
-                    # Определение границы устойчивости
-                    if (
-                        dyn_result1.is_success
-                        and dyn_result2.is_success
-                        and (dyn_result1.is_stable != dyn_result2.is_stable)
-                    ):
-                        # Бинарный поиск границы
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало бинарного поиска границы устойчивости"
-                        )
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Исходные значения: l_start={l_start:.2f} (устойчивость={dyn_result1.is_stable}), l_end={l_end:.2f} (устойчивость={dyn_result2.is_stable})"
-                        )
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начальное значение шунта: z_mod={z_mod:.6f}, z_angle={z_angle:.6f}, r_shunt={r_shunt:.6f}, x_shunt={x_shunt:.6f}, r_id={r_id}, x_id={x_id}"
-                        )
 
-                        l_stable = l_start if dyn_result1.is_stable else l_end
-                        l_unstable = l_end if dyn_result1.is_stable else l_start
-                        # ИСПРАВЛЕНО: В C# используется Math.Abs(num17 - num18) * 0.5 (строка 133)
-                        # Это половина разницы, а не среднее
-                        l_current = abs(l_stable - l_unstable) * 0.5
-
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Бинарный поиск: l_stable={l_stable:.2f}, l_unstable={l_unstable:.2f}, l_current={l_current:.2f}"
-                        )
-
-                        iteration = 0
-                        max_iterations = 50
-                        rastr.set_line_for_uost_calc(
-                            branch1_id, branch2_id, r_line, x_line, l_current
+                # ДОБАВЛЕНО: Извлекаем значение шунта после бинарного поиска границы
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение значения шунта КЗ после бинарного поиска: x_id={x_id}, r_id={r_id}, r_shunt={r_shunt}"
+                )
+                begin_shunt = -1.0
+                end_shunt = -1.0
+                try:
+                    if x_id > 0:
+                        # Получаем значение X шунта из действия
+                        x_shunt_value = rastr.get_val(
+                            "DFWAutoActionScn", "Formula", x_id
                         )
-                        dyn_result3 = rastr.run_dynamic(ems=True)
                         logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Бинарный поиск, итерация {iteration}: l_current={l_current:.2f}, устойчивость={dyn_result3.is_stable}"
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение X шунта из RASTR: x_shunt_value={x_shunt_value} (тип: {type(x_shunt_value)})"
                         )
-
-                        while (
-                            dyn_result3.is_success
-                            and (
-                                not dyn_result3.is_stable
-                                or abs(l_stable - l_unstable) > 0.5
+                        if r_shunt == -1.0:
+                            # Только X (реактивное сопротивление)
+                            begin_shunt = (
+                                float(x_shunt_value) if x_shunt_value else -1.0
                             )
-                            and iteration < max_iterations
-                        ):
-                            if dyn_result3.is_stable:
-                                l_stable = l_current
+                            end_shunt = (
+                                begin_shunt  # Одно значение для обоих узлов
+                            )
+                            logger.info(
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (только X): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
+                            )
+                        else:
+                            # X и R (полное сопротивление)
+                            if r_id > 0:
+                                r_shunt_value = rastr.get_val(
+                                    "DFWAutoActionScn", "Formula", r_id
+                                )
+                                logger.info(
+                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение R шунта из RASTR: r_shunt_value={r_shunt_value} (тип: {type(r_shunt_value)})"
+                                )
+                                x_val = (
+                                    float(x_shunt_value)
+                                    if x_shunt_value
+                                    else 0.0
+                                )
+                                r_val = (
+                                    float(r_shunt_value)
+                                    if r_shunt_value
+                                    else 0.0
+                                )
+                                # Модуль комплексного сопротивления
+                                z_mod_from_rastr = math.sqrt(
+                                    r_val**2 + x_val**2
+                                )
+                                begin_shunt = z_mod_from_rastr
+                                end_shunt = z_mod_from_rastr
+                                logger.info(
+                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (X и R): x_val={x_val:.6f}, r_val={r_val:.6f}, z_mod_from_rastr={z_mod_from_rastr:.6f}, begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
+                                )
                             else:
-                                l_unstable = l_current
-
-                            # ИСПРАВЛЕНО: Используем формулу из C# (строка 146)
-                            # num19 += Math.Abs(num18 - num17) * 0.5 * (double)(((dynamicResult.IsStable && dynamicResult3.IsStable) || (!dynamicResult.IsStable && !dynamicResult3.IsStable)) ? 1 : (-1));
-                            # Если знаки устойчивости совпадают (оба устойчивы ИЛИ оба неустойчивы), то добавляем, иначе вычитаем
-                            sign_multiplier = (
-                                1.0
-                                if (
-                                    (dyn_result1.is_stable and dyn_result3.is_stable)
-                                    or (
-                                        not dyn_result1.is_stable
-                                        and not dyn_result3.is_stable
-                                    )
+                                begin_shunt = (
+                                    float(x_shunt_value)
+                                    if x_shunt_value
+                                    else -1.0
                                 )
-                                else -1.0
-                            )
+                                end_shunt = begin_shunt
+                                logger.info(
+                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (только X, r_id=0): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
+                                )
+                    else:
+                        logger.warning(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] x_id={x_id}, не удалось извлечь значение шунта (x_id <= 0)"
+                        )
+                except Exception as e:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить значение шунта из RASTR после бинарного поиска: {e}"
+                    )
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Используем начальное значение z_mod={z_mod:.6f} как fallback"
+                    )
+                    # Используем начальное значение
+                    begin_shunt = z_mod
+                    end_shunt = z_mod
+            elif (
+                dyn_result1.is_success
+                and not dyn_result1.is_stable
+                and dyn_result2.is_success
+                and not dyn_result2.is_stable
+            ):
+                # Оба неустойчивы - увеличиваем шунт
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Оба расчета неустойчивы, начинаем увеличение шунта"
+                )
+                distance = -1.0
+                # ИСПРАВЛЕНО: Убеждаемся, что оба значения - числа перед сравнением
+                ip_int = int(ip) if not isinstance(ip, int) else ip
+                node_kz_int = (
+                    int(node_kz) if not isinstance(node_kz, int) else node_kz
+                )
+                split.set(rastr, (99.9 if ip_int == node_kz_int else 0.1))
 
-                            l_current += (
-                                abs(l_unstable - l_stable) * 0.5 * sign_multiplier
-                            )
-                            # Ограничиваем диапазоном 0-100
-                            l_current = max(0.0, min(100.0, l_current))
-                            distance = l_current
+                z_mod_new = (z_mod * 2.0) if z_mod > 0.1 else 1.0
+                z_mod_old = z_mod
 
-                            iteration += 1
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Бинарный поиск, итерация {iteration}: l_stable={l_stable:.2f}, l_unstable={l_unstable:.2f}, l_current={l_current:.2f}, distance={distance:.2f}"
-                            )
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начальные значения: z_mod={z_mod:.4f}, z_mod_new={z_mod_new:.4f}, z_mod_old={z_mod_old:.4f}"
+                )
 
-                            rastr.set_line_for_uost_calc(
-                                branch1_id, branch2_id, r_line, x_line, l_current
-                            )
-                            dyn_result3 = rastr.run_dynamic(ems=True)
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Бинарный поиск, итерация {iteration}: результат устойчивости={dyn_result3.is_stable}"
-                            )
+                if r_shunt == -1.0:
+                    rastr.change_rx_for_uost_calc(
+                        x_id, z_mod_new * math.sin(z_angle)
+                    )
+                else:
+                    rastr.change_rx_for_uost_calc(
+                        x_id,
+                        z_mod_new * math.sin(z_angle),
+                        r_id,
+                        z_mod_new * math.cos(z_angle),
+                    )
 
-                        # ИСПРАВЛЕНО: Обновляем l_stable/l_unstable после последнего расчета, если цикл завершился
-                        if dyn_result3.is_success:
-                            if dyn_result3.is_stable:
-                                l_stable = l_current
-                            else:
-                                l_unstable = l_current
+                dyn_result4 = rastr.run_dynamic(ems=True)
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Первый расчет с увеличенным шунтом: успех={dyn_result4.is_success}, устойчивость={dyn_result4.is_stable}"
+                )
 
-                        if iteration >= max_iterations:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Достигнуто максимальное количество итераций бинарного поиска ({max_iterations})"
-                            )
+                iteration1 = 0
+                max_iterations1 = 50  # Максимум итераций для первого цикла
+                while (
+                    dyn_result4.is_success
+                    and not dyn_result4.is_stable
+                    and iteration1 < max_iterations1
+                ):
+                    z_mod_old = z_mod_new
+                    z_mod_new += z_mod if z_mod > 0.1 else 1.0
 
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Бинарный поиск завершен: distance={distance:.2f}, l_stable={l_stable:.2f}, l_unstable={l_unstable:.2f}"
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Итерация {iteration1 + 1}: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}"
+                    )
+
+                    if r_shunt == -1.0:
+                        rastr.change_rx_for_uost_calc(
+                            x_id, z_mod_new * math.sin(z_angle)
+                        )
+                    else:
+                        rastr.change_rx_for_uost_calc(
+                            x_id,
+                            z_mod_new * math.sin(z_angle),
+                            r_id,
+                            z_mod_new * math.cos(z_angle),
                         )
 
-                        # ДОБАВЛЕНО: Извлекаем значения r и x для обеих ветвей после бинарного поиска
-                        # Эти значения соответствуют найденным остаточным напряжениям
-                        # ВАЖНО: branch1_id идет от ip к новому узлу (где КЗ), branch2_id идет от нового узла к iq
-                        # Если node_kz == ip, то begin_r/begin_x должны быть почти нулевыми
-                        # Если node_kz == iq, то end_r/end_x должны быть почти нулевыми
-                        begin_r = -1.0
-                        begin_x = -1.0
-                        end_r = -1.0
-                        end_x = -1.0
-                        try:
-                            # Получаем r и x для первой ветви (от ip к новому узлу, где КЗ)
-                            begin_r = rastr.get_val("vetv", "r", branch1_id)
-                            begin_x = rastr.get_val("vetv", "x", branch1_id)
-                            # Получаем r и x для второй ветви (от нового узла к iq)
-                            end_r = rastr.get_val("vetv", "r", branch2_id)
-                            end_x = rastr.get_val("vetv", "x", branch2_id)
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии после бинарного поиска: begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
-                            )
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Структура ветвей: branch1_id (ip={ip} -> new_node={new_node_counter}), branch2_id (new_node={new_node_counter} -> iq={iq}), node_kz={node_kz}, distance={distance:.2f}%"
-                            )
-                            # ВАЖНО: Параметры begin_r/begin_x соответствуют ветви от ip к точке КЗ
-                            # Параметры end_r/end_x соответствуют ветви от точки КЗ к iq
-                            # Если node_kz == ip, то КЗ в узле начала, и begin_r/begin_x должны быть почти нулевыми
-                            # Если node_kz == iq, то КЗ в узле конца, и end_r/end_x должны быть почти нулевыми
-                            # ПРОВЕРКА: Если node_kz == ip, то begin_r/begin_x должны быть почти нулевыми
-                            if ip_int == node_kz_int:
-                                if begin_r > 1.0 or begin_x > 1.0:
-                                    logger.warning(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] ⚠️ ВНИМАНИЕ: node_kz==ip, но begin_r={begin_r:.6f}, begin_x={begin_x:.6f} (ожидаются почти нулевые значения)"
-                                    )
-                            # ПРОВЕРКА: Если node_kz == iq, то end_r/end_x должны быть почти нулевыми
-                            iq_int = int(iq) if not isinstance(iq, int) else iq
-                            if iq_int == node_kz_int:
-                                if end_r > 1.0 or end_x > 1.0:
-                                    logger.warning(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] ⚠️ ВНИМАНИЕ: node_kz==iq, но end_r={end_r:.6f}, end_x={end_x:.6f} (ожидаются почти нулевые значения)"
-                                    )
-                            # ВАЖНО: Параметры для узла, где происходит КЗ (node_kz)
-                            # Если node_kz == ip, то параметры для узла ip должны быть begin_r/begin_x
-                            # Если node_kz == iq, то параметры для узла iq должны быть end_r/end_x
-                            # Если КЗ происходит на линии (не в узле), то параметры распределяются пропорционально distance
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры для узла КЗ (node_kz={node_kz}): "
-                                f"если node_kz==ip ({ip}), то для узла {ip} используются begin_r={begin_r:.6f}, begin_x={begin_x:.6f}; "
-                                f"если node_kz==iq ({iq}), то для узла {iq} используются end_r={end_r:.6f}, end_x={end_x:.6f}"
-                            )
-                        except Exception as e:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии после бинарного поиска: {e}"
-                            )
+                    dyn_result4 = rastr.run_dynamic(ems=True)
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Итерация {iteration1 + 1}: результат: успех={dyn_result4.is_success}, устойчивость={dyn_result4.is_stable}"
+                    )
+                    iteration1 += 1
 
-                        # ДОБАВЛЕНО: Извлекаем значение шунта после бинарного поиска границы
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение значения шунта КЗ после бинарного поиска: x_id={x_id}, r_id={r_id}, r_shunt={r_shunt}"
+                if iteration1 >= max_iterations1:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Достигнуто максимальное количество итераций ({max_iterations1}) для увеличения шунта"
+                    )
+
+                if not dyn_result4.is_success:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет динамики не успешен после увеличения шунта, пропуск уточнения"
+                    )
+                else:
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало уточнения границы устойчивости: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}"
+                    )
+
+                    # Уточнение границы
+                    iteration2 = 0
+                    max_iterations2 = 100  # Максимум итераций для второго цикла
+                    prev_z_mod_old = None
+                    prev_z_mod_new = None
+                    stagnation_count = 0
+
+                    while (
+                        dyn_result4.is_success
+                        and (
+                            not dyn_result4.is_stable
+                            or (1.0 - z_mod_old / z_mod_new) > 0.025
                         )
-                        begin_shunt = -1.0
-                        end_shunt = -1.0
-                        try:
-                            if x_id > 0:
-                                # Получаем значение X шунта из действия
-                                x_shunt_value = rastr.get_val(
-                                    "DFWAutoActionScn", "Formula", x_id
-                                )
-                                logger.info(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение X шунта из RASTR: x_shunt_value={x_shunt_value} (тип: {type(x_shunt_value)})"
-                                )
-                                if r_shunt == -1.0:
-                                    # Только X (реактивное сопротивление)
-                                    begin_shunt = (
-                                        float(x_shunt_value) if x_shunt_value else -1.0
-                                    )
-                                    end_shunt = (
-                                        begin_shunt  # Одно значение для обоих узлов
-                                    )
-                                    logger.info(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (только X): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
+                        and iteration2 < max_iterations2
+                    ):
+                        # ИСПРАВЛЕНО: Проверка на застой - если значения не меняются
+                        if (
+                            prev_z_mod_old is not None
+                            and prev_z_mod_new is not None
+                        ):
+                            if (
+                                abs(z_mod_old - prev_z_mod_old) < 0.0001
+                                and abs(z_mod_new - prev_z_mod_new) < 0.0001
+                            ):
+                                stagnation_count += 1
+                                if stagnation_count >= 5:
+                                    logger.warning(
+                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Обнаружен застой в уточнении границы (значения не меняются), прерываем цикл"
                                     )
-                                else:
-                                    # X и R (полное сопротивление)
-                                    if r_id > 0:
-                                        r_shunt_value = rastr.get_val(
-                                            "DFWAutoActionScn", "Formula", r_id
-                                        )
-                                        logger.info(
-                                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение R шунта из RASTR: r_shunt_value={r_shunt_value} (тип: {type(r_shunt_value)})"
-                                        )
-                                        x_val = (
-                                            float(x_shunt_value)
-                                            if x_shunt_value
-                                            else 0.0
-                                        )
-                                        r_val = (
-                                            float(r_shunt_value)
-                                            if r_shunt_value
-                                            else 0.0
-                                        )
-                                        # Модуль комплексного сопротивления
-                                        z_mod_from_rastr = math.sqrt(
-                                            r_val**2 + x_val**2
-                                        )
-                                        begin_shunt = z_mod_from_rastr
-                                        end_shunt = z_mod_from_rastr
-                                        logger.info(
-                                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (X и R): x_val={x_val:.6f}, r_val={r_val:.6f}, z_mod_from_rastr={z_mod_from_rastr:.6f}, begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
-                                        )
-                                    else:
-                                        begin_shunt = (
-                                            float(x_shunt_value)
-                                            if x_shunt_value
-                                            else -1.0
-                                        )
-                                        end_shunt = begin_shunt
-                                        logger.info(
-                                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт (только X, r_id=0): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
-                                        )
+                                    break
                             else:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] x_id={x_id}, не удалось извлечь значение шунта (x_id <= 0)"
-                                )
-                        except Exception as e:
+                                stagnation_count = 0
+
+                        prev_z_mod_old = z_mod_old
+                        prev_z_mod_new = z_mod_new
+
+                        # ИСПРАВЛЕНО: Проверка на равенство значений (как в C# - если num21 == num20, то num22 = 0)
+                        if abs(z_mod_old - z_mod_new) < 0.0001:
                             logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить значение шунта из RASTR после бинарного поиска: {e}"
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] z_mod_old и z_mod_new стали одинаковыми ({z_mod_old:.4f}), прерываем цикл уточнения"
                             )
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Используем начальное значение z_mod={z_mod:.6f} как fallback"
-                            )
-                            # Используем начальное значение
-                            begin_shunt = z_mod
-                            end_shunt = z_mod
-                    elif (
-                        dyn_result1.is_success
-                        and not dyn_result1.is_stable
-                        and dyn_result2.is_success
-                        and not dyn_result2.is_stable
-                    ):
-                        # Оба неустойчивы - увеличиваем шунт
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Оба расчета неустойчивы, начинаем увеличение шунта"
-                        )
-                        distance = -1.0
-                        # ИСПРАВЛЕНО: Убеждаемся, что оба значения - числа перед сравнением
-                        ip_int = int(ip) if not isinstance(ip, int) else ip
-                        node_kz_int = (
-                            int(node_kz) if not isinstance(node_kz, int) else node_kz
-                        )
-                        rastr.set_line_for_uost_calc(
-                            branch1_id,
-                            branch2_id,
-                            r_line,
-                            x_line,
-                            (99.9 if ip_int == node_kz_int else 0.1),
-                        )
+                            break
 
-                        z_mod_new = (z_mod * 2.0) if z_mod > 0.1 else 1.0
-                        z_mod_old = z_mod
+                        z_step = (
+                            (z_mod_old - z_mod_new) * 0.5
+                            if dyn_result4.is_stable
+                            else (z_mod_new - z_mod_old) * 0.5
+                        )
+                        z_current = z_mod_new + z_step
 
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начальные значения: z_mod={z_mod:.4f}, z_mod_new={z_mod_new:.4f}, z_mod_old={z_mod_old:.4f}"
+                        logger.debug(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение, итерация {iteration2 + 1}: z_step={z_step:.4f}, z_current={z_current:.4f}"
                         )
 
                         if r_shunt == -1.0:
                             rastr.change_rx_for_uost_calc(
-                                x_id, z_mod_new * math.sin(z_angle)
+                                x_id, z_current * math.sin(z_angle)
                             )
                         else:
                             rastr.change_rx_for_uost_calc(
                                 x_id,
-                                z_mod_new * math.sin(z_angle),
+                                z_current * math.sin(z_angle),
                                 r_id,
-                                z_mod_new * math.cos(z_angle),
+                                z_current * math.cos(z_angle),
                             )
 
                         dyn_result4 = rastr.run_dynamic(ems=True)
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Первый расчет с увеличенным шунтом: успех={dyn_result4.is_success}, устойчивость={dyn_result4.is_stable}"
-                        )
 
-                        iteration1 = 0
-                        max_iterations1 = 50  # Максимум итераций для первого цикла
-                        while (
-                            dyn_result4.is_success
-                            and not dyn_result4.is_stable
-                            and iteration1 < max_iterations1
-                        ):
-                            z_mod_old = z_mod_new
-                            z_mod_new += z_mod if z_mod > 0.1 else 1.0
+                        if dyn_result4.is_stable:
+                            z_mod_new = z_current
+                        else:
+                            z_mod_old = z_current
 
+                        iteration2 += 1
+
+                        # Логирование каждые 10 итераций
+                        if iteration2 % 10 == 0:
                             logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Итерация {iteration1 + 1}: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}"
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение, итерация {iteration2}: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}, устойчивость={dyn_result4.is_stable}, разница={abs(z_mod_old - z_mod_new):.4f}"
                             )
 
-                            if r_shunt == -1.0:
-                                rastr.change_rx_for_uost_calc(
-                                    x_id, z_mod_new * math.sin(z_angle)
-                                )
-                            else:
-                                rastr.change_rx_for_uost_calc(
-                                    x_id,
-                                    z_mod_new * math.sin(z_angle),
-                                    r_id,
-                                    z_mod_new * math.cos(z_angle),
-                                )
+                    if iteration2 >= max_iterations2:
+                        logger.warning(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Достигнуто максимальное количество итераций ({max_iterations2}) для уточнения границы"
+                        )
 
-                            dyn_result4 = rastr.run_dynamic(ems=True)
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Итерация {iteration1 + 1}: результат: успех={dyn_result4.is_success}, устойчивость={dyn_result4.is_stable}"
-                            )
-                            iteration1 += 1
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение завершено: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}, устойчивость={dyn_result4.is_stable}, итераций={iteration2}"
+                    )
 
-                        if iteration1 >= max_iterations1:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Достигнуто максимальное количество итераций ({max_iterations1}) для увеличения шунта"
-                            )
+                    # ИСПРАВЛЕНО: Сохраняем финальное значение шунта в момент нахождения на границе устойчивости
+                    z_mod_final = z_mod_new
 
-                        if not dyn_result4.is_success:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет динамики не успешен после увеличения шунта, пропуск уточнения"
+                    # ДОБАВЛЕНО: Извлекаем значения r и x для обеих ветвей после уточнения границы
+                    begin_r = -1.0
+                    begin_x = -1.0
+                    end_r = -1.0
+                    end_x = -1.0
+                    try:
+                        # Получаем r и x для первой ветви (начало линии)
+                        begin_r = rastr.get_val("vetv", "r", branch1_id)
+                        begin_x = rastr.get_val("vetv", "x", branch1_id)
+                        # Получаем r и x для второй ветви (конец линии)
+                        end_r = rastr.get_val("vetv", "r", branch2_id)
+                        end_x = rastr.get_val("vetv", "x", branch2_id)
+                        logger.info(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии после уточнения: begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
+                        )
+                    except Exception as e:
+                        logger.warning(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии после уточнения: {e}"
+                        )
+
+                    # ИСПРАВЛЕНО: Извлекаем значение шунта из RASTR в момент нахождения на границе устойчивости
+                    logger.info(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение значения шунта КЗ после уточнения границы: x_id={x_id}, r_id={r_id}, r_shunt={r_shunt}, z_mod_final={z_mod_final:.6f}"
+                    )
+                    begin_shunt = -1.0
+                    end_shunt = -1.0
+                    try:
+                        if x_id > 0:
+                            # Получаем значение X шунта из действия
+                            x_shunt_value = rastr.get_val(
+                                "DFWAutoActionScn", "Formula", x_id
                             )
-                        else:
                             logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало уточнения границы устойчивости: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}"
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение X шунта из RASTR после уточнения: x_shunt_value={x_shunt_value} (тип: {type(x_shunt_value)})"
                             )
-
-                            # Уточнение границы
-                            iteration2 = 0
-                            max_iterations2 = 100  # Максимум итераций для второго цикла
-                            prev_z_mod_old = None
-                            prev_z_mod_new = None
-                            stagnation_count = 0
-
-                            while (
-                                dyn_result4.is_success
-                                and (
-                                    not dyn_result4.is_stable
-                                    or (1.0 - z_mod_old / z_mod_new) > 0.025
+                            if r_shunt == -1.0:
+                                # Только X (реактивное сопротивление)
+                                begin_shunt = (
+                                    float(x_shunt_value)
+                                    if x_shunt_value
+                                    else -1.0
                                 )
-                                and iteration2 < max_iterations2
-                            ):
-                                # ИСПРАВЛЕНО: Проверка на застой - если значения не меняются
-                                if (
-                                    prev_z_mod_old is not None
-                                    and prev_z_mod_new is not None
-                                ):
-                                    if (
-                                        abs(z_mod_old - prev_z_mod_old) < 0.0001
-                                        and abs(z_mod_new - prev_z_mod_new) < 0.0001
-                                    ):
-                                        stagnation_count += 1
-                                        if stagnation_count >= 5:
-                                            logger.warning(
-                                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Обнаружен застой в уточнении границы (значения не меняются), прерываем цикл"
-                                            )
-                                            break
-                                    else:
-                                        stagnation_count = 0
-
-                                prev_z_mod_old = z_mod_old
-                                prev_z_mod_new = z_mod_new
-
-                                # ИСПРАВЛЕНО: Проверка на равенство значений (как в C# - если num21 == num20, то num22 = 0)
-                                if abs(z_mod_old - z_mod_new) < 0.0001:
-                                    logger.warning(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] z_mod_old и z_mod_new стали одинаковыми ({z_mod_old:.4f}), прерываем цикл уточнения"
-                                    )
-                                    break
-
-                                z_step = (
-                                    (z_mod_old - z_mod_new) * 0.5
-                                    if dyn_result4.is_stable
-                                    else (z_mod_new - z_mod_old) * 0.5
+                                end_shunt = (
+                                    begin_shunt  # Одно значение для обоих узлов
                                 )
-                                z_current = z_mod_new + z_step
-
-                                logger.debug(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение, итерация {iteration2 + 1}: z_step={z_step:.4f}, z_current={z_current:.4f}"
+                                logger.info(
+                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (только X): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
                                 )
-
-                                if r_shunt == -1.0:
-                                    rastr.change_rx_for_uost_calc(
-                                        x_id, z_current * math.sin(z_angle)
-                                    )
-                                else:
-                                    rastr.change_rx_for_uost_calc(
-                                        x_id,
-                                        z_current * math.sin(z_angle),
-                                        r_id,
-                                        z_current * math.cos(z_angle),
+                            else:
+                                # X и R (полное сопротивление)
+                                if r_id > 0:
+                                    r_shunt_value = rastr.get_val(
+                                        "DFWAutoActionScn", "Formula", r_id
                                     )
-
-                                dyn_result4 = rastr.run_dynamic(ems=True)
-
-                                if dyn_result4.is_stable:
-                                    z_mod_new = z_current
-                                else:
-                                    z_mod_old = z_current
-
-                                iteration2 += 1
-
-                                # Логирование каждые 10 итераций
-                                if iteration2 % 10 == 0:
                                     logger.info(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение, итерация {iteration2}: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}, устойчивость={dyn_result4.is_stable}, разница={abs(z_mod_old - z_mod_new):.4f}"
+                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение R шунта из RASTR после уточнения: r_shunt_value={r_shunt_value} (тип: {type(r_shunt_value)})"
                                     )
-
-                            if iteration2 >= max_iterations2:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Достигнуто максимальное количество итераций ({max_iterations2}) для уточнения границы"
-                                )
-
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Уточнение завершено: z_mod_old={z_mod_old:.4f}, z_mod_new={z_mod_new:.4f}, устойчивость={dyn_result4.is_stable}, итераций={iteration2}"
-                            )
-
-                            # ИСПРАВЛЕНО: Сохраняем финальное значение шунта в момент нахождения на границе устойчивости
-                            z_mod_final = z_mod_new
-
-                            # ДОБАВЛЕНО: Извлекаем значения r и x для обеих ветвей после уточнения границы
-                            begin_r = -1.0
-                            begin_x = -1.0
-                            end_r = -1.0
-                            end_x = -1.0
-                            try:
-                                # Получаем r и x для первой ветви (начало линии)
-                                begin_r = rastr.get_val("vetv", "r", branch1_id)
-                                begin_x = rastr.get_val("vetv", "x", branch1_id)
-                                # Получаем r и x для второй ветви (конец линии)
-                                end_r = rastr.get_val("vetv", "r", branch2_id)
-                                end_x = rastr.get_val("vetv", "x", branch2_id)
-                                logger.info(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии после уточнения: begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
-                                )
-                            except Exception as e:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии после уточнения: {e}"
-                                )
-
-                            # ИСПРАВЛЕНО: Извлекаем значение шунта из RASTR в момент нахождения на границе устойчивости
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение значения шунта КЗ после уточнения границы: x_id={x_id}, r_id={r_id}, r_shunt={r_shunt}, z_mod_final={z_mod_final:.6f}"
-                            )
-                            begin_shunt = -1.0
-                            end_shunt = -1.0
-                            try:
-                                if x_id > 0:
-                                    # Получаем значение X шунта из действия
-                                    x_shunt_value = rastr.get_val(
-                                        "DFWAutoActionScn", "Formula", x_id
+                                    x_val = (
+                                        float(x_shunt_value)
+                                        if x_shunt_value
+                                        else 0.0
+                                    )
+                                    r_val = (
+                                        float(r_shunt_value)
+                                        if r_shunt_value
+                                        else 0.0
                                     )
+                                    # Модуль комплексного сопротивления
+                                    z_mod_from_rastr = math.sqrt(
+                                        r_val**2 + x_val**2
+                                    )
+                                    begin_shunt = z_mod_from_rastr
+                                    end_shunt = z_mod_from_rastr
                                     logger.info(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение X шунта из RASTR после уточнения: x_shunt_value={x_shunt_value} (тип: {type(x_shunt_value)})"
+                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (X и R): x_val={x_val:.6f}, r_val={r_val:.6f}, z_mod_from_rastr={z_mod_from_rastr:.6f}, begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
                                     )
-                                    if r_shunt == -1.0:
-                                        # Только X (реактивное сопротивление)
-                                        begin_shunt = (
-                                            float(x_shunt_value)
-                                            if x_shunt_value
-                                            else -1.0
-                                        )
-                                        end_shunt = (
-                                            begin_shunt  # Одно значение для обоих узлов
-                                        )
-                                        logger.info(
-                                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (только X): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
-                                        )
-                                    else:
-                                        # X и R (полное сопротивление)
-                                        if r_id > 0:
-                                            r_shunt_value = rastr.get_val(
-                                                "DFWAutoActionScn", "Formula", r_id
-                                            )
-                                            logger.info(
-                                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено значение R шунта из RASTR после уточнения: r_shunt_value={r_shunt_value} (тип: {type(r_shunt_value)})"
-                                            )
-                                            x_val = (
-                                                float(x_shunt_value)
-                                                if x_shunt_value
-                                                else 0.0
-                                            )
-                                            r_val = (
-                                                float(r_shunt_value)
-                                                if r_shunt_value
-                                                else 0.0
-                                            )
-                                            # Модуль комплексного сопротивления
-                                            z_mod_from_rastr = math.sqrt(
-                                                r_val**2 + x_val**2
-                                            )
-                                            begin_shunt = z_mod_from_rastr
-                                            end_shunt = z_mod_from_rastr
-                                            logger.info(
-                                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (X и R): x_val={x_val:.6f}, r_val={r_val:.6f}, z_mod_from_rastr={z_mod_from_rastr:.6f}, begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
-                                            )
-                                        else:
-                                            begin_shunt = (
-                                                float(x_shunt_value)
-                                                if x_shunt_value
-                                                else -1.0
-                                            )
-                                            end_shunt = begin_shunt
-                                            logger.info(
-                                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (только X, r_id=0): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
-                                            )
                                 else:
-                                    logger.warning(
-                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] x_id={x_id}, не удалось извлечь значение шунта после уточнения (x_id <= 0)"
+                                    begin_shunt = (
+                                        float(x_shunt_value)
+                                        if x_shunt_value
+                                        else -1.0
                                     )
-                            except Exception as e:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить значение шунта из RASTR после уточнения: {e}"
-                                )
-                                logger.info(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Используем z_mod_final={z_mod_final:.6f} как fallback"
-                                )
-                                # Используем z_mod_final как резервное значение
-                                begin_shunt = z_mod_final
-                                end_shunt = z_mod_final
-
-                            # ИСПРАВЛЕНО: Если система все еще неустойчива после всех итераций, продолжаем расчет с текущими значениями
-                            if not dyn_result4.is_success:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет динамики не успешен после уточнения, продолжаем с distance=-1.0"
-                                )
-                            elif not dyn_result4.is_stable:
-                                logger.warning(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Система все еще неустойчива после уточнения, продолжаем расчет"
-                                )
-                    else:
-                        # Если не было уточнения границы (оба расчета были устойчивы или неустойчивы с самого начала)
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не было бинарного поиска или уточнения границы. Используем начальное значение шунта: z_mod={z_mod:.6f}"
-                        )
-                        begin_shunt = z_mod
-                        end_shunt = z_mod
-                        # Получаем текущие значения r и x для обеих ветвей
-                        try:
-                            begin_r = rastr.get_val("vetv", "r", branch1_id)
-                            begin_x = rastr.get_val("vetv", "x", branch1_id)
-                            end_r = rastr.get_val("vetv", "r", branch2_id)
-                            end_x = rastr.get_val("vetv", "x", branch2_id)
-                            logger.info(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии (без бинарного поиска): begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
-                            )
-                        except Exception as e:
+                                    end_shunt = begin_shunt
+                                    logger.info(
+                                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Шунт после уточнения (только X, r_id=0): begin_shunt={begin_shunt:.6f}, end_shunt={end_shunt:.6f}"
+                                    )
+                        else:
                             logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии: {e}"
+                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] x_id={x_id}, не удалось извлечь значение шунта после уточнения (x_id <= 0)"
                             )
-
-                    # Получение остаточных напряжений
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало получения остаточных напряжений: time_start={time_start:.6f}, ip={ip}, iq={iq}"
-                    )
-                    begin_uost = -1.0
-                    end_uost = -1.0
-
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Запуск финального динамического расчета для получения остаточных напряжений (ems=False, max_time={time_start + 0.02:.6f})"
-                    )
-                    dyn_result5 = rastr.run_dynamic(
-                        ems=False, max_time=time_start + 0.02
-                    )
-                    logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Финальный расчет завершен: успех={dyn_result5.is_success}, устойчивость={dyn_result5.is_stable}"
-                    )
-
-                    if dyn_result5.is_success and dyn_result5.is_stable:
-                        # ИСПРАВЛЕНО: Используем формат с пробелами и точное сравнение (как в C# строках 210-215)
-                        logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение точек из exit файла для узлов ip={ip} и iq={iq}"
-                        )
-                        points_ip = rastr.get_points_from_exit_file(
-                            "node", "vras", f"ny = {ip}"
-                        )
-                        points_iq = rastr.get_points_from_exit_file(
-                            "node", "vras", f"ny = {iq}"
+                    except Exception as e:
+                        logger.warning(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить значение шунта из RASTR после уточнения: {e}"
                         )
                         logger.info(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено точек для ip: {len(points_ip)}, для iq: {len(points_iq)}"
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Используем z_mod_final={z_mod_final:.6f} как fallback"
                         )
+                        # Используем z_mod_final как резервное значение
+                        begin_shunt = z_mod_final
+                        end_shunt = z_mod_final
 
-                        # ИСПРАВЛЕНО: Точное сравнение как в C# (k.X == time_start)
-                        for point in points_ip:
-                            if point.x == time_start:
-                                begin_uost = point.y
-                                logger.info(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено остаточное напряжение для узла ip={ip}: begin_uost={begin_uost:.2f} (время={point.x:.6f})"
-                                )
-                                break
-
-                        for point in points_iq:
-                            if point.x == time_start:
-                                end_uost = point.y
-                                logger.info(
-                                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено остаточное напряжение для узла iq={iq}: end_uost={end_uost:.2f} (время={point.x:.6f})"
-                                )
-                                break
-
-                        if begin_uost == -1.0:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не найдено остаточное напряжение для узла ip={ip} в момент времени {time_start:.6f}"
-                            )
-                        if end_uost == -1.0:
-                            logger.warning(
-                                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не найдено остаточное напряжение для узла iq={iq} в момент времени {time_start:.6f}"
-                            )
-                    else:
+                    # ИСПРАВЛЕНО: Если система все еще неустойчива после всех итераций, продолжаем расчет с текущими значениями
+                    if not dyn_result4.is_success:
                         logger.warning(
-                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Финальный расчет не успешен или неустойчив, остаточные напряжения не получены"
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет динамики не успешен после уточнения, продолжаем с distance=-1.0"
                         )
-
-                    # Сбор контролируемых величин
-                    values_list = []
-                    for kpr in self._kprs:
-                        values_list.append(
-                            Values(
-                                id=kpr.id,
-                                name=kpr.name,
-                                value=rastr.get_val(kpr.table, kpr.col, kpr.selection),
-                            )
+                    elif not dyn_result4.is_stable:
+                        logger.warning(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Система все еще неустойчива после уточнения, продолжаем расчет"
                         )
-
+            else:
+                # Если не было уточнения границы (оба расчета были устойчивы или неустойчивы с самого начала)
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не было бинарного поиска или уточнения границы. Используем начальное значение шунта: z_mod={z_mod:.6f}"
+                )
+                begin_shunt = z_mod
+                end_shunt = z_mod
+                # Получаем текущие значения r и x для обеих ветвей
+                try:
+                    begin_r = rastr.get_val("vetv", "r", branch1_id)
+                    begin_x = rastr.get_val("vetv", "x", branch1_id)
+                    end_r = rastr.get_val("vetv", "r", branch2_id)
+                    end_x = rastr.get_val("vetv", "x", branch2_id)
                     logger.info(
-                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет завершен: distance={distance:.2f}, begin_uost={begin_uost:.2f}, end_uost={end_uost:.2f}, begin_shunt={begin_shunt:.4f}, end_shunt={end_shunt:.4f}"
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Параметры линии (без бинарного поиска): begin_r={begin_r:.6f}, begin_x={begin_x:.6f}, end_r={end_r:.6f}, end_x={end_x:.6f}"
                     )
-
-                    events_list.append(
-                        UostEvents(
-                            name=Path(scn.name).stem,
-                            begin_node=ip,
-                            end_node=iq,
-                            np=np,
-                            distance=distance,
-                            begin_uost=begin_uost,
-                            end_uost=end_uost,
-                            begin_shunt=begin_shunt,
-                            end_shunt=end_shunt,
-                            begin_r=begin_r,
-                            begin_x=begin_x,
-                            end_r=end_r,
-                            end_x=end_x,
-                            values=values_list,
-                        )
+                except Exception as e:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не удалось получить параметры линии: {e}"
                     )
 
-                    progress += 1
-                    if self._progress_callback:
-                        self._progress_callback(progress)
+            # Получение остаточных напряжений
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Начало получения остаточных напряжений: time_start={time_start:.6f}, ip={ip}, iq={iq}"
+            )
+            begin_uost = -1.0
+            end_uost = -1.0
 
-                    # ИСПРАВЛЕНО: Увеличиваем счетчик для следующего сценария (как num2 в C#)
-                    new_node_counter += 1
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Запуск финального динамического расчета для получения остаточных напряжений (ems=False, max_time={time_start + 0.02:.6f})"
+            )
+            dyn_result5 = rastr.run_dynamic(
+                ems=False, max_time=time_start + 0.02
+            )
+            logger.info(
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Финальный расчет завершен: успех={dyn_result5.is_success}, устойчивость={dyn_result5.is_stable}"
+            )
 
+            if dyn_result5.is_success and dyn_result5.is_stable:
+                # ИСПРАВЛЕНО: Используем формат с пробелами и точное сравнение (как в C# строках 210-215)
                 logger.info(
-                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}] Обработано событий: {len(events_list)}"
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Извлечение точек из exit файла для узлов ip={ip} и iq={iq}"
+                )
+                points_ip = rastr.get_points_from_exit_file(
+                    "node", "vras", f"ny = {ip}"
+                )
+                points_iq = rastr.get_points_from_exit_file(
+                    "node", "vras", f"ny = {iq}"
+                )
+                logger.info(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Получено точек для ip: {len(points_ip)}, для iq: {len(points_iq)}"
                 )
 
-                uost_shems_list.append(
-                    UostShems(
-                        sheme_name=vrn.name, is_stable=is_stable, events=events_list
+                # ИСПРАВЛЕНО: Точное сравнение как в C# (k.X == time_start)
+                for point in points_ip:
+                    if point.x == time_start:
+                        begin_uost = point.y
+                        logger.info(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено остаточное напряжение для узла ip={ip}: begin_uost={begin_uost:.2f} (время={point.x:.6f})"
+                        )
+                        break
+
+                for point in points_iq:
+                    if point.x == time_start:
+                        end_uost = point.y
+                        logger.info(
+                            f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Найдено остаточное напряжение для узла iq={iq}: end_uost={end_uost:.2f} (время={point.x:.6f})"
+                        )
+                        break
+
+                if begin_uost == -1.0:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не найдено остаточное напряжение для узла ip={ip} в момент времени {time_start:.6f}"
+                    )
+                if end_uost == -1.0:
+                    logger.warning(
+                        f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Не найдено остаточное напряжение для узла iq={iq} в момент времени {time_start:.6f}"
+                    )
+            else:
+                logger.warning(
+                    f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Финальный расчет не успешен или неустойчив, остаточные напряжения не получены"
+                )
+
+            # Сбор контролируемых величин
+            values_list = []
+            for kpr in self._kprs:
+                values_list.append(
+                    Values(
+                        id=kpr.id,
+                        name=kpr.name,
+                        value=rastr.get_val(kpr.table, kpr.col, kpr.selection),
                     )
                 )
 
             logger.info(
-                f"[РЕЖИМ {rgm_idx + 1}] Обработано вариантов: {len(uost_shems_list)}"
+                f"[РЕЖИМ {rgm_idx + 1}, ВАРИАНТ {vrn_idx + 1}, СЦЕНАРИЙ {scn_idx + 1}] Расчет завершен: distance={distance:.2f}, begin_uost={begin_uost:.2f}, end_uost={end_uost:.2f}, begin_shunt={begin_shunt:.4f}, end_shunt={end_shunt:.4f}"
             )
 
-            results.append(
-                UostResults(rg_name=Path(rgm.name).stem, uost_shems=uost_shems_list)
+            return True, UostEvents(
+                name=Path(scn.name).stem,
+                begin_node=ip,
+                end_node=iq,
+                np=np,
+                distance=distance,
+                begin_uost=begin_uost,
+                end_uost=end_uost,
+                begin_shunt=begin_shunt,
+                end_shunt=end_shunt,
+                begin_r=begin_r,
+                begin_x=begin_x,
+                end_r=end_r,
+                end_x=end_x,
+                values=values_list,
+                probes=probes,
             )
-
-        logger.info(
-            f"Расчет остаточного напряжения завершен. Всего результатов: {len(results)}"
-        )
-        return results
@@ -7,6 +7,7 @@ import locale
 import os
 import platform
 import subprocess
+import threading
 from pathlib import Path
 from typing import List, Optional, Callable
 
@@ -30,6 +31,7 @@ from calculations import (
     DynStabilityCalc,
     MdpStabilityCalc,
     UostStabilityCalc,
+    CrtWarmStart,
 )
 from excel_operations import ExcelOperations
 from utils.exceptions import UncorrectFileException, RastrUnavailableException
@@ -39,9 +41,18 @@ from utils.logger import logger
 
 # Условный импорт RastrOperations для кроссплатформенности
 try:
-    from rastr_operations import RastrOperations, RASTR_AVAILABLE
+    from rastr_operations import (
+        RastrOperations,
+        RastrSessionPool,
+        SnapshotStore,
+        template_index,
+        RASTR_AVAILABLE,
+    )
 except ImportError:
     RastrOperations = None
+    RastrSessionPool = None
+    SnapshotStore = None
+    template_index = None
     RASTR_AVAILABLE = False
 
 
@@ -80,12 +91,18 @@ class DataInfo:
         self.base_angle = config.get("calculations.base_angle", 1.471)
         self.crt_time_precision = config.get("calculations.crt_time_precision", 0.02)
         self.crt_time_max = config.get("calculations.crt_time_max", 1.0)
+        self.cct_screening = config.get("calculations.cct_screening", False)
+        self.cct_screening_margin = config.get("calculations.cct_screening_margin", 0.3)
+        self.shunt_thevenin_start = config.get("calculations.shunt_thevenin_start", False)
         self.selected_sch = config.get("calculations.default_selected_sch", 0)
         self.dyn_no_pa = config.get("settings.dyn_no_pa", True)
         self.dyn_with_pa = config.get("settings.dyn_with_pa", False)
         self.save_grf = config.get("settings.save_grf", False)
         self.use_lpn = config.get("settings.use_lpn", False)
         self.lpns = config.get("settings.lpns", "")
+        self.parallel_workers = config.get("performance.parallel_workers", 1)
+        self.crt_speculative = config.get("performance.crt_speculative", False)
+        self.crt_warm_start = config.get("performance.crt_warm_start", False)
 
         # Результаты
         self.shunt_results: List[ShuntResults] = []
@@ -94,6 +111,12 @@ class DataInfo:
         self.mdp_results: List[MdpResults] = []
         self.uost_results: List[UostResults] = []
 
+        # Хранилище подготовленных режимов, общее для всех видов расчетов
+        self.snapshot_store = SnapshotStore() if SnapshotStore else None
+        # Индекс шаблонов строится в фоне, чтобы не задерживать запуск
+        if template_index is not None:
+            threading.Thread(target=template_index.warmup, daemon=True).start()
+
         # Прогресс
         self.progress = 0
         self.max_progress = 1
@@ -252,6 +275,26 @@ class DataInfo:
             logger.warning(f"В файле сечений {file_path} не найдено ни одного сечения")
             return
 
+        try:
+            # Чтение колонок таблицы сечений целиком
+            names = rastr.get_column("sechen", "name", sections).tolist()
+            nums = rastr.get_column("sechen", "ns", sections).tolist()
+            controls = rastr.get_column("sechen", "sta", sections).tolist()
+        except Exception as e:
+            logger.warning(
+                f"Не удалось прочитать колонки таблицы сечений из {file_path}, "
+                f"чтение по строкам: {e}"
+            )
+            self._read_sechen_rows(rastr, sections)
+            return
+
+        for section_id, name, num, control in zip(sections, names, nums, controls):
+            self.sch_inf.append(
+                SchInfo(id=section_id, name=name or "", num=num or 0, control=control or 0)
+            )
+
+    def _read_sechen_rows(self, rastr, sections: List[int]):
+        """Чтение сечений по строкам (ошибочная строка пропускается)"""
         for section_id in sections:
             try:
                 # Безопасное получение значений с обработкой ошибок
@@ -284,15 +327,13 @@ class DataInfo:
         rastr = RastrOperations()
         rastr.load(file_path)
         variants = rastr.selection("var_mer")
+        names = rastr.get_column("var_mer", "name", variants).tolist()
+        nums = rastr.get_column("var_mer", "Num", variants).tolist()
+        deactive = rastr.get_column("var_mer", "sta", variants).tolist()
 
-        for variant_id in variants:
+        for variant_id, name, num, sta in zip(variants, names, nums, deactive):
             self.vrn_inf.append(
-                VrnInfo(
-                    id=variant_id,
-                    name=rastr.get_val("var_mer", "name", variant_id),
-                    num=rastr.get_val("var_mer", "Num", variant_id),
-                    deactive=rastr.get_val("var_mer", "sta", variant_id),
-                )
+                VrnInfo(id=variant_id, name=name, num=num, deactive=sta)
             )
 
     def _handle_grf_file(self, file_path: str):
@@ -309,16 +350,20 @@ class DataInfo:
         rastr = RastrOperations()
         rastr.load(file_path)
         ots_vals = rastr.selection("ots_val")
+        columns = {
+            col: rastr.get_column("ots_val", col, ots_vals).tolist()
+            for col in ("Num", "name", "tabl", "vibork", "formula")
+        }
 
-        for ots_id in ots_vals:
+        for i, ots_id in enumerate(ots_vals):
             self.kpr_inf.append(
                 KprInfo(
                     id=ots_id,
-                    num=rastr.get_val("ots_val", "Num", ots_id),
-                    name=rastr.get_val("ots_val", "name", ots_id),
-                    table=rastr.get_val("ots_val", "tabl", ots_id),
-                    selection=rastr.get_val("ots_val", "vibork", ots_id),
-                    col=rastr.get_val("ots_val", "formula", ots_id),
+                    num=columns["Num"][i],
+                    name=columns["name"][i],
+                    table=columns["tabl"][i],
+                    selection=columns["vibork"][i],
+                    col=columns["formula"][i],
                 )
             )
 
@@ -417,6 +462,17 @@ class DataInfo:
         if selected_scn and selected_scn in self.scns_info:
             self.scns_info.remove(selected_scn)
 
+    @staticmethod
+    def _session_pool():
+        """
+        Пул сессий RASTR для одного расчета
+
+        Расчет выполняется в отдельном потоке интерфейса, а COM-объекты RASTR
+        используются только в создавшем их потоке, поэтому пул создается
+        в потоке расчета и не переходит между расчетами.
+        """
+        return RastrSessionPool() if RastrSessionPool else None
+
     def calc_shunt_kz(self, progress_callback: Optional[Callable[[int], None]] = None):
         """Расчет шунтов КЗ"""
         if self.is_active:
@@ -436,6 +492,10 @@ class DataInfo:
                 self.use_type_val_u,
                 self.calc_one_phase,
                 self.calc_two_phase,
+                session_pool=self._session_pool(),
+                snapshot_store=self.snapshot_store,
+                parallel_workers=self.parallel_workers,
+                thevenin_start=self.shunt_thevenin_start,
             )
 
             self.max_progress = calc.max
@@ -469,6 +529,13 @@ class DataInfo:
                 self.rems.name,
                 self.crt_time_precision,
                 self.crt_time_max,
+                session_pool=self._session_pool(),
+                snapshot_store=self.snapshot_store,
+                parallel_workers=self.parallel_workers,
+                speculative=self.crt_speculative,
+                warm_start=CrtWarmStart() if self.crt_warm_start else None,
+                screening=self.cct_screening,
+                screening_margin=self.cct_screening_margin,
             )
 
             self.max_progress = calc.max
@@ -513,6 +580,9 @@ class DataInfo:
                 self.dyn_no_pa,
                 self.dyn_with_pa,
                 self.use_lpn,
+                session_pool=self._session_pool(),
+                snapshot_store=self.snapshot_store,
+                parallel_workers=self.parallel_workers,
             )
 
             self.max_progress = calc.max
@@ -580,6 +650,9 @@ class DataInfo:
                 self.dyn_no_pa,
                 self.dyn_with_pa,
                 self.use_lpn,
+                session_pool=self._session_pool(),
+                snapshot_store=self.snapshot_store,
+                parallel_workers=self.parallel_workers,
             )
 
             self.max_progress = calc.max
@@ -632,6 +705,9 @@ class DataInfo:
                 self.vrn_inf,
                 self.rems.name,
                 self.kpr_inf,
+                session_pool=self._session_pool(),
+                snapshot_store=self.snapshot_store,
+                parallel_workers=self.parallel_workers,
             )
 
             self.max_progress = calc.max
@@ -14,7 +14,8 @@ class ShuntKZ:
     
     def __init__(self, node: int = 0, r1: float = -1.0, x1: float = -1.0,
                  u1: float = -1.0, r2: float = -1.0, x2: float = -1.0,
-                 u2: float = -1.0):
+                 u2: float = -1.0, calc_time: float = 0.0,
+                 iterations1: int = 0, iterations2: int = 0):
         self.node = node
         self.r1 = r1
         self.x1 = x1
@@ -22,6 +23,9 @@ class ShuntKZ:
         self.r2 = r2
         self.x2 = x2
         self.u2 = u2
+        self.calc_time = calc_time  # Время расчета узла, с
+        self.iterations1 = iterations1  # Расчетов динамики для однофазного КЗ
+        self.iterations2 = iterations2  # Расчетов динамики для двухфазного КЗ
 
 
 class Shems:
@@ -116,7 +120,8 @@ class MdpEvents:
                  no_pa_mdp: float = -1.0,
                  with_pa_sechen: Optional[List[Values]] = None,
                  with_pa_kpr: Optional[List[Values]] = None,
-                 with_pa_mdp: float = -1.0):
+                 with_pa_mdp: float = -1.0,
+                 no_pa_probes: int = 0, with_pa_probes: int = 0, with_pa_saved: int = 0):
         self.name = name
         self.no_pa_sechen = no_pa_sechen or []
         self.no_pa_kpr = no_pa_kpr or []
@@ -124,6 +129,9 @@ class MdpEvents:
         self.with_pa_sechen = with_pa_sechen or []
         self.with_pa_kpr = with_pa_kpr or []
         self.with_pa_mdp = with_pa_mdp
+        self.no_pa_probes = no_pa_probes  # Расчетов динамики при поиске МДП без ПА
+        self.with_pa_probes = with_pa_probes  # Расчетов динамики при поиске МДП с ПА
+        self.with_pa_saved = with_pa_saved  # Сэкономлено расчетов с ПА за счет предела без ПА (оценка)
 
 
 class MdpShems:
@@ -161,7 +169,7 @@ class UostEvents:
                  begin_shunt: float = -1.0, end_shunt: float = -1.0,
                  begin_r: float = -1.0, begin_x: float = -1.0,
                  end_r: float = -1.0, end_x: float = -1.0,
-                 values: Optional[List[Values]] = None):
+                 values: Optional[List[Values]] = None, probes: int = 0):
         self.name = name
         self.begin_node = begin_node
         self.end_node = end_node
@@ -176,6 +184,7 @@ class UostEvents:
         self.end_r = end_r  # Сопротивление конца линии
         self.end_x = end_x  # Реактивное сопротивление конца линии
         self.values = values or []
+        self.probes = probes  # Расчетов динамики при поиске места КЗ на границе устойчивости
 
 
 class UostShems:
@@ -2,14 +2,19 @@
 Модель результата расчета шунта КЗ
 """
 
+from typing import List, Optional, Tuple
+
 
 class ShuntKZResult:
     """Результат расчета шунта короткого замыкания"""
     
-    def __init__(self, r: float = -1.0, x: float = 0.0, u: float = 0.0):
+    def __init__(self, r: float = -1.0, x: float = 0.0, u: float = 0.0,
+                 iterations: int = 0, history: Optional[List[Tuple[float, float]]] = None):
         self.r = r
         self.x = x
         self.u = u
+        self.iterations = iterations  # Количество расчетов динамики
+        self.history = history or []  # Пары (модуль сопротивления, Ом; напряжение, кВ)
     
     def __str__(self) -> str:
         return f"R={self.r:.3f} Ом, X={self.x:.3f} Ом, U={self.u:.1f} кВ"
@@ -9,12 +9,26 @@ except ImportError:
     RASTR_AVAILABLE = False
 
 from .rastr_operations import RastrOperations
+from .session_pool import RastrSessionPool
+from .snapshot_store import SnapshotStore
+from .template_index import TemplateIndex, template_index
+from .variant_cache import VariantCache, variant_cache
+from .weighting_trajectory import WeightingTrajectory
+from .split_line import SplitLine
 from .dynamic_result import DynamicResult
 from .point import Point
 from .shunt_kz_result import ShuntKZResult
 
 __all__ = [
     'RastrOperations',
+    'RastrSessionPool',
+    'SnapshotStore',
+    'TemplateIndex',
+    'template_index',
+    'VariantCache',
+    'variant_cache',
+    'WeightingTrajectory',
+    'SplitLine',
     'DynamicResult',
     'Point',
     'ShuntKZResult',
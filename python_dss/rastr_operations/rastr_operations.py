@@ -3,13 +3,19 @@
 """
 
 import os
+import re
 import math
 import locale
 from pathlib import Path
-from typing import List, Optional, Union, Any
+from typing import List, Optional, Sequence, Tuple, Union, Any
+
+import numpy as np
+
 from .dynamic_result import DynamicResult
 from .point import Point
 from .shunt_kz_result import ShuntKZResult
+from .template_index import template_index
+from .weighting_trajectory import WeightingTrajectory
 
 try:
     import win32com.client
@@ -27,8 +33,80 @@ class RastrOperations:
     RASTR_PROGID = "Astra.Rastr"
     # GUID для RASTR COM объекта (fallback)
     RASTR_CLSID = "{EFC5E4AD-A3DD-11D3-B73F-00500454CF3F}"
+    # Расширения файлов, загрузка которых заменяет расчетный режим
+    REGIME_EXTENSIONS = (".rst", ".rg2")
+    # Таблицы сценария, изменение которых не затрагивает подготовленный режим
+    SCENARIO_TABLES = ("DFWAutoActionScn", "DFWAutoLogicScn", "var_mer")
+
+    # Ключевые колонки таблиц для прямого поиска строки без SetSel/FindNextSel
+    PRIMARY_KEYS = {
+        "node": ("ny",),
+        "vetv": ("ip", "iq", "np"),
+    }
+    # Условие выборки вида "колонка = целое число"
+    _KEY_CONDITION = re.compile(r"^\s*(\w+)\s*=\s*(-?\d+)\s*$")
+
+    # Способы чтения значения колонки и исключения, означающие "способ не поддерживается"
+    _GETTERS = (
+        (lambda col, idx: col.Z(idx), (AttributeError, TypeError)),
+        (lambda col, idx: col[idx], (AttributeError, TypeError, IndexError)),
+        (lambda col, idx: col.GetZ(idx), (AttributeError,)),
+        (lambda col, idx: col.get_Z(idx), (AttributeError,)),
+    )
+    # Способы записи значения колонки
+    _SETTERS = (
+        (lambda col, idx, value: col.SetZ(idx, value), (AttributeError,)),
+        (lambda col, idx, value: col.__setitem__(idx, value), (AttributeError, TypeError, IndexError)),
+        (lambda col, idx, value: col.set_Z(idx, value), (AttributeError,)),
+    )
+
+    def __init__(self, com_object: Any = None):
+        """
+        Инициализация сессии RASTR
+
+        Args:
+            com_object: Готовый COM-объект RASTR (или его имитация в тестах).
+                Если не задан, объект создается через win32com.
+        """
+        # Шаблоны, загруженные в сессию: расширение -> путь к шаблону
+        self._loaded_templates = {}
+        # Шаблоны, таблицы которых не изменялись после NewFile
+        self._clean_templates = set()
+        # Количество пропущенных повторных загрузок шаблонов
+        self.template_reloads_skipped = 0
+        # Ключ подготовленного режима, в котором находится сессия (см. SnapshotStore)
+        self._state_key = None
+        # Поддержка ReadSafeArray/WriteSafeArray (None - еще не проверялась)
+        self._safe_arrays = None
+        # Кэш объектов таблиц/колонок и найденных способов доступа к значениям
+        self._tables = {}
+        self._cols = {}
+        self._getters = {}
+        self._setters = {}
+        # Количество обращений к COM, сэкономленных кэшем объектов
+        self.com_calls_saved = 0
+        # Количество расчетов динамики при последнем поиске критического времени
+        self.crt_runs = 0
+        # Поколения данных: общее (загрузка, расчет режима, динамика) и по таблицам (запись)
+        self._generation = 0
+        self._table_generations = {}
+        # Поколения структуры: загрузка файлов, добавление строк, запись ключевых колонок
+        self._structure_generation = 0
+        self._table_structures = {}
+        # Кэш выборок: (таблица, выборка) -> (поколения, строки, выборка полная)
+        self._sel_cache = {}
+        # Индексы по ключевым колонкам: таблица -> (поколения, ключ -> строки)
+        self._key_index = {}
+        # Классификация действий сценария для поиска критического времени
+        # (поколения, КЗ в узлах, отключения ветвей, исходные TimeStart и DT)
+        self._crt_actions = None
+        # Исходное время расчета Tras на время поиска критического времени
+        self._crt_tras = None
+
+        if com_object is not None:
+            self._rastr = com_object
+            return
 
-    def __init__(self):
         if not RASTR_AVAILABLE:
             raise ImportError(
                 "pywin32 не установлен. RASTR операции недоступны на этой платформе."
@@ -59,6 +137,221 @@ class RastrOperations:
         """Очистка ресурсов"""
         self._rastr = None
 
+    @property
+    def state_key(self) -> Optional[str]:
+        """Ключ подготовленного режима, если режим сессии не изменялся после подготовки"""
+        return self._state_key
+
+    @state_key.setter
+    def state_key(self, value: Optional[str]):
+        self._state_key = value
+
+    def _invalidate_state(self, table_name: Optional[str] = None):
+        """Отметка изменения режима (изменение таблиц сценария режим не затрагивает)"""
+        if table_name not in self.SCENARIO_TABLES:
+            self._state_key = None
+        self._touch(table_name)
+
+    def _clear_handles(self):
+        """Сброс кэша объектов таблиц и колонок (после NewFile/Load)"""
+        self._tables.clear()
+        self._cols.clear()
+        self._getters.clear()
+        self._setters.clear()
+        self._sel_cache.clear()
+        self._key_index.clear()
+        self._structure_generation += 1
+        self._touch()
+
+    def _touch(self, table_name: Optional[str] = None, structure: bool = False):
+        """
+        Отметка изменения данных таблицы (или всех таблиц) для кэша выборок
+
+        Args:
+            table_name: Имя таблицы (None - изменились все таблицы)
+            structure: Изменился состав строк или ключевые колонки таблицы
+        """
+        if table_name is None:
+            self._generation += 1
+            return
+        self._table_generations[table_name] = self._table_generations.get(table_name, 0) + 1
+        if structure:
+            self._table_structures[table_name] = self._table_structures.get(table_name, 0) + 1
+
+    def _is_key_column(self, table_name: str, col_name: str) -> bool:
+        return col_name in self.PRIMARY_KEYS.get(table_name, ())
+
+    def _data_generation(self, table_name: str):
+        return self._generation, self._table_generations.get(table_name, 0)
+
+    def _parse_key_selection(self, table_name: str, selection: str) -> Optional[tuple]:
+        """Значение первичного ключа, если выборка задана только по ключевым колонкам"""
+        key_cols = self.PRIMARY_KEYS.get(table_name)
+        if not key_cols or not selection:
+            return None
+        values = {}
+        for part in selection.split("&"):
+            match = self._KEY_CONDITION.match(part)
+            if not match:
+                return None
+            values[match.group(1)] = int(match.group(2))
+        if set(values) != set(key_cols):
+            return None
+        return tuple(values[col] for col in key_cols)
+
+    def _key_rows(self, table_name: str, key: tuple) -> List[int]:
+        """Строки с заданным первичным ключом (индекс строится одним чтением колонок)"""
+        generation = (self._structure_generation, self._table_structures.get(table_name, 0))
+        cached = self._key_index.get(table_name)
+        if cached is not None and cached[0] == generation:
+            self.com_calls_saved += 2
+            return cached[1].get(key, [])
+
+        columns = [self.get_column(table_name, col).tolist() for col in self.PRIMARY_KEYS[table_name]]
+        index = {}
+        for row, values in enumerate(zip(*columns)):
+            index.setdefault(tuple(int(v) for v in values), []).append(row)
+        self._key_index[table_name] = (generation, index)
+        return index.get(key, [])
+
+    def find_row(self, table_name: str, *key: int) -> int:
+        """
+        Поиск строки по первичному ключу (ny для node, ip/iq/np для vetv)
+
+        Returns:
+            Индекс строки или -1, если строка не найдена
+        """
+        rows = self._key_rows(table_name, tuple(int(v) for v in key))
+        return rows[0] if rows else -1
+
+    def _table(self, table_name: str) -> Any:
+        """Объект таблицы RASTR (кэшируется до следующей загрузки)"""
+        table = self._tables.get(table_name)
+        if table is None:
+            table = self._rastr.Tables.Item(table_name)
+            self._tables[table_name] = table
+        else:
+            self.com_calls_saved += 1
+        return table
+
+    def _col(self, table_name: str, col_name: str) -> Any:
+        """Объект колонки RASTR (кэшируется до следующей загрузки)"""
+        key = (table_name, col_name)
+        col = self._cols.get(key)
+        if col is None:
+            col = self._table(table_name).Cols.Item(col_name)
+            self._cols[key] = col
+        else:
+            # Сэкономлены Tables.Item и Cols.Item
+            self.com_calls_saved += 2
+        return col
+
+    def _table_size(self, table_name: str) -> int:
+        """Количество строк таблицы"""
+        table_size = self._table(table_name).Size
+        if not isinstance(table_size, int):
+            try:
+                table_size = int(table_size)
+            except (ValueError, TypeError):
+                table_size = 0
+        return table_size
+
+    def _find_first(self, table_name: str, selection: str) -> int:
+        """Индекс первой строки выборки или -1"""
+        key = self._parse_key_selection(table_name, selection)
+        if key is not None:
+            rows = self._key_rows(table_name, key)
+            return rows[0] if rows else -1
+
+        generation = self._data_generation(table_name)
+        cached = self._sel_cache.get((table_name, selection))
+        if cached is not None and cached[0] == generation:
+            self.com_calls_saved += 2
+            return cached[1][0] if cached[1] else -1
+
+        table = self._table(table_name)
+        table.SetSel(selection)
+        idx = table.FindNextSel(-1)
+        # ИСПРАВЛЕНО: Преобразуем idx в int, если это строка
+        if not isinstance(idx, int) and idx is not None:
+            try:
+                idx = int(idx)
+            except (ValueError, TypeError):
+                idx = -1
+        self._sel_cache[(table_name, selection)] = (
+            generation, [idx] if idx != -1 else [], idx == -1
+        )
+        return idx
+
+    def _read(self, table_name: str, col_name: str, idx: int) -> Any:
+        """Чтение значения способом, найденным для колонки при первом обращении"""
+        key = (table_name, col_name)
+        col = self._col(table_name, col_name)
+        getter = self._getters.get(key)
+        if getter is not None:
+            return getter(col, idx)
+
+        for getter, unsupported in self._GETTERS:
+            try:
+                value = getter(col, idx)
+            except unsupported:
+                continue
+            self._getters[key] = getter
+            return value
+        raise AttributeError(f"Не удалось получить значение для колонки {col_name}[{idx}]")
+
+    def _write(self, table_name: str, col_name: str, idx: int, value: Any):
+        """Запись значения способом, найденным для колонки при первом обращении"""
+        key = (table_name, col_name)
+        col = self._col(table_name, col_name)
+        self._touch(table_name, self._is_key_column(table_name, col_name))
+        setter = self._setters.get(key)
+        if setter is not None:
+            setter(col, idx, value)
+            return
+
+        for setter, unsupported in self._SETTERS:
+            try:
+                setter(col, idx, value)
+            except unsupported:
+                continue
+            self._setters[key] = setter
+            return
+        raise AttributeError(
+            f"Не удалось установить значение для колонки {col_name}[{idx}] = {value}"
+        )
+
+    def _new_file(self, extension: str, shabl: str):
+        """Очистка таблиц шаблона с учетом загруженных шаблонов сессии"""
+        self._rastr.NewFile(shabl)
+        self._clear_handles()
+        self._loaded_templates[extension] = shabl
+        if extension in self.REGIME_EXTENSIONS:
+            self._invalidate_state()
+            self._clean_templates.clear()
+        self._clean_templates.add(extension)
+
+    def _dynamics_done(self):
+        """Отметка выполненного расчета динамики (таблицы шаблона .dfw заполнены)"""
+        self._clean_templates.discard(".dfw")
+        self._touch()
+
+    def reset(self):
+        """
+        Сброс сессии к исходному состоянию перед выдачей следующей задаче
+
+        Подготовленный режим, не изменявшийся после подготовки, сохраняется,
+        чтобы следующая задача с той же парой (режим, вариант) не загружала его заново.
+        """
+        keep_regime = self._state_key is not None
+        for extension, shabl in list(self._loaded_templates.items()):
+            if keep_regime and extension in self.REGIME_EXTENSIONS:
+                continue
+            self._rastr.NewFile(shabl)
+            del self._loaded_templates[extension]
+            self._clean_templates.add(extension)
+        self._clear_handles()
+
     @staticmethod
     def find_template_path_with_extension(extension: str) -> Optional[str]:
         """Поиск шаблона по расширению"""
@@ -68,16 +361,16 @@ class RastrOperations:
         # Получаем путь к директории шаблонов из конфигурации
         template_dir = config.get_path("paths.rastr_template_dir")
 
-        if not template_dir.exists():
+        templates = template_index.templates(template_dir)
+        if templates is None:
             logger.error(f"Директория шаблонов не найдена: {template_dir}")
             logger.error(f"Проверьте настройку paths.rastr_template_dir в конфигурации")
             return None
 
         # Ищем шаблон с нужным расширением
-        for file in template_dir.glob(f"*{extension}"):
-            if file.stem != "базовый режим мт":
-                logger.debug(f"Найден шаблон: {file}")
-                return str(file)
+        file = templates.get(extension.lower())
+        if file:
+            return file
 
         logger.warning(f"Шаблон для расширения {extension} не найден в {template_dir}")
         return None
@@ -99,9 +392,10 @@ class RastrOperations:
 
         shabl = self.find_template_path_with_extension(extension)
         if shabl:
-            self._rastr.NewFile(shabl)
+            self._new_file(extension, shabl)
             # RG_REPL = 0 (замена)
             self._rastr.Load(0, str(file_path), shabl)
+            self._clean_templates.discard(extension)
         else:
             # Более подробное сообщение об ошибке
             template_dir = config.get_path("paths.rastr_template_dir")
@@ -120,7 +414,7 @@ class RastrOperations:
 
         shabl = self.find_template_path_with_extension(extension)
         if shabl:
-            self._rastr.NewFile(shabl)
+            self._new_file(extension, shabl)
         else:
             template_dir = config.get_path("paths.rastr_template_dir")
             error_msg = (
@@ -133,6 +427,13 @@ class RastrOperations:
             )
             raise FileNotFoundError(error_msg)
 
+    def ensure_template(self, extension: str):
+        """Загрузка шаблона, если его таблицы изменялись после последней загрузки"""
+        if extension in self._clean_templates:
+            self.template_reloads_skipped += 1
+            return
+        self.load_template(extension)
+
     def save(self, file: str):
         """Сохранение файла"""
         from utils.config import config
@@ -161,6 +462,11 @@ class RastrOperations:
         shabl = self.find_template_path_with_extension(extension)
         if shabl:
             self._rastr.Load(1, file, shabl)
+            self._clear_handles()
+            self._loaded_templates.setdefault(extension, shabl)
+            self._clean_templates.discard(extension)
+            if extension in self.REGIME_EXTENSIONS:
+                self._invalidate_state()
         else:
             template_dir = config.get_path("paths.rastr_template_dir")
             error_msg = (
@@ -180,22 +486,21 @@ class RastrOperations:
         voltage: Optional[float] = None,
     ) -> bool:
         """Расчет установившегося режима"""
-        table = self._rastr.Tables.Item("com_regim")
-        col_it_max = table.Cols.Item("it_max")
-        col_dv_min = table.Cols.Item("dv_min")
-
         if iterations is not None:
-            col_it_max.SetZ(0, iterations)
+            self._col("com_regim", "it_max").SetZ(0, iterations)
         if voltage is not None:
-            col_dv_min.SetZ(0, voltage)
+            self._col("com_regim", "dv_min").SetZ(0, voltage)
 
+        self._invalidate_state()
         # AST_OK = 0
         return self._rastr.rgm(param) == 0
 
     def add_table_row(self, table_name: str) -> int:
         """Добавление строки в таблицу"""
-        table = self._rastr.Tables.Item(table_name)
+        table = self._table(table_name)
         table.AddRow()
+        self._invalidate_state(table_name)
+        self._touch(table_name, structure=True)
         table_size = table.Size
         # ИСПРАВЛЕНО: Преобразуем table.Size в int, если это строка
         if not isinstance(table_size, int):
@@ -210,8 +515,14 @@ class RastrOperations:
                 table_size = 0
         return table_size - 1
 
-    def set_line_for_uost_calc(self, id1: int, id2: int, r: float, x: float, l: float):
-        """Установка параметров линии для расчета остаточного напряжения"""
+    def set_line_for_uost_calc(self, id1: int, id2: int, r: float, x: float, l: float,
+                               load_flow: bool = True):
+        """
+        Установка параметров линии для расчета остаточного напряжения
+
+        Сопротивления линии делятся между ветвями id1 и id2 в отношении l / (100 - l);
+        load_flow=False - без расчета режима (напряжение узла КЗ задается вызывающим, см. SplitLine)
+        """
         # ИСПРАВЛЕНО: Преобразуем id1 и id2 в int, если это строки
         if not isinstance(id1, int):
             try:
@@ -238,9 +549,8 @@ class RastrOperations:
                     f"id2 должен быть int, получен {type(id2).__name__}: {id2}"
                 )
 
-        table = self._rastr.Tables.Item("vetv")
-        col_r = table.Cols.Item("r")
-        col_x = table.Cols.Item("x")
+        col_r = self._col("vetv", "r")
+        col_x = self._col("vetv", "x")
 
         r_part = l * r / 100.0
         x_part = l * x / 100.0
@@ -249,8 +559,10 @@ class RastrOperations:
         col_r.SetZ(id2, r - r_part)
         col_x.SetZ(id1, x_part)
         col_x.SetZ(id2, x - x_part)
+        self._touch("vetv")
 
-        self.rgm()
+        if load_flow:
+            self.rgm()
 
     def change_rx_for_uost_calc(
         self, x_id: int, x: float, r_id: int = 0, r: float = -1.0
@@ -282,16 +594,26 @@ class RastrOperations:
                     f"r_id должен быть int, получен {type(r_id).__name__}: {r_id}"
                 )
 
-        table = self._rastr.Tables.Item("DFWAutoActionScn")
-        col_formula = table.Cols.Item("Formula")
+        col_formula = self._col("DFWAutoActionScn", "Formula")
 
         col_formula.SetZ(x_id, str(x).replace(",", "."))
         if r != -1.0:
             col_formula.SetZ(r_id, str(r).replace(",", "."))
+        self._touch("DFWAutoActionScn")
 
     def selection(self, table_name: str, selection: str = "") -> List[int]:
         """Выборка строк по условию"""
-        table = self._rastr.Tables.Item(table_name)
+        key = self._parse_key_selection(table_name, selection)
+        if key is not None:
+            return list(self._key_rows(table_name, key))
+
+        generation = self._data_generation(table_name)
+        cached = self._sel_cache.get((table_name, selection))
+        if cached is not None and cached[0] == generation and cached[2]:
+            self.com_calls_saved += len(cached[1]) + 2
+            return list(cached[1])
+
+        table = self._table(table_name)
         table.SetSel(selection)
 
         result = []
@@ -313,10 +635,18 @@ class RastrOperations:
                 except (ValueError, TypeError):
                     idx = -1
 
-        return result
+        self._sel_cache[(table_name, selection)] = (generation, result, True)
+        return list(result)
+
+    def apply_variant(self, num: int, file: str, regime_key: Optional[str] = None) -> bool:
+        """
+        Применение варианта из файла
 
-    def apply_variant(self, num: int, file: str) -> bool:
-        """Применение варианта из файла"""
+        Args:
+            num: Номер варианта
+            file: Путь к файлу ремонтных схем
+            regime_key: Хеш файла загруженного режима для кэша изменений по вариантам
+        """
         # ИСПРАВЛЕНО: Проверка на None или пустую строку перед загрузкой
         if not file:
             from utils.logger import logger
@@ -328,49 +658,36 @@ class RastrOperations:
                 f"Путь к файлу ремонтных схем не может быть None или пустой строкой"
             )
 
+        from utils.config import config
+
+        if config.get("performance.variant_delta_cache", False):
+            from .variant_cache import variant_cache
+
+            variant_cache.apply(self, num, file, regime_key)
+        else:
+            self.load_variant(num, file)
+        return self.rgm()
+
+    def load_variant(self, num: int, file: str):
+        """Загрузка файла ремонтных схем и применение варианта средствами RASTR (без расчета режима)"""
         self.load(file)
         self._rastr.ApplyVariant(num)
-        return self.rgm()
+        self._invalidate_state()
+
+    def columns(self, table_name: str) -> List[str]:
+        """Имена колонок таблицы"""
+        cols = self._table(table_name).Cols
+        return [cols.Item(idx).Name for idx in range(int(cols.Count))]
 
     def get_val(
         self, table_name: str, col_name: str, selection_or_index: Union[str, int]
     ) -> Any:
         """Получение значения из таблицы"""
         try:
-            table = self._rastr.Tables.Item(table_name)
-            col = table.Cols.Item(col_name)
-
             if isinstance(selection_or_index, str):
-                table.SetSel(selection_or_index)
-                idx = table.FindNextSel(-1)
-                # ИСПРАВЛЕНО: Преобразуем idx в int, если это строка
-                if not isinstance(idx, int) and idx is not None:
-                    try:
-                        idx = int(idx)
-                    except (ValueError, TypeError):
-                        idx = -1
-
+                idx = self._find_first(table_name, selection_or_index)
                 if idx != -1:
-                    # Пытаемся получить значение разными способами
-                    try:
-                        # Способ 1: Z(index) - свойство с индексом (как в рабочей версии)
-                        return col.Z(idx)
-                    except (AttributeError, TypeError):
-                        try:
-                            # Способ 2: прямое обращение через индекс
-                            return col[idx]
-                        except (AttributeError, TypeError, IndexError):
-                            try:
-                                # Способ 3: GetZ (с заглавной буквы)
-                                return col.GetZ(idx)
-                            except AttributeError:
-                                try:
-                                    # Способ 4: get_Z (маленькая буква)
-                                    return col.get_Z(idx)
-                                except AttributeError as e:
-                                    raise AttributeError(
-                                        f"Не удалось получить значение для колонки {col_name}[{idx}]: {e}"
-                                    )
+                    return self._read(table_name, col_name, idx)
                 return None
             else:
                 # ИСПРАВЛЕНО: Преобразуем selection_or_index в int, если это строка
@@ -388,37 +705,12 @@ class RastrOperations:
                         )
 
                 # Проверяем, что индекс валиден
-                table_size = table.Size
-                if not isinstance(table_size, int):
-                    try:
-                        table_size = int(table_size)
-                    except (ValueError, TypeError):
-                        table_size = 0
-
+                table_size = self._table_size(table_name)
                 if selection_or_index < 0 or selection_or_index >= table_size:
                     raise IndexError(
                         f"Индекс {selection_or_index} вне диапазона таблицы {table_name} (размер: {table_size})"
                     )
-                # Пытаемся получить значение разными способами
-                try:
-                    # Способ 1: Z(index) - свойство с индексом (как в рабочей версии)
-                    return col.Z(selection_or_index)
-                except (AttributeError, TypeError):
-                    try:
-                        # Способ 2: прямое обращение через индекс
-                        return col[selection_or_index]
-                    except (AttributeError, TypeError, IndexError):
-                        try:
-                            # Способ 3: GetZ (с заглавной буквы)
-                            return col.GetZ(selection_or_index)
-                        except AttributeError:
-                            try:
-                                # Способ 4: get_Z (маленькая буква)
-                                return col.get_Z(selection_or_index)
-                            except AttributeError as e:
-                                raise AttributeError(
-                                    f"Не удалось получить значение для колонки {col_name}[{selection_or_index}]: {e}"
-                                )
+                return self._read(table_name, col_name, selection_or_index)
         except Exception as e:
             from utils.logger import logger
 
@@ -438,34 +730,14 @@ class RastrOperations:
         try:
             from utils.logger import logger
 
-            table = self._rastr.Tables.Item(table_name)
-            col = table.Cols.Item(col_name)
+            self._invalidate_state(table_name)
 
             # ИСПРАВЛЕНО: Поддержка строки выборки (как в C# setVal с selection)
             if isinstance(index_or_selection, str):
-                # Используем строку выборки
-                table.SetSel(index_or_selection)
-                idx = table.FindNextSel(-1)
-                # ИСПРАВЛЕНО: Преобразуем idx в int, если это строка
-                if not isinstance(idx, int) and idx is not None:
-                    try:
-                        idx = int(idx)
-                    except (ValueError, TypeError):
-                        idx = -1
-
+                idx = self._find_first(table_name, index_or_selection)
                 if idx != -1:
-                    try:
-                        col.SetZ(idx, value)
-                        return True
-                    except AttributeError:
-                        try:
-                            col.set_Z(idx, value)
-                            return True
-                        except AttributeError as e:
-                            logger.error(
-                                f"Не удалось установить значение для {table_name}.{col_name} (выборка: {index_or_selection}): {e}"
-                            )
-                            return False
+                    self._write(table_name, col_name, idx, value)
+                    return True
                 return False
             else:
                 # Используем индекс
@@ -483,33 +755,13 @@ class RastrOperations:
                         )
 
                 # Проверяем, что индекс валиден
-                table_size = table.Size
-                if not isinstance(table_size, int):
-                    try:
-                        table_size = int(table_size)
-                    except (ValueError, TypeError):
-                        table_size = 0
-
+                table_size = self._table_size(table_name)
                 if index < 0 or index >= table_size:
                     raise IndexError(
                         f"Индекс {index} вне диапазона таблицы {table_name} (размер: {table_size})"
                     )
 
-                try:
-                    # Способ 1: SetZ(index, value) - метод (как в рабочей версии)
-                    col.SetZ(index, value)
-                except AttributeError:
-                    try:
-                        # Способ 2: прямое присваивание через индекс
-                        col[index] = value
-                    except (AttributeError, TypeError, IndexError):
-                        try:
-                            # Способ 3: set_Z (маленькая буква)
-                            col.set_Z(index, value)
-                        except AttributeError as e:
-                            raise AttributeError(
-                                f"Не удалось установить значение для колонки {col_name}[{index}] = {value}: {e}"
-                            )
+                self._write(table_name, col_name, index, value)
                 return True
         except Exception as e:
             from utils.logger import logger
@@ -524,22 +776,10 @@ class RastrOperations:
     ) -> bool:
         """Установка значения по условию выборки"""
         try:
-            from utils.logger import logger
-
-            table = self._rastr.Tables.Item(table_name)
-            col = table.Cols.Item(col_name)
-            table.SetSel(selection)
-            idx = table.FindNextSel(-1)
-
-            # ИСПРАВЛЕНО: Преобразуем idx в int, если это строка
-            if not isinstance(idx, int) and idx is not None:
-                try:
-                    idx = int(idx)
-                except (ValueError, TypeError):
-                    idx = -1
-
+            self._invalidate_state(table_name)
+            idx = self._find_first(table_name, selection)
             if idx != -1:
-                col.SetZ(idx, value)
+                self._write(table_name, col_name, idx, value)
                 return True
             return False
         except Exception as e:
@@ -550,6 +790,99 @@ class RastrOperations:
             )
             raise
 
+    def _rows_to_indices(
+        self, table_name: str, rows: Union[str, Sequence[int], None]
+    ) -> List[int]:
+        """Преобразование выборки или списка индексов в список индексов строк"""
+        if rows is None:
+            return list(range(self._table_size(table_name)))
+        if isinstance(rows, str):
+            return self.selection(table_name, rows)
+        return [int(idx) for idx in rows]
+
+    def get_column(
+        self,
+        table_name: str,
+        col_name: str,
+        rows: Union[str, Sequence[int], None] = None,
+    ) -> np.ndarray:
+        """
+        Чтение значений колонки за одно обращение к RASTR
+
+        Args:
+            table_name: Имя таблицы
+            col_name: Имя колонки
+            rows: Строка выборки, список индексов строк или None (вся таблица)
+
+        Returns:
+            Массив значений в порядке строк выборки (или заданных индексов)
+        """
+        table = self._table(table_name)
+
+        if self._safe_arrays is not False:
+            selection = rows if isinstance(rows, str) else ""
+            try:
+                data = table.ReadSafeArray(2, col_name, selection)
+                self._safe_arrays = True
+            except AttributeError:
+                # Методы безопасных массивов недоступны в этой версии RASTR
+                self._safe_arrays = False
+            else:
+                values = np.array([row[0] for row in data])
+                if rows is None or isinstance(rows, str):
+                    return values
+                return values[np.asarray(rows, dtype=int)]
+
+        indices = self._rows_to_indices(table_name, rows)
+        return np.array([self._read(table_name, col_name, idx) for idx in indices])
+
+    def set_column(
+        self,
+        table_name: str,
+        col_name: str,
+        rows: Union[str, Sequence[int], None],
+        values: Any,
+    ):
+        """
+        Запись значений колонки (одно значение или массив по числу строк)
+
+        Args:
+            table_name: Имя таблицы
+            col_name: Имя колонки
+            rows: Строка выборки, список индексов строк или None (вся таблица)
+            values: Значение для всех строк или последовательность значений
+        """
+        table = self._table(table_name)
+        self._invalidate_state(table_name)
+        self._touch(table_name, self._is_key_column(table_name, col_name))
+        scalar = np.ndim(values) == 0
+        if not scalar:
+            values = [v.item() if isinstance(v, np.generic) else v for v in values]
+
+        if (rows is None or isinstance(rows, str)) and self._safe_arrays is not False:
+            selection = rows or ""
+            try:
+                if scalar:
+                    count = len(table.ReadSafeArray(2, col_name, selection))
+                    values = [values] * count
+                table.WriteSafeArray(col_name, selection, tuple((v,) for v in values))
+                self._safe_arrays = True
+                return
+            except AttributeError:
+                self._safe_arrays = False
+
+        indices = self._rows_to_indices(table_name, rows)
+        if scalar:
+            values = [values] * len(indices)
+        elif len(values) != len(indices):
+            raise ValueError(
+                f"Количество значений ({len(values)}) не совпадает с количеством строк "
+                f"({len(indices)}) для {table_name}.{col_name}"
+            )
+
+        for idx, value in zip(indices, values):
+            self._write(table_name, col_name, idx, value)
+
     def create_scn_from_lpn(
         self, lpn_file: str, lpn: str, scn_file: str, save_file: str = ""
     ):
@@ -578,14 +911,15 @@ class RastrOperations:
         logger.info("run_ut: Начало выполнения утяжеления")
         try:
             logger.info("run_ut: Получение таблиц vetv и ut_common")
-            table_vetv = self._rastr.Tables.Item("vetv")
-            table_ut = self._rastr.Tables.Item("ut_common")
-            col_sum_kfc = table_ut.Cols.Item("sum_kfc")
+            self._table("vetv")
+            self._col("ut_common", "sum_kfc")
             logger.info("run_ut: Таблицы получены успешно")
         except Exception as e:
             logger.error(f"run_ut: Ошибка при получении таблиц: {e}")
             raise
 
+        self._invalidate_state()
+
         # step_ut("i") - инициализация
         # step_ut("z") - шаг утяжеления
         # AST_OK = 0
@@ -664,34 +998,14 @@ class RastrOperations:
         logger.info(f"run_ut: Шаг утяжеления завершен за {step_iteration} итераций")
 
         logger.info("run_ut: Получение значения sum_kfc")
-        # Используем Z(index) - свойство с индексом (как в рабочей версии)
-        try:
-            result = col_sum_kfc.Z(0)
-            logger.info(f"run_ut: sum_kfc получен через Z(0): {result}")
-            return result
-        except (AttributeError, TypeError) as e:
-            logger.debug(f"run_ut: Z(0) не сработал, пробуем [0]: {e}")
-            try:
-                result = col_sum_kfc[0]
-                logger.info(f"run_ut: sum_kfc получен через [0]: {result}")
-                return result
-            except (AttributeError, TypeError, IndexError) as e2:
-                logger.debug(f"run_ut: [0] не сработал, пробуем GetZ(0): {e2}")
-                try:
-                    result = col_sum_kfc.GetZ(0)
-                    logger.info(f"run_ut: sum_kfc получен через GetZ(0): {result}")
-                    return result
-                except AttributeError as e3:
-                    logger.debug(f"run_ut: GetZ(0) не сработал, пробуем get_Z(0): {e3}")
-                    result = col_sum_kfc.get_Z(0)
-                    logger.info(f"run_ut: sum_kfc получен через get_Z(0): {result}")
-                    return result
+        result = self._read("ut_common", "sum_kfc", 0)
+        logger.info(f"run_ut: sum_kfc = {result}")
+        return result
 
     def step(self, step_value: float = 1.0, init: bool = True) -> float:
         """Выполнение шага утяжеления"""
-        table_ut = self._rastr.Tables.Item("ut_common")
-        col_sum_kfc = table_ut.Cols.Item("sum_kfc")
-        col_kfc = table_ut.Cols.Item("kfc")
+        col_kfc = self._col("ut_common", "kfc")
+        self._invalidate_state()
 
         if init:
             self._rastr.step_ut("i")
@@ -699,17 +1013,60 @@ class RastrOperations:
         col_kfc.SetZ(0, step_value)
         self._rastr.step_ut("z")
 
-        # Используем Z(index) - свойство с индексом (как в рабочей версии)
+        return self._read("ut_common", "sum_kfc", 0)
+
+    def weighting_trajectory(
+        self,
+        kfc: Optional[float] = None,
+        limit: Optional[float] = None,
+        resolution: int = 1,
+        max_steps: int = 1000,
+    ) -> WeightingTrajectory:
+        """
+        Утяжеление с записью траектории (сумма шагов и перетоки в сечениях после каждого шага)
+
+        Args:
+            kfc: Шаг утяжеления (по умолчанию - шаг загруженной траектории), знак задает направление
+            limit: Модуль суммы шагов, по достижении которого запись прекращается
+                (по умолчанию - до окончания утяжеления)
+            resolution: Количество шагов записи на один шаг утяжеления
+            max_steps: Максимальное количество шагов
+
+        Returns:
+            Траектория; в сессии остается режим последней точки
+        """
+        from utils.logger import logger
+
+        col_kfc = self._col("ut_common", "kfc")
+        original_kfc = self._read("ut_common", "kfc", 0)
+        step_kfc = (original_kfc if kfc is None else kfc) / max(1, resolution)
+        if step_kfc == 0:
+            raise ValueError("Нулевой шаг утяжеления")
+        self._invalidate_state()
+
+        self._rastr.step_ut("i")
+        col_kfc.SetZ(0, step_kfc)
+        sum_kfc = [self._read("ut_common", "sum_kfc", 0)]
+        psech = [self.get_column("sechen", "psech")]
         try:
-            return col_sum_kfc.Z(0)
-        except (AttributeError, TypeError):
-            try:
-                return col_sum_kfc[0]
-            except (AttributeError, TypeError, IndexError):
-                try:
-                    return col_sum_kfc.GetZ(0)
-                except AttributeError:
-                    return col_sum_kfc.get_Z(0)
+            for _ in range(max_steps):
+                result = self._rastr.step_ut("z")
+                self._invalidate_state()
+                current = self._read("ut_common", "sum_kfc", 0)
+                if current == sum_kfc[-1]:
+                    # Шаг не выполнен - предел утяжеления
+                    break
+                sum_kfc.append(current)
+                psech.append(self.get_column("sechen", "psech"))
+                if result != 0 or (limit is not None and abs(current) >= abs(limit)):
+                    break
+            else:
+                logger.warning(f"Траектория утяжеления: достигнуто максимальное количество шагов ({max_steps})")
+        finally:
+            col_kfc.SetZ(0, original_kfc)
+
+        logger.debug(f"Траектория утяжеления: {len(sum_kfc)} точек, сумма шагов {sum_kfc[-1]:.2f}")
+        return WeightingTrajectory(np.array(sum_kfc), np.array(psech), step_kfc)
 
     def dyn_settings(self):
         """Настройка параметров динамики"""
@@ -785,6 +1142,8 @@ class RastrOperations:
                 logger.error(f"Ошибка при установке SnapMaxCount: {e}")
                 raise
 
+            self._touch("com_dynamics", structure=True)
+
         except RuntimeError:
             # Пробрасываем RuntimeError как есть
             raise
@@ -801,33 +1160,17 @@ class RastrOperations:
 
             result = DynamicResult()
 
-            table = self._rastr.Tables.Item("com_dynamics")
+            table = self._table("com_dynamics")
 
             # Проверяем, что таблица существует и имеет хотя бы одну строку
-            table_size = table.Size
-            if not isinstance(table_size, int):
-                try:
-                    table_size = int(table_size)
-                except (ValueError, TypeError):
-                    table_size = 0
-            if table_size == 0:
+            if self._table_size("com_dynamics") == 0:
                 logger.warning("Таблица com_dynamics пуста, добавляем строку")
                 table.AddRow()
 
-            col_tras = table.Cols.Item("Tras")
-            # Используем Z(index) - свойство с индексом (как в рабочей версии)
-            try:
-                original_time = col_tras.Z(0)
-            except (AttributeError, TypeError):
-                try:
-                    original_time = col_tras[0]
-                except (AttributeError, TypeError, IndexError):
-                    try:
-                        original_time = col_tras.GetZ(0)
-                    except AttributeError:
-                        original_time = col_tras.get_Z(0)
+            col_tras = self._col("com_dynamics", "Tras")
+            original_time = self._read("com_dynamics", "Tras", 0)
 
-            self.load_template(".dfw")
+            self.ensure_template(".dfw")
 
             if ems and max_time != -1.0:
                 col_tras.SetZ(0, max_time)
@@ -846,6 +1189,7 @@ class RastrOperations:
                 fw_dynamic.ResultMessage if fw_dynamic.ResultMessage else " - "
             )
             result.time_reached = fw_dynamic.TimeReached
+            self._dynamics_done()
 
             # Восстанавливаем исходное время
             try:
@@ -860,15 +1204,38 @@ class RastrOperations:
             logger.error(f"Ошибка при выполнении динамического расчета: {e}")
             raise
 
-    def find_crt_time(self, precision: float, max_time: float) -> float:
-        """Поиск критического времени отключения КЗ"""
+    def find_crt_time(
+        self,
+        precision: float,
+        max_time: float,
+        bracket: Optional[Tuple[float, float]] = None,
+    ) -> float:
+        """
+        Поиск критического времени отключения КЗ
+
+        Args:
+            precision: Точность расчета, с
+            max_time: Максимальное время отключения КЗ, с
+            bracket: Предполагаемый интервал (устойчиво, неустойчиво), например по
+                результатам соседних вариантов. Границы проверяются расчетами динамики,
+                при ошибке интервал расширяется.
+        """
+        self.crt_runs = 0
+        if bracket is not None:
+            # Шаблон .dfw загружается один раз на поиск, как и при поиске с полного интервала
+            self.ensure_template(".dfw")
+            crt_time = self._find_crt_time_bracketed(precision, max_time, *bracket)
+            self._crt_done()
+            return crt_time
+
         crt_time = max_time
-        self.load_template(".dfw")
+        self.ensure_template(".dfw")
 
         self._reset_crt_time(max_time)
 
         fw_dynamic = self._rastr.FWDynamic()
         ret_code = fw_dynamic.RunEMSmode()
+        self.crt_runs += 1
 
         # SYNC_LOSS_NONE = 0
         if fw_dynamic.SyncLossCause != 0:
@@ -882,6 +1249,7 @@ class RastrOperations:
 
                 fw_dynamic = self._rastr.FWDynamic()
                 ret_code = fw_dynamic.RunEMSmode()
+                self.crt_runs += 1
 
                 if fw_dynamic.SyncLossCause == 0:
                     time_min = crt_time
@@ -890,32 +1258,155 @@ class RastrOperations:
 
                 time_step = (time_max - time_min) * 0.5
 
+        self._crt_done()
         return crt_time
 
+    def _find_crt_time_bracketed(
+        self, precision: float, max_time: float, time_min: float, time_max: float
+    ) -> float:
+        """Поиск критического времени с проверкой и расширением начального интервала"""
+        time_min = min(max(time_min, 0.0), max_time)
+        time_max = min(max(time_max, time_min), max_time)
+        width = max(time_max - time_min, precision)
+
+        # Нижняя граница должна быть устойчивой (нулевая длительность считается устойчивой)
+        upper_checked = False
+        while time_min > 0.0 and not self._run_crt_time(time_min):
+            time_max, upper_checked = time_min, True
+            time_min = max(0.0, time_min - width)
+            width *= 2
+
+        # Верхняя граница, совпадающая с проверенной нижней, устойчива без повторного расчета
+        if not upper_checked and time_min > 0.0 and time_max == time_min:
+            if time_max >= max_time:
+                return max_time
+            time_max = min(max_time, time_max + width)
+            width *= 2
+
+        # Верхняя граница должна быть неустойчивой
+        while not upper_checked:
+            if not self._run_crt_time(time_max):
+                upper_checked = True
+            elif time_max >= max_time:
+                return max_time
+            else:
+                time_min = time_max
+                time_max = min(max_time, time_max + width)
+                width *= 2
+
+        while (time_max - time_min) * 0.5 > precision:
+            crt_time = (time_min + time_max) * 0.5
+            if self._run_crt_time(crt_time):
+                time_min = crt_time
+            else:
+                time_max = crt_time
+        return time_min
+
+    def probe_crt_time(self, dt: float) -> bool:
+        """
+        Один расчет динамики с заданной длительностью КЗ
+
+        Returns:
+            True, если процесс устойчив
+        """
+        self.ensure_template(".dfw")
+        stable = self._run_crt_time(dt)
+        self._crt_done()
+        return stable
+
+    def _run_crt_time(self, dt: float) -> bool:
+        """Расчет динамики с длительностью КЗ dt без загрузки шаблона .dfw"""
+        self._reset_crt_time(dt)
+        fw_dynamic = self._rastr.FWDynamic()
+        fw_dynamic.RunEMSmode()
+        self.crt_runs += 1
+        # SYNC_LOSS_NONE = 0
+        return fw_dynamic.SyncLossCause == 0
+
+    def _scenario_generation(self) -> tuple:
+        """Поколение данных таблицы сценария (расчеты режима и динамики его не меняют)"""
+        table = "DFWAutoActionScn"
+        return (
+            self._structure_generation,
+            self._table_structures.get(table, 0),
+            self._table_generations.get(table, 0),
+        )
+
+    def _classify_crt_actions(self) -> tuple:
+        """
+        Действия сценария: КЗ в узлах и отключения ветвей (один раз на сценарий)
+
+        Returns:
+            (маска КЗ в узлах, маска отключений ветвей, исходные TimeStart, исходные DT)
+        """
+        generation = self._scenario_generation()
+        if self._crt_actions is None or self._crt_actions[0] != generation:
+            obj_class = self.get_column("DFWAutoActionScn", "ObjectClass")
+            self._crt_actions = (
+                generation,
+                obj_class == "node",
+                obj_class == "vetv",
+                self.get_column("DFWAutoActionScn", "TimeStart").astype(float),
+                self.get_column("DFWAutoActionScn", "DT").astype(float),
+            )
+        return self._crt_actions[1:]
+
     def _reset_crt_time(self, dt: float):
         """Сброс времени КЗ для расчета критического времени"""
         time_start = 1.0
-        items = self.selection("DFWAutoActionScn")
-
-        for item in items:
-            obj_class = self.get_val("DFWAutoActionScn", "ObjectClass", item)
-
-            if obj_class == "node":
-                self.set_val("DFWAutoActionScn", "TimeStart", item, time_start)
-                self.set_val("DFWAutoActionScn", "DT", item, dt)
-            elif obj_class == "vetv":
-                self.set_val("DFWAutoActionScn", "TimeStart", item, time_start + dt)
-                self.set_val("DFWAutoActionScn", "DT", item, 999)
+        nodes, vetvs, time_start_isx, dt_isx = self._classify_crt_actions()
 
-        self.set_val("com_dynamics", "Tras", 0, time_start + dt + 3.0)
+        if nodes.any() or vetvs.any():
+            # Колонки записываются целиком: по одному обращению на колонку
+            self.set_column(
+                "DFWAutoActionScn", "TimeStart", None,
+                np.where(nodes, time_start, np.where(vetvs, time_start + dt, time_start_isx)),
+            )
+            self.set_column(
+                "DFWAutoActionScn", "DT", None,
+                np.where(nodes, dt, np.where(vetvs, 999.0, dt_isx)),
+            )
+            # Собственная запись не требует повторной классификации
+            self._crt_actions = (self._scenario_generation(),) + self._crt_actions[1:]
+
+        # Время расчета записывается напрямую, как в run_dynamic, и восстанавливается
+        # в конце поиска (_crt_done), поэтому подготовленный режим сессии сохраняется
+        if self._crt_tras is None:
+            self._crt_tras = self._read("com_dynamics", "Tras", 0)
+        self._col("com_dynamics", "Tras").SetZ(0, time_start + dt + 3.0)
+
+    def _crt_done(self):
+        """Завершение поиска критического времени: исходное Tras, таблицы .dfw заполнены"""
+        if self._crt_tras is not None:
+            self._col("com_dynamics", "Tras").SetZ(0, self._crt_tras)
+            self._crt_tras = None
+        self._dynamics_done()
 
     def find_shunt_kz(
-        self, node: int, u_ost: float, x_isx: float, r_isx: float = -1.0
+        self,
+        node: int,
+        u_ost: float,
+        x_isx: float,
+        r_isx: float = -1.0,
+        method: Optional[str] = None,
+        max_iterations: Optional[int] = None,
     ) -> ShuntKZResult:
-        """Поиск шунта КЗ для заданного остаточного напряжения"""
-        table = self._rastr.Tables.Item("com_dynamics")
-        col_tras = table.Cols.Item("Tras")
+        """
+        Поиск шунта КЗ для заданного остаточного напряжения
+
+        Args:
+            node: Номер узла
+            u_ost: Целевое остаточное напряжение, кВ
+            x_isx: Начальное реактивное сопротивление шунта, Ом
+            r_isx: Начальное активное сопротивление шунта, Ом (-1 - только X)
+            method: Стратегия поиска из utils.root_finding
+                (по умолчанию calculations.shunt_root_finder)
+            max_iterations: Максимальное количество расчетов динамики
+                (по умолчанию calculations.shunt_max_iterations)
+        """
+        col_tras = self._col("com_dynamics", "Tras")
         col_tras.SetZ(0, 1.1)
+        self._invalidate_state()
 
         self.load_template(".dfw")
 
@@ -955,72 +1446,67 @@ class RastrOperations:
         z_mod = math.sqrt((r_isx**2 if r_isx != -1.0 else 0) + x_isx**2)
         z_angle = (math.pi / 2.0) if r_isx == -1.0 else math.atan(x_isx / r_isx)
 
-        if r_isx == -1.0:
-            self._create_shunt_scn(node, z_mod * math.sin(z_angle))
-        else:
-            self._create_shunt_scn(
-                node, z_mod * math.sin(z_angle), z_mod * math.cos(z_angle)
-            )
+        def measure(z: float) -> Optional[float]:
+            """Расчет динамики с шунтом модуля z и остаточное напряжение из протокола"""
+            prot.clear()
+            if r_isx == -1.0:
+                self._create_shunt_scn(node, z * math.sin(z_angle))
+            else:
+                self._create_shunt_scn(
+                    node, z * math.sin(z_angle), z * math.cos(z_angle)
+                )
 
-        fw_dynamic = self._rastr.FWDynamic()
-        ret_code = fw_dynamic.Run()
+            fw_dynamic = self._rastr.FWDynamic()
+            fw_dynamic.Run()
+            self._dynamics_done()
 
-        # Парсинг результата из протокола
-        if prot:
-            last_msg = prot[-1]
-            # Извлечение напряжения из сообщения
             # Формат: "Величина остаточного напряжения в узле ... (Uкз=XXX кВ, ...)"
+            if not prot:
+                return None
             try:
                 u_kz_str = (
-                    last_msg.split("Uкз=")[1]
+                    prot[-1].split("Uкз=")[1]
                     .split(" кВ")[0]
                     .replace(".", locale.localeconv()["decimal_point"])
                 )
-                u_current = float(u_kz_str)
-            except:
-                u_current = 0.0
-        else:
-            u_current = 0.0
-
-        u_nom = self.get_val("node", "uhom", f"ny={node}")
-        precision = min(2.0, 0.02 * u_nom)
+                return float(u_kz_str)
+            except (IndexError, ValueError):
+                return None
 
-        while abs(u_current - u_ost) > precision:
-            z_mod = z_mod * u_ost / u_current if u_current > 0 else z_mod
+        from utils.config import config
+        from utils.root_finding import find_root
 
-            if r_isx == -1.0:
-                self._create_shunt_scn(node, z_mod * math.sin(z_angle))
-            else:
-                self._create_shunt_scn(
-                    node, z_mod * math.sin(z_angle), z_mod * math.cos(z_angle)
-                )
+        if method is None:
+            method = config.get("calculations.shunt_root_finder", "proportional")
+        if max_iterations is None:
+            max_iterations = config.get("calculations.shunt_max_iterations", 20)
 
-            fw_dynamic = self._rastr.FWDynamic()
-            ret_code = fw_dynamic.Run()
+        u_nom = self.get_val("node", "uhom", f"ny={node}")
+        precision = min(2.0, 0.02 * u_nom)
 
-            # ИСПРАВЛЕНО: Сначала извлекаем значение, потом очищаем протокол (как в исходном C# коде)
-            if prot:
-                last_msg = prot[-1]
+        try:
+            found = find_root(measure, z_mod, u_ost, precision, method, max_iterations)
+        finally:
+            if event_connected:
                 try:
-                    u_kz_str = (
-                        last_msg.split("Uкз=")[1]
-                        .split(" кВ")[0]
-                        .replace(".", locale.localeconv()["decimal_point"])
-                    )
-                    u_current = float(u_kz_str)
-                except:
-                    break
-            else:
-                # Если протокол пустой, прерываем цикл
-                break
+                    self._rastr.OnLog -= on_log_handler
+                except Exception:
+                    pass
 
-            # Очистка протокола ПОСЛЕ извлечения значения (как в исходном C# коде, строка 339)
-            prot.clear()
+        if not found.converged and len(found.history) >= max_iterations:
+            from utils.logger import logger
+
+            logger.warning(
+                f"Шунт КЗ в узле {node}: за {max_iterations} итераций не достигнуто "
+                f"U={u_ost:.1f} кВ (U={found.u:.1f} кВ)"
+            )
 
         return ShuntKZResult(
-            r=(-1.0 if r_isx == -1.0 else z_mod * math.cos(z_angle)),
-            x=z_mod * math.sin(z_angle),
-            u=u_current,
+            r=(-1.0 if r_isx == -1.0 else found.z * math.cos(z_angle)),
+            x=found.z * math.sin(z_angle),
+            u=found.u,
+            iterations=found.iterations,
+            history=found.history,
         )
 
     def _create_shunt_scn(self, node: int, x: float, r: float = -1.0):
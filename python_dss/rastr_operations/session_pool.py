@@ -0,0 +1,138 @@
+"""
+Пул долгоживущих сессий RASTR
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .rastr_operations import RastrOperations
+
+
+class RastrSessionPool:
+    """Пул сессий RASTR, переиспользуемых между задачами расчета"""
+
+    def __init__(self, factory: Optional[Callable[[], RastrOperations]] = None,
+                 max_size: int = 1, max_uses: int = 0):
+        """
+        Инициализация пула
+
+        Args:
+            factory: Функция создания новой сессии (по умолчанию RastrOperations())
+            max_size: Максимальное количество свободных сессий в пуле
+            max_uses: Количество выдач, после которого сессия пересоздается (0 - без ограничения)
+        """
+        self._factory = factory or RastrOperations
+        self._max_size = max(1, max_size)
+        self._max_uses = max_uses
+        self._idle: List[RastrOperations] = []
+        self._uses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.resets = 0
+        self.discards = 0
+        self.reset_time = 0.0
+        self.com_calls_saved = 0
+        self.template_reloads_skipped = 0
+
+    @property
+    def factory(self) -> Callable[[], RastrOperations]:
+        """Функция создания новой сессии"""
+        return self._factory
+
+    def acquire(self) -> RastrOperations:
+        """Выдача сессии из пула или создание новой"""
+        with self._lock:
+            if self._idle:
+                self.hits += 1
+                return self._idle.pop()
+            self.misses += 1
+        session = self._factory()
+        with self._lock:
+            self._uses[id(session)] = 0
+        return session
+
+    def release(self, session: RastrOperations, discard: bool = False):
+        """
+        Возврат сессии в пул
+
+        Args:
+            session: Сессия, полученная через acquire()
+            discard: Не возвращать сессию в пул (например, после ошибки COM)
+        """
+        with self._lock:
+            self.com_calls_saved += session.com_calls_saved
+            session.com_calls_saved = 0
+            self.template_reloads_skipped += session.template_reloads_skipped
+            session.template_reloads_skipped = 0
+            uses = self._uses.get(id(session), 0) + 1
+            self._uses[id(session)] = uses
+            exhausted = self._max_uses and uses >= self._max_uses
+            if discard or exhausted or len(self._idle) >= self._max_size:
+                self._uses.pop(id(session), None)
+                self.discards += 1
+                return
+
+        start = time.perf_counter()
+        try:
+            session.reset()
+        except Exception as e:
+            from utils.logger import logger
+            logger.warning(f"Не удалось сбросить сессию RASTR, сессия отброшена: {e}")
+            with self._lock:
+                self._uses.pop(id(session), None)
+                self.discards += 1
+            return
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.resets += 1
+            self.reset_time += elapsed
+            self._idle.append(session)
+
+    @contextmanager
+    def session(self) -> Iterator[RastrOperations]:
+        """Контекстный менеджер аренды сессии; при исключении сессия отбрасывается"""
+        rastr = self.acquire()
+        try:
+            yield rastr
+        except BaseException:
+            self.release(rastr, discard=True)
+            raise
+        self.release(rastr)
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика пула"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'resets': self.resets,
+                'discards': self.discards,
+                'reset_time': self.reset_time,
+                'com_calls_saved': self.com_calls_saved,
+                'template_reloads_skipped': self.template_reloads_skipped,
+                'idle': len(self._idle),
+            }
+
+    def log_stats(self):
+        """Вывод статистики пула в лог"""
+        from utils.logger import logger
+        stats = self.stats()
+        logger.info(
+            f"Пул сессий RASTR: выдано из пула {stats['hits']}, создано {stats['misses']}, "
+            f"сбросов {stats['resets']} ({stats['reset_time']:.3f} с), отброшено {stats['discards']}, "
+            f"сэкономлено обращений к COM {stats['com_calls_saved']}, "
+            f"пропущено загрузок шаблонов {stats['template_reloads_skipped']}"
+        )
+
+    def close(self):
+        """Освобождение всех свободных сессий"""
+        with self._lock:
+            self._idle.clear()
+            self._uses.clear()
@@ -0,0 +1,329 @@
+"""
+Хранилище подготовленных режимов RASTR (режим + вариант)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .rastr_operations import RastrOperations
+from .split_line import SplitLine
+
+
+class SnapshotStore:
+    """
+    Хранилище снимков .rst подготовленных режимов
+
+    Снимок - это режим после настройки динамики и применения варианта.
+    Ключ снимка - хеш содержимого файла режима, файла ремонтных схем и номера
+    варианта, поэтому снимки переиспользуются между видами расчетов и запусками.
+    """
+
+    # Версия процедуры подготовки (входит в ключ снимка)
+    VERSION = "1"
+    EXTENSION = ".rst"
+
+    def __init__(self, root: Optional[Path] = None, max_mb: Optional[float] = None):
+        """
+        Инициализация хранилища
+
+        Args:
+            root: Директория снимков (по умолчанию paths.cache_dir/snapshots)
+            max_mb: Ограничение размера хранилища на диске, МБ
+                (по умолчанию performance.snapshot_cache_mb)
+        """
+        from utils.config import config
+
+        self.root = Path(root) if root else config.get_path("paths.cache_dir") / "snapshots"
+        self.root.mkdir(parents=True, exist_ok=True)
+        if max_mb is None:
+            max_mb = config.get("performance.snapshot_cache_mb", 2048)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._stable: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+        self.session_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.lpn_hits = 0
+        self.lpn_misses = 0
+        self.split_hits = 0
+        self.split_misses = 0
+
+    def _file_hash(self, file: str) -> str:
+        """Хеш содержимого файла (кэшируется по размеру и времени изменения)"""
+        stat = os.stat(file)
+        stamp = (str(Path(file).resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._file_hashes.get(stamp)
+        if cached:
+            return cached
+
+        digest = hashlib.md5()
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[stamp] = value
+        return value
+
+    def key(self, regime: str, vrn: Any, rems_path: Optional[str]) -> str:
+        """Ключ снимка для пары (режим, вариант)"""
+        parts = [self.VERSION, self._file_hash(regime)]
+        if vrn.id == -1:
+            parts.append("normal")
+        else:
+            parts.append(self._file_hash(rems_path) if rems_path else "no-rems")
+            parts.append(str(vrn.num))
+        return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+    def path(self, key: str) -> Path:
+        """Путь к файлу снимка"""
+        return self.root / f"{key}{self.EXTENSION}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Метаданные снимка или None, если снимок отсутствует"""
+        meta_path = self._meta_path(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("is_stable") and not self.path(key).exists():
+            return None
+        # Время изменения используется как время последнего обращения (LRU)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return meta
+
+    def put(self, key: str, rastr: RastrOperations, meta: Dict[str, Any]):
+        """Сохранение подготовленного режима сессии в хранилище"""
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        if meta.get("is_stable"):
+            tmp_path = self.root / f"{key}{suffix}{self.EXTENSION}"
+            rastr.save(str(tmp_path))
+            os.replace(tmp_path, self.path(key))
+        tmp_meta = self.root / f"{key}{suffix}.json"
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_meta, self._meta_path(key))
+        self._evict(keep=key)
+
+    def _evict(self, keep: str):
+        """Удаление давно не использованных снимков сверх ограничения размера"""
+        from utils.logger import logger
+
+        entries = []
+        total = 0
+        for meta_path in self.root.glob("*.json"):
+            key = meta_path.stem
+            if "." in key:
+                continue
+            size = meta_path.stat().st_size
+            snapshot = self.path(key)
+            if snapshot.exists():
+                size += snapshot.stat().st_size
+            entries.append((meta_path.stat().st_mtime, key, size))
+            total += size
+
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for file in (self.path(key), self._meta_path(key)):
+                try:
+                    file.unlink()
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self._stable.pop(key, None)
+            total -= size
+            self.evicted += 1
+            logger.debug(f"Снимок режима {key} удален из хранилища (ограничение размера)")
+
+    def prepare(self, rastr: RastrOperations, regime: str, vrn: Any,
+                rems_path: Optional[str]) -> bool:
+        """
+        Подготовка режима в сессии: загрузка, настройка динамики и применение варианта
+
+        Если сессия уже находится в подготовленном состоянии для этой пары,
+        повторная загрузка не выполняется. Если снимок есть в хранилище,
+        загружается снимок. Иначе режим подготавливается и сохраняется.
+
+        Args:
+            rastr: Сессия RASTR
+            regime: Путь к файлу режима
+            vrn: Вариант (ремонтная схема)
+            rems_path: Путь к файлу ремонтных схем
+
+        Returns:
+            True, если режим после применения варианта сбалансирован
+        """
+        from utils.logger import logger
+
+        key = self.key(regime, vrn, rems_path)
+
+        with self._lock:
+            stable = self._stable.get(key)
+        if stable and rastr.state_key == key:
+            self.session_hits += 1
+            return True
+
+        meta = self.get(key)
+        if meta is not None:
+            is_stable = bool(meta.get("is_stable"))
+            if is_stable:
+                path = self.path(key)
+                try:
+                    rastr.load(str(path))
+                except Exception as e:
+                    if path.exists():
+                        raise
+                    # Снимок удален другим процессом (вытеснение) - режим подготавливается заново
+                    logger.debug(f"Снимок {key} удален до загрузки: {e}")
+                    meta = None
+                else:
+                    rastr.state_key = key
+        if meta is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            rastr.load(regime)
+            rastr.dyn_settings()
+
+            if vrn.id == -1:
+                is_stable = rastr.rgm()
+            elif not rems_path:
+                logger.error(f"Файл ремонтных схем не загружен, но требуется для варианта {vrn.name}")
+                is_stable = False
+            else:
+                is_stable = rastr.apply_variant(vrn.num, rems_path, self._file_hash(regime))
+
+            self.put(key, rastr, {
+                "is_stable": bool(is_stable),
+                "regime": str(regime),
+                "variant": vrn.name,
+            })
+            if is_stable:
+                rastr.state_key = key
+
+        with self._lock:
+            self._stable[key] = bool(is_stable)
+        return bool(is_stable)
+
+    def lpn_scenario(self, rastr: RastrOperations, sechen: str, lapnu: str, lpns: str,
+                     scn: str):
+        """
+        Сценарий с ПА, составленный из файла ЛАПНУ (create_scn_from_lpn)
+
+        Составленный сценарий сохраняется в директории lpn_scn хранилища; ключ -
+        хеш содержимого файлов сечений, ЛАПНУ и сценария и строка номеров LPN,
+        поэтому сценарий переиспользуется между режимами, вариантами и запусками
+        и составляется заново после изменения любого из файлов.
+
+        Args:
+            rastr: Сессия RASTR
+            sechen: Путь к файлу сечений
+            lapnu: Путь к файлу ЛАПНУ (.lpn)
+            lpns: Номера LPN
+            scn: Путь к файлу сценария
+        """
+        parts = [self.VERSION, "lpn", self._file_hash(sechen), self._file_hash(lapnu),
+                 self._file_hash(scn), lpns]
+        key = hashlib.md5("|".join(parts).encode()).hexdigest()
+        path = self.root / "lpn_scn" / f"{key}.scn"
+
+        rastr.load(sechen)
+        if path.exists():
+            self.lpn_hits += 1
+            rastr.load(str(path))
+            return
+
+        self.lpn_misses += 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.scn")
+        rastr.create_scn_from_lpn(lapnu, lpns, scn, str(tmp_path))
+        os.replace(tmp_path, path)
+
+    def split_line(self, rastr: RastrOperations, regime: str, vrn: Any, rems_path: Optional[str],
+                   ip: int, iq: int, np: int, node: int, uhom: float) -> Optional[SplitLine]:
+        """
+        Режим варианта с линией, разделенной узлом КЗ (расчет остаточного напряжения)
+
+        Разделенная линия строится в подготовленном режиме сессии (см. prepare) один
+        раз и сохраняется как снимок; ключ - ключ снимка варианта, линия и номинальное
+        напряжение узла КЗ, поэтому снимок переиспользуется всеми сценариями с КЗ на
+        этой линии. Номер узла КЗ - номер при построении снимка (SplitLine.node).
+
+        Args:
+            rastr: Сессия RASTR с подготовленным режимом варианта
+            regime: Путь к файлу режима
+            vrn: Вариант
+            rems_path: Путь к файлу ремонтных схем
+            ip, iq, np: Ключ линии
+            node: Номер узла КЗ при построении
+            uhom: Номинальное напряжение узла КЗ
+
+        Returns:
+            Разделенная линия или None, если линию не удалось разделить
+        """
+        parts = [self.VERSION, "split", self.key(regime, vrn, rems_path), str(ip), str(iq), str(np), str(uhom)]
+        key = hashlib.md5("|".join(parts).encode()).hexdigest()
+
+        meta = self.get(key)
+        if meta is not None:
+            self.split_hits += 1
+            rastr.load(str(self.path(key)))
+            return SplitLine.attach(rastr, ip, iq, np, meta.get("solved", False))
+
+        self.split_misses += 1
+        split = SplitLine.build(rastr, ip, iq, np, node, uhom)
+        if split is not None:
+            self.put(key, rastr, {
+                "is_stable": True,
+                "regime": str(regime),
+                "variant": vrn.name,
+                "line": f"{ip},{iq},{np}",
+                "solved": bool(split.solved),
+            })
+        return split
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика хранилища"""
+        return {
+            'session_hits': self.session_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evicted': self.evicted,
+            'lpn_hits': self.lpn_hits,
+            'lpn_misses': self.lpn_misses,
+            'split_hits': self.split_hits,
+            'split_misses': self.split_misses,
+        }
+
+    def log_stats(self):
+        """Вывод статистики хранилища в лог"""
+        from utils.logger import logger
+        logger.info(
+            f"Снимки режимов: восстановлено в сессии {self.session_hits}, "
+            f"загружено с диска {self.disk_hits}, подготовлено {self.misses}, удалено {self.evicted}"
+        )
+        if self.lpn_hits or self.lpn_misses:
+            logger.info(
+                f"Сценарии ЛАПНУ: из хранилища {self.lpn_hits}, составлено {self.lpn_misses}"
+            )
+        if self.split_hits or self.split_misses:
+            logger.info(
+                f"Разделенные линии: из хранилища {self.split_hits}, построено {self.split_misses}"
+            )
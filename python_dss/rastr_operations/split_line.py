@@ -0,0 +1,126 @@
+"""
+Линия, разделенная узлом КЗ, для расчета остаточного напряжения
+"""
+
+import cmath
+import math
+from typing import Any, Optional, Tuple
+
+
+class SplitLine:
+    """
+    Линия ip-iq-np, разделенная узлом КЗ
+
+    Исходная линия отключена, ее емкостная проводимость отнесена к узлам ip и iq,
+    узел КЗ и две ветви (ip - узел КЗ, узел КЗ - iq) - последние строки таблиц
+    node и vetv. Сумма сопротивлений ветвей при любом положении КЗ равна
+    сопротивлению линии, а узел КЗ не имеет нагрузки и шунта, поэтому режим
+    остальной сети от положения КЗ не зависит, а напряжение узла КЗ - линейная
+    интерполяция комплексных напряжений узлов ip и iq. Если режим разделенной
+    линии рассчитан (solved), положение КЗ меняется без расчета режима.
+    """
+
+    def __init__(self, ip: int, iq: int, np: int, node: int, node_row: int,
+                 branches: Tuple[int, int], r: float, x: float, solved: bool):
+        """
+        Args:
+            ip, iq, np: Ключ исходной линии
+            node: Номер узла КЗ
+            node_row: Индекс строки узла КЗ
+            branches: Индексы строк ветвей ip - узел КЗ и узел КЗ - iq
+            r, x: Сопротивления исходной линии
+            solved: Режим с разделенной линией рассчитан
+        """
+        self.ip, self.iq, self.np = ip, iq, np
+        self.node = node
+        self.node_row = node_row
+        self.branches = branches
+        self.r = r
+        self.x = x
+        self.solved = solved
+        # Напряжения узлов ip и iq в рассчитанном режиме (читаются при первой смене положения КЗ)
+        self._ends: Optional[Tuple[complex, complex]] = None
+
+    @property
+    def selection(self) -> str:
+        """Выборка исходной линии"""
+        return f"ip = {self.ip} & iq = {self.iq} & np = {self.np}"
+
+    @classmethod
+    def build(cls, rastr: Any, ip: int, iq: int, np: int, node: int,
+              uhom: float) -> Optional["SplitLine"]:
+        """
+        Разделение линии узлом КЗ в режиме сессии с расчетом режима
+
+        Args:
+            rastr: Сессия RASTR (RastrOperations)
+            ip, iq, np: Ключ линии
+            node: Номер добавляемого узла КЗ
+            uhom: Номинальное напряжение узла КЗ
+
+        Returns:
+            Разделенная линия или None, если линию не удалось отключить
+        """
+        selection = f"ip = {ip} & iq = {iq} & np = {np}"
+        r = rastr.get_val("vetv", "r", selection)
+        x = rastr.get_val("vetv", "x", selection)
+        b = rastr.get_val("vetv", "b", selection)
+
+        if not (rastr.set_val("vetv", "sta", selection, 1)
+                and rastr.set_val("node", "bsh", f"ny = {ip}", b / 2.0)
+                and rastr.set_val("node", "bsh", f"ny = {iq}", b / 2.0)):
+            return None
+
+        node_row = int(rastr.add_table_row("node"))
+        rastr.set_val("node", "ny", node_row, node)
+        rastr.set_val("node", "uhom", node_row, uhom)
+
+        branch1 = int(rastr.add_table_row("vetv"))
+        branch2 = int(rastr.add_table_row("vetv"))
+        rastr.set_val("vetv", "ip", branch1, ip)
+        rastr.set_val("vetv", "iq", branch1, node)
+        rastr.set_val("vetv", "ip", branch2, node)
+        rastr.set_val("vetv", "iq", branch2, iq)
+
+        solved = rastr.rgm()
+        return cls(ip, iq, np, node, node_row, (branch1, branch2), r, x, solved)
+
+    @classmethod
+    def attach(cls, rastr: Any, ip: int, iq: int, np: int, solved: bool) -> "SplitLine":
+        """Разделенная линия в режиме сессии, загруженном из файла (см. build)"""
+        node_row = len(rastr.selection("node")) - 1
+        branch2 = len(rastr.selection("vetv")) - 1
+        selection = f"ip = {ip} & iq = {iq} & np = {np}"
+        return cls(ip, iq, np, int(rastr.get_val("node", "ny", node_row)), node_row,
+                   (branch2 - 1, branch2), rastr.get_val("vetv", "r", selection),
+                   rastr.get_val("vetv", "x", selection), solved)
+
+    @staticmethod
+    def _voltage(rastr: Any, ny: int) -> complex:
+        vras = rastr.get_val("node", "vras", f"ny = {ny}")
+        delta = rastr.get_val("node", "delta", f"ny = {ny}")
+        return cmath.rect(vras, math.radians(delta))
+
+    def set(self, rastr: Any, distance: float) -> bool:
+        """
+        Установка положения КЗ
+
+        Args:
+            rastr: Сессия RASTR
+            distance: Расстояние от узла ip, % длины линии
+
+        Returns:
+            True, если расчет режима не потребовался
+        """
+        branch1, branch2 = self.branches
+        rastr.set_line_for_uost_calc(branch1, branch2, self.r, self.x, distance,
+                                     load_flow=not self.solved)
+        if not self.solved:
+            return False
+        if self._ends is None:
+            self._ends = (self._voltage(rastr, self.ip), self._voltage(rastr, self.iq))
+        v_begin, v_end = self._ends
+        voltage = v_begin + (v_end - v_begin) * distance / 100.0
+        rastr.set_val("node", "vras", self.node_row, abs(voltage))
+        rastr.set_val("node", "delta", self.node_row, math.degrees(cmath.phase(voltage)))
+        return True
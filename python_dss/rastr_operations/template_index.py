@@ -0,0 +1,159 @@
+"""
+Индекс шаблонов RASTR по расширению
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class TemplateIndex:
+    """
+    Индекс директории шаблонов: расширение -> путь к шаблону
+
+    Директория сканируется один раз и повторно только после изменения ее
+    времени модификации (проверка не чаще refresh_interval секунд).
+    Результат сканирования сохраняется в paths.cache_dir, поэтому рабочие
+    процессы и следующие запуски не сканируют директорию повторно.
+    """
+
+    # Файлы, которые не используются как шаблоны
+    EXCLUDED_STEMS = ("базовый режим мт",)
+    CACHE_FILE = "template_index.json"
+
+    def __init__(self, cache_file: Optional[Path] = None,
+                 refresh_interval: Optional[float] = None):
+        """
+        Инициализация индекса
+
+        Args:
+            cache_file: Файл сохранения индекса (по умолчанию paths.cache_dir/template_index.json)
+            refresh_interval: Минимальный интервал проверки изменения директории, с
+                (по умолчанию performance.template_index_refresh)
+        """
+        self._cache_file = Path(cache_file) if cache_file else None
+        self._refresh_interval = refresh_interval
+        self._entries: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.scans = 0
+
+    def _interval(self) -> float:
+        if self._refresh_interval is not None:
+            return self._refresh_interval
+        from utils.config import config
+        return config.get("performance.template_index_refresh", 2.0)
+
+    def _cache_path(self) -> Path:
+        if self._cache_file:
+            return self._cache_file
+        from utils.config import config
+        return config.get_path("paths.cache_dir") / self.CACHE_FILE
+
+    def _read_persisted(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self._cache_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _persist(self, key: str, mtime: int, templates: Dict[str, str]):
+        """Сохранение индекса директории в общий файл (атомарная замена)"""
+        path = self._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = self._read_persisted()
+            data[key] = {"mtime_ns": mtime, "templates": templates}
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            from utils.logger import logger
+            logger.debug(f"Не удалось сохранить индекс шаблонов: {e}")
+
+    def _scan(self, template_dir: Path) -> Dict[str, str]:
+        """Однократный проход по директории шаблонов"""
+        templates: Dict[str, str] = {}
+        with os.scandir(template_dir) as entries:
+            for entry in entries:
+                stem, suffix = os.path.splitext(entry.name)
+                if not suffix or stem in self.EXCLUDED_STEMS or not entry.is_file():
+                    continue
+                templates.setdefault(suffix.lower(), entry.path)
+        self.scans += 1
+        return templates
+
+    def templates(self, template_dir: Path) -> Optional[Dict[str, str]]:
+        """
+        Шаблоны директории по расширениям
+
+        Returns:
+            Словарь расширение -> путь или None, если директория недоступна
+        """
+        key = str(template_dir)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - self._checked.get(key, 0.0) < self._interval():
+                self.hits += 1
+                return entry[1]
+
+            try:
+                mtime = os.stat(template_dir).st_mtime_ns
+            except OSError:
+                self._entries.pop(key, None)
+                return None
+            self._checked[key] = now
+            if entry is not None and entry[0] == mtime:
+                self.hits += 1
+                return entry[1]
+
+            persisted = self._read_persisted().get(key)
+            if persisted and persisted.get("mtime_ns") == mtime:
+                templates = persisted["templates"]
+            else:
+                try:
+                    templates = self._scan(template_dir)
+                except OSError:
+                    return None
+                self._persist(key, mtime, templates)
+            self._entries[key] = (mtime, templates)
+            return templates
+
+    def find(self, extension: str, template_dir: Path) -> Optional[str]:
+        """Путь к шаблону с расширением или None"""
+        templates = self.templates(template_dir)
+        if not templates:
+            return None
+        return templates.get(extension.lower())
+
+    def warmup(self, template_dir: Optional[Path] = None):
+        """Построение индекса заранее (при запуске приложения)"""
+        from utils.logger import logger
+
+        if template_dir is None:
+            from utils.config import config
+            template_dir = config.get_path("paths.rastr_template_dir")
+        start = time.perf_counter()
+        templates = self.templates(template_dir)
+        if templates is None:
+            logger.warning(f"Индекс шаблонов не построен, директория недоступна: {template_dir}")
+            return
+        logger.debug(
+            f"Индекс шаблонов {template_dir}: {len(templates)} расширений "
+            f"за {time.perf_counter() - start:.3f} с"
+        )
+
+    def invalidate(self):
+        """Сброс индекса в памяти (файл индекса проверяется по времени изменения)"""
+        with self._lock:
+            self._entries.clear()
+            self._checked.clear()
+
+
+# Глобальный индекс шаблонов, общий для всех сессий RASTR
+template_index = TemplateIndex()
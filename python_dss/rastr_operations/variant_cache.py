@@ -0,0 +1,186 @@
+"""
+Кэш изменений режима, вносимых вариантами (ремонтными схемами)
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Изменения колонки: индексы строк, значения до и после применения варианта
+ColumnDelta = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class VariantDelta:
+    """Изменения таблиц режима при применении варианта"""
+
+    def __init__(self, changes: Dict[Tuple[str, str], ColumnDelta]):
+        self.changes = changes
+
+    @property
+    def cells(self) -> int:
+        """Количество измененных значений"""
+        return sum(len(rows) for rows, _, _ in self.changes.values())
+
+
+class VariantCache:
+    """
+    Изменения режима по вариантам файла ремонтных схем
+
+    При первом применении варианта файл .vrn загружается и вариант применяется
+    средствами RASTR; изменения таблиц режима запоминаются. Разница до и после
+    применения не содержит ячеек, уже имевших значения варианта, поэтому
+    запомненные изменения верны только для того же исходного режима. Ключ -
+    хеш содержимого файла, номер варианта и ключ исходного режима: хеш файла
+    режима, если он передан (повторное применение - только запись измененных
+    значений), иначе хеш содержимого таблиц режима. Хеш содержимого таблиц
+    проверяется и при промахе по хешу файла режима (тот же режим из другого файла).
+    """
+
+    def __init__(self, tables: Optional[Sequence[str]] = None):
+        """
+        Args:
+            tables: Таблицы режима, изменяемые вариантами
+                (по умолчанию performance.variant_tables)
+        """
+        self._tables = list(tables) if tables is not None else None
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+        # Ключ: (хеш файла ремонтных схем, номер варианта, вид ключа режима, ключ режима)
+        self._deltas: Dict[Tuple[str, int, str, str], VariantDelta] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def tables(self) -> List[str]:
+        """Таблицы режима, изменения которых запоминаются"""
+        if self._tables is not None:
+            return self._tables
+        from utils.config import config
+        return list(config.get("performance.variant_tables", ["node", "vetv", "Generator"]))
+
+    def _file_hash(self, file: str) -> str:
+        """Хеш содержимого файла (кэшируется по размеру и времени изменения)"""
+        stat = os.stat(file)
+        stamp = (str(Path(file).resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._file_hashes.get(stamp)
+        if cached:
+            return cached
+        digest = hashlib.md5()
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        with self._lock:
+            self._file_hashes[stamp] = digest.hexdigest()
+        return self._file_hashes[stamp]
+
+    @staticmethod
+    def _layout(rastr: Any, tables: Sequence[str]) -> Tuple[List[str], Tuple[int, ...]]:
+        """Таблицы, имеющиеся в сессии, и количество строк в них"""
+        existing, sizes = [], []
+        for name in tables:
+            try:
+                sizes.append(len(rastr.selection(name)))
+            except Exception:
+                continue
+            existing.append(name)
+        return existing, tuple(sizes)
+
+    def _read(self, rastr: Any, tables: Sequence[str]) -> Dict[Tuple[str, str], np.ndarray]:
+        """Все колонки таблиц режима"""
+        return {(name, col): rastr.get_column(name, col)
+                for name in tables for col in rastr.columns(name)}
+
+    @staticmethod
+    def _content_hash(values: Dict[Tuple[str, str], np.ndarray]) -> str:
+        """Хеш содержимого таблиц режима"""
+        digest = hashlib.md5()
+        for (name, col), column in sorted(values.items()):
+            digest.update(f"{name}.{col}:".encode())
+            digest.update(repr(column.tolist()).encode())
+        return digest.hexdigest()
+
+    def apply(self, rastr: Any, num: int, file: str, regime_key: Optional[str] = None):
+        """
+        Применение варианта num файла file к режиму сессии (без расчета режима)
+
+        Args:
+            rastr: Сессия RASTR (RastrOperations) с загруженным режимом
+            num: Номер варианта
+            file: Путь к файлу ремонтных схем
+            regime_key: Хеш файла загруженного режима (режим не изменялся после загрузки)
+        """
+        from utils.logger import logger
+
+        file_hash = self._file_hash(file)
+        regime = (file_hash, num, "regime", regime_key) if regime_key is not None else None
+        if regime is not None:
+            with self._lock:
+                delta = self._deltas.get(regime)
+            if delta is not None:
+                self._write(rastr, delta)
+                return
+
+        tables, _ = self._layout(rastr, self.tables())
+        before = self._read(rastr, tables)
+        content = (file_hash, num, "content", self._content_hash(before))
+        with self._lock:
+            delta = self._deltas.get(content)
+            if delta is not None and regime is not None:
+                self._deltas[regime] = delta
+        if delta is not None:
+            self._write(rastr, delta)
+            return
+
+        rastr.load_variant(num, file)
+        after = self._read(rastr, tables)
+
+        with self._lock:
+            self.misses += 1
+        changes = {}
+        for col, old in before.items():
+            new = after.get(col)
+            if new is None or len(new) != len(old):
+                # Вариант изменил состав строк - изменения не кэшируются
+                return
+            rows = np.flatnonzero(old != new)
+            if rows.size:
+                changes[col] = (rows, old[rows], new[rows])
+        delta = VariantDelta(changes)
+        with self._lock:
+            self._deltas[content] = delta
+            if regime is not None:
+                self._deltas[regime] = delta
+        logger.debug(f"Вариант {num}: запомнено изменений {delta.cells}")
+
+    def _write(self, rastr: Any, delta: VariantDelta):
+        """Запись запомненных изменений в режим сессии"""
+        for (name, col), (rows, _, after) in delta.changes.items():
+            rastr.set_column(name, col, rows.tolist(), after)
+        with self._lock:
+            self.hits += 1
+
+    def clear(self):
+        """Очистка кэша"""
+        with self._lock:
+            self._deltas.clear()
+            self._file_hashes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика кэша"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def log_stats(self):
+        """Вывод статистики кэша в лог"""
+        from utils.logger import logger
+        logger.info(
+            f"Варианты: применено из кэша {self.hits}, через RASTR {self.misses}"
+        )
+
+
+# Кэш процесса (общий для всех сессий)
+variant_cache = VariantCache()
@@ -0,0 +1,71 @@
+"""
+Траектория утяжеления: перетоки в сечениях в зависимости от суммы шагов
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class WeightingTrajectory:
+    """
+    Траектория утяжеления, записанная за один проход step_ut
+
+    Точки - сумма шагов sum_kfc и перетоки psech всех строк таблицы sechen
+    после каждого шага. Переток при промежуточной сумме шагов и сумма шагов
+    для заданного перетока находятся линейной интерполяцией между точками.
+    """
+
+    def __init__(self, sum_kfc: np.ndarray, psech: np.ndarray, kfc: float = 0.0):
+        """
+        Args:
+            sum_kfc: Суммы шагов в точках траектории
+            psech: Перетоки в точках (строка - точка, колонка - строка таблицы sechen)
+            kfc: Шаг записи
+        """
+        order = np.argsort(sum_kfc, kind="stable")
+        self.sum_kfc = np.asarray(sum_kfc, dtype=float)[order]
+        self.psech = np.asarray(psech, dtype=float).reshape(len(order), -1)[order]
+        self.kfc = kfc
+
+    def __len__(self) -> int:
+        return len(self.sum_kfc)
+
+    @property
+    def limit(self) -> float:
+        """Сумма шагов в последней по направлению утяжеления точке"""
+        if not len(self):
+            return 0.0
+        return float(self.sum_kfc[-1] if self.kfc >= 0 else self.sum_kfc[0])
+
+    def covers(self, step: float) -> bool:
+        """Сумма шагов в пределах траектории"""
+        return len(self) > 1 and self.sum_kfc[0] <= step <= self.sum_kfc[-1]
+
+    def value(self, step: float, row: int = 0) -> float:
+        """Переток в строке row таблицы sechen при сумме шагов step"""
+        return float(np.interp(step, self.sum_kfc, self.psech[:, row]))
+
+    def step_for(self, value: float, row: int = 0) -> Optional[float]:
+        """
+        Сумма шагов, при которой переток в строке row равен value
+
+        Переток вдоль траектории может быть немонотонным (у предела утяжеления
+        он обычно перестает расти), поэтому интерполяция выполняется на первом
+        по направлению утяжеления отрезке между точками, содержащем value.
+
+        Returns:
+            Сумма шагов или None, если переток вне траектории
+        """
+        if len(self) < 2:
+            return None
+        p = self.psech[:, row]
+        # Точки в порядке утяжеления (от исходного режима к пределу)
+        order = np.arange(len(self)) if self.kfc >= 0 else np.arange(len(self))[::-1]
+        for a, b in zip(order[:-1], order[1:]):
+            p_a, p_b = p[a], p[b]
+            if min(p_a, p_b) <= value <= max(p_a, p_b):
+                if p_a == p_b:
+                    return float(self.sum_kfc[a])
+                return float(self.sum_kfc[a] + (self.sum_kfc[b] - self.sum_kfc[a]) * (value - p_a) / (p_b - p_a))
+        return None
@@ -34,3 +34,54 @@ def sample_data_info():
     from data_info import DataInfo
     return DataInfo()
 
+
+@pytest.fixture
+def rastr_templates(temp_dir, monkeypatch):
+    """Директория шаблонов RASTR для имитации COM-объекта"""
+    from utils.config import config
+    from tests.fake_rastr import write_template
+
+    template_dir = temp_dir / "SHABLON"
+    template_dir.mkdir()
+    regime_tables = {
+        "node": ["ny", "uhom", "vras"],
+        "vetv": ["ip", "iq", "np", "r", "x"],
+        "com_regim": ["it_max", "dv_min"],
+        "com_dynamics": ["Tras", "MaxResultFiles", "SnapAutoLoad", "SnapMaxCount"],
+    }
+    write_template(template_dir / "режим.rst", regime_tables)
+    write_template(template_dir / "режим.rg2", regime_tables)
+    write_template(template_dir / "сценарий.scn", {
+        "DFWAutoActionScn": ["Id", "Type", "Formula", "ObjectClass", "ObjectProp",
+                             "ObjectKey", "RunsCount", "TimeStart", "DT"],
+    })
+    write_template(template_dir / "динамика.dfw", {"fake_dfw": ["id"]})
+    write_template(template_dir / "ремонты.vrn", {
+        "fake_variants": ["num", "table", "sel", "col", "value"],
+        "var_mer": ["Num", "Type"],
+    })
+    write_template(template_dir / "сечения.sch", {"sechen": ["ns", "psech", "p0", "dp"]})
+    write_template(template_dir / "лапну.lpn", {"fake_lpn": ["num", "lpn"]})
+    write_template(template_dir / "траектория.ut2", {"ut_common": ["kfc", "sum_kfc", "limit"]})
+    monkeypatch.setitem(config._config["paths"], "rastr_template_dir", str(template_dir))
+    monkeypatch.setitem(config._config["paths"], "cache_dir", str(temp_dir / "cache"))
+    return template_dir
+
+
+@pytest.fixture
+def regime_files(rastr_templates, temp_dir):
+    """Файлы режима и ремонтных схем для имитации COM-объекта"""
+    from tests.fake_rastr import write_json
+
+    regime = write_json(temp_dir / "режим.rst", {
+        "node": {"ny": [1, 2], "uhom": [110, 110], "vras": [115, 112]},
+        "vetv": {"ip": [1], "iq": [2], "np": [0], "r": [1.0], "x": [10.0]},
+        "com_regim": {"it_max": [20], "dv_min": [0.5]},
+        "com_dynamics": {"Tras": [5.0], "MaxResultFiles": [0],
+                         "SnapAutoLoad": [0], "SnapMaxCount": [0]},
+    })
+    rems = write_json(temp_dir / "ремонты.vrn", {
+        "fake_variants": {"num": [1], "table": ["vetv"], "sel": ["ip = 1 & iq = 2"],
+                          "col": ["x"], "value": [20.0]},
+    })
+    return regime, rems
@@ -0,0 +1,449 @@
+"""
+Имитация COM-объекта RASTR для тестов на платформах без ASTRALib
+
+Файлы режимов, сценариев и шаблонов в тестах - это JSON вида
+{"tables": {"node": {"ny": [1, 2], "uhom": [110, 110]}}}.
+Шаблон описывает набор таблиц, которые сбрасываются при NewFile.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+
+
+def _parse_value(text: str) -> Any:
+    text = text.strip().strip("'\"")
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _compare(left: Any, op: str, right: Any) -> bool:
+    try:
+        if isinstance(right, (int, float)) and not isinstance(left, (int, float)):
+            left = float(left)
+    except (TypeError, ValueError):
+        return False
+    if op == "=":
+        return left == right
+    if op == "!=":
+        return left != right
+    if op == "<":
+        return left < right
+    if op == ">":
+        return left > right
+    if op == "<=":
+        return left <= right
+    return left >= right
+
+
+class FakeCol:
+    """Колонка таблицы"""
+
+    def __init__(self, table: "FakeTable", name: str):
+        self._table = table
+        self.Name = name
+
+    def Z(self, index: int) -> Any:
+        self._table.rastr.count("Z")
+        return self._table.data[self.Name][int(index)]
+
+    def SetZ(self, index: int, value: Any):
+        self._table.rastr.count("SetZ")
+        self._table.data[self.Name][int(index)] = value
+
+
+class FakeCols:
+    """Коллекция колонок таблицы"""
+
+    def __init__(self, table: "FakeTable"):
+        self._table = table
+
+    def Item(self, name: Any) -> FakeCol:
+        self._table.rastr.count("Cols.Item")
+        if isinstance(name, int):
+            name = list(self._table.data)[name]
+        if name not in self._table.data:
+            # RASTR создает вычисляемые колонки по шаблону, в имитации - по запросу
+            self._table.data[name] = [0] * self._table.size
+        return FakeCol(self._table, name)
+
+    @property
+    def Count(self) -> int:
+        self._table.rastr.count("Cols.Count")
+        return len(self._table.data)
+
+
+class FakeTable:
+    """Таблица RASTR"""
+
+    def __init__(self, rastr: "FakeRastr", name: str, data: Optional[Dict[str, List[Any]]] = None):
+        self.rastr = rastr
+        self.name = name
+        self.data: Dict[str, List[Any]] = {k: list(v) for k, v in (data or {}).items()}
+        self._sel: List[int] = []
+
+    @property
+    def size(self) -> int:
+        return max((len(v) for v in self.data.values()), default=0)
+
+    @property
+    def Cols(self) -> FakeCols:
+        self.rastr.count("Table.Cols")
+        return FakeCols(self)
+
+    @property
+    def Size(self) -> int:
+        self.rastr.count("Size")
+        return self.size
+
+    def AddRow(self):
+        self.rastr.count("AddRow")
+        for values in self.data.values():
+            values.append(0)
+
+    def rows(self, selection: str) -> List[int]:
+        """Индексы строк, удовлетворяющих выборке"""
+        if not selection or not selection.strip():
+            return list(range(self.size))
+        result = []
+        for idx in range(self.size):
+            ok = True
+            for part in selection.split("&"):
+                match = _CONDITION.match(part)
+                if not match:
+                    raise ValueError(f"Некорректная выборка: {selection}")
+                col, op, value = match.groups()
+                left = self.data.get(col, [0] * self.size)[idx]
+                if not _compare(left, op, _parse_value(value)):
+                    ok = False
+                    break
+            if ok:
+                result.append(idx)
+        return result
+
+    def SetSel(self, selection: str):
+        self.rastr.count("SetSel")
+        self._sel = self.rows(selection)
+
+    def FindNextSel(self, index: int) -> int:
+        self.rastr.count("FindNextSel")
+        for idx in self._sel:
+            if idx > index:
+                return idx
+        return -1
+
+    def ReadSafeArray(self, mode: int, cols: str, selection: str):
+        if not self.rastr.safe_arrays:
+            raise AttributeError("ReadSafeArray")
+        self.rastr.count("ReadSafeArray")
+        names = [c.strip() for c in cols.split(",")]
+        return tuple(
+            tuple(self.data[name][idx] for name in names) for idx in self.rows(selection)
+        )
+
+    def WriteSafeArray(self, cols: str, selection: str, values):
+        if not self.rastr.safe_arrays:
+            raise AttributeError("WriteSafeArray")
+        self.rastr.count("WriteSafeArray")
+        names = [c.strip() for c in cols.split(",")]
+        rows = self.rows(selection)
+        if len(rows) != len(values):
+            raise ValueError("Размер массива не совпадает с выборкой")
+        for idx, row in zip(rows, values):
+            for name, value in zip(names, row):
+                self.data[name][idx] = value
+
+
+class FakeTables:
+    """Коллекция таблиц"""
+
+    def __init__(self, rastr: "FakeRastr"):
+        self._rastr = rastr
+
+    def Item(self, name: str) -> FakeTable:
+        self._rastr.count("Tables.Item")
+        if name not in self._rastr.tables:
+            raise KeyError(f"Таблица {name} не найдена")
+        return self._rastr.tables[name]
+
+
+class FakeFWDynamic:
+    """Результат запуска динамики"""
+
+    def __init__(self, rastr: "FakeRastr"):
+        self._rastr = rastr
+        self.SyncLossCause = 0
+        self.ResultMessage = ""
+        self.TimeReached = 0.0
+
+    def _run(self, ems: bool) -> int:
+        self._rastr.count("FWDynamic.Run")
+        self._rastr.dynamic_runs += 1
+        ret_code, stable, time_reached = self._rastr.dynamic_model(self._rastr, ems)
+        self.SyncLossCause = 0 if stable else 1
+        self.TimeReached = time_reached
+        self.ResultMessage = "" if stable else "Потеря синхронизма"
+        return ret_code
+
+    def Run(self) -> int:
+        return self._run(False)
+
+    def RunEMSmode(self) -> int:
+        return self._run(True)
+
+
+def stable_dynamic_model(rastr: "FakeRastr", ems: bool):
+    """Модель динамики по умолчанию: всегда устойчиво"""
+    return 0, True, rastr.value("com_dynamics", "Tras", 0, 5.0)
+
+
+def critical_time_model(rastr: "FakeRastr", ems: bool):
+    """
+    Модель динамики с критическим временем КЗ
+
+    Критическое время задается колонкой CrtTime сценария и обратно
+    пропорционально сопротивлению первой ветви (x = 10 - без изменений).
+    Процесс устойчив, если длительность КЗ в узле не превышает критическую.
+    """
+    scn = rastr.tables.get("DFWAutoActionScn")
+    if scn is None or "CrtTime" not in scn.data:
+        return stable_dynamic_model(rastr, ems)
+    crt_time = scn.data["CrtTime"][0] * 10.0 / rastr.value("vetv", "x", 0, 10.0)
+    durations = [dt for cls, dt in zip(scn.data.get("ObjectClass", []), scn.data.get("DT", []))
+                 if cls == "node"]
+    stable = all(dt <= crt_time + 1e-9 for dt in durations)
+    tras = rastr.value("com_dynamics", "Tras", 0, 5.0)
+    return 0, stable, tras if stable else min(durations) + 1.0
+
+
+def weighting_model(rastr: "FakeRastr", param: str) -> int:
+    """
+    Модель утяжеления: переток сечения линейно зависит от суммы шагов
+
+    psech = p0 + dp * sum_kfc (+ dp2 * sum_kfc^2, если в сечениях есть колонка dp2);
+    шаг "z" увеличивает sum_kfc на kfc до предела limit (колонки ut_common берутся
+    из первой строки файла траектории).
+    """
+    ut = rastr.tables.get("ut_common")
+    if ut is None or "limit" not in ut.data:
+        return 1
+    if param == "i":
+        ut.data["sum_kfc"][0] = 0.0
+        result = 1
+    else:
+        total = ut.data["sum_kfc"][0] + ut.data["kfc"][0]
+        result = 1 if total >= ut.data["limit"][0] else 0
+        ut.data["sum_kfc"][0] = min(total, ut.data["limit"][0])
+    sechen = rastr.tables.get("sechen")
+    if sechen is not None:
+        total = ut.data["sum_kfc"][0]
+        dp2 = sechen.data.get("dp2", [0.0] * len(sechen.data["p0"]))
+        sechen.data["psech"] = [p0 + dp * total + k2 * total * total
+                                for p0, dp, k2 in zip(sechen.data["p0"], sechen.data["dp"], dp2)]
+    return result
+
+
+def transfer_limit_model(rastr: "FakeRastr", ems: bool):
+    """
+    Модель динамики с предельным перетоком: устойчиво, если psech первого сечения
+    не больше Pmax сценария (плюс прирост dPmax от ПА, загруженной в таблицу fake_pa)
+    """
+    scn = rastr.tables.get("DFWAutoActionScn")
+    if scn is None or "Pmax" not in scn.data:
+        return stable_dynamic_model(rastr, ems)
+    p_max = scn.data["Pmax"][0] + rastr.value("fake_pa", "dPmax", 0, 0.0)
+    stable = rastr.value("sechen", "psech", 0, 0.0) <= p_max
+    tras = rastr.value("com_dynamics", "Tras", 0, 5.0)
+    return 0, stable, tras if stable else 1.0
+
+
+def fault_distance_model(x_critical: float) -> Callable:
+    """
+    Модель динамики для КЗ на разделенной линии: устойчиво, если сопротивление
+    ветви от начала линии до узла КЗ (предпоследняя строка vetv) не меньше x_critical
+    """
+    def model(rastr: "FakeRastr", ems: bool):
+        vetv = rastr.tables.get("vetv")
+        if vetv is None or vetv.size < 3:
+            return stable_dynamic_model(rastr, ems)
+        stable = vetv.data["x"][-2] >= x_critical
+        tras = rastr.value("com_dynamics", "Tras", 0, 5.0)
+        return 0, stable, tras if stable else 1.0
+    return model
+
+
+def shunt_voltage_model(u_source: float, z_source: complex) -> Callable:
+    """
+    Модель динамики для поиска шунта КЗ: остаточное напряжение делителя
+
+    U = u_source * |Zш| / |Zш + z_source|, где Zш собирается из строк сценария
+    с ObjectProp x/r; результат передается в протокол OnLog, как в RASTR.
+    """
+    def model(rastr: "FakeRastr", ems: bool):
+        scn = rastr.tables.get("DFWAutoActionScn")
+        shunt = {"x": 0.0, "r": 0.0}
+        node = 0
+        if scn is not None:
+            for prop, formula, key in zip(scn.data.get("ObjectProp", []),
+                                          scn.data.get("Formula", []),
+                                          scn.data.get("ObjectKey", [])):
+                if prop in shunt:
+                    shunt[prop] = float(formula)
+                    node = key
+        z_shunt = complex(shunt["r"], shunt["x"])
+        u = u_source * abs(z_shunt) / abs(z_shunt + z_source)
+        rastr.OnLog.fire(0, 0, 0, "node", 0,
+                         f"Величина остаточного напряжения в узле {node} (Uкз={u:.4f} кВ, t=1.06 с)", "")
+        return stable_dynamic_model(rastr, ems)
+    return model
+
+
+class FakeEvent:
+    """Событие COM-объекта: подключение обработчиков через += и -="""
+
+    def __init__(self):
+        self.handlers: List[Callable] = []
+
+    def __iadd__(self, handler: Callable) -> "FakeEvent":
+        self.handlers.append(handler)
+        return self
+
+    def __isub__(self, handler: Callable) -> "FakeEvent":
+        self.handlers.remove(handler)
+        return self
+
+    def fire(self, *args):
+        for handler in list(self.handlers):
+            handler(*args)
+
+
+class FakeRastr:
+    """Имитация COM-объекта Astra.Rastr"""
+
+    def __init__(self, dynamic_model: Optional[Callable] = None,
+                 rgm_model: Optional[Callable] = None, safe_arrays: bool = True,
+                 ut_model: Optional[Callable] = None):
+        self.calls: Counter = Counter()
+        self.safe_arrays = safe_arrays
+        self.tables: Dict[str, FakeTable] = {}
+        self.Tables = FakeTables(self)
+        self.dynamic_model = dynamic_model or stable_dynamic_model
+        self.rgm_model = rgm_model or (lambda rastr: 0)
+        self.ut_model = ut_model or (lambda rastr, param: 1)
+        self.dynamic_runs = 0
+        self.loaded: List[str] = []
+        self.OnLog = FakeEvent()
+
+    # ----- служебные методы имитации -----
+
+    def count(self, name: str):
+        self.calls[name] += 1
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def table(self, name: str) -> FakeTable:
+        if name not in self.tables:
+            self.tables[name] = FakeTable(self, name)
+        return self.tables[name]
+
+    def value(self, table: str, col: str, index: int, default: Any = None) -> Any:
+        try:
+            return self.tables[table].data[col][index]
+        except (KeyError, IndexError):
+            return default
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+
+    # ----- COM-интерфейс -----
+
+    def NewFile(self, shabl: str):
+        self.count("NewFile")
+        template = self._read(shabl)
+        for name, cols in template.get("tables", {}).items():
+            self.tables[name] = FakeTable(self, name, {c: [] for c in cols})
+
+    def Load(self, kd: int, name: str, shabl: str):
+        self.count("Load")
+        self.loaded.append(name)
+        content = self._read(name)
+        for table_name, cols in content.get("tables", {}).items():
+            table = self.table(table_name)
+            if kd == 0 or not table.data:
+                table.data = {k: list(v) for k, v in cols.items()}
+            else:
+                size = table.size
+                for col in set(table.data) | set(cols):
+                    table.data.setdefault(col, [0] * size).extend(
+                        cols.get(col, [0] * len(next(iter(cols.values()), [])))
+                    )
+
+    def Save(self, name: str, shabl: str):
+        self.count("Save")
+        # Сохраняются только таблицы шаблона (как в RASTR)
+        names = set(self._read(shabl).get("tables", {})) if shabl else set(self.tables)
+        content = {
+            "tables": {n: {k: list(v) for k, v in t.data.items()}
+                       for n, t in self.tables.items() if n in names}
+        }
+        Path(name).write_text(json.dumps(content), encoding="utf-8")
+
+    def rgm(self, param: str) -> int:
+        self.count("rgm")
+        return self.rgm_model(self)
+
+    def ApplyVariant(self, num: int, *args):
+        self.count("ApplyVariant")
+        variants = self.tables.get("fake_variants")
+        if variants is None:
+            return
+        for idx in range(variants.size):
+            if variants.data["num"][idx] != num:
+                continue
+            target = self.tables[variants.data["table"][idx]]
+            for row in target.rows(variants.data["sel"][idx]):
+                target.data[variants.data["col"][idx]][row] = variants.data["value"][idx]
+
+    def FWDynamic(self) -> FakeFWDynamic:
+        self.count("FWDynamic")
+        return FakeFWDynamic(self)
+
+    def GetChainedGraphSnapshot(self, table: str, col: str, index: int, snapshot: int) -> list:
+        """Графики расчета динамики в имитации не записываются"""
+        self.count("GetChainedGraphSnapshot")
+        return []
+
+    def step_ut(self, param: str) -> int:
+        self.count("step_ut")
+        return self.ut_model(self, param)
+
+    def LAPNUSMZU(self, param: str) -> int:
+        """Составление сценария ПА: одно действие с номерами LPN в Formula"""
+        self.count("LAPNUSMZU")
+        self.table("DFWAutoActionScn").data = {"ObjectClass": ["lapnu"], "Formula": [param]}
+        return 0
+
+
+def write_json(path: Path, tables: Dict[str, Dict[str, List[Any]]]) -> str:
+    """Запись файла режима/сценария/шаблона для имитации"""
+    path.write_text(json.dumps({"tables": tables}), encoding="utf-8")
+    return str(path)
+
+
+def write_template(path: Path, tables: Dict[str, List[str]]) -> str:
+    """Запись файла шаблона: таблица -> список колонок"""
+    path.write_text(json.dumps({"tables": tables}), encoding="utf-8")
+    return str(path)
@@ -0,0 +1,151 @@
+"""
+Тесты для стратегий поиска границы устойчивости
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from utils.boundary_search import BOUNDARY_SEARCHES, find_boundary, make_boundary_search
+
+
+# Синтетические зависимости перетока в сечении от шага утяжеления x в [-90, 0]
+CURVES = {
+    "linear": lambda x: 500.0 + 5.0 * x,
+    "convex": lambda x: 500.0 + 5.0 * x * (1 + x / 250.0),
+    "saturating": lambda x: 500.0 - 450.0 * (1 - math.exp(x / 40.0)) / (1 - math.exp(-90.0 / 40.0)),
+}
+MAX_STEP = 90.0
+PRECISION = 10.0
+
+
+def search(method, curve, limit, max_probes=100, known=False):
+    """
+    Поиск предела перетока limit по кривой: устойчиво, если переток не больше limit
+
+    known - зависимость перетока от шага известна по точкам через 10 шагов
+    (как траектория утяжеления)
+    """
+    p = CURVES[curve]
+    kwargs = {}
+    if known:
+        steps = np.linspace(-MAX_STEP, 0.0, 10)
+        values = np.array([p(x) for x in steps])
+        kwargs = dict(curve=lambda x: float(np.interp(x, steps, values)) if -MAX_STEP <= x <= 0 else None,
+                      inverse=lambda y: float(np.interp(y, values, steps)) if values[0] <= y <= values[-1] else None)
+    strategy = make_boundary_search(method, (0.0, p(0.0)), -MAX_STEP, PRECISION, **kwargs)
+    return find_boundary(lambda x: (x, p(x), p(x) <= limit), strategy, max_probes)
+
+
+class TestBoundarySearch:
+    """Тесты стратегий на синтетических кривых"""
+
+    @pytest.mark.parametrize("method", sorted(BOUNDARY_SEARCHES))
+    @pytest.mark.parametrize("curve", sorted(CURVES))
+    @pytest.mark.parametrize("limit", [230.0, 301.0, 449.0, 495.0])
+    @pytest.mark.parametrize("known", [False, True])
+    def test_converges(self, method, curve, limit, known):
+        """Тест нахождения предела с заданной точностью и устойчивой последней пробой"""
+        result = search(method, curve, limit, known=known)
+
+        assert result.converged
+        assert result.stable
+        assert limit - PRECISION <= result.y <= limit
+        assert result.probes == len(result.history)
+
+    def test_benchmark(self):
+        """Сравнение количества расчетов динамики: деление пополам по шагу и шаг по известной кривой"""
+        limits = range(220, 500, 7)
+        for curve in ("convex", "saturating"):
+            bisection = sum(search("bisection", curve, limit).probes for limit in limits)
+            secant = sum(search("secant", curve, limit, known=True).probes for limit in limits)
+
+            assert secant < bisection
+
+    def test_interpolation(self):
+        """Тест шага по интерполяции y(x) вместо середины интервала по x"""
+        strategy = make_boundary_search("secant", (0.0, 900.0), -90.0, 1.0)
+        strategy.add(-25.0, 150.0, True)
+        strategy.add(-10.0, 400.0, False)
+        strategy.add(-20.0, 200.0, True)
+
+        # Переток 300 - по интерполяции через концы интервала и ближайшую пробу, а не при x = -15
+        x = strategy.next_x()
+        assert -15.0 < x < -10.0
+
+    def test_expand_bracket(self):
+        """Тест расширения интервала, если предел за предполагаемой устойчивой границей"""
+        result = search("bisection", "linear", 20.0)
+
+        assert result.converged
+        assert result.x < -MAX_STEP
+        assert 10.0 <= result.y <= 20.0
+
+    def test_restore_stable(self):
+        """Тест повторной пробы устойчивой границы, если последняя проба неустойчива"""
+        strategy = make_boundary_search("bisection", (0.0, 500.0), -90.0, 10.0)
+        strategy.add(-45.0, 275.0, True)
+        strategy.add(-44.0, 280.0, False)
+
+        assert strategy.done()
+        assert strategy.next_x() == -45.0
+
+    @pytest.mark.parametrize("method", sorted(BOUNDARY_SEARCHES))
+    def test_seeded(self, method):
+        """Тест поиска от известной устойчивой точки с первой пробой по прогнозу предела"""
+        p = CURVES["linear"]
+        probes = []
+
+        def probe(x):
+            probes.append(x)
+            return x, p(x), p(x) <= 350.0
+
+        strategy = make_boundary_search(method, (0.0, p(0.0)), -MAX_STEP, PRECISION, stable=(-40.0, p(-40.0)))
+        result = find_boundary(probe, strategy, first=[-26.0])
+
+        assert result.converged
+        assert 350.0 - PRECISION <= result.y <= 350.0
+        assert probes[0] == -26.0
+        assert all(-40.0 <= x <= -26.0 for x in probes)
+        assert result.probes < search(method, "linear", 350.0).probes
+
+    def test_bracket_guesses(self):
+        """Сравнение количества расчетов динамики: поиск места КЗ с пробами по предыдущей границе и без них"""
+        tolerance = 0.5
+        boundaries = [40.0 + 3.0 * math.sin(k) for k in range(20)]
+
+        def find(boundary, first=()):
+            # Устойчиво, если КЗ дальше границы от начала линии
+            strategy = make_boundary_search("bisection", (0.1, 0.1), 99.9, tolerance, stable=(99.9, 99.9))
+            return find_boundary(lambda x: (x, x, x >= boundary), strategy, 50, first)
+
+        cold = [find(boundary) for boundary in boundaries]
+        warm = [find(boundary, [previous + 2 * tolerance, previous - 2 * tolerance])
+                for previous, boundary in zip(boundaries, boundaries[1:])]
+
+        for boundary, result in zip(boundaries[1:], warm):
+            assert result.converged
+            assert boundary <= result.x <= boundary + tolerance
+        assert sum(result.probes for result in warm) < sum(result.probes for result in cold[1:])
+
+    def test_max_probes(self):
+        """Тест ограничения количества проб"""
+        result = search("secant", "linear", 301.0, max_probes=2)
+
+        assert not result.converged
+        assert result.probes == 2
+
+    def test_probe_failed(self):
+        """Тест прерывания поиска, если расчет не выполнен"""
+        strategy = make_boundary_search("secant", (0.0, 500.0), -90.0, 10.0)
+        result = find_boundary(lambda x: None, strategy)
+
+        assert not result.converged
+        assert result.probes == 0
+        assert result.x == 0.0
+
+    def test_unknown_method(self):
+        """Тест ошибки для неизвестной стратегии"""
+        with pytest.raises(ValueError):
+            make_boundary_search("golden", (0.0, 500.0), -90.0, 10.0)
@@ -0,0 +1,194 @@
+"""
+Тесты оценки критического времени отключения КЗ по правилу площадей
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from calculations import cct_screening, thevenin
+from calculations.cct_screening import (
+    SCREENED, TRIVIALLY_STABLE, TRIVIALLY_UNSTABLE,
+    equal_area_cct, screen_scenario, transfer_susceptance,
+)
+from rastr_operations import RastrOperations
+from tests.fake_rastr import FakeRastr
+
+
+def first_swing_stable(tj, pm, pmax_pre, pmax_fault, pmax_post, t_clear,
+                       frequency=50.0, dt=1e-4, duration=2.0):
+    """Прямое интегрирование уравнения движения ротора эквивалентной машины"""
+    omega = 2 * math.pi * frequency
+    delta = np.arcsin(pm / pmax_pre)
+    speed = np.zeros_like(delta)
+    stable = np.ones(delta.shape, dtype=bool)
+    for step in range(int(duration / dt)):
+        pmax = np.where(step * dt < t_clear, pmax_fault, pmax_post)
+        speed += dt * omega * (pm - pmax * np.sin(delta)) / tj
+        delta += dt * speed
+        stable &= delta < math.pi
+    return stable
+
+
+class TestEqualAreaCct:
+    """Тесты расчета критического времени эквивалентной машины"""
+
+    # Tj, Pm, Pmax до КЗ, при КЗ, после КЗ
+    SYSTEMS = np.array([
+        [7.0, 0.8, 2.0, 0.0, 1.6],
+        [10.0, 0.9, 2.2, 0.0, 1.2],
+        [6.0, 0.7, 1.8, 0.3, 1.5],
+        [8.0, 1.0, 2.5, 0.6, 2.0],
+    ]).T
+
+    def test_matches_simulation(self):
+        """Тест оценки по прямому интегрированию: устойчиво чуть раньше и неустойчиво чуть позже"""
+        cct, status = equal_area_cct(*self.SYSTEMS)
+
+        assert (status == SCREENED).all()
+        assert (cct > 0.05).all() and (cct < 1.0).all()
+        assert first_swing_stable(*self.SYSTEMS, cct * 0.97).all()
+        assert not first_swing_stable(*self.SYSTEMS, cct * 1.03).any()
+
+    def test_closed_form(self):
+        """Тест аналитического решения при отсутствии передачи мощности во время КЗ"""
+        tj, pm, pmax_pre, pmax_post = 7.0, 0.8, 2.0, 1.6
+        delta0 = math.asin(pm / pmax_pre)
+        delta_max = math.pi - math.asin(pm / pmax_post)
+        delta_clear = math.acos(pm * (delta_max - delta0) / pmax_post + math.cos(delta_max))
+        expected = math.sqrt(2 * tj * (delta_clear - delta0) / (2 * math.pi * 50 * pm))
+
+        cct, _ = equal_area_cct([tj], [pm], [pmax_pre], [0.0], [pmax_post])
+        assert cct[0] == pytest.approx(expected)
+
+    def test_trivial(self):
+        """Тест признаков тривиально устойчивых и неустойчивых сценариев"""
+        cct, status = equal_area_cct(
+            [7.0, 7.0, 7.0], [0.8, 0.8, 1.5], [2.0, 2.0, 2.0], [0.9, 0.0, 0.0], [1.6, 0.7, 1.6],
+        )
+        assert status.tolist() == [TRIVIALLY_STABLE, TRIVIALLY_UNSTABLE, TRIVIALLY_UNSTABLE]
+        assert np.isnan(cct).all()
+
+
+class TestTransferSusceptance:
+    """Тесты приведения схемы к узлам источника и базисному узлу"""
+
+    # Генератор 10 (xd = 0.2) - узел 1 - две параллельные ветви (0.5) - узел 2 - базисный узел 3 (0.1)
+    IP = np.array([10, 1, 1, 2])
+    IQ = np.array([1, 2, 2, 3])
+    X = np.array([0.2, 0.5, 0.5, 0.1])
+
+    def test_series_parallel(self):
+        """Тест взаимной проводимости последовательно-параллельной схемы"""
+        assert transfer_susceptance(self.IP, self.IQ, self.X, 10, 3) == pytest.approx(1 / 0.55)
+        assert transfer_susceptance(self.IP[[0, 1, 3]], self.IQ[[0, 1, 3]], self.X[[0, 1, 3]],
+                                    10, 3) == pytest.approx(1 / 0.8)
+
+    def test_fault(self):
+        """Тест передачи мощности при КЗ"""
+        assert transfer_susceptance(self.IP, self.IQ, self.X, 10, 3, fault=1) == 0.0
+        # КЗ в узле 2 отделяет генератор от базисного узла
+        assert transfer_susceptance(self.IP, self.IQ, self.X, 10, 3, fault=2) == 0.0
+        assert transfer_susceptance(self.IP[:2], self.IQ[:2], self.X[:2], 10, 3) == 0.0
+
+
+    def test_meshed_network(self, monkeypatch):
+        """Тест по исключению узлов плотной матрицы для сложнозамкнутой схемы (с SciPy и без)"""
+        rng = np.random.default_rng(3)
+        ip = np.concatenate([np.arange(1, 30), rng.integers(1, 31, 40)])
+        iq = np.concatenate([np.arange(2, 31), rng.integers(1, 31, 40)])
+        keep = ip != iq
+        ip, iq = ip[keep], iq[keep]
+        x = rng.uniform(0.05, 0.5, len(ip))
+
+        for fault in (None, 12, 30):
+            expected = dense_transfer(ip, iq, x, 5, 30, fault)
+            assert transfer_susceptance(ip, iq, x, 5, 30, fault) == pytest.approx(expected, rel=1e-6)
+            monkeypatch.setattr(cct_screening, "SCIPY_AVAILABLE", False)
+            monkeypatch.setattr(thevenin, "SCIPY_AVAILABLE", False)
+            assert transfer_susceptance(ip, iq, x, 5, 30, fault) == pytest.approx(expected, rel=1e-6)
+            monkeypatch.undo()
+
+
+def dense_transfer(ip, iq, x, source, base, fault=None):
+    """Приведение полной плотной матрицы проводимостей к узлам source и base"""
+    nodes = sorted(set(ip.tolist()) | set(iq.tolist()))
+    index = {n: k for k, n in enumerate(nodes)}
+    b = np.zeros((len(nodes), len(nodes)))
+    for a, c, xx in zip(ip.tolist(), iq.tolist(), x.tolist()):
+        b[index[a], index[a]] += 1 / xx
+        b[index[c], index[c]] += 1 / xx
+        b[index[a], index[c]] -= 1 / xx
+        b[index[c], index[a]] -= 1 / xx
+    if fault is not None:
+        b[index[fault], index[fault]] += cct_screening.FAULT_SUSCEPTANCE
+    kept = [index[source], index[base]]
+    other = np.setdiff1d(np.arange(len(nodes)), kept)
+    reduced = b[np.ix_(kept, kept)] - b[np.ix_(kept, other)] @ np.linalg.solve(
+        b[np.ix_(other, other)], b[np.ix_(other, kept)])
+    transfer = -reduced[0, 1]
+    return transfer if transfer > cct_screening.MIN_SUSCEPTANCE else 0.0
+
+
+class TestScreenScenario:
+    """Тесты оценки по таблицам режима и сценария"""
+
+    def make_session(self, trip_key):
+        """Генератор в узле 1, две параллельные ВЛ 1-2 (и 1-2 np=1), базисный узел 2"""
+        com = FakeRastr()
+        com.table("node").data = {"ny": [1, 2], "uhom": [10.0, 10.0], "tip": [1, 0], "sta": [0, 0]}
+        com.table("vetv").data = {"ip": [1, 1], "iq": [2, 2], "np": [0, 1],
+                                  "x": [0.5, 0.5], "sta": [0, 0]}
+        com.table("Generator").data = {"Node": [1], "P": [80.0], "Pnom": [100.0],
+                                       "Mj": [7.0], "xd1": [0.2], "sta": [0]}
+        com.table("DFWAutoActionScn").data = {"ObjectClass": ["node", "vetv"],
+                                              "ObjectKey": ["1", trip_key]}
+        return RastrOperations(com_object=com)
+
+    def test_estimate(self):
+        """Тест оценки для КЗ в узле генератора с отключением одной ВЛ"""
+        estimate = screen_scenario(self.make_session("1,2,1"), base_mva=100.0)
+
+        # о.е. на базе 100 МВА при 10 кВ: xd = 0.2, ВЛ = 0.5
+        expected, status = equal_area_cct([7.0], [0.8], [1 / 0.45], [0.0], [1 / 0.7])
+        assert estimate.status == status[0] == SCREENED
+        assert estimate.generator == 1
+        assert estimate.cct == pytest.approx(expected[0])
+
+        low, high = estimate.bracket(1.0, 0.3, 0.02)
+        assert low < estimate.cct < high
+
+    def test_unavailable(self):
+        """Тест отказа от оценки без таблицы генераторов"""
+        rastr = self.make_session("1,2,1")
+        del rastr._rastr.tables["Generator"]
+        assert screen_scenario(rastr) is None
+
+    def test_near_generators(self, monkeypatch):
+        """Тест выбора критического генератора среди ближайших к месту КЗ"""
+        com = FakeRastr()
+        # Цепочка 1-2-...-8, базисный узел 8; генераторы в узлах 1..7, КЗ в узле 2
+        com.table("node").data = {"ny": list(range(1, 9)), "uhom": [10.0] * 8,
+                                  "tip": [1] * 7 + [0], "sta": [0] * 8}
+        com.table("vetv").data = {"ip": list(range(1, 8)), "iq": list(range(2, 9)), "np": [0] * 7,
+                                  "x": [0.05] * 7, "sta": [0] * 7}
+        com.table("Generator").data = {"Node": list(range(1, 8)), "P": [50.0] * 7, "Pnom": [100.0] * 7,
+                                       "Mj": [7.0] * 7, "xd1": [0.2] * 7, "sta": [0] * 7}
+        com.table("DFWAutoActionScn").data = {"ObjectClass": ["node"], "ObjectKey": ["2"]}
+
+        solved = []
+        columns = cct_screening._GroundedNetwork.columns
+        monkeypatch.setattr(cct_screening._GroundedNetwork, "columns",
+                            lambda net, nodes: solved.append(list(nodes)) or columns(net, nodes))
+        monkeypatch.setattr(cct_screening, "NEAR_GENERATORS", 2)
+        estimate = screen_scenario(RastrOperations(com_object=com))
+
+        # Столбец узла КЗ, затем только два ближайших генератора
+        assert solved[0] == [2]
+        assert sorted(solved[1]) == [1, 2]
+        # Генератор за местом КЗ: передача при КЗ отсутствует
+        expected, _ = equal_area_cct([7.0], [0.5], [1 / 0.55], [0.0], [1 / 0.55])
+        assert estimate.generator == 1
+        assert estimate.status == SCREENED
+        assert estimate.cct == pytest.approx(expected[0])
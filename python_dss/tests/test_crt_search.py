@@ -0,0 +1,155 @@
+"""
+Тесты спекулятивного k-арного поиска критического времени КЗ
+"""
+
+import math
+import pickle
+
+import pytest
+
+from calculations.crt_search import (
+    CrtWarmStart, bisection_runs, kary_probes, speculative_crt_search,
+)
+from rastr_operations import RastrOperations
+from tests.fake_rastr import FakeRastr, critical_time_model, write_json
+
+
+def make_evaluate(crt_time, calls):
+    """Модель устойчивости: устойчиво при длительности КЗ не больше crt_time"""
+    def evaluate(times):
+        calls.append(list(times))
+        return [dt <= crt_time for dt in times]
+    return evaluate
+
+
+class TestSpeculativeCrtSearch:
+    """Тесты поиска критического времени пакетами расчетов"""
+
+    def test_kary_probes(self):
+        """Тест деления интервала на равные части"""
+        assert kary_probes(0.0, 1.0, 3) == [0.25, 0.5, 0.75]
+        assert kary_probes(0.2, 0.4, 0) == []
+
+    @pytest.mark.parametrize("width", [1, 2, 3, 7])
+    @pytest.mark.parametrize("crt_time", [0.013, 0.25, 0.61, 0.999])
+    def test_precision(self, width, crt_time):
+        """Тест точности найденного времени и количества раундов"""
+        calls = []
+        found, rounds, probes = speculative_crt_search(
+            make_evaluate(crt_time, calls), 0.01, 1.0, width
+        )
+
+        assert crt_time - 0.02 <= found <= crt_time
+        assert rounds == len(calls)
+        assert probes == sum(len(times) for times in calls)
+        assert all(len(times) == width for times in calls)
+        # Интервал сужается в width + 1 раз за раунд (первый раунд проверяет max_time)
+        assert rounds <= 1 + math.ceil(math.log(1.0 / 0.02) / math.log(width + 1))
+
+    def test_rounds_drop_with_width(self):
+        """Тест уменьшения числа раундов при увеличении пакета"""
+        rounds = {width: speculative_crt_search(make_evaluate(0.37, []), 0.001, 1.0, width)[1]
+                  for width in (1, 3, 7)}
+        assert rounds[1] > rounds[3] > rounds[7]
+
+    def test_stable_at_max_time(self):
+        """Тест завершения после первого раунда, если устойчиво при max_time"""
+        calls = []
+        assert speculative_crt_search(make_evaluate(2.0, calls), 0.01, 1.0, 4) == (1.0, 1, 4)
+
+    def test_unbalanced(self):
+        """Тест прерывания поиска, если режим не сбалансирован"""
+        assert speculative_crt_search(lambda times: None, 0.01, 1.0, 3) is None
+
+
+class TestBracketedSearch:
+    """Тесты поиска критического времени с начального интервала"""
+
+    @pytest.fixture
+    def session(self, regime_files, temp_dir):
+        """Сессия с режимом и сценарием КЗ с критическим временем 0.37 с"""
+        regime, _ = regime_files
+        rastr = RastrOperations(com_object=FakeRastr(dynamic_model=critical_time_model))
+        rastr.load(regime)
+        rastr.load(write_json(temp_dir / "кз.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node", "vetv"], "TimeStart": [1.0, 1.1],
+                                 "DT": [0.1, 999], "CrtTime": [0.37, 0.37]},
+        }))
+        return rastr
+
+    def test_cold_search_runs(self, session):
+        """Тест числа расчетов динамики при поиске с полного интервала"""
+        found = session.find_crt_time(0.01, 1.0)
+
+        assert 0.35 <= found <= 0.37
+        assert session.crt_runs <= bisection_runs(0.01, 1.0) + 1
+
+    @pytest.mark.parametrize("bracket", [(0.35, 0.39), (0.6, 0.64), (0.05, 0.09), (0.0, 1.0)])
+    def test_bracket(self, session, bracket):
+        """Тест поиска с верного и неверного начального интервала"""
+        found = session.find_crt_time(0.01, 1.0, bracket)
+
+        assert 0.35 <= found <= 0.37
+        if bracket == (0.35, 0.39):
+            # Две проверки границ и не более двух делений
+            assert session.crt_runs <= 4 < bisection_runs(0.01, 1.0)
+
+    def test_stable_at_max_time(self, session):
+        """Тест результата при устойчивости на максимальном времени"""
+        assert session.find_crt_time(0.01, 0.3, (0.25, 0.29)) == 0.3
+
+    @pytest.mark.parametrize("bracket", [(0.3, 0.3), (0.2, 0.2)])
+    def test_verified_lower_equals_upper(self, session, bracket):
+        """Тест интервала из одной точки: устойчивая нижняя граница не проверяется повторно"""
+        found = session.find_crt_time(0.01, 0.3, bracket)
+
+        assert found == 0.3
+        if bracket == (0.3, 0.3):
+            assert session.crt_runs == 1
+
+    @pytest.mark.parametrize("bracket", [None, (0.35, 0.39)])
+    def test_keeps_prepared_state(self, session, bracket):
+        """Тест сохранения подготовленного режима: Tras восстанавливается после поиска"""
+        session.state_key = "режим"
+        session.find_crt_time(0.01, 1.0, bracket)
+        session.probe_crt_time(0.2)
+
+        assert session.state_key == "режим"
+        assert session.get_val("com_dynamics", "Tras", 0) == 5.0
+
+    def test_template_loaded_once(self, session):
+        """Тест загрузки шаблона .dfw один раз на поиск, а не на каждый расчет динамики"""
+        com = session._rastr
+        com.calls.clear()
+        session.find_crt_time(0.01, 1.0, (0.6, 0.64))
+
+        assert session.crt_runs > 2
+        assert com.calls["NewFile"] == 1
+
+
+class TestCrtWarmStart:
+    """Тесты начальных интервалов по ранее найденным значениям"""
+
+    def test_neighbours(self, temp_dir):
+        """Тест интервала по результатам сценария в других вариантах"""
+        warm = CrtWarmStart(cache_file=temp_dir / "warm.json")
+        assert warm.bracket("р.rst", "Нормальная", "кз.scn", 0.01, 1.0) is None
+
+        warm.record("р.rst", "Нормальная", "кз.scn", 0.3)
+        warm.record("р.rst", "Ремонт 1", "кз.scn", 0.2)
+        warm.record("р.rst", "Ремонт 2", "кз.scn", 0.5)
+
+        assert warm.bracket("р.rst", "Ремонт 3", "кз.scn", 0.01, 1.0) == pytest.approx((0.28, 0.32))
+        assert warm.bracket("р.rst", "Ремонт 3", "другое.scn", 0.01, 1.0) is None
+
+    def test_previous_run(self, temp_dir):
+        """Тест интервала по результату предыдущего запуска"""
+        warm = CrtWarmStart(cache_file=temp_dir / "warm.json", margin=0.05)
+        warm.record("р.rst", "Нормальная", "кз.scn", 0.98)
+        warm.record("р.rst", "Ремонт", "кз.scn", 0.1)
+        warm.save()
+
+        restored = pickle.loads(pickle.dumps(CrtWarmStart(cache_file=temp_dir / "warm.json",
+                                                          margin=0.05)))
+        assert restored.bracket("р.rst", "Нормальная", "кз.scn", 0.01, 1.0) == pytest.approx((0.93, 1.0))
+        assert restored.bracket("р.rst", "Ремонт", "кз.scn", 0.01, 1.0) == pytest.approx((0.05, 0.15))
@@ -0,0 +1,395 @@
+"""
+Тесты параллельного выполнения расчетов на имитации COM-объекта
+"""
+
+import os
+
+import pytest
+
+from models import VrnInfo, RgmsInfo, ScnsInfo
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore
+from tests.fake_rastr import (
+    FakeRastr, critical_time_model, fault_distance_model, transfer_limit_model,
+    weighting_model, write_json,
+)
+
+
+NORMAL = VrnInfo(id=-1, name="Нормальная схема", num=0, deactive=False)
+REPAIR = VrnInfo(id=0, name="Ремонт ВЛ", num=1, deactive=False)
+# Критическое время КЗ сценариев в нормальной схеме (в ремонтной - в 2 раза меньше)
+CRT_TIMES = [0.05, 0.3, 0.15, 0.22]
+
+
+def make_session() -> RastrOperations:
+    """Сессия RASTR с моделью критического времени КЗ"""
+    return RastrOperations(com_object=FakeRastr(dynamic_model=critical_time_model))
+
+
+def make_weighting_session() -> RastrOperations:
+    """Сессия RASTR с моделью утяжеления и предельного перетока"""
+    return RastrOperations(com_object=FakeRastr(dynamic_model=transfer_limit_model,
+                                                ut_model=weighting_model))
+
+
+def crash_once_model(rastr, ems):
+    """Модель динамики, аварийно завершающая процесс при первом запуске"""
+    marker = os.environ["DSS_CRASH_MARKER"]
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return critical_time_model(rastr, ems)
+
+
+def make_crashing_session() -> RastrOperations:
+    """Сессия RASTR, процесс которой аварийно завершается один раз"""
+    return RastrOperations(com_object=FakeRastr(dynamic_model=crash_once_model))
+
+
+def fault_node_model(rastr, ems):
+    """Модель динамики КЗ на разделенной линии с записью номера узла КЗ в файл"""
+    with open(os.environ["DSS_FAULT_NODES"], "a") as f:
+        f.write(f"{rastr.tables['node'].data['ny'][-1]}\n")
+    return fault_distance_model(4.0)(rastr, ems)
+
+
+def make_fault_session() -> RastrOperations:
+    """Сессия RASTR с моделью КЗ на разделенной линии"""
+    return RastrOperations(com_object=FakeRastr(dynamic_model=fault_node_model))
+
+
+@pytest.fixture
+def scenarios(regime_files, temp_dir, monkeypatch):
+    """Сценарии КЗ с разным критическим временем"""
+    from utils.config import config
+
+    monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+    scns = []
+    for idx, crt_time in enumerate(CRT_TIMES):
+        scns.append(ScnsInfo(name=write_json(temp_dir / f"кз{idx}.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node", "vetv"], "TimeStart": [1.0, 1.1],
+                                 "DT": [0.1, 999], "CrtTime": [crt_time, crt_time]},
+        })))
+    return scns
+
+
+def calc_kwargs(temp_dir, workers, factory=make_session):
+    """Собственные пул сессий и хранилище снимков для расчета"""
+    return dict(
+        session_pool=RastrSessionPool(factory=factory),
+        snapshot_store=SnapshotStore(root=temp_dir / f"snapshots{workers}", max_mb=10),
+        parallel_workers=workers,
+    )
+
+
+class TestParallelDynStability:
+    """Тесты параллельного расчета ДУ"""
+
+    def test_matches_serial(self, regime_files, scenarios, temp_dir):
+        """Тест совпадения результатов и прогресса с последовательным расчетом"""
+        from calculations import DynStabilityCalc
+
+        regime, rems = regime_files
+        outputs = {}
+        for workers in (1, 2):
+            progress = []
+            calc = DynStabilityCalc(
+                progress.append, [RgmsInfo(name=regime)], scenarios, [NORMAL, REPAIR], rems,
+                [], None, None, False, "", True, False, False,
+                **calc_kwargs(temp_dir, workers),
+            )
+            results = calc.calc()
+            outputs[workers] = [
+                (shem.sheme_name, shem.is_stable,
+                 [(ev.name, ev.no_pa_result.is_stable, ev.no_pa_result.time_reached)
+                  for ev in shem.events])
+                for res in results for shem in res.dyn_shems
+            ]
+            assert progress == list(range(1, calc.max))
+
+        assert outputs[2] == outputs[1]
+        assert [ev[1] for ev in outputs[1][0][2]] == [False, True, True, True]
+        assert [ev[1] for ev in outputs[1][1][2]] == [False, True, False, True]
+
+
+class TestParallelUostStability:
+    """Тесты параллельного расчета остаточного напряжения"""
+
+    def test_matches_serial(self, regime_files, temp_dir, monkeypatch):
+        """Тест совпадения результатов с последовательным расчетом и различия узлов КЗ задач"""
+        from calculations import UostStabilityCalc
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        regime, rems = regime_files
+        scenarios = [ScnsInfo(name=write_json(temp_dir / f"кз_линия{idx}.scn", {
+            "DFWAutoActionScn": {
+                "Id": [1, 2], "ObjectClass": ["vetv", "node"], "ObjectKey": ["1,2,0", "1"],
+                "ObjectProp": ["sta", "x"], "Formula": ["1", formula], "TimeStart": [1.0, 1.0],
+            },
+        })) for idx, formula in enumerate(["5", "7", "9"])]
+        outputs, nodes = {}, {}
+        for workers in (1, 2):
+            log = temp_dir / f"узлы{workers}.txt"
+            monkeypatch.setenv("DSS_FAULT_NODES", str(log))
+            calc = UostStabilityCalc(
+                None, [RgmsInfo(name=regime)], scenarios, [NORMAL, REPAIR], rems, [],
+                **calc_kwargs(temp_dir, workers, factory=make_fault_session),
+            )
+            outputs[workers] = [
+                (shem.sheme_name, shem.is_stable,
+                 [(ev.name, ev.distance, ev.begin_x, ev.end_x) for ev in shem.events])
+                for res in calc.calc() for shem in res.uost_shems
+            ]
+            nodes[workers] = set(log.read_text().split())
+
+        assert outputs[2] == outputs[1]
+        assert [[ev[0] for ev in events] for _, _, events in outputs[1]] == [
+            ["кз_линия0", "кз_линия1", "кз_линия2"]] * 2
+        # В ремонтной схеме сопротивление линии в 2 раза больше - граница ближе к началу линии
+        assert all(39.5 <= ev[1] <= 41.0 for ev in outputs[1][0][2])
+        assert all(19.5 <= ev[1] <= 21.0 for ev in outputs[1][1][2])
+        # Каждая задача параллельного расчета добавляет собственный узел КЗ
+        assert len(nodes[2]) == 2 * len(scenarios)
+
+
+class TestParallelMaxKZTime:
+    """Тесты параллельного поиска предельного времени КЗ"""
+
+    def run(self, regime_files, scenarios, temp_dir, workers, **kwargs):
+        """Расчет и сводка результатов"""
+        from calculations import MaxKZTimeCalc
+
+        regime, rems = regime_files
+        calc = MaxKZTimeCalc(
+            None, [RgmsInfo(name=regime)], scenarios, [NORMAL, REPAIR], rems, 0.02, 0.5,
+            **calc_kwargs(temp_dir, workers, **kwargs),
+        )
+        return [
+            (res.rg_name, shem.sheme_name, shem.is_stable,
+             [(t.scn_name, t.crt_time) for t in shem.times])
+            for res in calc.calc() for shem in res.crt_shems
+        ]
+
+    def test_matches_serial(self, regime_files, scenarios, temp_dir):
+        """Тест совпадения результатов с последовательным расчетом"""
+        serial = self.run(regime_files, scenarios, temp_dir, 1)
+        parallel = self.run(regime_files, scenarios, temp_dir, 3)
+
+        assert parallel == serial
+        for (_, _, _, times), scale in zip(serial, (1.0, 0.5)):
+            for (_, found), expected in zip(times, CRT_TIMES):
+                assert expected * scale - 0.02 <= found <= expected * scale
+
+    def test_speculative(self, regime_files, scenarios, temp_dir):
+        """Тест спекулятивного поиска пакетами расчетов динамики"""
+        from calculations import MaxKZTimeCalc
+
+        regime, rems = regime_files
+        serial = self.run(regime_files, scenarios, temp_dir, 1)
+        calc = MaxKZTimeCalc(
+            None, [RgmsInfo(name=regime)], scenarios, [NORMAL, REPAIR], rems, 0.02, 0.5,
+            speculative=True, **calc_kwargs(temp_dir, 3),
+        )
+        results = calc.calc()
+
+        stats = calc.search_stats
+        assert stats['scenarios'] == len(CRT_TIMES) * 2
+        assert stats['probes'] == stats['rounds'] * 3
+        for res in results:
+            for shem, (_, _, is_stable, times) in zip(res.crt_shems, serial):
+                assert shem.is_stable == is_stable
+                for crt, (_, found) in zip(shem.times, times):
+                    assert abs(crt.crt_time - found) <= 0.02
+
+    def test_warm_start(self, regime_files, scenarios, temp_dir):
+        """Тест поиска с интервалов по результатам других вариантов и предыдущего запуска"""
+        from calculations import CrtWarmStart, MaxKZTimeCalc
+
+        regime, rems = regime_files
+        cold = self.run(regime_files, scenarios, temp_dir, 1)
+        saved = []
+        for _ in range(2):
+            calc = MaxKZTimeCalc(
+                None, [RgmsInfo(name=regime)], scenarios, [NORMAL, REPAIR], rems, 0.02, 0.5,
+                warm_start=CrtWarmStart(cache_file=temp_dir / "warm.json"),
+                **calc_kwargs(temp_dir, 1),
+            )
+            results = calc.calc()
+            for shem, (_, _, _, times) in zip(results[0].crt_shems, cold):
+                for crt, (_, found) in zip(shem.times, times):
+                    assert abs(crt.crt_time - found) <= 0.02
+            saved.append(calc.search_stats['runs_saved'])
+
+        # Второй запуск начинает каждый сценарий с интервала по предыдущему
+        assert saved[1] > saved[0]
+        assert saved[1] >= len(CRT_TIMES) * 2
+
+    def test_retry_after_worker_crash(self, regime_files, scenarios, temp_dir, monkeypatch):
+        """Тест повторного выполнения задач после аварийного завершения процесса"""
+        monkeypatch.setenv("DSS_CRASH_MARKER", str(temp_dir / "crashed"))
+        serial = self.run(regime_files, scenarios, temp_dir, 1)
+        parallel = self.run(regime_files, scenarios, temp_dir, 2,
+                            factory=make_crashing_session)
+
+        assert (temp_dir / "crashed").exists()
+        assert parallel == serial
+
+
+class TestParallelShuntKZ:
+    """Тесты параллельного расчета шунтов КЗ по узлам"""
+
+    @pytest.fixture
+    def regime(self, rastr_templates, temp_dir, monkeypatch):
+        """Режим с отмеченными узлами"""
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        nodes = list(range(1, 11))
+        return write_json(temp_dir / "режим.rst", {
+            "node": {"ny": nodes, "uhom": [110] * 10, "vras": [110.0 + n for n in nodes],
+                     "sel": [n % 3 != 0 for n in nodes]},
+            "vetv": {"ip": [1], "iq": [2], "np": [0], "r": [1.0], "x": [10.0]},
+            "com_regim": {"it_max": [20], "dv_min": [0.5]},
+            "com_dynamics": {"Tras": [5.0], "MaxResultFiles": [0],
+                             "SnapAutoLoad": [0], "SnapMaxCount": [0]},
+        })
+
+    def test_matches_serial(self, regime, temp_dir):
+        """Тест совпадения результатов с последовательным расчетом и замера времени"""
+        from calculations import ShuntKZCalc
+
+        outputs = {}
+        for workers in (1, 2):
+            progress = []
+            calc = ShuntKZCalc(
+                progress.append, [RgmsInfo(name=regime)], [NORMAL], None, [], True, True,
+                True, True, **calc_kwargs(temp_dir, workers),
+            )
+            results = calc.calc()
+            nodes = results[0].shems[0].nodes
+            outputs[workers] = [(n.node, n.x1, n.u1, n.x2, n.u2) for n in nodes]
+            assert all(n.calc_time > 0 for n in nodes)
+            assert progress == sorted(progress) and progress[-1] == calc.max - 1
+
+        assert outputs[2] == outputs[1]
+        assert [node for node, *_ in outputs[1]] == [1, 2, 4, 5, 7, 8, 10]
+
+
+class TestParallelMdpStability:
+    """Тесты параллельного расчета МДП ДУ по вариантам"""
+
+    @pytest.fixture
+    def files(self, regime_files, temp_dir, monkeypatch):
+        """Сечение, траектория утяжеления и сценарии с разным предельным перетоком"""
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        sechen = write_json(temp_dir / "сечения.sch", {
+            "sechen": {"ns": [1], "psech": [500.0], "p0": [500.0], "dp": [5.0]},
+        })
+        vir = write_json(temp_dir / "траектория.ut2", {
+            "ut_common": {"kfc": [10.0], "sum_kfc": [0.0], "limit": [100.0]},
+        })
+        scns = [ScnsInfo(name=write_json(temp_dir / f"кз{idx}.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node"], "Pmax": [p_max]},
+        })) for idx, p_max in enumerate([300.0, 450.0, 800.0])]
+        return sechen, vir, scns
+
+    def test_matches_serial(self, regime_files, files, temp_dir):
+        """Тест совпадения результатов с последовательным расчетом"""
+        from calculations import MdpStabilityCalc
+        from models import SchInfo
+
+        regime, rems = regime_files
+        sechen, vir, scns = files
+        outputs = {}
+        for workers in (1, 2):
+            progress = []
+            calc = MdpStabilityCalc(
+                progress.append, [RgmsInfo(name=regime)], scns, [NORMAL, REPAIR], rems, vir,
+                sechen, None, [SchInfo(id=0, num=1, name="Сечение", control=True)], [], "", 0,
+                True, False, False, **calc_kwargs(temp_dir, workers, factory=make_weighting_session),
+            )
+            results = calc.calc()
+            outputs[workers] = [
+                (shem.sheme_name, shem.is_stable, shem.max_step, shem.p_pred, shem.p_start,
+                 [(ev.name, ev.no_pa_mdp, [(v.id, v.value) for v in ev.no_pa_sechen])
+                  for ev in shem.events])
+                for res in results for shem in res.mdp_shems
+            ]
+            assert progress[-1] == calc.max
+            assert not (calc._root / "mdp_calc_tmp_base.rst").exists()
+
+        assert outputs[2] == outputs[1]
+        mdps = [mdp for _, mdp, _ in outputs[1][0][5]]
+        assert 300.0 - 10.0 <= mdps[0] <= 300.0
+        assert 450.0 - 10.0 <= mdps[1] <= 450.0
+        assert mdps[2] == 500.0
+
+    def test_search_probes(self, regime_files, files, temp_dir):
+        """Тест количества расчетов динамики при поиске МДП: деление пополам и шаг по траектории"""
+        from calculations import MdpStabilityCalc
+        from models import SchInfo
+
+        regime, rems = regime_files
+        _, vir, scns = files
+        # Переток нелинейно зависит от шага утяжеления
+        sechen = write_json(temp_dir / "сечения2.sch", {
+            "sechen": {"ns": [1], "psech": [500.0], "p0": [500.0], "dp": [5.0], "dp2": [0.02]},
+        })
+        probes = {}
+        for method, trajectory in (("bisection", False), ("secant", True)):
+            calc = MdpStabilityCalc(
+                None, [RgmsInfo(name=regime)], scns, [NORMAL], rems, vir,
+                sechen, None, [SchInfo(id=0, num=1, name="Сечение", control=True)], [], "", 0,
+                True, False, False, search_method=method, weighting_trajectory=trajectory,
+                **calc_kwargs(temp_dir / method, 1, factory=make_weighting_session),
+            )
+            events = calc.calc()[0].mdp_shems[0].events
+            for event, p_max in zip(events, (300.0, 450.0)):
+                assert p_max - 10.0 <= event.no_pa_mdp <= p_max
+            probes[method] = [event.no_pa_probes for event in events]
+
+        # Сценарий, устойчивый в исходном режиме, - один расчет динамики
+        assert probes["bisection"][2] == probes["secant"][2] == 1
+        assert all(count > 1 for count in probes["secant"][:2])
+        assert sum(probes["secant"]) < sum(probes["bisection"])
+
+    def test_seed_with_pa(self, regime_files, files, rastr_templates, temp_dir):
+        """Тест поиска МДП с ПА от предела без ПА"""
+        from calculations import MdpStabilityCalc
+        from models import SchInfo
+        from tests.fake_rastr import write_template
+
+        # Таблица ПА входит в шаблон сценария (очищается при загрузке сценария)
+        pa_table = {"fake_pa": ["id", "dPmax"]}
+        write_template(rastr_templates / "лапну.dwf", pa_table)
+        write_template(rastr_templates / "сценарий.scn", {
+            "DFWAutoActionScn": ["Id", "Type", "Formula", "ObjectClass", "ObjectProp",
+                                 "ObjectKey", "RunsCount", "TimeStart", "DT"],
+            **pa_table,
+        })
+        regime, rems = regime_files
+        sechen, vir, _ = files
+        scns = [ScnsInfo(name=write_json(temp_dir / f"кз_па{idx}.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node"], "Pmax": [p_max]},
+        })) for idx, p_max in enumerate([300.0, 320.0, 340.0])]
+        # ПА повышает предельный переток на 30
+        lapnu = write_json(temp_dir / "па.dwf", {"fake_pa": {"id": [1], "dPmax": [30.0]}})
+        probes = {}
+        for seed in (False, True):
+            calc = MdpStabilityCalc(
+                None, [RgmsInfo(name=regime)], scns, [NORMAL], rems, vir,
+                sechen, lapnu, [SchInfo(id=0, num=1, name="Сечение", control=True)], [], "", 0,
+                True, True, False, search_method="bisection", seed_with_pa=seed,
+                **calc_kwargs(temp_dir / f"seed{seed}", 1, factory=make_weighting_session),
+            )
+            events = calc.calc()[0].mdp_shems[0].events
+            for event, p_max in zip(events, (300.0, 320.0, 340.0)):
+                assert p_max - 10.0 <= event.no_pa_mdp <= p_max
+                assert p_max + 30.0 - 10.0 <= event.with_pa_mdp <= p_max + 30.0
+            probes[seed] = [event.with_pa_probes for event in events]
+            assert calc.search_stats["with_pa_probes"] == sum(probes[seed])
+
+        assert sum(probes[True]) < sum(probes[False])
+        assert calc.search_stats["runs_saved"] > 0
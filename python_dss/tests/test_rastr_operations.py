@@ -0,0 +1,323 @@
+"""
+Тесты для операций с RASTR на имитации COM-объекта
+"""
+
+import numpy as np
+import pytest
+
+from rastr_operations import RastrOperations
+from tests.fake_rastr import FakeRastr
+
+
+ROWS = 500
+
+
+def make_rastr(safe_arrays: bool = True):
+    """Сессия RASTR с таблицей узлов из ROWS строк"""
+    com = FakeRastr(safe_arrays=safe_arrays)
+    com.table("node").data = {
+        "ny": list(range(1, ROWS + 1)),
+        "vras": [110.0 + i % 7 for i in range(ROWS)],
+        "sel": [i % 2 for i in range(ROWS)],
+    }
+    return com, RastrOperations(com_object=com)
+
+
+class TestColumnAccess:
+    """Тесты для get_column/set_column"""
+
+    @pytest.mark.parametrize("safe_arrays", [True, False])
+    def test_get_column(self, safe_arrays):
+        """Тест чтения колонки по выборке и по индексам"""
+        com, rastr = make_rastr(safe_arrays)
+
+        selected = rastr.get_column("node", "ny", "sel = 1")
+        by_index = rastr.get_column("node", "vras", [0, 3, 5])
+
+        assert isinstance(selected, np.ndarray)
+        assert selected.tolist() == list(range(2, ROWS + 1, 2))
+        assert by_index.tolist() == [110.0, 113.0, 115.0]
+
+    @pytest.mark.parametrize("safe_arrays", [True, False])
+    def test_set_column(self, safe_arrays):
+        """Тест записи скалярного значения и массива"""
+        com, rastr = make_rastr(safe_arrays)
+
+        rastr.set_column("node", "vras", "sel = 1", 100.0)
+        rastr.set_column("node", "vras", [0, 2], np.array([1.0, 2.0]))
+
+        vras = com.tables["node"].data["vras"]
+        assert vras[0] == 1.0 and vras[2] == 2.0
+        assert all(vras[i] == 100.0 for i in range(1, ROWS, 2))
+
+    def test_set_column_length_mismatch(self):
+        """Тест ошибки при несовпадении числа значений и строк"""
+        com, rastr = make_rastr(safe_arrays=False)
+        with pytest.raises(ValueError):
+            rastr.set_column("node", "vras", [0, 1], [1.0])
+
+    def test_call_count_benchmark(self):
+        """Сравнение числа обращений к COM: get_val в цикле и get_column"""
+        com, rastr = make_rastr()
+        indices = rastr.selection("node")
+        com.calls.clear()
+        looped = [rastr.get_val("node", "vras", idx) for idx in indices]
+        loop_calls = com.total_calls
+
+        com.calls.clear()
+        bulk = rastr.get_column("node", "vras").tolist()
+        bulk_calls = com.total_calls
+
+        com_fallback, rastr_fallback = make_rastr(safe_arrays=False)
+        rastr_fallback.get_column("node", "vras")
+        com_fallback.calls.clear()
+        rastr_fallback.get_column("node", "vras")
+        fallback_calls = com_fallback.total_calls
+
+        assert bulk == looped
+        assert bulk_calls <= 2
+        assert loop_calls >= ROWS * 2
+        # Пакетный цикл без безопасных массивов: одно обращение на значение
+        assert fallback_calls <= ROWS + 3
+
+
+class TestHandleCache:
+    """Тесты кэша объектов таблиц и колонок"""
+
+    def test_handles_cached(self):
+        """Тест повторного использования объектов таблицы и колонки"""
+        com, rastr = make_rastr()
+        for idx in range(10):
+            rastr.get_val("node", "vras", idx)
+            rastr.set_val("node", "vras", idx, 100.0)
+
+        assert com.calls["Tables.Item"] == 1
+        assert com.calls["Cols.Item"] == 1
+        assert rastr.com_calls_saved > 0
+
+    def test_handles_invalidated_on_load(self, rastr_templates, temp_dir):
+        """Тест сброса кэша объектов при загрузке файла"""
+        from tests.fake_rastr import write_json
+
+        com, rastr = make_rastr()
+        rastr.get_val("node", "vras", 0)
+        rastr.load(write_json(temp_dir / "режим.rst", {"node": {"ny": [7], "vras": [99.0]}}))
+
+        assert rastr.get_val("node", "vras", 0) == 99.0
+        assert com.calls["Tables.Item"] == 2
+
+    def test_accessor_resolved_once(self):
+        """Тест однократного определения способа чтения значения"""
+        class IndexOnlyCol:
+            """Колонка, поддерживающая только обращение по индексу"""
+            def __init__(self):
+                self.attempts = 0
+                self.values = [1.0, 2.0, 3.0]
+
+            def __getitem__(self, idx):
+                return self.values[idx]
+
+            def __getattr__(self, name):
+                self.attempts += 1
+                raise AttributeError(name)
+
+        com, rastr = make_rastr()
+        col = IndexOnlyCol()
+        rastr._cols[("node", "vras")] = col
+        values = [rastr._read("node", "vras", idx) for idx in range(3)]
+
+        assert values == [1.0, 2.0, 3.0]
+        assert col.attempts == 1
+
+
+class TestSelectionCache:
+    """Тесты кэша выборок и индекса по ключевым колонкам"""
+
+    def test_repeated_selection_cached(self):
+        """Тест повторной выборки без обращения к SetSel"""
+        com, rastr = make_rastr()
+        first = rastr.selection("node", "sel = 1")
+        com.calls.clear()
+        second = rastr.selection("node", "sel = 1")
+
+        assert second == first
+        assert com.calls["SetSel"] == 0
+        assert com.calls["FindNextSel"] == 0
+
+    def test_invalidated_on_write(self):
+        """Тест сброса кэша выборок после записи и добавления строки"""
+        com, rastr = make_rastr()
+        assert rastr.get_val("node", "vras", "sel = 1") == 111.0
+
+        rastr.set_val("node", "sel", 1, 0)
+        assert rastr.get_val("node", "vras", "sel = 1") == 113.0
+
+        rastr.set_column("node", "sel", None, 0)
+        idx = rastr.add_table_row("node")
+        rastr.set_val("node", "sel", idx, 1)
+        assert rastr.selection("node", "sel = 1") == [ROWS]
+
+    def test_invalidated_on_load(self, rastr_templates, temp_dir):
+        """Тест сброса кэша выборок при загрузке файла"""
+        from tests.fake_rastr import write_json
+
+        com, rastr = make_rastr()
+        assert rastr.selection("node", "sel = 1")[0] == 1
+        rastr.load(write_json(temp_dir / "режим.rst", {"node": {"ny": [7], "sel": [1]}}))
+
+        assert rastr.selection("node", "sel = 1") == [0]
+        assert rastr.selection("node", "ny = 7") == [0]
+
+    def test_primary_key_lookup(self):
+        """Тест поиска строк по ключу без SetSel/FindNextSel"""
+        com, rastr = make_rastr()
+        com.table("vetv").data = {
+            "ip": [1, 1, 2], "iq": [2, 2, 3], "np": [0, 1, 0], "r": [1.0, 2.0, 3.0],
+        }
+        com.calls.clear()
+
+        assert rastr.get_val("vetv", "r", "ip = 1 & iq = 2 & np = 1") == 2.0
+        assert rastr.get_val("vetv", "r", "iq=3 & ip=2 & np=0") == 3.0
+        assert rastr.selection("node", "ny = 5") == [4]
+        assert rastr.find_row("vetv", 1, 2, 0) == 0
+        assert rastr.find_row("node", ROWS + 1) == -1
+        assert com.calls["SetSel"] == 0
+        assert com.total_calls <= 12
+
+        rastr.set_val("node", "ny", 4, 1000)
+        assert rastr.find_row("node", 1000) == 4
+
+
+class TestTemplateReload:
+    """Тесты пропуска повторной загрузки шаблона динамики"""
+
+    @pytest.fixture
+    def session(self, rastr_templates):
+        """Сессия с пустым режимом и сценарием"""
+        com = FakeRastr()
+        rastr = RastrOperations(com_object=com)
+        rastr.load_template(".rst")
+        rastr.add_table_row("com_dynamics")
+        rastr.load_template(".scn")
+        com.calls.clear()
+        return com, rastr
+
+    def test_search_new_file_count(self, session):
+        """Тест числа NewFile при поиске с загрузкой шаблона перед каждым расчетом"""
+        com, rastr = session
+        probes = 6
+        for _ in range(probes):
+            rastr.load_template(".dfw")
+            rastr.run_dynamic(ems=True)
+
+        assert com.calls["NewFile"] == probes
+        assert rastr.template_reloads_skipped == probes
+
+    def test_reload_after_dynamics(self, session):
+        """Тест повторной загрузки шаблона после расчета динамики"""
+        com, rastr = session
+        rastr.run_dynamic()
+        rastr.run_dynamic()
+        rastr.find_crt_time(0.02, 0.5)
+
+        assert com.calls["NewFile"] == 3
+        assert rastr.template_reloads_skipped == 0
+
+
+class TestCrtTimeReset:
+    """Тесты записи длительности КЗ при поиске критического времени"""
+
+    @pytest.fixture
+    def session(self):
+        """Сценарий из КЗ в узлах, отключений ветвей и прочих действий"""
+        com = FakeRastr()
+        classes = ["node", "vetv", "vetv", "Generator"] * 5
+        com.table("DFWAutoActionScn").data = {
+            "ObjectClass": classes,
+            "TimeStart": [0.5] * len(classes),
+            "DT": [0.0] * len(classes),
+        }
+        com.table("com_dynamics").data = {"Tras": [5.0]}
+        return com, RastrOperations(com_object=com)
+
+    def test_values(self, session):
+        """Тест значений TimeStart/DT после нескольких расчетов"""
+        com, rastr = session
+        for dt in (0.3, 0.15):
+            rastr._reset_crt_time(dt)
+
+        data = com.tables["DFWAutoActionScn"].data
+        assert data["TimeStart"][:4] == [1.0, 1.15, 1.15, 0.5]
+        assert data["DT"][:4] == [0.15, 999.0, 999.0, 0.0]
+        assert com.tables["com_dynamics"].data["Tras"] == [4.15]
+
+    def test_call_count_benchmark(self, session):
+        """Число обращений к COM на один расчет: классификация действий выполняется один раз"""
+        com, rastr = session
+        rastr._reset_crt_time(0.3)
+        com.calls.clear()
+        probes = 10
+        for idx in range(probes):
+            rastr._reset_crt_time(0.01 * idx)
+
+        assert com.calls["ReadSafeArray"] == 0
+        # Запись TimeStart и DT (по одному обращению), Tras (размер таблицы и значение)
+        assert com.total_calls <= probes * 4
+
+    def test_new_scenario(self, session):
+        """Тест повторной классификации после изменения сценария"""
+        com, rastr = session
+        rastr._reset_crt_time(0.3)
+        rastr.set_val("DFWAutoActionScn", "ObjectClass", 3, "node")
+        rastr._reset_crt_time(0.2)
+
+        data = com.tables["DFWAutoActionScn"].data
+        assert data["TimeStart"][3] == 1.0 and data["DT"][3] == 0.2
+
+
+class TestSechenReader:
+    """Тесты чтения файла сечений в DataInfo"""
+
+    @pytest.fixture
+    def sechen_file(self, rastr_templates, temp_dir):
+        """Файл с двумя сечениями"""
+        from tests.fake_rastr import write_json
+
+        return write_json(temp_dir / "сечения.sch", {
+            "sechen": {"ns": [1, 2], "name": ["С1", "С2"], "sta": [0, 1],
+                       "psech": [0.0, 0.0], "p0": [0.0, 0.0], "dp": [0.0, 0.0]},
+        })
+
+    @pytest.fixture
+    def data_info(self, monkeypatch):
+        """DataInfo с сессиями RASTR на имитации COM-объекта"""
+        import data_info
+
+        monkeypatch.setattr(data_info, "RASTR_AVAILABLE", True)
+        monkeypatch.setattr(data_info, "RastrOperations",
+                            lambda: RastrOperations(com_object=FakeRastr()))
+        return data_info.DataInfo()
+
+    def test_columns(self, data_info, sechen_file):
+        """Тест чтения сечений колонками"""
+        data_info._handle_sechen_file(sechen_file)
+
+        assert [(s.num, s.name, s.control) for s in data_info.sch_inf] == [(1, "С1", 0), (2, "С2", 1)]
+
+    def test_row_fallback(self, data_info, sechen_file, monkeypatch):
+        """Тест чтения по строкам, если колонку прочитать не удалось: пропускается только ошибочная строка"""
+        def get_column(self, *args, **kwargs):
+            raise RuntimeError("ReadSafeArray")
+
+        get_val = RastrOperations.get_val
+
+        def flaky_get_val(self, table, col, index):
+            if index == 0 and col == "name":
+                raise RuntimeError("get_val")
+            return get_val(self, table, col, index)
+
+        monkeypatch.setattr(RastrOperations, "get_column", get_column)
+        monkeypatch.setattr(RastrOperations, "get_val", flaky_get_val)
+        data_info._handle_sechen_file(sechen_file)
+
+        assert [(s.num, s.name, s.control) for s in data_info.sch_inf] == [(2, "С2", 1)]
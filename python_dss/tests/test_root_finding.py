@@ -0,0 +1,122 @@
+"""
+Тесты для стратегий поиска шунта КЗ
+"""
+
+import pytest
+
+from utils.root_finding import ROOT_FINDERS, find_root, make_root_finder
+
+
+# Синтетическая зависимость остаточного напряжения от сопротивления шунта:
+# делитель между ЭДС 115 кВ за сопротивлением 2 + 25j Ом и шунтом Z под углом BASE_ANGLE
+U_SOURCE = 115.0
+Z_SOURCE = complex(2.0, 25.0)
+BASE_ANGLE = 1.471
+
+
+def divider(z: float) -> float:
+    """U(Z) для шунта модуля z"""
+    import cmath
+    z_shunt = cmath.rect(z, BASE_ANGLE)
+    return U_SOURCE * abs(z_shunt) / abs(z_shunt + Z_SOURCE)
+
+
+class TestRootFinders:
+    """Тесты стратегий на синтетической кривой U(Z)"""
+
+    @pytest.mark.parametrize("method", sorted(ROOT_FINDERS))
+    @pytest.mark.parametrize("target", [0.33 * 115, 0.66 * 115, 100.0])
+    def test_converges(self, method, target):
+        """Тест сходимости всех стратегий от начального сопротивления 1 Ом"""
+        result = find_root(divider, 1.0, target, 2.0, method, max_iterations=50)
+
+        assert result.converged
+        assert abs(result.u - target) <= 2.0
+        assert result.iterations == len(result.history)
+        assert result.history[0][0] == 1.0
+
+    def test_benchmark(self):
+        """Сравнение количества расчетов динамики: пропорциональный шаг и остальные стратегии"""
+        targets = [U_SOURCE * k for k in (0.1, 0.2, 0.33, 0.5, 0.66, 0.8, 0.9)]
+        starts = [0.1, 1.0, 100.0]
+        runs = {
+            method: sum(find_root(divider, z0, target, 0.5, method, max_iterations=100).iterations
+                        for target in targets for z0 in starts)
+            for method in ROOT_FINDERS
+        }
+
+        assert runs["illinois"] < runs["proportional"]
+        assert runs["newton_log"] < runs["proportional"]
+        assert runs["secant"] <= runs["proportional"]
+
+    def test_max_iterations(self):
+        """Тест ограничения количества итераций"""
+        result = find_root(divider, 1.0, 50.0, 0.0, "proportional", max_iterations=3)
+
+        assert not result.converged
+        assert result.iterations == 3
+
+    def test_measurement_failed(self):
+        """Тест прерывания поиска, если напряжение не определено"""
+        values = iter([20.0, None])
+        result = find_root(lambda z: next(values), 1.0, 50.0, 1.0)
+
+        assert not result.converged
+        assert result.history == [(1.0, 20.0)]
+        assert result.z == 1.0
+
+    def test_bracket_safeguard(self):
+        """Тест удержания шага в интервале, содержащем решение"""
+        finder = make_root_finder("secant", 50.0)
+        finder.add(1.0, 10.0)
+        finder.add(2.0, 60.0)
+        finder.add(1.9, 59.0)
+
+        assert 1.0 < finder.next_z() < 1.9
+
+    def test_unknown_method(self):
+        """Тест ошибки для неизвестной стратегии"""
+        with pytest.raises(ValueError):
+            make_root_finder("bisection", 50.0)
+
+
+class TestFindShuntKZ:
+    """Тесты поиска шунта КЗ на имитации COM-объекта"""
+
+    def make_rastr(self):
+        from rastr_operations import RastrOperations
+        from tests.fake_rastr import FakeRastr, shunt_voltage_model
+
+        com = FakeRastr(dynamic_model=shunt_voltage_model(U_SOURCE, Z_SOURCE))
+        com.table("node").data = {"ny": [1], "uhom": [110], "vras": [115.0]}
+        com.table("com_dynamics").data = {"Tras": [5.0]}
+        return com, RastrOperations(com_object=com)
+
+    @pytest.mark.parametrize("method", ["proportional", "illinois", "newton_log"])
+    def test_find_shunt_kz(self, rastr_templates, method):
+        """Тест достижения остаточного напряжения с заданной точностью"""
+        com, rastr = self.make_rastr()
+        result = rastr.find_shunt_kz(1, 38.0, 1.0, 0.1, method=method)
+
+        assert abs(result.u - 38.0) <= 2.0
+        assert result.iterations == com.dynamic_runs == len(result.history)
+        assert result.r > 0 and result.x > 0
+        # Обработчик протокола отключается после поиска
+        assert com.OnLog.handlers == []
+
+    def test_fewer_runs_than_proportional(self, rastr_templates):
+        """Тест сокращения количества расчетов динамики по сравнению с пропорциональным шагом"""
+        runs = {}
+        for method in ("proportional", "illinois"):
+            com, rastr = self.make_rastr()
+            rastr.find_shunt_kz(1, 0.66 * 115, 1.0, method=method)
+            runs[method] = com.dynamic_runs
+
+        assert runs["illinois"] < runs["proportional"]
+
+    def test_iteration_limit(self, rastr_templates):
+        """Тест ограничения количества расчетов динамики"""
+        com, rastr = self.make_rastr()
+        result = rastr.find_shunt_kz(1, 100.0, 0.01, method="proportional", max_iterations=2)
+
+        assert result.iterations == com.dynamic_runs == 2
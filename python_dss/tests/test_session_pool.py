@@ -0,0 +1,76 @@
+"""
+Тесты для пула сессий RASTR
+"""
+
+import pytest
+
+from rastr_operations import RastrOperations, RastrSessionPool
+from tests.fake_rastr import FakeRastr, write_json
+
+
+class TestRastrSessionPool:
+    """Тесты для RastrSessionPool"""
+
+    @pytest.fixture
+    def created(self):
+        """Список созданных имитаций COM-объекта"""
+        return []
+
+    @pytest.fixture
+    def pool(self, created):
+        """Пул сессий над имитацией RASTR"""
+        def factory():
+            com = FakeRastr()
+            created.append(com)
+            return RastrOperations(com_object=com)
+        return RastrSessionPool(factory=factory)
+
+    def test_session_reused(self, pool, created):
+        """Тест повторного использования сессии"""
+        with pool.session() as first:
+            pass
+        with pool.session() as second:
+            pass
+
+        assert first is second
+        assert len(created) == 1
+        assert pool.hits == 1
+        assert pool.misses == 1
+
+    def test_discard_on_error(self, pool, created):
+        """Тест отбрасывания сессии после ошибки"""
+        with pytest.raises(RuntimeError):
+            with pool.session():
+                raise RuntimeError("COM error")
+
+        with pool.session():
+            pass
+
+        assert len(created) == 2
+        assert pool.discards == 1
+
+    def test_max_uses(self, created):
+        """Тест пересоздания сессии после заданного числа выдач"""
+        pool = RastrSessionPool(
+            factory=lambda: created.append(FakeRastr()) or RastrOperations(com_object=created[-1]),
+            max_uses=2,
+        )
+        for _ in range(4):
+            with pool.session():
+                pass
+
+        assert len(created) == 2
+
+    def test_reset_clears_loaded_templates(self, pool, created, rastr_templates, temp_dir):
+        """Тест сброса таблиц шаблона при возврате сессии"""
+        regime = write_json(temp_dir / "режим1.rst", {"node": {"ny": [1, 2], "uhom": [110, 110]}})
+
+        with pool.session() as rastr:
+            rastr.load(regime)
+            assert created[0].tables["node"].size == 2
+
+        assert created[0].tables["node"].size == 0
+        stats = pool.stats()
+        assert stats['resets'] == 1
+        assert stats['reset_time'] >= 0.0
+        assert stats['hit_rate'] == 0.0
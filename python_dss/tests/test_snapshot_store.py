@@ -0,0 +1,215 @@
+"""
+Тесты для хранилища подготовленных режимов
+"""
+
+from pathlib import Path
+
+import pytest
+
+from models import VrnInfo, RgmsInfo, ScnsInfo
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore
+from tests.fake_rastr import FakeRastr, write_json
+
+
+NORMAL = VrnInfo(id=-1, name="Нормальная схема", num=0, deactive=False)
+REPAIR = VrnInfo(id=0, name="Ремонт ВЛ", num=1, deactive=False)
+
+
+class TestSnapshotStore:
+    """Тесты для SnapshotStore"""
+
+    @pytest.fixture
+    def store(self, temp_dir):
+        """Хранилище снимков во временной директории"""
+        return SnapshotStore(root=temp_dir / "snapshots", max_mb=10)
+
+    def test_session_restore(self, store, regime_files):
+        """Тест повторной подготовки в той же сессии без загрузки"""
+        regime, rems = regime_files
+        com = FakeRastr()
+        rastr = RastrOperations(com_object=com)
+
+        assert store.prepare(rastr, regime, REPAIR, rems)
+        loads = com.calls["Load"]
+        assert store.prepare(rastr, regime, REPAIR, rems)
+
+        assert com.calls["Load"] == loads
+        assert store.session_hits == 1
+        assert com.tables["vetv"].data["x"] == [20.0]
+
+    def test_disk_restore_across_stores(self, store, regime_files, temp_dir):
+        """Тест загрузки снимка новой сессией и новым экземпляром хранилища"""
+        regime, rems = regime_files
+        store.prepare(RastrOperations(com_object=FakeRastr()), regime, REPAIR, rems)
+
+        other = SnapshotStore(root=temp_dir / "snapshots", max_mb=10)
+        com = FakeRastr()
+        assert other.prepare(RastrOperations(com_object=com), regime, REPAIR, rems)
+
+        assert other.disk_hits == 1
+        assert com.calls["ApplyVariant"] == 0
+        assert com.calls["rgm"] == 0
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert com.tables["com_dynamics"].data["MaxResultFiles"] == [1]
+
+    def test_invalidation_after_write(self, store, regime_files):
+        """Тест сброса подготовленного состояния после изменения режима"""
+        regime, rems = regime_files
+        com = FakeRastr()
+        rastr = RastrOperations(com_object=com)
+        store.prepare(rastr, regime, NORMAL, rems)
+
+        rastr.set_val("node", "vras", 0, 100.0)
+        assert rastr.state_key is None
+
+        store.prepare(rastr, regime, NORMAL, rems)
+        assert store.disk_hits == 1
+        assert com.tables["node"].data["vras"] == [115, 112]
+
+    def test_evicted_before_load(self, store, regime_files, monkeypatch):
+        """Тест подготовки режима заново, если снимок удален другим процессом после проверки"""
+        regime, rems = regime_files
+        store.prepare(RastrOperations(com_object=FakeRastr()), regime, REPAIR, rems)
+
+        get = SnapshotStore.get
+
+        def get_and_evict(self, key):
+            meta = get(self, key)
+            self.path(key).unlink()
+            return meta
+
+        monkeypatch.setattr(SnapshotStore, "get", get_and_evict)
+        com = FakeRastr()
+        rastr = RastrOperations(com_object=com)
+
+        assert store.prepare(rastr, regime, REPAIR, rems)
+        assert com.calls["ApplyVariant"] == 1
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert rastr.state_key is not None
+        assert (store.disk_hits, store.misses) == (0, 2)
+
+    def test_unstable_variant(self, store, regime_files):
+        """Тест сохранения признака несбалансированного режима"""
+        regime, rems = regime_files
+        com = FakeRastr(rgm_model=lambda rastr: 1)
+        assert not store.prepare(RastrOperations(com_object=com), regime, NORMAL, rems)
+
+        com2 = FakeRastr()
+        assert not store.prepare(RastrOperations(com_object=com2), regime, NORMAL, rems)
+        assert com2.calls["Load"] == 0
+
+    def test_eviction(self, regime_files, temp_dir):
+        """Тест удаления старых снимков при превышении размера"""
+        regime, rems = regime_files
+        store = SnapshotStore(root=temp_dir / "snapshots", max_mb=0)
+        store.prepare(RastrOperations(com_object=FakeRastr()), regime, NORMAL, rems)
+        store.prepare(RastrOperations(com_object=FakeRastr()), regime, REPAIR, rems)
+
+        assert store.evicted == 1
+        assert len(list((temp_dir / "snapshots").glob("*.rst"))) == 1
+
+
+class TestCalculatorsWithSnapshots:
+    """Тесты подготовки режима в расчетах"""
+
+    def test_variant_applied_once_per_pair(self, regime_files, temp_dir, monkeypatch):
+        """Тест однократного применения варианта для всех сценариев пары"""
+        from utils.config import config
+        from calculations import MaxKZTimeCalc
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        regime, rems = regime_files
+        scns = []
+        for idx in range(3):
+            scns.append(ScnsInfo(name=write_json(temp_dir / f"кз{idx}.scn", {
+                "DFWAutoActionScn": {"ObjectClass": ["node", "vetv"],
+                                     "TimeStart": [1.0, 1.1], "DT": [0.1, 999]},
+            })))
+
+        com = FakeRastr()
+        calc = MaxKZTimeCalc(
+            None, [RgmsInfo(name=regime)], scns, [NORMAL, REPAIR], rems, 0.02, 0.5,
+            session_pool=RastrSessionPool(factory=lambda: RastrOperations(com_object=com)),
+            snapshot_store=SnapshotStore(root=temp_dir / "snapshots", max_mb=10),
+        )
+        results = calc.calc()
+
+        assert com.calls["ApplyVariant"] == 1
+        times = results[0].crt_shems[1].times
+        assert [t.crt_time for t in times] == [0.5, 0.5, 0.5]
+
+    def test_lpn_scenario_once_per_scenario(self, regime_files, temp_dir, monkeypatch):
+        """Тест однократного составления сценария ЛАПНУ для всех вариантов"""
+        from utils.config import config
+        from calculations import DynStabilityCalc
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        monkeypatch.setitem(config._config["performance"], "lpn_scn_cache", True)
+        regime, rems = regime_files
+        sechen = write_json(temp_dir / "сечения.sch", {"sechen": {"ns": [1], "psech": [500.0]}})
+        lapnu = write_json(temp_dir / "лапну.lpn", {"fake_lpn": {"num": [1], "lpn": [1]}})
+        scns = [ScnsInfo(name=write_json(temp_dir / f"кз{idx}.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node"], "TimeStart": [1.0], "DT": [0.1 * (idx + 1)]},
+        })) for idx in range(2)]
+
+        com = FakeRastr()
+        calc = DynStabilityCalc(
+            None, [RgmsInfo(name=regime)], scns, [NORMAL, REPAIR], rems, [], sechen, lapnu,
+            False, "1", False, True, True,
+            session_pool=RastrSessionPool(factory=lambda: RastrOperations(com_object=com)),
+            snapshot_store=SnapshotStore(root=temp_dir / "snapshots", max_mb=10),
+        )
+        results = calc.calc()
+
+        assert com.calls["LAPNUSMZU"] == len(scns)
+        assert all(ev.with_pa_result.is_stable for shem in results[0].dyn_shems for ev in shem.events)
+
+
+class TestLpnScenario:
+    """Тесты хранения сценариев, составленных из ЛАПНУ"""
+
+    @pytest.fixture
+    def files(self, regime_files, temp_dir):
+        """Файлы сечений, ЛАПНУ и сценария"""
+        sechen = write_json(temp_dir / "сечения.sch", {
+            "sechen": {"ns": [1], "psech": [500.0], "p0": [500.0], "dp": [5.0]},
+        })
+        lapnu = write_json(temp_dir / "лапну.lpn", {"fake_lpn": {"num": [1], "lpn": [1]}})
+        scn = write_json(temp_dir / "кз.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node"], "Formula": ["0"]},
+        })
+        return sechen, lapnu, scn
+
+    @pytest.fixture
+    def store_dir(self, temp_dir):
+        """Директория хранилища"""
+        return temp_dir / "snapshots"
+
+    def compose(self, store, files, lpns="1"):
+        """Составление сценария в новой сессии"""
+        com = FakeRastr()
+        store.lpn_scenario(RastrOperations(com_object=com), *files[:2], lpns, files[2])
+        return com
+
+    def test_reuse(self, store_dir, files):
+        """Тест повторного использования сценария новой сессией и новым хранилищем"""
+        composed = self.compose(SnapshotStore(root=store_dir, max_mb=10), files)
+        store = SnapshotStore(root=store_dir, max_mb=10)
+        com = self.compose(store, files)
+
+        assert com.calls["LAPNUSMZU"] == 0
+        assert com.tables["DFWAutoActionScn"].data == composed.tables["DFWAutoActionScn"].data
+        assert com.tables["DFWAutoActionScn"].data["ObjectClass"] == ["lapnu", "node"]
+        assert "sechen" in com.tables
+        assert store.stats()["lpn_hits"] == 1
+
+    def test_invalidation(self, store_dir, files):
+        """Тест повторного составления после изменения сценария или номеров LPN"""
+        store = SnapshotStore(root=store_dir, max_mb=10)
+        self.compose(store, files)
+        write_json(Path(files[2]), {"DFWAutoActionScn": {"ObjectClass": ["vetv"], "Formula": ["0"]}})
+        com = self.compose(store, files)
+        self.compose(store, files, lpns="2")
+
+        assert com.tables["DFWAutoActionScn"].data["ObjectClass"] == ["lapnu", "vetv"]
+        assert store.lpn_misses == 3
@@ -0,0 +1,161 @@
+"""
+Тесты для линии, разделенной узлом КЗ, и ее снимков в расчете остаточного напряжения
+"""
+
+import pytest
+
+from models import VrnInfo, RgmsInfo, ScnsInfo
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, SplitLine
+from tests.fake_rastr import FakeRastr, fault_distance_model, write_json
+
+
+NORMAL = VrnInfo(id=-1, name="Нормальная схема", num=0, deactive=False)
+
+
+def prepared_session(store, regime, model=None):
+    """Сессия с подготовленным режимом нормальной схемы"""
+    com = FakeRastr(dynamic_model=model)
+    rastr = RastrOperations(com_object=com)
+    assert store.prepare(rastr, regime, NORMAL, None)
+    return com, rastr
+
+
+class TestSplitLine:
+    """Тесты для SplitLine"""
+
+    @pytest.fixture
+    def store(self, temp_dir):
+        """Хранилище снимков во временной директории"""
+        return SnapshotStore(root=temp_dir / "snapshots", max_mb=10)
+
+    def test_build(self, store, regime_files):
+        """Тест разделения линии: узел КЗ, ветви и отключение исходной линии"""
+        regime, _ = regime_files
+        com, rastr = prepared_session(store, regime)
+        split = SplitLine.build(rastr, 1, 2, 0, 7, 110)
+
+        assert split.solved
+        assert split.node == 7
+        assert com.tables["node"].data["ny"][split.node_row] == 7
+        assert com.tables["vetv"].data["sta"][0] == 1
+        assert [com.tables["vetv"].data["ip"][row] for row in split.branches] == [1, 7]
+        assert [com.tables["vetv"].data["iq"][row] for row in split.branches] == [7, 2]
+        assert (split.r, split.x) == (1.0, 10.0)
+
+    def test_set_without_load_flow(self, store, regime_files):
+        """Тест смены положения КЗ без расчета режима: напряжение узла КЗ по концам линии"""
+        regime, _ = regime_files
+        com, rastr = prepared_session(store, regime)
+        split = SplitLine.build(rastr, 1, 2, 0, 7, 110)
+        rgm_calls = com.calls["rgm"]
+
+        assert split.set(rastr, 25.0)
+        assert com.calls["rgm"] == rgm_calls
+        branch1, branch2 = split.branches
+        assert com.tables["vetv"].data["x"][branch1] == pytest.approx(2.5)
+        assert com.tables["vetv"].data["x"][branch2] == pytest.approx(7.5)
+        assert com.tables["node"].data["vras"][split.node_row] == pytest.approx(114.25)
+
+        split.solved = False
+        assert not split.set(rastr, 50.0)
+        assert com.calls["rgm"] == rgm_calls + 1
+
+    def test_fixture_reuse(self, store, regime_files):
+        """Тест построения разделенной линии один раз на (режим, вариант, линию)"""
+        regime, _ = regime_files
+        _, rastr = prepared_session(store, regime)
+        built = store.split_line(rastr, regime, NORMAL, None, 1, 2, 0, 3, 110)
+
+        com, rastr = prepared_session(store, regime)
+        com.calls.clear()
+        split = store.split_line(rastr, regime, NORMAL, None, 1, 2, 0, 5, 110)
+
+        assert com.calls["rgm"] == com.calls["AddRow"] == 0
+        assert split.node == built.node == 3
+        assert split.branches == built.branches
+        assert (split.r, split.x, split.solved) == (1.0, 10.0, True)
+        assert (store.split_hits, store.split_misses) == (1, 1)
+
+
+class TestUostSplitFixture:
+    """Тесты расчета остаточного напряжения со снимками разделенной линии"""
+
+    @pytest.fixture
+    def scenarios(self, regime_files, temp_dir):
+        """Сценарии КЗ на линии 1-2 у узла 1"""
+        return [ScnsInfo(name=write_json(temp_dir / f"кз{idx}.scn", {
+            "DFWAutoActionScn": {
+                "Id": [1, 2], "ObjectClass": ["vetv", "node"], "ObjectKey": ["1,2,0", "1"],
+                "ObjectProp": ["sta", "x"], "Formula": ["1", formula], "TimeStart": [1.0, 1.0],
+            },
+        })) for idx, formula in enumerate(["5", "7"])]
+
+    def test_matches_legacy(self, regime_files, scenarios, temp_dir, monkeypatch):
+        """Тест совпадения границы устойчивости с расчетом режима при каждой пробе"""
+        from calculations import UostStabilityCalc
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        regime, _ = regime_files
+        outputs, rgm_calls = {}, {}
+        for fixture in (False, True):
+            sessions = []
+
+            def factory():
+                com = FakeRastr(dynamic_model=fault_distance_model(4.0))
+                sessions.append(com)
+                return RastrOperations(com_object=com)
+
+            calc = UostStabilityCalc(
+                None, [RgmsInfo(name=regime)], scenarios, [NORMAL], None, [],
+                session_pool=RastrSessionPool(factory=factory),
+                snapshot_store=SnapshotStore(root=temp_dir / f"snapshots{fixture}", max_mb=10),
+                split_fixture=fixture,
+            )
+            events = calc.calc()[0].uost_shems[0].events
+            outputs[fixture] = [(event.distance, event.begin_x, event.end_x) for event in events]
+            rgm_calls[fixture] = sum(com.calls["rgm"] for com in sessions)
+
+        assert outputs[True] == outputs[False]
+        assert all(35.0 <= distance <= 45.0 for distance, _, _ in outputs[True])
+        assert rgm_calls[True] < rgm_calls[False]
+
+    def test_search_probes(self, regime_files, scenarios, temp_dir, monkeypatch):
+        """Тест точности места КЗ и количества расчетов динамики с пробами по границе предыдущего сценария"""
+        from calculations import UostStabilityCalc
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        regime, _ = regime_files
+        probes = {}
+        for warm_start in (False, True):
+            calc = UostStabilityCalc(
+                None, [RgmsInfo(name=regime)], scenarios, [NORMAL], None, [],
+                session_pool=RastrSessionPool(
+                    factory=lambda: RastrOperations(com_object=FakeRastr(dynamic_model=fault_distance_model(4.0)))
+                ),
+                snapshot_store=SnapshotStore(root=temp_dir / f"snapshots{warm_start}", max_mb=10),
+                split_fixture=True, tolerance=0.1, warm_start=warm_start,
+            )
+            events = calc.calc()[0].uost_shems[0].events
+
+            assert all(40.0 <= event.distance <= 40.1 for event in events)
+            probes[warm_start] = [event.probes for event in events]
+            assert calc.search_stats == {'scenarios': 2, 'probes': sum(probes[warm_start])}
+
+        assert probes[True][0] == probes[False][0]
+        assert probes[True][1] < probes[False][1]
+
+    def test_no_warm_start_in_parallel(self, regime_files, scenarios, temp_dir, monkeypatch):
+        """Тест отключения проб по границе предыдущего сценария при параллельном расчете"""
+        from calculations import UostStabilityCalc
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        regime, _ = regime_files
+        calc = UostStabilityCalc(
+            None, [RgmsInfo(name=regime)], scenarios, [NORMAL], None, [],
+            parallel_workers=2, warm_start=True,
+        )
+
+        assert not calc._warm_start
@@ -0,0 +1,61 @@
+"""
+Тесты для индекса шаблонов RASTR
+"""
+
+import os
+
+import pytest
+
+from rastr_operations import RastrOperations, TemplateIndex
+
+
+@pytest.fixture
+def template_dir(temp_dir):
+    """Директория шаблонов с исключаемым файлом режима"""
+    directory = temp_dir / "SHABLON"
+    directory.mkdir()
+    (directory / "базовый режим мт.rst").write_text("{}", encoding="utf-8")
+    (directory / "режим.rst").write_text("{}", encoding="utf-8")
+    (directory / "сценарий.scn").write_text("{}", encoding="utf-8")
+    return directory
+
+
+class TestTemplateIndex:
+    """Тесты для TemplateIndex"""
+
+    def test_single_scan(self, template_dir, temp_dir):
+        """Тест однократного сканирования директории"""
+        index = TemplateIndex(cache_file=temp_dir / "index.json", refresh_interval=0)
+
+        for _ in range(10):
+            assert index.find(".rst", template_dir) == str(template_dir / "режим.rst")
+            assert index.find(".scn", template_dir) == str(template_dir / "сценарий.scn")
+        assert index.find(".dfw", template_dir) is None
+        assert index.scans == 1
+
+    def test_refresh_on_change(self, template_dir, temp_dir):
+        """Тест повторного сканирования после изменения директории"""
+        index = TemplateIndex(cache_file=temp_dir / "index.json", refresh_interval=0)
+        assert index.find(".dfw", template_dir) is None
+
+        (template_dir / "динамика.dfw").write_text("{}", encoding="utf-8")
+        stat = os.stat(template_dir)
+        os.utime(template_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        assert index.find(".dfw", template_dir) == str(template_dir / "динамика.dfw")
+        assert index.scans == 2
+
+    def test_shared_between_instances(self, template_dir, temp_dir):
+        """Тест использования сохраненного индекса другим экземпляром (процессом)"""
+        TemplateIndex(cache_file=temp_dir / "index.json").warmup(template_dir)
+
+        other = TemplateIndex(cache_file=temp_dir / "index.json")
+        assert other.find(".rst", template_dir) == str(template_dir / "режим.rst")
+        assert other.scans == 0
+
+    def test_missing_directory(self, temp_dir, monkeypatch):
+        """Тест поиска шаблона в отсутствующей директории"""
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "rastr_template_dir", str(temp_dir / "нет"))
+        assert RastrOperations.find_template_path_with_extension(".rst") is None
@@ -0,0 +1,121 @@
+"""
+Тесты для эквивалентных сопротивлений сети и начального приближения шунта КЗ
+"""
+
+import cmath
+
+import pytest
+
+from calculations import thevenin
+from calculations.thevenin import shunt_estimate, thevenin_impedances
+from models import RgmsInfo, VrnInfo
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore
+from tests.fake_rastr import FakeRastr, shunt_voltage_model, write_json
+
+
+Z_LINE = complex(2.0, 25.0)
+Z_TRANSFORMER = complex(1.0, 10.0)
+BASE_ANGLE = 1.471
+
+
+def make_rastr(**tables):
+    """Сессия RASTR: базисный узел 1, линия 1-2, трансформатор 2-3 (kt = 0.5), узел 4 без связи"""
+    com = FakeRastr()
+    com.table("node").data = {"ny": [1, 2, 3, 4], "tip": [0, 1, 1, 1], "sta": [0, 0, 0, 0]}
+    com.table("vetv").data = {
+        "ip": [1, 2, 2], "iq": [2, 3, 3], "r": [Z_LINE.real, Z_TRANSFORMER.real, 5.0],
+        "x": [Z_LINE.imag, Z_TRANSFORMER.imag, 50.0], "ktr": [0, 0.5, 0.5], "sta": [0, 0, 1],
+    }
+    for name, data in tables.items():
+        com.table(name).data = data
+    return RastrOperations(com_object=com)
+
+
+class TestTheveninImpedances:
+    """Тесты эквивалентных сопротивлений"""
+
+    @pytest.mark.parametrize("scipy", [True, False])
+    def test_radial_network(self, monkeypatch, scipy):
+        """Тест сопротивлений радиальной сети с трансформатором (SciPy и NumPy)"""
+        if scipy and not thevenin.SCIPY_AVAILABLE:
+            pytest.skip("SciPy не установлен")
+        monkeypatch.setattr(thevenin, "SCIPY_AVAILABLE", scipy)
+
+        z_th = thevenin_impedances(make_rastr(), [1, 2, 3, 4])
+
+        assert set(z_th) == {2, 3}
+        assert z_th[2] == pytest.approx(Z_LINE)
+        # Сопротивление приводится к напряжению узла 3 (kt = 0.5)
+        assert z_th[3] == pytest.approx((Z_LINE + Z_TRANSFORMER) * 0.25)
+
+    def test_generator(self):
+        """Тест учета генератора как источника за сопротивлением xd1"""
+        rastr = make_rastr(Generator={"Node": [2], "xd1": [50.0], "sta": [0]})
+
+        z_th = thevenin_impedances(rastr, [2])
+
+        assert z_th[2] == pytest.approx(1 / (1 / Z_LINE + 1 / 50j))
+
+    def test_no_data(self):
+        """Тест отсутствия данных режима"""
+        com = FakeRastr()
+        com.table("node").data = {"ny": [1, 2]}
+        assert thevenin_impedances(RastrOperations(com_object=com), [2]) == {}
+
+
+class TestShuntEstimate:
+    """Тесты оценки сопротивления шунта"""
+
+    @pytest.mark.parametrize("ratio", [0.1, 0.33, 0.66, 0.9])
+    def test_divider(self, ratio):
+        """Тест достижения целевого напряжения на делителе"""
+        z = shunt_estimate(Z_LINE, 115.0, 115.0 * ratio, BASE_ANGLE)
+        z_shunt = cmath.rect(z, BASE_ANGLE)
+
+        assert 115.0 * abs(z_shunt) / abs(z_shunt + Z_LINE) == pytest.approx(115.0 * ratio)
+
+    def test_unreachable(self):
+        """Тест недостижимого целевого напряжения"""
+        assert shunt_estimate(Z_LINE, 110.0, 115.0, BASE_ANGLE) is None
+        assert shunt_estimate(0j, 115.0, 50.0, BASE_ANGLE) is None
+
+
+class TestTheveninStart:
+    """Тесты начального приближения в расчете шунтов КЗ"""
+
+    @pytest.fixture
+    def regime(self, rastr_templates, temp_dir, monkeypatch):
+        """Узел 2 за линией от базисного узла с ЭДС 115 кВ"""
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        return write_json(temp_dir / "режим.rst", {
+            "node": {"ny": [1, 2], "uhom": [110, 110], "vras": [115.0, 115.0],
+                     "tip": [0, 1], "sel": [0, 1]},
+            "vetv": {"ip": [1], "iq": [2], "r": [Z_LINE.real], "x": [Z_LINE.imag]},
+            "com_regim": {"it_max": [20], "dv_min": [0.5]},
+            "com_dynamics": {"Tras": [5.0], "MaxResultFiles": [0],
+                             "SnapAutoLoad": [0], "SnapMaxCount": [0]},
+        })
+
+    @pytest.mark.parametrize("thevenin_start", [False, True])
+    def test_iterations(self, regime, temp_dir, thevenin_start):
+        """Тест сходимости за один расчет динамики от оценки по эквивалентному сопротивлению"""
+        from calculations import ShuntKZCalc
+
+        calc = ShuntKZCalc(
+            None, [RgmsInfo(name=regime)], [VrnInfo(id=-1, name="Нормальная схема", num=0, deactive=False)],
+            None, [], True, True, True, True,
+            session_pool=RastrSessionPool(factory=lambda: RastrOperations(
+                com_object=FakeRastr(dynamic_model=shunt_voltage_model(115.0, Z_LINE)))),
+            snapshot_store=SnapshotStore(root=temp_dir / "snapshots", max_mb=10),
+            thevenin_start=thevenin_start,
+        )
+        node = calc.calc()[0].shems[0].nodes[0]
+
+        assert abs(node.u1 - 0.66 * 115.0) <= 2.0
+        assert abs(node.u2 - 0.33 * 115.0) <= 2.0
+        if thevenin_start:
+            assert node.iterations1 == node.iterations2 == 1
+        else:
+            assert node.iterations1 > 1 and node.iterations2 > 1
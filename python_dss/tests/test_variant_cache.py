@@ -0,0 +1,142 @@
+"""
+Тесты для кэша изменений режима по вариантам
+"""
+
+import pytest
+
+from rastr_operations import RastrOperations, VariantCache
+from tests.fake_rastr import FakeRastr, write_json
+
+
+def load_regime(regime):
+    """Новая сессия с загруженным режимом"""
+    com = FakeRastr()
+    rastr = RastrOperations(com_object=com)
+    rastr.load(regime)
+    return com, rastr
+
+
+class TestVariantCache:
+    """Тесты для VariantCache"""
+
+    @pytest.fixture
+    def cache(self):
+        """Кэш с явным списком таблиц"""
+        return VariantCache(tables=["node", "vetv", "Generator"])
+
+    def test_reuse_across_sessions(self, cache, regime_files):
+        """Тест применения запомненных изменений без загрузки файла ремонтных схем"""
+        regime, rems = regime_files
+        com, rastr = load_regime(regime)
+        com.calls.clear()
+        cache.apply(rastr, 1, rems)
+        assert com.tables["vetv"].data["x"] == [20.0]
+        miss_calls = com.total_calls
+
+        com, rastr = load_regime(regime)
+        com.calls.clear()
+        cache.apply(rastr, 1, rems)
+
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert com.calls["Load"] == com.calls["ApplyVariant"] == 0
+        assert com.total_calls < miss_calls
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_reuse_by_regime_file(self, cache, regime_files):
+        """Тест повторного применения по хешу файла режима: только запись изменений"""
+        regime, rems = regime_files
+        _, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems, regime_key="режим")
+
+        com, rastr = load_regime(regime)
+        com.calls.clear()
+        cache.apply(rastr, 1, rems, regime_key="режим")
+
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert com.calls["Load"] == com.calls["ApplyVariant"] == com.calls["ReadSafeArray"] == 0
+        assert com.total_calls < 20
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_content_check_on_regime_miss(self, cache, regime_files):
+        """Тест применения по содержимому таблиц, если тот же режим передан с другим ключом"""
+        regime, rems = regime_files
+        _, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems, regime_key="режим")
+
+        com, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems, regime_key="копия режима")
+
+        assert com.calls["ApplyVariant"] == 0
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_different_regime_values(self, cache, regime_files, temp_dir):
+        """Тест применения через RASTR, если исходные значения режима отличаются"""
+        regime, rems = regime_files
+        _, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems)
+
+        other = write_json(temp_dir / "режим2.rst", {
+            "node": {"ny": [1, 2], "uhom": [110, 110], "vras": [115, 112]},
+            "vetv": {"ip": [1], "iq": [2], "np": [0], "r": [1.0], "x": [15.0]},
+        })
+        com, rastr = load_regime(other)
+        cache.apply(rastr, 1, rems)
+
+        assert com.calls["ApplyVariant"] == 1
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert cache.stats() == {"hits": 0, "misses": 2}
+
+    def test_value_already_set(self, cache, regime_files, temp_dir):
+        """Тест режима, в котором значения варианта уже установлены (пустая разница)"""
+        _, rems = regime_files
+        applied = write_json(temp_dir / "режим_вариант.rst", {
+            "node": {"ny": [1, 2], "uhom": [110, 110], "vras": [115, 112]},
+            "vetv": {"ip": [1], "iq": [2], "np": [0], "r": [1.0], "x": [20.0]},
+        })
+        _, rastr = load_regime(applied)
+        cache.apply(rastr, 1, rems)
+
+        other = write_json(temp_dir / "режим2.rst", {
+            "node": {"ny": [1, 2], "uhom": [110, 110], "vras": [115, 112]},
+            "vetv": {"ip": [1], "iq": [2], "np": [0], "r": [1.0], "x": [15.0]},
+        })
+        com, rastr = load_regime(other)
+        cache.apply(rastr, 1, rems, regime_key="режим2")
+
+        assert com.calls["ApplyVariant"] == 1
+        assert com.tables["vetv"].data["x"] == [20.0]
+        assert cache.hits == 0
+
+    def test_file_change(self, cache, regime_files, temp_dir):
+        """Тест сброса изменений при изменении файла ремонтных схем"""
+        regime, rems = regime_files
+        _, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems)
+
+        write_json(temp_dir / "ремонты.vrn", {
+            "fake_variants": {"num": [1], "table": ["vetv"], "sel": ["ip = 1 & iq = 2"],
+                              "col": ["x"], "value": [30.0]},
+        })
+        com, rastr = load_regime(regime)
+        cache.apply(rastr, 1, rems)
+
+        assert com.tables["vetv"].data["x"] == [30.0]
+        assert cache.misses == 2
+
+    def test_apply_variant(self, regime_files, monkeypatch):
+        """Тест применения варианта в RastrOperations через кэш процесса"""
+        from utils.config import config
+        from rastr_operations import variant_cache
+
+        monkeypatch.setitem(config._config["performance"], "variant_delta_cache", True)
+        variant_cache.clear()
+        regime, rems = regime_files
+        applied = 0
+        for _ in range(3):
+            com, rastr = load_regime(regime)
+            assert rastr.apply_variant(1, rems)
+            assert com.tables["vetv"].data["x"] == [20.0]
+            applied += com.calls["ApplyVariant"]
+
+        assert applied == 1
@@ -0,0 +1,122 @@
+"""
+Тесты для траектории утяжеления
+"""
+
+import numpy as np
+import pytest
+
+from models import RgmsInfo, SchInfo, ScnsInfo, VrnInfo
+from rastr_operations import RastrOperations, RastrSessionPool, SnapshotStore, WeightingTrajectory
+from tests.fake_rastr import FakeRastr, transfer_limit_model, weighting_model, write_json
+
+
+def make_rastr():
+    """Сессия RASTR с траекторией утяжеления и двумя сечениями (переток второго снижается)"""
+    com = FakeRastr(ut_model=weighting_model)
+    com.table("ut_common").data = {"kfc": [10.0], "sum_kfc": [0.0], "limit": [100.0]}
+    com.table("sechen").data = {"ns": [1, 2], "psech": [500.0, 100.0], "p0": [500.0, 100.0],
+                                "dp": [5.0, -0.5], "dp2": [0.02, 0.0]}
+    return com, RastrOperations(com_object=com)
+
+
+class TestWeightingTrajectory:
+    """Тесты записи траектории и интерполяции"""
+
+    def test_record(self):
+        """Тест записи траектории до окончания утяжеления"""
+        com, rastr = make_rastr()
+
+        trajectory = rastr.weighting_trajectory(resolution=2)
+
+        assert len(trajectory) == 21
+        assert trajectory.limit == 100.0
+        assert trajectory.kfc == 5.0
+        assert trajectory.value(40.0, 0) == pytest.approx(500 + 200 + 32)
+        assert trajectory.value(40.0, 1) == pytest.approx(80.0)
+        # Исходный шаг траектории восстановлен, в сессии - режим последней точки
+        assert com.tables["ut_common"].data["kfc"] == [10.0]
+        assert rastr.get_val("sechen", "psech", 0) == pytest.approx(1200.0)
+
+    def test_unloading(self):
+        """Тест записи в направлении разгрузки до заданной суммы шагов"""
+        _, rastr = make_rastr()
+
+        trajectory = rastr.weighting_trajectory(kfc=-10.0, limit=85.0)
+
+        assert trajectory.limit == -90.0
+        assert trajectory.covers(-85.0) and not trajectory.covers(5.0)
+        assert trajectory.step_for(300.0, 0) == pytest.approx(-50.0)
+
+    def test_step_for(self):
+        """Тест суммы шагов по перетоку: убывающий переток, вне траектории, немонотонный"""
+        trajectory = WeightingTrajectory(np.array([0.0, 10.0, 20.0]),
+                                         np.array([[100.0, 5.0], [80.0, 7.0], [60.0, 6.0]]), 10.0)
+
+        assert trajectory.step_for(90.0, 0) == pytest.approx(5.0)
+        assert trajectory.step_for(120.0, 0) is None
+        # Первый по направлению утяжеления отрезок с заданным перетоком
+        assert trajectory.step_for(6.5, 1) == pytest.approx(7.5)
+        assert trajectory.step_for(5.5, 1) == pytest.approx(2.5)
+
+    def test_step_for_flat_limit(self):
+        """Тест интерполяции у предела утяжеления, где переток перестает расти"""
+        trajectory = WeightingTrajectory(np.array([0.0, -10.0, -20.0, -30.0]),
+                                         np.array([100.0, 150.0, 170.0, 170.0]), -10.0)
+
+        assert trajectory.step_for(160.0) == pytest.approx(-15.0)
+        assert trajectory.step_for(170.0) == pytest.approx(-20.0)
+        assert trajectory.step_for(180.0) is None
+
+
+class TestMdpCalibration:
+    """Тесты калибровки шага утяжеления по траектории"""
+
+    @pytest.fixture
+    def files(self, temp_dir, monkeypatch):
+        """Сечение с нелинейной зависимостью перетока от шага, траектория и устойчивый сценарий"""
+        from utils.config import config
+
+        monkeypatch.setitem(config._config["paths"], "results_dir", str(temp_dir / "results"))
+        sechen = write_json(temp_dir / "сечения.sch", {
+            "sechen": {"ns": [1], "psech": [500.0], "p0": [500.0], "dp": [5.0], "dp2": [0.02]},
+        })
+        vir = write_json(temp_dir / "траектория.ut2", {
+            "ut_common": {"kfc": [10.0], "sum_kfc": [0.0], "limit": [100.0]},
+        })
+        scn = write_json(temp_dir / "кз.scn", {
+            "DFWAutoActionScn": {"ObjectClass": ["node"], "Pmax": [800.0]},
+        })
+        return sechen, vir, [ScnsInfo(name=scn)]
+
+    def test_calibration(self, regime_files, files, temp_dir):
+        """Тест калибровки без повторных загрузок файлов при записи траектории"""
+        from calculations import MdpStabilityCalc
+
+        regime, rems = regime_files
+        sechen, vir, scns = files
+        loads = {}
+        for trajectory in (False, True):
+            sessions = []
+
+            def factory():
+                sessions.append(FakeRastr(dynamic_model=transfer_limit_model, ut_model=weighting_model))
+                return RastrOperations(com_object=sessions[-1])
+
+            calc = MdpStabilityCalc(
+                None, [RgmsInfo(name=regime)], scns,
+                [VrnInfo(id=-1, name="Нормальная схема", num=0, deactive=False)], rems, vir, sechen,
+                None, [SchInfo(id=0, num=1, name="Сечение", control=True)], [], "", 0,
+                True, False, False, weighting_trajectory=trajectory,
+                session_pool=RastrSessionPool(factory=factory),
+                snapshot_store=SnapshotStore(root=temp_dir / f"snapshots{trajectory}", max_mb=10),
+            )
+            shem = calc.calc()[0].mdp_shems[0]
+            p_current = 500.0 + 5.0 * shem.max_step + 0.02 * shem.max_step ** 2
+
+            assert shem.p_pred == pytest.approx(1200.0)
+            assert abs(p_current - 0.9 * shem.p_pred) <= 2.0
+            loads[trajectory] = sessions[0].calls["Load"]
+
+        # Шаг по траектории проверяется одним расчетом, без итераций калибровки
+        # (с учетом загрузок для записи траектории разгрузки)
+        assert loads[True] < loads[False]
@@ -0,0 +1,254 @@
+"""
+Поиск границы устойчивости по параметру утяжеления
+
+Каждая проба - это расчет динамики с результатом "устойчиво/неустойчиво"
+и контролируемой величиной y(x) (например, переток в сечении при шаге
+утяжеления x), монотонной по x. Граница ищется в интервале между
+устойчивой и неустойчивой точками до сужения интервала по y до заданной
+точности. Стратегии - пошаговые: по интервалу и истории проб предлагают
+следующее значение параметра.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+# Доля интервала у его концов, в которую не допускается шаг по хорде
+EDGE_FRACTION = 0.05
+# Минимальная ширина интервала по параметру (дальнейшее деление бессмысленно)
+MIN_WIDTH = 1e-3
+
+
+class BoundarySearch:
+    """
+    Деление интервала по параметру пополам
+
+    Интервал [x_s, x_u]: x_u - неустойчивая точка, x_s - устойчивая; начальная
+    устойчивая точка может быть предполагаемой (не проверенной расчетом).
+    Если неустойчивые пробы подходят к предполагаемой устойчивой точке ближе
+    четверти начального интервала, она отодвигается на половину начального интервала.
+    """
+
+    name = "bisection"
+
+    def __init__(self, unstable: Tuple[float, float], stable_x: float, tolerance: float,
+                 stable: Optional[Tuple[float, float]] = None,
+                 curve: Optional[Callable[[float], Optional[float]]] = None,
+                 inverse: Optional[Callable[[float], Optional[float]]] = None):
+        """
+        Args:
+            unstable: Неустойчивая точка (x, y)
+            stable_x: Предполагаемая устойчивая граница интервала по параметру
+            tolerance: Точность по y
+            stable: Проверенная устойчивая точка (x, y), если известна
+            curve: Известная зависимость y(x) (None - значение неизвестно)
+            inverse: Обратная зависимость x(y) (None - значение неизвестно)
+        """
+        self.curve = curve
+        self.inverse = inverse
+        self.x_u, self.y_u = unstable
+        self.x_s, self.y_s = stable if stable is not None else (stable_x, None)
+        self.tolerance = tolerance
+        self.history: List[Tuple[float, float, bool]] = []
+        self._span = abs(self.x_s - self.x_u)
+
+    @property
+    def verified(self) -> bool:
+        """Устойчивая граница интервала проверена расчетом"""
+        return self.y_s is not None
+
+    @property
+    def width(self) -> float:
+        """Ширина интервала по y (бесконечность, если устойчивая граница не проверена)"""
+        return abs(self.y_u - self.y_s) if self.verified else float("inf")
+
+    def add(self, x: float, y: float, stable: bool):
+        """Добавление результата пробы"""
+        self.history.append((x, y, stable))
+        if stable:
+            self.x_s, self.y_s = x, y
+            return
+        if not self.verified and abs(self.x_s - x) < self._span / 4:
+            # Предел, вероятно, за предполагаемой устойчивой границей - расширение интервала
+            self.x_s = x + (self.x_s - self.x_u) / abs(self.x_s - self.x_u) * self._span / 2
+        self.x_u, self.y_u = x, y
+
+    def done(self) -> bool:
+        """Интервал сужен до точности по y (или по параметру)"""
+        return self.verified and (self.width <= self.tolerance or abs(self.x_u - self.x_s) < MIN_WIDTH)
+
+    def next_x(self) -> float:
+        """Следующее значение параметра; после сужения интервала - устойчивая граница"""
+        if self.done():
+            return self.x_s
+        return self._step()
+
+    def _step(self) -> float:
+        return (self.x_s + self.x_u) / 2
+
+
+class SecantBoundarySearch(BoundarySearch):
+    """
+    Деление интервала по y с шагом по интерполяции x(y)
+
+    Значение параметра для целевого y находится по известной зависимости y(x)
+    (если задана, например, по траектории утяжеления), иначе - обратной
+    интерполяцией по концам интервала и ближайшей к нему пробе вне интервала
+    (хорда через одни концы дает середину по параметру, третья точка учитывает
+    кривизну y(x)); до проверки устойчивой границы - по хорде через две
+    последние пробы. Цель - середина интервала по y. Шаг, выходящий за интервал
+    или к его концам, а также шаг после интерполяции с большой ошибкой
+    заменяется делением интервала пополам по параметру.
+    """
+
+    name = "secant"
+
+    # Ошибка интерполяции, после которой выполняется деление пополам по параметру
+    INACCURATE = 0.25
+
+    def __init__(self, unstable: Tuple[float, float], stable_x: float, tolerance: float,
+                 stable: Optional[Tuple[float, float]] = None,
+                 curve: Optional[Callable[[float], Optional[float]]] = None,
+                 inverse: Optional[Callable[[float], Optional[float]]] = None):
+        super().__init__(unstable, stable_x, tolerance, stable, curve, inverse)
+        self._points: List[Tuple[float, float]] = [unstable] + ([stable] if stable else [])
+        self._expected: Optional[Tuple[float, float]] = None
+        # Относительная ошибка последней интерполяции (до первой - не определена)
+        self._error: Optional[float] = None
+
+    def add(self, x: float, y: float, stable: bool):
+        if self._expected is not None:
+            target, width = self._expected
+            self._error = abs(y - target) / width
+        else:
+            self._error = None
+        self._expected = None
+        super().add(x, y, stable)
+        self._points.append((x, y))
+
+    def _step(self) -> float:
+        middle = super()._step()
+        if self._error is not None and self._error > self.INACCURATE:
+            return middle
+        if self.verified:
+            y_s = self.y_s
+            ends = [(self.x_s, self.y_s), (self.x_u, self.y_u)]
+            lo, hi = sorted((self.x_s, self.x_u))
+            outside = [p for p in self._points if not lo <= p[0] <= hi]
+            nearest = [min(outside, key=lambda p: min(abs(p[0] - lo), abs(p[0] - hi)))] if outside else []
+            points = ends + nearest
+        else:
+            y_s = self.curve(self.x_s) if self.curve is not None else None
+            if y_s is None:
+                if len(self._points) < 2:
+                    return middle
+                (x0, y0), (x1, y1) = self._points[-2:]
+                if x1 == x0 or y1 == y0:
+                    return middle
+                # Оценка y на предполагаемой устойчивой границе по хорде
+                y_s = y1 + (self.x_s - x1) * (y1 - y0) / (x1 - x0)
+            points = self._points[-2:]
+        width = abs(self.y_u - y_s)
+        if width == 0:
+            return middle
+        target = (y_s + self.y_u) / 2
+        x = self.inverse(target) if self.inverse is not None else None
+        if x is None and len(points) >= 2:
+            x = _inverse_interpolation(points, target)
+        lo, hi = sorted((self.x_s, self.x_u))
+        margin = (hi - lo) * EDGE_FRACTION
+        if x is None or not lo + margin <= x <= hi - margin:
+            return middle
+        self._expected = (target, width)
+        return x
+
+
+def _inverse_interpolation(points: List[Tuple[float, float]], target: float) -> Optional[float]:
+    """Значение x(target) по интерполяционному многочлену Лагранжа x(y) через точки (x, y)"""
+    ys = [y for _, y in points]
+    if len(set(ys)) != len(ys):
+        return None
+    x = 0.0
+    for i, (xi, yi) in enumerate(points):
+        term = xi
+        for j, yj in enumerate(ys):
+            if j != i:
+                term *= (target - yj) / (yi - yj)
+        x += term
+    return x
+
+
+BOUNDARY_SEARCHES: Dict[str, Type[BoundarySearch]] = {
+    cls.name: cls for cls in (BoundarySearch, SecantBoundarySearch)
+}
+
+
+def make_boundary_search(method: str, unstable: Tuple[float, float], stable_x: float,
+                         tolerance: float, stable: Optional[Tuple[float, float]] = None,
+                         curve: Optional[Callable[[float], Optional[float]]] = None,
+                         inverse: Optional[Callable[[float], Optional[float]]] = None) -> BoundarySearch:
+    """Стратегия поиска границы по имени (bisection, secant)"""
+    try:
+        cls = BOUNDARY_SEARCHES[method]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный метод поиска границы устойчивости: {method} "
+            f"(допустимо: {', '.join(BOUNDARY_SEARCHES)})"
+        ) from None
+    return cls(unstable, stable_x, tolerance, stable, curve, inverse)
+
+
+class BoundaryResult:
+    """Результат поиска границы устойчивости"""
+
+    def __init__(self, x: float, y: float, stable: bool,
+                 history: List[Tuple[float, float, bool]], converged: bool):
+        self.x = x
+        self.y = y
+        self.stable = stable
+        self.history = history
+        self.converged = converged
+
+    @property
+    def probes(self) -> int:
+        """Количество проб (расчетов динамики)"""
+        return len(self.history)
+
+
+def find_boundary(probe: Callable[[float], Optional[Tuple[float, float, bool]]],
+                  search: BoundarySearch, max_probes: int = 100,
+                  first: Sequence[float] = ()) -> BoundaryResult:
+    """
+    Поиск границы устойчивости
+
+    Поиск завершается устойчивой пробой при интервале, суженном до точности
+    (если последняя проба неустойчива, повторяется проба устойчивой границы,
+    чтобы состояние расчета соответствовало найденному пределу).
+
+    Args:
+        probe: Проба при значении параметра x - (фактическое x, y, устойчиво?);
+            None - расчет не выполнен, поиск прерывается
+        search: Стратегия поиска
+        max_probes: Максимальное количество проб
+        first: Значения параметра первых проб (далее - шаги стратегии), например,
+            прогноз предела по предыдущим расчетам; значения вне интервала,
+            суженного предыдущими пробами, пропускаются
+
+    Returns:
+        Последняя проба и история поиска
+    """
+    x, y, stable = search.x_u, search.y_u, False
+    first = list(first)
+    while not (stable and search.done()):
+        if len(search.history) >= max_probes:
+            return BoundaryResult(x, y, stable, search.history, False)
+        lo, hi = sorted((search.x_s, search.x_u))
+        while first and not (lo < first[0] < hi):
+            first.pop(0)
+        if first and not search.done():
+            result = probe(first.pop(0))
+        else:
+            result = probe(search.next_x())
+        if result is None:
+            return BoundaryResult(x, y, False, search.history, False)
+        x, y, stable = result
+        search.add(x, y, stable)
+    return BoundaryResult(x, y, stable, search.history, True)
@@ -67,6 +67,17 @@ class Config:
                 "base_angle": 1.471,
                 "crt_time_precision": 0.02,
                 "crt_time_max": 1.0,
+                "cct_screening": False,  # Начальный интервал поиска по правилу площадей
+                "cct_screening_margin": 0.3,  # Относительная погрешность оценки
+                "shunt_root_finder": "proportional",  # proportional, secant, illinois, newton_log
+                "shunt_max_iterations": 20,  # Максимум расчетов динамики на шунт КЗ
+                "shunt_thevenin_start": False,  # Начальный шунт по эквивалентному сопротивлению сети
+                "mdp_search": "bisection",  # bisection, secant
+                "mdp_max_probes": 100,  # Максимум расчетов динамики на поиск МДП
+                "mdp_seed_with_pa": False,  # Поиск МДП с ПА от предела без ПА
+                "uost_tolerance": 0.5,  # Точность места КЗ на границе устойчивости, % длины линии
+                "uost_max_probes": 50,  # Максимум расчетов динамики на поиск места КЗ
+                "uost_warm_start": False,  # Начальный интервал по границе предыдущих сценариев линии
                 "default_selected_sch": 0
             },
             "settings": {
@@ -94,8 +105,20 @@ class Config:
             },
             "performance": {
                 "max_workers": None,  # None = автоматически
+                "parallel_workers": 1,  # Процессов для параллельных расчетов (1 = последовательно)
+                "parallel_retries": 2,  # Повторов после аварийного завершения рабочего процесса
+                "crt_speculative": False,  # Спекулятивный k-арный поиск критического времени КЗ
+                "crt_warm_start": False,  # Начальный интервал поиска по ранее найденным значениям
+                "variant_delta_cache": False,  # Применение вариантов по запомненным изменениям режима
+                "variant_tables": ["node", "vetv", "Generator"],  # Таблицы, изменяемые вариантами
+                "lpn_scn_cache": False,  # Хранение сценариев, составленных из ЛАПНУ
+                "weighting_trajectory": False,  # Траектория утяжеления для калибровки и поиска МДП
+                "weighting_resolution": 1,  # Шагов записи траектории на один шаг утяжеления
+                "uost_split_fixture": False,  # Снимки режима с разделенной линией в расчете Uост
                 "cache_enabled": True,
-                "cache_ttl": 3600  # 1 час
+                "cache_ttl": 3600,  # 1 час
+                "snapshot_cache_mb": 2048,  # Ограничение хранилища снимков режимов
+                "template_index_refresh": 2.0  # Интервал проверки директории шаблонов, с
             },
             "license": {
                 "disable_check": True  # True для отключения проверки лицензии (только для тестирования!)
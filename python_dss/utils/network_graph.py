@@ -0,0 +1,23 @@
+"""
+Связность схемы сети по ветвям
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+
+def connected_nodes(ip: np.ndarray, iq: np.ndarray, roots: Sequence[int]) -> set:
+    """Узлы, связанные ветвями (ip, iq) с узлами roots"""
+    adjacent = {}
+    for a, b in zip(ip.tolist(), iq.tolist()):
+        adjacent.setdefault(a, []).append(b)
+        adjacent.setdefault(b, []).append(a)
+    seen = set(roots)
+    stack = list(roots)
+    while stack:
+        for other in adjacent.get(stack.pop(), ()):
+            if other not in seen:
+                seen.add(other)
+                stack.append(other)
+    return seen
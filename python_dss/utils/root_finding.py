@@ -0,0 +1,209 @@
+"""
+Поиск сопротивления шунта КЗ по заданному остаточному напряжению
+
+Остаточное напряжение U(Z) монотонно возрастает с ростом сопротивления шунта,
+каждое вычисление U - это расчет динамики, поэтому стратегии стремятся
+минимизировать количество вычислений. Стратегии - пошаговые: по истории
+точек (Z, U) предлагают следующее сопротивление.
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+# Ограничение шага по сопротивлению за одну итерацию (во сколько раз)
+MAX_STEP_FACTOR = 10.0
+
+
+class RootFinder:
+    """
+    Базовая стратегия: пропорциональный шаг Z * U_цел / U
+
+    Ведет историю вычислений и интервал [lo, hi], в котором U(lo) < U_цел < U(hi).
+    """
+
+    name = "proportional"
+
+    def __init__(self, target: float):
+        """
+        Args:
+            target: Целевое остаточное напряжение, кВ
+        """
+        self.target = target
+        self.history: List[Tuple[float, float]] = []
+        self.lo: Optional[float] = None
+        self.hi: Optional[float] = None
+
+    def add(self, z: float, u: float):
+        """Добавление результата вычисления U(z)"""
+        self.history.append((z, u))
+        if u < self.target:
+            self.lo = z if self.lo is None else max(self.lo, z)
+        elif u > self.target:
+            self.hi = z if self.hi is None else min(self.hi, z)
+
+    def next_z(self) -> float:
+        """Следующее сопротивление для вычисления"""
+        z, u = self.history[-1]
+        if u <= 0:
+            # Напряжение не определено - увеличение сопротивления в пределах интервала
+            return 2 * z if self.hi is None else math.sqrt(z * self.hi)
+        return self._safeguard(z, self._step())
+
+    def _step(self) -> float:
+        z, u = self.history[-1]
+        return z * self.target / u
+
+    def _safeguard(self, z: float, z_new: float) -> float:
+        """Ограничение шага; при выходе за известный интервал - деление его пополам (в логарифмах)"""
+        if not math.isfinite(z_new) or z_new <= 0:
+            z_new = z * self.target / self.history[-1][1]
+        z_new = min(max(z_new, z / MAX_STEP_FACTOR), z * MAX_STEP_FACTOR)
+        if self.lo is not None and self.hi is not None and not self.lo < z_new < self.hi:
+            z_new = math.sqrt(self.lo * self.hi)
+        return z_new
+
+
+class SecantFinder(RootFinder):
+    """Метод секущих по двум последним точкам (первый шаг - пропорциональный)"""
+
+    name = "secant"
+
+    def _step(self) -> float:
+        if len(self.history) < 2:
+            return super()._step()
+        (z0, u0), (z1, u1) = self.history[-2:]
+        if u1 == u0:
+            return super()._step()
+        return z1 - (u1 - self.target) * (z1 - z0) / (u1 - u0)
+
+
+class IllinoisFinder(SecantFinder):
+    """
+    Метод ложного положения с модификацией Illinois
+
+    До нахождения интервала, содержащего решение, выполняются шаги метода секущих;
+    далее - хорды между концами интервала, значение на "застрявшем" конце
+    уменьшается вдвое, что исключает медленную одностороннюю сходимость.
+    """
+
+    name = "illinois"
+
+    def __init__(self, target: float):
+        super().__init__(target)
+        self._a: Optional[Tuple[float, float]] = None
+        self._b: Optional[Tuple[float, float]] = None
+
+    def add(self, z: float, u: float):
+        super().add(z, u)
+        f = u - self.target
+        if self._a is None:
+            if self._b is not None and self._b[1] * f < 0:
+                self._a = self._b
+            self._b = (z, f)
+            return
+        if self._b[1] * f < 0:
+            self._a = self._b
+        else:
+            self._a = (self._a[0], self._a[1] / 2)
+        self._b = (z, f)
+
+    def _step(self) -> float:
+        if self._a is None:
+            return super()._step()
+        (za, fa), (zb, fb) = self._a, self._b
+        if fb == fa:
+            return super()._step()
+        return zb - fb * (zb - za) / (fb - fa)
+
+
+class LogNewtonFinder(RootFinder):
+    """
+    Метод Ньютона для ln U(ln Z) = ln U_цел с защитой
+
+    Производная d lnU / d lnZ оценивается по двум последним точкам (до второй
+    точки принимается равной 1, что совпадает с пропорциональным шагом).
+    """
+
+    name = "newton_log"
+
+    # Допустимый диапазон производной d lnU / d lnZ
+    MIN_SLOPE = 0.05
+    MAX_SLOPE = 20.0
+
+    def _step(self) -> float:
+        z1, u1 = self.history[-1]
+        slope = 1.0
+        if len(self.history) >= 2:
+            z0, u0 = self.history[-2]
+            if u0 > 0 and z0 != z1:
+                slope = math.log(u1 / u0) / math.log(z1 / z0)
+            if not self.MIN_SLOPE <= slope <= self.MAX_SLOPE:
+                slope = 1.0
+        return z1 * math.exp(math.log(self.target / u1) / slope)
+
+
+ROOT_FINDERS: Dict[str, Type[RootFinder]] = {
+    cls.name: cls for cls in (RootFinder, SecantFinder, IllinoisFinder, LogNewtonFinder)
+}
+
+
+def make_root_finder(method: str, target: float) -> RootFinder:
+    """Стратегия поиска по имени (proportional, secant, illinois, newton_log)"""
+    try:
+        return ROOT_FINDERS[method](target)
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный метод поиска шунта КЗ: {method} (допустимо: {', '.join(ROOT_FINDERS)})"
+        ) from None
+
+
+class RootResult:
+    """Результат поиска сопротивления"""
+
+    def __init__(self, z: float, u: float, history: List[Tuple[float, float]], converged: bool):
+        self.z = z
+        self.u = u
+        self.history = history
+        self.converged = converged
+
+    @property
+    def iterations(self) -> int:
+        """Количество вычислений U(Z)"""
+        return len(self.history)
+
+
+def find_root(func: Callable[[float], Optional[float]], z0: float, target: float,
+              tolerance: float, method: str = "illinois",
+              max_iterations: int = 20) -> RootResult:
+    """
+    Поиск сопротивления Z, при котором |U(Z) - target| <= tolerance
+
+    Args:
+        func: Вычисление U(Z); None - вычисление невозможно, поиск прерывается
+        z0: Начальное сопротивление
+        target: Целевое значение
+        tolerance: Допустимое отклонение
+        method: Стратегия поиска
+        max_iterations: Максимальное количество вычислений U
+
+    Returns:
+        Последняя вычисленная точка и история поиска
+    """
+    finder = make_root_finder(method, target)
+    z = z0
+    u = func(z)
+    if u is None:
+        return RootResult(z, 0.0, finder.history, False)
+    finder.add(z, u)
+    while abs(u - target) > tolerance:
+        if len(finder.history) >= max_iterations:
+            return RootResult(z, u, finder.history, False)
+        z_new = finder.next_z()
+        u_new = func(z_new)
+        if u_new is None:
+            break
+        z, u = z_new, u_new
+        finder.add(z, u)
+    else:
+        return RootResult(z, u, finder.history, True)
+    return RootResult(z, u, finder.history, False)